@@ -2,23 +2,32 @@ import pandas as pd
 from typing import List, Dict, Set, Optional, Any, Callable, Union, Tuple
 from collections import Counter # Added for duplicate counting
 import csv # Added for failure log
+import glob
+import hashlib
+import argparse
+from dataclasses import dataclass, field
 from src.data_handler import load_and_preprocess_data, process_and_consolidate_contact_data, get_canonical_base_url, generate_processed_contacts_report # Kept main's import
-from src.scraper import scrape_website
-from src.regex_extractor_component import extract_numbers_with_snippets_from_text
+from src.scraper import scrape_website, BrowserPool, CrawlFrontier, HttpFetcher, RequestInterceptor, RobotsCache, CrawlStopPolicies, UrlDiscovery, ResponseCache, AsyncDnsResolver
+from src.regex_extractor_component import extract_numbers_with_snippets_from_text, extract_numbers_from_tel_hrefs, merge_tel_href_candidates, read_tel_hrefs_for_page_file
 from src.llm_extractor_component import GeminiLLMExtractor
+from src.llm_chunk_sizing import AdaptiveChunkSizer
 from src.core.schemas import PhoneNumberLLMOutput, CompanyContactDetails, ConsolidatedPhoneNumber 
 from src.scraper.scraper_logic import normalize_url
 from src.core.logging_config import setup_logging
 from src.core.config import AppConfig
+from src.incremental_state import IncrementalRunState
+from src.checkpoint_store import RunCheckpointStore
+from src.pipeline_store import SQLitePipelineRepository, QUEUE_PENDING, QUEUE_DONE, QUEUE_FAILED
 import logging
+import multiprocessing
 import os
+import sqlite3
 import asyncio
 from datetime import datetime
 import time
 import json
 import re
 from urllib.parse import urlparse, quote
-import socket # Added for TLD probing
 import phonenumbers
 from phonenumbers import NumberParseException
 from openpyxl.utils import get_column_letter
@@ -34,6 +43,17 @@ EXCLUDED_TYPES_FOR_TOP_CONTACTS_REPORT: Set[str] = {
 logger = logging.getLogger(__name__) 
 app_config: AppConfig = AppConfig()
 
+# DataFrame columns written by Pass 1 for an input row; saved in the row's checkpoint.
+PASS1_ROW_COLUMNS: List[str] = [
+    'ScrapingStatus', 'VerificationStatus', 'CanonicalEntryURL', 'Overall_VerificationStatus', 'Original_Number_Status',
+    'Primary_Number_1', 'Primary_Type_1', 'Primary_SourceURL_1', 'Primary_Number_2', 'Primary_Type_2', 'Primary_SourceURL_2',
+    'Secondary_Number_1', 'Secondary_Type_1', 'Secondary_SourceURL_1', 'Secondary_Number_2', 'Secondary_Type_2', 'Secondary_SourceURL_2',
+]
+# run_metrics["tasks"] entries accumulated row by row in Pass 1; checkpointed and summed across worker processes.
+PASS1_TASK_DURATION_KEYS: List[str] = [
+    'scrape_website_total_duration_seconds', 'regex_extraction_total_duration_seconds', 'llm_extraction_total_duration_seconds',
+]
+
 FAULT_CATEGORY_MAP_DEFINITION: Dict[str, str] = {
     "Input_URL_Invalid": "Input Data Issue",
     "Input_URL_UnsupportedScheme": "Input Data Issue",
@@ -138,6 +158,375 @@ def get_input_canonical_url(url_string: Optional[str]) -> Optional[str]:
         logger.debug(f"Could not parse/normalize input URL '{url_string}' for canonical pre-check: {e}")
         return None
 
+def plan_domain_work_units(input_canonical_urls_by_index: Dict[Any, Optional[str]]) -> Dict[str, List[Any]]:
+    """
+    Groups input rows by the true base domain of their input URL (see
+    `get_input_canonical_url` and `get_canonical_base_url`).
+
+    Returns a mapping of true base domain -> input row indices in input order.
+    Each domain is one work unit: Pass 1 scrapes it once, for the first row,
+    and the other rows reuse that result. Rows without a usable domain are not
+    included and are processed on their own.
+    """
+    work_units: Dict[str, List[Any]] = {}
+    for index, input_canonical_url in input_canonical_urls_by_index.items():
+        if not input_canonical_url:
+            continue
+        true_base_domain = get_canonical_base_url(input_canonical_url, log_level_for_non_domain_input=logging.DEBUG)
+        if true_base_domain:
+            work_units.setdefault(true_base_domain, []).append(index)
+    return work_units
+
+def plan_queue_entries(df: pd.DataFrame, domain_work_units: Dict[str, List[Any]]) -> List[Tuple[str, Optional[str], str]]:
+    """
+    The pipeline store queue entries (row_key, given_url, work_unit) of the input rows.
+
+    The work unit is the row's input canonical domain (see `plan_domain_work_units`),
+    so rows sharing a domain are claimed, and sharded, together; `row:<index>` for
+    rows without one.
+    """
+    input_domain_by_row_key = {str(index): domain for domain, row_indices in domain_work_units.items() for index in row_indices}
+    return [
+        (str(index), None if pd.isna(given_url_val) else str(given_url_val), input_domain_by_row_key.get(str(index)) or f"row:{index}")
+        for index, given_url_val in (df['GivenURL'].items() if 'GivenURL' in df.columns else ((index, None) for index in df.index))
+    ]
+
+def shard_for_work_unit(work_unit: str, shard_count: int) -> int:
+    """
+    Shard number (1..shard_count) of a work unit (an input canonical domain, or `row:<index>`).
+
+    Uses a SHA-256 of the work unit rather than `hash()`, so every machine and
+    Python process assigns the same rows to the same shard.
+    """
+    return int.from_bytes(hashlib.sha256(work_unit.encode('utf-8')).digest()[:8], 'big') % shard_count + 1
+
+def parse_shard_spec(value: str) -> Tuple[int, int]:
+    """Parses `--shard i/N` (1 <= i <= N)."""
+    match = re.fullmatch(r'\s*(\d+)\s*/\s*(\d+)\s*', value)
+    if not match or not 1 <= int(match.group(1)) <= int(match.group(2)):
+        raise argparse.ArgumentTypeError(f"expected i/N with 1 <= i <= N, got '{value}'")
+    return int(match.group(1)), int(match.group(2))
+
+def compute_input_fingerprint(df: pd.DataFrame) -> str:
+    """Hash of the input rows (index, company name, given URL); shards can only be merged over the same input."""
+    input_hash = hashlib.sha256()
+    input_columns = [df[col] if col in df.columns else [None] * len(df) for col in ('CompanyName', 'GivenURL')]
+    for index, company_name, given_url in zip(df.index, *input_columns):
+        input_hash.update(f"{index}\x1f{company_name}\x1f{given_url}\x1e".encode('utf-8'))
+    return input_hash.hexdigest()
+
+# Pass 1 stats sections (dotted run_metrics paths) whose `*_ratio` / `*_rate` / `*_avg` values are
+# derived from their counters, and the function that recomputes them after a merge.
+PASS1_DERIVED_METRICS: Dict[str, Callable[[Dict[str, Any]], None]] = {
+    "scraping_stats.response_cache": ResponseCache.add_derived_stats,
+    "scraping_stats.dns_resolver": AsyncDnsResolver.add_derived_stats,
+    "crawl_frontier_stats": CrawlFrontier.add_derived_stats,
+    "crawl_frontier_stats.robots_cache": RobotsCache.add_derived_stats,
+    "llm_processing_stats.chunk_sizing": AdaptiveChunkSizer.add_derived_stats,
+}
+
+def merge_pass1_metrics(target: Dict[str, Any], source: Dict[str, Any], path: str) -> None:
+    """
+    Adds the Pass 1 counters in `source` (one process's run_metrics section at `path`) to `target`.
+
+    Numbers are summed, booleans OR'd and nested dicts merged recursively.
+    `*_max` / `*_peak` values keep the maximum. `*_ratio` / `*_rate` / `*_avg`
+    values are not merged: sections listed in `PASS1_DERIVED_METRICS` get them
+    recomputed from the summed counters, so every process is weighted by its
+    volume. Anything else (status strings, lists) is taken from `source`.
+    """
+    for key, value in source.items():
+        existing = target.get(key)
+        if isinstance(value, dict):
+            if not isinstance(existing, dict):
+                existing = target[key] = {}
+            merge_pass1_metrics(existing, value, f"{path}.{key}")
+        elif isinstance(value, bool):
+            target[key] = bool(existing) or value
+        elif isinstance(value, (int, float)) and (existing is None or isinstance(existing, (int, float))):
+            if key.endswith(('_max', '_peak')):
+                target[key] = value if existing is None else max(existing, value)
+            elif key.endswith(('_ratio', '_rate', '_avg')):
+                if existing is None:
+                    target[key] = value
+            else:
+                target[key] = (existing or 0) + value
+        else:
+            target[key] = value
+    add_derived_stats = PASS1_DERIVED_METRICS.get(path)
+    if add_derived_stats is not None:
+        add_derived_stats(target)
+
+def merge_journey_entry(target: Dict[str, Any], source: Dict[str, Any]) -> None:
+    """Merges the canonical domain journey entry one process built for a true base domain into another's."""
+    for key, value in source.items():
+        existing = target.get(key)
+        if existing is None:
+            target[key] = value
+        elif isinstance(existing, set):
+            existing.update(value)
+        elif isinstance(existing, Counter):
+            existing.update(value)
+        elif isinstance(existing, bool):
+            target[key] = existing or bool(value)
+        elif isinstance(existing, (int, float)):
+            target[key] = existing + value
+        elif isinstance(existing, list):
+            existing.extend(value)
+        elif existing == "Unknown":
+            target[key] = value
+
+@dataclass
+class Pass1State:
+    """
+    The Pass 1 results of this process that are checkpointed row by row, and that
+    checkpoints of worker processes and shards are merged into.
+
+    `df`, `run_metrics`, `incremental_state` and `pipeline_store` belong to the
+    whole run; the other fields are Pass 1's own bookkeeping.
+    """
+    df: pd.DataFrame
+    run_metrics: Dict[str, Any]
+    incremental_state: IncrementalRunState
+    pipeline_store: SQLitePipelineRepository
+    input_to_canonical_map: Dict[str, Optional[str]] = field(default_factory=dict)
+    # (scraped page details, scraper status, pathful canonical URL) per row that got a scrape result.
+    pass1_row_scrape_results: Dict[Any, Tuple[List[Tuple[str, str, str, str]], str, Optional[str]]] = field(default_factory=dict)
+    completed_pass1_rows: Set[Any] = field(default_factory=set)
+    canonical_domain_journey_data: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    true_base_to_input_row_ids: Dict[str, Set[Any]] = field(default_factory=dict)
+    true_base_to_input_company_names: Dict[str, Set[str]] = field(default_factory=dict)
+    true_base_to_input_given_urls: Dict[str, Set[str]] = field(default_factory=dict)
+    true_base_to_pathful_urls_attempted: Dict[str, Set[str]] = field(default_factory=dict)
+    row_level_failure_counts: Dict[str, int] = field(default_factory=dict)
+    rows_processed_in_pass1: int = 0
+    rows_failed_in_pass1: int = 0
+    # Number of run_metrics["errors_encountered"] entries already in the checkpoint.
+    checkpointed_error_count: int = 0
+
+def restore_pass1_checkpoint(state: Pass1State, checkpoint: Dict[str, Any]) -> int:
+    """
+    Merges a loaded checkpoint (this run's own, a Pass 1 worker's or a shard's) into `state`.
+
+    Domain journey data and counters are added to what is already there, so the
+    checkpoints of several worker processes can be restored one after another.
+    Returns the number of rows restored.
+    """
+    df = state.df
+    run_metrics = state.run_metrics
+    index_by_row_key = {str(df_index): df_index for df_index in df.index}
+    restored_rows = 0
+    for row_key, row_record in checkpoint["rows"].items():
+        restored_index = index_by_row_key.get(row_key)
+        if restored_index is None:
+            continue
+        for col_name, value in row_record.get("df_values", {}).items():
+            df.at[restored_index, col_name] = value
+        state.input_to_canonical_map[row_record["given_url_key"]] = row_record.get("true_base")
+        if row_record.get("scrape_result") is not None:
+            restored_details, restored_status, restored_pathful = row_record["scrape_result"]
+            state.pass1_row_scrape_results[restored_index] = ([tuple(page) for page in restored_details], restored_status, restored_pathful)
+        state.completed_pass1_rows.add(restored_index)
+        restored_rows += 1
+    for pathful_url_key, pathful_record in checkpoint["pathful"].items():
+        if pathful_record.get("incremental_record"):
+            state.incremental_state.import_pathful(pathful_url_key, pathful_record["incremental_record"])
+    for true_base_key, domain_record in checkpoint["domains"].items():
+        journey_entry = domain_record["journey"]
+        for set_key in ("Input_Row_IDs", "Input_CompanyNames", "Input_GivenURLs", "Pathful_URLs_Attempted_List"):
+            journey_entry[set_key] = set(journey_entry.get(set_key, []))
+        for counter_key in ("Scraped_Pages_Details_Aggregated", "LLM_Consolidated_Number_Types_Summary"):
+            journey_entry[counter_key] = Counter(journey_entry.get(counter_key, {}))
+        if true_base_key in state.canonical_domain_journey_data:
+            merge_journey_entry(state.canonical_domain_journey_data[true_base_key], journey_entry)
+        else:
+            state.canonical_domain_journey_data[true_base_key] = journey_entry
+        state.true_base_to_input_row_ids.setdefault(true_base_key, set()).update(domain_record.get("input_row_ids", []))
+        state.true_base_to_input_company_names.setdefault(true_base_key, set()).update(domain_record.get("input_company_names", []))
+        state.true_base_to_input_given_urls.setdefault(true_base_key, set()).update(domain_record.get("input_given_urls", []))
+        state.true_base_to_pathful_urls_attempted.setdefault(true_base_key, set()).update(domain_record.get("pathful_urls_attempted", []))
+    checkpointed_state = checkpoint["state"]
+    for metrics_section, section_values in checkpointed_state.get("run_metrics", {}).items():
+        merge_pass1_metrics(run_metrics.setdefault(metrics_section, {}), section_values, metrics_section)
+    state.incremental_state.add_pass1_stats(checkpointed_state.get("incremental_stats", {}))
+    state.pipeline_store.add_stats(checkpointed_state.get("pipeline_store_stats", {}))
+    for stage_key, failure_count in checkpointed_state.get("row_level_failure_counts", {}).items():
+        state.row_level_failure_counts[stage_key] = state.row_level_failure_counts.get(stage_key, 0) + failure_count
+    state.rows_processed_in_pass1 += checkpointed_state.get("rows_processed_in_pass1", 0)
+    state.rows_failed_in_pass1 += checkpointed_state.get("rows_failed_in_pass1", 0)
+    run_metrics["data_processing_stats"]["rows_reused_domain_result"] += checkpointed_state.get("rows_reused_domain_result", 0)
+    run_metrics["errors_encountered"].extend(checkpoint["errors"])
+    state.checkpointed_error_count += len(checkpoint["errors"])
+    return restored_rows
+
+def domain_checkpoint_record(state: Pass1State, true_base: str) -> Dict[str, Any]:
+    return {
+        "journey": state.canonical_domain_journey_data[true_base],
+        "input_row_ids": state.true_base_to_input_row_ids.get(true_base, set()),
+        "input_company_names": state.true_base_to_input_company_names.get(true_base, set()),
+        "input_given_urls": state.true_base_to_input_given_urls.get(true_base, set()),
+        "pathful_urls_attempted": state.true_base_to_pathful_urls_attempted.get(true_base, set()),
+    }
+
+def pass1_state_snapshot(state: Pass1State) -> Dict[str, Any]:
+    """Run-level Pass 1 counters of this process, as checkpointed with each row."""
+    run_metrics = state.run_metrics
+    run_metrics_snapshot = {
+        "scraping_stats": {k: v for k, v in run_metrics["scraping_stats"].items() if k != "processed_canonical_sites_for_success_count"},
+        "regex_extraction_stats": run_metrics["regex_extraction_stats"],
+        "llm_processing_stats": {k: v for k, v in run_metrics["llm_processing_stats"].items() if k != "sites_already_attempted_llm_or_skipped"},
+        "tasks": {k: v for k, v in run_metrics["tasks"].items() if k in PASS1_TASK_DURATION_KEYS},
+    }
+    if "crawl_frontier_stats" in run_metrics:
+        run_metrics_snapshot["crawl_frontier_stats"] = run_metrics["crawl_frontier_stats"]
+    return {
+        "run_metrics": run_metrics_snapshot,
+        "incremental_stats": state.incremental_state.pass1_stats(),
+        "pipeline_store_stats": state.pipeline_store.stats,
+        "row_level_failure_counts": state.row_level_failure_counts,
+        "rows_processed_in_pass1": state.rows_processed_in_pass1,
+        "rows_failed_in_pass1": state.rows_failed_in_pass1,
+        "rows_reused_domain_result": run_metrics["data_processing_stats"]["rows_reused_domain_result"],
+    }
+
+def checkpoint_pass1_row(state: Pass1State, checkpoint_store: Optional[RunCheckpointStore], index: Any) -> None:
+    """Persists everything a completed Pass 1 row produced (see RunCheckpointStore)."""
+    if checkpoint_store is None:
+        return
+    df = state.df
+    given_url_value = df.at[index, 'GivenURL'] if 'GivenURL' in df.columns else None
+    true_base_value = df.at[index, 'CanonicalEntryURL'] if 'CanonicalEntryURL' in df.columns else None
+    true_base_value = true_base_value if isinstance(true_base_value, str) and true_base_value else None
+    row_record: Dict[str, Any] = {
+        "df_values": {col: (None if pd.isna(df.at[index, col]) else df.at[index, col]) for col in PASS1_ROW_COLUMNS if col in df.columns},
+        "given_url_key": str(given_url_value) if given_url_value is not None else "None_GivenURL_Input",
+        "true_base": true_base_value,
+        "scrape_result": state.pass1_row_scrape_results.get(index),
+    }
+    # The pathful URL's regex/LLM results are already persisted in pipeline_store.
+    pathful_checkpoint = None
+    pathful_url_value = state.pass1_row_scrape_results[index][2] if index in state.pass1_row_scrape_results else None
+    if pathful_url_value and state.incremental_state.export_pathful(pathful_url_value) is not None:
+        pathful_checkpoint = (pathful_url_value, {"incremental_record": state.incremental_state.export_pathful(pathful_url_value)})
+    domain_checkpoint = None
+    if true_base_value and true_base_value in state.canonical_domain_journey_data:
+        domain_checkpoint = (true_base_value, domain_checkpoint_record(state, true_base_value))
+    new_errors = state.run_metrics["errors_encountered"][state.checkpointed_error_count:]
+    try:
+        checkpoint_store.checkpoint_row(
+            str(index), row_record, pathful=pathful_checkpoint, domain=domain_checkpoint,
+            state=pass1_state_snapshot(state), new_errors=new_errors
+        )
+        state.checkpointed_error_count += len(new_errors)
+    except sqlite3.Error as e:
+        logger.error(f"[RowID: {index}] Could not write Pass 1 checkpoint: {e}")
+
+def restore_worker_checkpoints(state: Pass1State, checkpoint_store: RunCheckpointStore, worker_checkpoint_pattern: str) -> int:
+    """
+    Restores the checkpoints left by Pass 1 worker processes (files matching
+    `worker_checkpoint_pattern`) and folds each one into `checkpoint_store`, then
+    deletes it. Returns the number of rows restored.
+
+    A worker checkpoint already folded in (the run crashed before deleting it) is
+    only deleted, so its rows are not counted twice.
+    """
+    restored_rows = 0
+    for worker_checkpoint_path in sorted(glob.glob(worker_checkpoint_pattern)):
+        source_name = os.path.basename(worker_checkpoint_path)
+        try:
+            if source_name not in checkpoint_store.imported_checkpoints():
+                worker_store = RunCheckpointStore(worker_checkpoint_path)
+                try:
+                    worker_checkpoint = worker_store.load()
+                finally:
+                    worker_store.close()
+                worker_rows = restore_pass1_checkpoint(state, worker_checkpoint)
+                checkpoint_store.import_checkpoint(
+                    source_name, worker_checkpoint["rows"], worker_checkpoint["pathful"],
+                    domains={true_base: domain_checkpoint_record(state, true_base) for true_base in worker_checkpoint["domains"] if true_base in state.canonical_domain_journey_data},
+                    state=pass1_state_snapshot(state), new_errors=worker_checkpoint["errors"]
+                )
+                restored_rows += worker_rows
+                logger.info(f"Merged Pass 1 worker checkpoint {source_name}: {worker_rows} rows.")
+            os.remove(worker_checkpoint_path)
+        except (sqlite3.Error, OSError) as e:
+            logger.error(f"Could not merge Pass 1 worker checkpoint {worker_checkpoint_path}: {e}. Its rows will be processed again.")
+    return restored_rows
+
+def load_shard_outputs(
+    shard_dirs: List[str], checkpoint_file: str, pipeline_store_file: str, input_fingerprint: str, input_row_count: int
+) -> Optional[List[Tuple[str, Dict[str, Any], Dict[str, Any]]]]:
+    """
+    Loads the Pass 1 checkpoints of `--shard` runs for `merge`, as (shard_dir, shard meta, checkpoint).
+
+    None if an output is not a shard of this input (`input_fingerprint`) or the
+    outputs do not cover shards 1..N of one layout exactly once.
+    """
+    shard_outputs: List[Tuple[str, Dict[str, Any], Dict[str, Any]]] = []
+    for shard_dir in shard_dirs:
+        shard_checkpoint_path = os.path.join(shard_dir, checkpoint_file)
+        if not os.path.exists(shard_checkpoint_path) or not os.path.exists(os.path.join(shard_dir, pipeline_store_file)):
+            logger.error(f"Merge: {shard_dir} has no Pass 1 checkpoint or pipeline store; is it the output directory of a --shard run?")
+            return None
+        shard_checkpoint_store = RunCheckpointStore(shard_checkpoint_path)
+        try:
+            shard_meta = shard_checkpoint_store.get_meta("shard")
+            shard_checkpoint = shard_checkpoint_store.load()
+        finally:
+            shard_checkpoint_store.close()
+        if shard_meta is None:
+            logger.error(f"Merge: {shard_dir} is not the output of a --shard run.")
+            return None
+        if shard_meta["input_fingerprint"] != input_fingerprint:
+            logger.error(f"Merge: shard {shard_meta['index']}/{shard_meta['count']} in {shard_dir} was run on a different input ({shard_meta['input_rows']} rows) than {INPUT_FILE_PATH} ({input_row_count} rows).")
+            return None
+        if glob.glob(os.path.join(glob.escape(shard_dir), f"{os.path.splitext(checkpoint_file)[0]}.worker-*")):
+            logger.warning(f"Merge: {shard_dir} still holds worker checkpoints (the shard run was interrupted). Resume it with --resume to include them; their rows are processed here otherwise.")
+        shard_outputs.append((shard_dir, shard_meta, shard_checkpoint))
+    shard_counts = {shard_meta["count"] for _, shard_meta, _ in shard_outputs}
+    shard_numbers = [shard_meta["index"] for _, shard_meta, _ in shard_outputs]
+    if len(shard_counts) != 1 or len(set(shard_numbers)) != len(shard_numbers) or set(shard_numbers) != set(range(1, next(iter(shard_counts)) + 1)):
+        logger.error(f"Merge: the shard outputs must cover shards 1..N of one layout exactly once; got {sorted((shard_meta['index'], shard_meta['count']) for _, shard_meta, _ in shard_outputs)} (index, count).")
+        return None
+    return shard_outputs
+
+def restore_shard_outputs(
+    state: Pass1State, checkpoint_store: RunCheckpointStore, shard_outputs: List[Tuple[str, Dict[str, Any], Dict[str, Any]]], pipeline_store_file: str
+) -> None:
+    """
+    Restores shard outputs (see `load_shard_outputs`): their checkpoints into `state`
+    and `checkpoint_store`, their pipeline stores into `state.pipeline_store`.
+    """
+    for shard_dir, shard_meta, shard_checkpoint in shard_outputs:
+        shard_rows = restore_pass1_checkpoint(state, shard_checkpoint)
+        imported_pathful_count = state.pipeline_store.import_results(os.path.join(shard_dir, pipeline_store_file))
+        checkpoint_store.import_checkpoint(
+            f"shard-{shard_meta['index']}-of-{shard_meta['count']}", shard_checkpoint["rows"], shard_checkpoint["pathful"],
+            domains={true_base: domain_checkpoint_record(state, true_base) for true_base in shard_checkpoint["domains"] if true_base in state.canonical_domain_journey_data},
+            state=pass1_state_snapshot(state), new_errors=shard_checkpoint["errors"]
+        )
+        logger.info(f"Merge: restored shard {shard_meta['index']}/{shard_meta['count']} from {shard_dir}: {shard_rows} rows, {imported_pathful_count} pathful canonical URL results.")
+    state.run_metrics["data_processing_stats"]["shards_merged"] = len(shard_outputs)
+    state.run_metrics["data_processing_stats"]["rows_restored_from_shards"] = len(state.completed_pass1_rows)
+
+def mark_restored_rows_in_queue(state: Pass1State) -> None:
+    """Queue status of restored rows follows the checkpoint; rows claimed but not checkpointed go back to pending."""
+    failed_rows = {index for index in state.completed_pass1_rows if state.df.at[index, 'Overall_VerificationStatus'] == 'Error_Pass1_RowProcessing'}
+    state.pipeline_store.set_row_status([str(index) for index in failed_rows], QUEUE_FAILED)
+    state.pipeline_store.set_row_status([str(index) for index in state.completed_pass1_rows - failed_rows], QUEUE_DONE)
+    state.pipeline_store.requeue_unfinished()
+
+def discard_unfinished_pathful_results(state: Pass1State) -> int:
+    """Drops the pipeline store's pathful results whose row did not complete; they are redone. Returns how many."""
+    discarded_count = state.pipeline_store.discard_pathful_results({str(restored_index) for restored_index in state.completed_pass1_rows})
+    # Sets only used to count each pathful canonical once; restored pathful URLs are never processed again.
+    scrape_results = state.pass1_row_scrape_results
+    state.run_metrics["scraping_stats"]["processed_canonical_sites_for_success_count"] = set(scrape_results[i][2] for i in scrape_results if scrape_results[i][2])
+    state.run_metrics["llm_processing_stats"]["sites_already_attempted_llm_or_skipped"] = {
+        pathful_url for pathful_urls in state.pipeline_store.completed_pathful_urls_by_true_base().values() for pathful_url in pathful_urls
+    }
+    return discarded_count
+
 def _determine_final_row_outcome_and_fault(
     index: Any,
     row_summary: pd.Series,
@@ -148,7 +537,7 @@ def _determine_final_row_outcome_and_fault(
     true_base_scraper_status_map: Dict[str, str], # Map of true_base_domain to its overall scraper status
     true_base_to_pathful_map: Dict[str, List[str]],
     canonical_site_pathful_scraper_status: Dict[str, str], # Map of pathful_url to its scraper status
-    canonical_site_raw_llm_outputs: Dict[str, List[PhoneNumberLLMOutput]],
+    pathful_urls_with_llm_outputs: Set[str], # Pathful URLs with at least one raw LLM output
     canonical_site_regex_candidates_found_status: Dict[str, bool], # New
     canonical_site_llm_exception_details: Dict[str, str] # New: For specific LLM error messages
 ) -> Tuple[str, str]:
@@ -236,7 +625,7 @@ def _determine_final_row_outcome_and_fault(
             all_raw_llm_empty_for_canonical = True
         else:
             for p_url in pathful_urls_for_canonical:
-                if canonical_site_raw_llm_outputs.get(p_url): # If any pathful URL had non-empty raw LLM output list
+                if p_url in pathful_urls_with_llm_outputs: # If any pathful URL had non-empty raw LLM output list
                     all_raw_llm_empty_for_canonical = False
                     break
         
@@ -327,7 +716,41 @@ def _determine_final_domain_outcome_and_fault(
 
     # Fallback if none of the above conditions met but still no consolidated contacts
     return "Unknown_Domain_Processing_Gap_NoContact", FAULT_CATEGORY_MAP_DEFINITION["Unknown_Processing_Gap_NoContact"]
-def main() -> None:
+def main(
+    incremental: bool = False,
+    resume_run_id: Optional[str] = None,
+    worker_processes: Optional[int] = None,
+    pass1_worker: Optional[Tuple[str, int, int]] = None,
+    shard: Optional[Tuple[int, int]] = None,
+    merge_shard_dirs: Optional[List[str]] = None
+) -> None:
+    """
+    Runs the pipeline over the configured input file.
+
+    Args:
+        incremental: Reuse the stored regex/LLM results of pathful canonical URLs
+            (and consolidated contact details of domains) whose scraped content is
+            unchanged since the previous run. See `IncrementalRunState`.
+        resume_run_id: Continue an interrupted run in its existing output directory.
+            Rows recorded in the run's Pass 1 checkpoint are restored instead of being
+            processed again. See `RunCheckpointStore`.
+        worker_processes: Number of processes sharing Pass 1 (default
+            PIPELINE_WORKER_PROCESSES). Each worker process claims work units from the
+            run's queue in the pipeline store and checkpoints its rows to its own file;
+            this process then merges the worker checkpoints, processes any rows left
+            unfinished, and runs consolidation and reporting.
+        pass1_worker: Internal. (run_id, worker number, worker count) when this process is
+            a Pass 1 worker started by `main`: it only runs Pass 1 and stops before
+            consolidation. It gets 1/worker count of the LLM per-minute budgets.
+        shard: (i, N) to run Pass 1 only for the rows of shard i of N. Rows are assigned
+            to shards by a hash of their input canonical domain (`shard_for_work_unit`),
+            so rows sharing a domain always land on the same shard. The run stops after
+            Pass 1; its output directory (checkpoint, pipeline store, failure log) can be
+            copied to another machine and passed to `merge`.
+        merge_shard_dirs: Output directories of `--shard` runs covering all N shards of
+            this input. Their Pass 1 results are restored instead of running Pass 1,
+            then consolidation and reporting run over all of them.
+    """
     pipeline_start_time = time.time() 
     run_metrics: Dict[str, Any] = {
         "run_id": None,
@@ -355,6 +778,7 @@ def main() -> None:
             "new_canonical_sites_scraped": 0, 
             "total_pages_scraped_overall": 0,
             "pages_scraped_by_type": {}, 
+            "pages_scraped_by_fetch_tier": {},
             "total_successful_canonical_scrapes": 0, 
             "total_urls_fetched_by_scraper": 0, 
         },
@@ -384,8 +808,13 @@ def main() -> None:
         "errors_encountered": []
     }
 
-    run_id = generate_run_id()
+    run_id = resume_run_id or (pass1_worker[0] if pass1_worker else None) or (f"{generate_run_id()}_shard{shard[0]}of{shard[1]}" if shard else generate_run_id())
     run_metrics["run_id"] = run_id
+    # Files a Pass 1 worker writes on its own (log, failure CSV, checkpoint) carry this tag.
+    worker_file_tag = f"worker-{pass1_worker[1]}-{os.getpid()}" if pass1_worker else None
+    if worker_processes is None:
+        worker_processes = app_config.pipeline_worker_processes
+    worker_processes = 1 if pass1_worker else max(1, worker_processes)
     
     output_base_dir_abs: str = app_config.output_base_dir
     if not os.path.isabs(output_base_dir_abs):
@@ -393,12 +822,15 @@ def main() -> None:
         output_base_dir_abs = os.path.join(project_root_dir_local, output_base_dir_abs)
         
     run_output_dir: str = os.path.join(output_base_dir_abs, run_id)
+    if resume_run_id and not os.path.isdir(run_output_dir):
+        # Logging is configured for the run's output directory further down, so this cannot go through the logger.
+        raise SystemExit(f"Cannot resume run '{resume_run_id}': output directory {run_output_dir} does not exist.")
     os.makedirs(run_output_dir, exist_ok=True)
     
     llm_context_dir = os.path.join(run_output_dir, app_config.llm_context_subdir)
     os.makedirs(llm_context_dir, exist_ok=True)
     
-    log_file_name = f"pipeline_run_{run_id}.log"
+    log_file_name = f"pipeline_run_{run_id}.{worker_file_tag}.log" if worker_file_tag else f"pipeline_run_{run_id}.log"
     log_file_path = os.path.join(run_output_dir, log_file_name)
     
     file_log_level_int = getattr(logging, app_config.log_level.upper(), logging.INFO)
@@ -411,13 +843,13 @@ def main() -> None:
         log_file_path=log_file_path
     )
     
-    logger.info(f"Logging initialized. Run ID: {run_id}")
+    logger.info(f"Logging initialized. Run ID: {run_id}{' (resumed)' if resume_run_id else ''}{f' (Pass 1 worker {pass1_worker[1]})' if pass1_worker else ''}{f' (shard {shard[0]}/{shard[1]})' if shard else ''}{f' (merging {len(merge_shard_dirs)} shard outputs)' if merge_shard_dirs else ''}")
     logger.info(f"File log level set to: {logging.getLevelName(file_log_level_int)} (from LOG_LEVEL='{app_config.log_level}')")
     logger.info(f"Console log level set to: {logging.getLevelName(console_log_level_int)} (from CONSOLE_LOG_LEVEL='{app_config.console_log_level}')")
     logger.info(f"Main log file will be: {log_file_path}")
     logger.info(f"Base output directory for this run: {run_output_dir}")
 
-    failure_log_csv_path = os.path.join(run_output_dir, f"failed_rows_{run_id}.csv")
+    failure_log_csv_path = os.path.join(run_output_dir, f"failed_rows_{run_id}.{worker_file_tag}.csv" if worker_file_tag else f"failed_rows_{run_id}.csv")
     logger.info(f"Row-specific failure log for this run will be: {failure_log_csv_path}")
 
     logger.info("Starting phone validation pipeline...")
@@ -428,6 +860,8 @@ def main() -> None:
     llm_extractor: GeminiLLMExtractor
     try:
         llm_extractor = GeminiLLMExtractor(config=app_config)
+        if pass1_worker:
+            llm_extractor.rate_limiter.scale_budgets(1.0 / pass1_worker[2])
         logger.info("GeminiLLMExtractor initialized successfully.")
     except ValueError as ve:
         logger.error(f"Failed to initialize GeminiLLMExtractor: {ve}. Check GEMINI_API_KEY.")
@@ -567,31 +1001,139 @@ def main() -> None:
     run_metrics["tasks"]["pre_computation_duplicate_counts_duration_seconds"] = time.time() - pre_comp_start_time
     # --- End Pre-computation ---
 
+    # --- Domain work-unit planning ---
+    # Rows sharing a true base domain are scraped and classified once; the first row of each
+    # domain leads, the others wait for its scrape result in Pass 1 instead of fetching again.
+    domain_work_units = plan_domain_work_units({
+        index: get_input_canonical_url(given_url_val) for index, given_url_val in df['GivenURL'].items()
+    } if 'GivenURL' in df.columns else {})
+    row_to_shared_work_unit: Dict[Any, str] = {
+        index: domain for domain, row_indices in domain_work_units.items() if len(row_indices) > 1 for index in row_indices
+    }
+    work_unit_leader_rows: Set[Any] = {row_indices[0] for row_indices in domain_work_units.values()}
+    rows_without_domain = len(df) - sum(len(row_indices) for row_indices in domain_work_units.values())
+    planned_work_units = len(domain_work_units) + rows_without_domain
+    run_metrics["data_processing_stats"]["planned_work_units"] = planned_work_units
+    run_metrics["data_processing_stats"]["planned_domains_shared_by_multiple_rows"] = sum(1 for row_indices in domain_work_units.values() if len(row_indices) > 1)
+    run_metrics["data_processing_stats"]["planned_rows_reusing_domain_result"] = len(row_to_shared_work_unit) - run_metrics["data_processing_stats"]["planned_domains_shared_by_multiple_rows"]
+    run_metrics["data_processing_stats"]["rows_reused_domain_result"] = 0
+    logger.info(
+        f"Work-unit planning: {len(df)} input rows -> {planned_work_units} unique work units "
+        f"({len(domain_work_units)} domains, {rows_without_domain} rows without a usable domain). "
+        f"{run_metrics['data_processing_stats']['planned_domains_shared_by_multiple_rows']} domains are shared; "
+        f"{run_metrics['data_processing_stats']['planned_rows_reusing_domain_result']} rows will reuse another row's scrape."
+    )
+    # --- End Domain work-unit planning ---
+
+    checkpoint_store: Optional[RunCheckpointStore] = None
+    worker_checkpoint_pattern: Optional[str] = None
+    if app_config.pipeline_checkpoint_file:
+        checkpoint_path = os.path.join(run_output_dir, app_config.pipeline_checkpoint_file)
+        checkpoint_stem, checkpoint_ext = os.path.splitext(checkpoint_path)
+        worker_checkpoint_pattern = f"{glob.escape(checkpoint_stem)}.worker-*{checkpoint_ext}"
+        if worker_file_tag:
+            checkpoint_path = f"{checkpoint_stem}.{worker_file_tag}{checkpoint_ext}"
+        if resume_run_id and not os.path.exists(checkpoint_path):
+            logger.warning(f"Resuming run {run_id}, but no checkpoint found at {checkpoint_path}. All rows will be processed.")
+        try:
+            checkpoint_store = RunCheckpointStore(checkpoint_path)
+            checkpointed_input = checkpoint_store.get_meta("input")
+            current_input = {"path": INPUT_FILE_PATH, "rows": len(df)}
+            if checkpointed_input is None:
+                checkpoint_store.set_meta("input", current_input)
+            elif checkpointed_input != current_input:
+                logger.error(f"Checkpoint {checkpoint_path} was written for input {checkpointed_input}, but the current input is {current_input}. Cannot resume.")
+                checkpoint_store.close()
+                return
+            logger.info(f"Pass 1 checkpoint: {checkpoint_path}")
+        except sqlite3.Error as e:
+            if pass1_worker:
+                logger.error(f"Could not open Pass 1 worker checkpoint {checkpoint_path}: {e}. A worker cannot hand back its results without it; exiting.")
+                return
+            logger.error(f"Could not open Pass 1 checkpoint {checkpoint_path}: {e}. Continuing without checkpointing.")
+            checkpoint_store = None
+    if (shard or merge_shard_dirs) and checkpoint_store is None:
+        logger.error("--shard and merge exchange Pass 1 results through the run checkpoint, but checkpointing is disabled or failed (PIPELINE_CHECKPOINT_FILE). Exiting.")
+        return
+    input_fingerprint = compute_input_fingerprint(df) if (shard or merge_shard_dirs or resume_run_id) else None
+    if checkpoint_store is not None and not pass1_worker:
+        checkpointed_shard = checkpoint_store.get_meta("shard")
+        if shard is None and checkpointed_shard is not None and resume_run_id:
+            shard = (checkpointed_shard["index"], checkpointed_shard["count"])
+            logger.info(f"Resumed run {run_id} is shard {shard[0]}/{shard[1]}.")
+        if shard is not None:
+            if checkpointed_shard is None:
+                checkpoint_store.set_meta("shard", {"index": shard[0], "count": shard[1], "input_rows": len(df), "input_fingerprint": input_fingerprint})
+            elif (checkpointed_shard["index"], checkpointed_shard["count"]) != tuple(shard) or checkpointed_shard["input_fingerprint"] != input_fingerprint:
+                logger.error(f"Run {run_id} was started as shard {checkpointed_shard['index']}/{checkpointed_shard['count']} of another input or shard layout. Cannot continue it as shard {shard[0]}/{shard[1]}.")
+                checkpoint_store.close()
+                return
+    if worker_processes > 1 and checkpoint_store is None:
+        # Worker processes hand their results back through checkpoint files.
+        logger.warning(f"{worker_processes} worker processes requested, but Pass 1 checkpointing is disabled (PIPELINE_CHECKPOINT_FILE). Running Pass 1 in this process only.")
+        worker_processes = 1
+
+    pipeline_store_path = os.path.join(run_output_dir, app_config.pipeline_store_file)
+    try:
+        pipeline_store = SQLitePipelineRepository(
+            pipeline_store_path,
+            busy_timeout_seconds=app_config.pipeline_store_busy_timeout_seconds,
+            store_page_text=app_config.pipeline_store_page_text
+        )
+        if not pass1_worker:
+            queue_entries = plan_queue_entries(df, domain_work_units)
+            if shard is not None:
+                # Only this shard's work units are queued; the other shards' rows stay untouched in this run.
+                queue_entries = [entry for entry in queue_entries if shard_for_work_unit(entry[2], shard[1]) == shard[0]]
+                run_metrics["data_processing_stats"]["shard"] = f"{shard[0]}/{shard[1]}"
+                run_metrics["data_processing_stats"]["shard_rows"] = len(queue_entries)
+                logger.info(f"Shard {shard[0]}/{shard[1]}: {len(queue_entries)} of {len(df)} input rows belong to this shard.")
+            pipeline_store.enqueue_rows(queue_entries)
+        logger.info(f"Pipeline store: {pipeline_store_path} (queue: {pipeline_store.queue_counts()})")
+    except sqlite3.Error as e:
+        logger.error(f"Could not open pipeline store {pipeline_store_path}: {e}. Aborting run.")
+        if checkpoint_store is not None:
+            checkpoint_store.close()
+        return
+
     globally_processed_urls: Set[str] = set()
     all_flattened_rows: List[Dict[str, Any]] = []
     all_tertiary_rows: List[Dict[str, Any]] = []
-    canonical_site_raw_llm_outputs: Dict[str, List[PhoneNumberLLMOutput]] = {}
-    canonical_site_pathful_scraper_status: Dict[str, str] = {}
+    # Per pathful canonical URL results (scraper status, regex flag, LLM outputs and errors) live in pipeline_store.
     input_to_canonical_map: Dict[str, Optional[str]] = {}
-    canonical_site_regex_candidates_found_status: Dict[str, bool] = {} # New: Track if regex found candidates for a canonical
-    canonical_site_llm_exception_details: Dict[str, str] = {} # New: Store specific LLM exception details
  
     pass1_loop_start_time = time.time()
-    rows_processed_in_pass1 = 0
-    rows_failed_in_pass1 = 0
     attrition_data_list: List[Dict[str, Any]] = [] # For Row Attrition Report
     row_level_failure_counts: Dict[str, int] = {} # Initialize counter for stage_of_failure
     
     failure_log_file_handle = None
     failure_writer = None
+    # One event loop and one browser pool serve every scrape in this run, instead of
+    # launching Chromium per row inside its own asyncio.run().
+    scrape_event_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(scrape_event_loop)
+    request_interceptor = RequestInterceptor(app_config) if app_config.scraper_request_interception_enabled else None
+    browser_pool = BrowserPool(app_config, request_interceptor=request_interceptor)
+    robots_cache = RobotsCache(app_config)
+    crawl_frontier = CrawlFrontier(app_config, robots_cache=robots_cache)
+    http_fetcher = HttpFetcher(app_config)
+    stop_policies = CrawlStopPolicies(app_config)
+    response_cache = ResponseCache(app_config) if app_config.scraper_response_cache_enabled else None
+    url_discovery = UrlDiscovery(app_config, http_fetcher.client, crawl_frontier) if app_config.scraper_url_discovery_enabled else None
+    dns_resolver = AsyncDnsResolver(app_config)
+    incremental_state = IncrementalRunState(app_config, run_id, reuse_enabled=incremental)
+    if incremental:
+        logger.info(f"Incremental mode: unchanged pathful canonical URLs reuse stored results from {incremental_state.state_path}.")
     try:
-        failure_log_file_handle = open(failure_log_csv_path, 'w', newline='', encoding='utf-8')
+        append_to_failure_log = bool(resume_run_id) and os.path.exists(failure_log_csv_path)
+        failure_log_file_handle = open(failure_log_csv_path, 'a' if append_to_failure_log else 'w', newline='', encoding='utf-8')
         failure_writer = csv.writer(failure_log_file_handle)
-        failure_writer.writerow([
-            'log_timestamp', 'input_row_identifier', 'CompanyName', 'GivenURL',
-            'stage_of_failure', 'error_reason', 'error_details',
-            'Associated_Pathful_Canonical_URL' # New header
-        ])
+        if not append_to_failure_log:
+            failure_writer.writerow([
+                'log_timestamp', 'input_row_identifier', 'CompanyName', 'GivenURL',
+                'stage_of_failure', 'error_reason', 'error_details',
+                'Associated_Pathful_Canonical_URL' # New header
+            ])
 
         # --- Data structures for new Canonical Domain Journey Report ---
         canonical_domain_journey_data: Dict[str, Dict[str, Any]] = {}
@@ -601,14 +1143,82 @@ def main() -> None:
         true_base_to_input_given_urls: Dict[str, Set[str]] = {}
         true_base_to_pathful_urls_attempted: Dict[str, Set[str]] = {} # Stores unique pathful URLs processed under a true_base
         # true_base_scraper_status is already initialized later, will be used for this report too
-        # canonical_site_regex_candidates_found_status is already initialized, will be aggregated
-        # canonical_site_llm_exception_details is already initialized, will be aggregated
+        # Regex flags and LLM error details per pathful URL come from pipeline_store
         # final_consolidated_data_by_true_base will be a key source
 
         # --- End Data structures for new Canonical Domain Journey Report ---
 
-        for i, (index, row_series) in enumerate(df.iterrows()): # Corrected indentation
-            rows_processed_in_pass1 += 1
+        # --- Concurrent Pass 1 engine ---
+        # Rows run as coroutines on scrape_event_loop. PIPELINE_MAX_CONCURRENT_ROWS bounds how many
+        # rows are in flight; the stage semaphores bound scraping, regex and LLM work independently.
+        # All shared bookkeeping (df, run_metrics, journey data, failure log) is only touched from
+        # the event loop thread; blocking regex and LLM calls are pushed to worker threads.
+        scrape_semaphore = asyncio.Semaphore(max(1, app_config.pipeline_max_concurrent_scrapes))
+        regex_semaphore = asyncio.Semaphore(max(1, app_config.pipeline_max_concurrent_regex))
+        llm_semaphore = asyncio.Semaphore(max(1, app_config.pipeline_max_concurrent_llm_calls))
+        # Scrape result (details, status, pathful canonical URL) of each shared domain's leading row, or None
+        # if the leader did not get to scrape. Created in _run_pass1_rows, on the running loop.
+        shared_work_unit_results: Dict[str, asyncio.Future] = {}
+        # (scraped page details, scraper status, pathful canonical URL) per row that got a scrape result. Checkpointed.
+        pass1_row_scrape_results: Dict[Any, Tuple[List[Tuple[str, str, str, str]], str, Optional[str]]] = {}
+        completed_pass1_rows: Set[Any] = set()
+        # The same objects as the Pass 1 structures above (not copies), for the checkpoint restore/merge functions.
+        pass1_state = Pass1State(
+            df=df, run_metrics=run_metrics, incremental_state=incremental_state, pipeline_store=pipeline_store,
+            input_to_canonical_map=input_to_canonical_map, pass1_row_scrape_results=pass1_row_scrape_results,
+            completed_pass1_rows=completed_pass1_rows, canonical_domain_journey_data=canonical_domain_journey_data,
+            true_base_to_input_row_ids=true_base_to_input_row_ids, true_base_to_input_company_names=true_base_to_input_company_names,
+            true_base_to_input_given_urls=true_base_to_input_given_urls, true_base_to_pathful_urls_attempted=true_base_to_pathful_urls_attempted,
+            row_level_failure_counts=row_level_failure_counts
+        )
+
+        def _append_failure_logs(csv_paths: List[str], remove_after: bool) -> None:
+            """Appends failure CSVs of Pass 1 worker processes or shards (without their header) to this run's one."""
+            for other_csv_path in csv_paths:
+                try:
+                    with open(other_csv_path, 'r', newline='', encoding='utf-8') as other_csv:
+                        other_rows = list(csv.reader(other_csv))[1:]
+                    failure_writer.writerows(other_rows)
+                    failure_log_file_handle.flush()
+                    if remove_after:
+                        os.remove(other_csv_path)
+                except (OSError, csv.Error) as e:
+                    logger.error(f"Could not merge failure log {other_csv_path}: {e}")
+
+        def _merge_worker_failure_logs() -> None:
+            _append_failure_logs(sorted(glob.glob(os.path.join(glob.escape(run_output_dir), f"failed_rows_{glob.escape(run_id)}.worker-*.csv"))), remove_after=True)
+
+        if resume_run_id and checkpoint_store is not None and not pass1_worker:
+            checkpoint = checkpoint_store.load()
+            restored_row_count = restore_pass1_checkpoint(pass1_state, checkpoint)
+            restored_row_count += restore_worker_checkpoints(pass1_state, checkpoint_store, worker_checkpoint_pattern)
+            _merge_worker_failure_logs()
+            discarded_pathful_count = discard_unfinished_pathful_results(pass1_state)
+            mark_restored_rows_in_queue(pass1_state)
+            run_metrics["data_processing_stats"]["rows_restored_from_checkpoint"] = restored_row_count
+            logger.info(f"Resuming run {run_id}: restored {restored_row_count} completed rows and {len(canonical_domain_journey_data)} domains from the checkpoint; discarded {discarded_pathful_count} unfinished pathful canonical URL results from the pipeline store.")
+        elif resume_run_id and not pass1_worker:
+            # Nothing of the interrupted run can be restored without its checkpoint: every row is processed again.
+            pipeline_store.discard_pathful_results(set())
+            pipeline_store.set_row_status([str(index) for index in df.index], QUEUE_PENDING)
+
+        if merge_shard_dirs:
+            shard_outputs = load_shard_outputs(merge_shard_dirs, app_config.pipeline_checkpoint_file, app_config.pipeline_store_file, input_fingerprint, len(df))
+            if shard_outputs is None:
+                return
+            restore_shard_outputs(pass1_state, checkpoint_store, shard_outputs, app_config.pipeline_store_file)
+            for shard_dir, _, _ in shard_outputs:
+                _append_failure_logs(sorted(
+                    csv_path for csv_path in glob.glob(os.path.join(glob.escape(shard_dir), "failed_rows_*.csv")) if ".worker-" not in os.path.basename(csv_path)
+                ), remove_after=False)
+            discard_unfinished_pathful_results(pass1_state)
+            mark_restored_rows_in_queue(pass1_state)
+            leftover_row_count = pipeline_store.queue_counts().get(QUEUE_PENDING, 0)
+            if leftover_row_count:
+                logger.warning(f"Merge: {leftover_row_count} rows were not completed by their shard and are processed by this run.")
+
+        async def _process_pass1_row(i: int, index: Any, row_series: pd.Series) -> None:
+            pass1_state.rows_processed_in_pass1 += 1
             row: pd.Series = row_series
             company_name: str = str(row.get('CompanyName', f"Row_{index}"))
             given_url_original: Optional[str] = row.get('GivenURL')
@@ -618,6 +1228,8 @@ def main() -> None:
 
             current_row_scraper_status: str = "Not_Run"
             final_canonical_entry_url: Optional[str] = None # Initialize for each row, before the try block
+            # Set once this row holds the pipeline store's claim on final_canonical_entry_url; released in `finally` unless completed.
+            pathful_claim_held = False
             # ... (other per-row initializations) ...
             
             given_url_original_str_key = str(given_url_original) if given_url_original is not None else "None_GivenURL_Input"
@@ -656,22 +1268,15 @@ def main() -> None:
                         is_ip_address = re.match(r"^\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}$", current_netloc)
                         if current_netloc.lower() != 'localhost' and not is_ip_address:
                             logger.info(f"[RowID: {index}, Company: {company_name}] Input domain '{current_netloc}' appears to lack a TLD. Attempting TLD probing...")
-                            successfully_probed_tld = False
                             probed_netloc_base = current_netloc # Keep original for logging if all probes fail
-                            
-                            for tld_to_try in app_config.url_probing_tlds:
-                                candidate_domain_to_probe = f"{probed_netloc_base}.{tld_to_try}"
-                                logger.debug(f"[RowID: {index}, Company: {company_name}] Probing TLD: Trying '{candidate_domain_to_probe}'")
-                                try:
-                                    socket.gethostbyname(candidate_domain_to_probe)
-                                    current_netloc = candidate_domain_to_probe # Update current_netloc
-                                    logger.info(f"[RowID: {index}, Company: {company_name}] TLD probe successful. Using '{current_netloc}' after trying '.{tld_to_try}'.")
-                                    successfully_probed_tld = True
-                                    break # Stop on first successful probe
-                                except socket.gaierror:
-                                    logger.debug(f"[RowID: {index}, Company: {company_name}] TLD probe DNS lookup failed for '{candidate_domain_to_probe}'.")
-                                except Exception as sock_e: # Catch other potential socket errors
-                                    logger.debug(f"[RowID: {index}, Company: {company_name}] TLD probe for '{candidate_domain_to_probe}' failed with unexpected socket error: {sock_e}")
+                            candidate_domains_to_probe = [f"{probed_netloc_base}.{tld_to_try}" for tld_to_try in app_config.url_probing_tlds]
+                            logger.debug(f"[RowID: {index}, Company: {company_name}] Probing TLDs concurrently: {candidate_domains_to_probe}")
+                            # All candidates are resolved at once; the first one in URL_PROBING_TLDS order that exists wins.
+                            probed_domain = await dns_resolver.probe_first(candidate_domains_to_probe)
+                            successfully_probed_tld = probed_domain is not None
+                            if successfully_probed_tld:
+                                current_netloc = probed_domain # Update current_netloc
+                                logger.info(f"[RowID: {index}, Company: {company_name}] TLD probe successful. Using '{current_netloc}'.")
                             
                             if not successfully_probed_tld:
                                 logger.warning(f"[RowID: {index}, Company: {company_name}] TLD probing failed for base domain '{probed_netloc_base}'. Proceeding with '{current_netloc}' (which might be the un-suffixed original or last attempted).")
@@ -712,20 +1317,39 @@ def main() -> None:
                     )
                     stage_key = "URL_Validation_InvalidOrMissing"
                     row_level_failure_counts[stage_key] = row_level_failure_counts.get(stage_key, 0) + 1
-                    rows_failed_in_pass1 +=1
-                    continue
+                    pass1_state.rows_failed_in_pass1 +=1
+                    return
      
-                scraped_pages_details: List[Tuple[str, str, str]]
+                scraped_pages_details: List[Tuple[str, str, str, str]]
                 scraper_status: str
                 # final_canonical_entry_url is now initialized at the start of the loop iteration
                 
-                run_metrics["scraping_stats"]["urls_processed_for_scraping"] += 1
-                scrape_task_start_time = time.time()
-                scraped_pages_details, scraper_status, final_canonical_entry_url = asyncio.run(
-                    scrape_website(processed_url, run_output_dir, company_name, globally_processed_urls, index)
-                )
-                run_metrics["tasks"].setdefault("scrape_website_total_duration_seconds", 0)
-                run_metrics["tasks"]["scrape_website_total_duration_seconds"] += (time.time() - scrape_task_start_time)
+                shared_work_unit_domain = row_to_shared_work_unit.get(index)
+                leader_scrape_result = None
+                if shared_work_unit_domain is not None and index not in work_unit_leader_rows:
+                    leader_scrape_result = await shared_work_unit_results[shared_work_unit_domain]
+                    if leader_scrape_result is None:
+                        logger.info(f"[RowID: {index}, Company: {company_name}] Leading row for domain '{shared_work_unit_domain}' produced no scrape result. Scraping this row itself.")
+
+                if leader_scrape_result is not None:
+                    scraped_pages_details, scraper_status, final_canonical_entry_url = leader_scrape_result
+                    run_metrics["data_processing_stats"]["rows_reused_domain_result"] += 1
+                    logger.info(f"[RowID: {index}, Company: {company_name}] Domain '{shared_work_unit_domain}' already scraped for another input row. Reusing its result (status: {scraper_status}, pathful canonical: {final_canonical_entry_url}).")
+                else:
+                    run_metrics["scraping_stats"]["urls_processed_for_scraping"] += 1
+                    scrape_task_start_time = time.time()
+                    async with scrape_semaphore:
+                        scraped_pages_details, scraper_status, final_canonical_entry_url = await scrape_website(
+                            processed_url, run_output_dir, company_name, globally_processed_urls, index,
+                            browser_pool=browser_pool, crawl_frontier=crawl_frontier, http_fetcher=http_fetcher,
+                            stop_policies=stop_policies, url_discovery=url_discovery, response_cache=response_cache,
+                            dns_resolver=dns_resolver
+                        )
+                    run_metrics["tasks"].setdefault("scrape_website_total_duration_seconds", 0)
+                    run_metrics["tasks"]["scrape_website_total_duration_seconds"] += (time.time() - scrape_task_start_time)
+                    if shared_work_unit_domain is not None and not shared_work_unit_results[shared_work_unit_domain].done():
+                        shared_work_unit_results[shared_work_unit_domain].set_result((scraped_pages_details, scraper_status, final_canonical_entry_url))
+                pass1_row_scrape_results[index] = (scraped_pages_details, scraper_status, final_canonical_entry_url)
 
                 df.at[index, 'ScrapingStatus'] = scraper_status
                 true_base_domain_for_row = get_canonical_base_url(final_canonical_entry_url) if final_canonical_entry_url else None
@@ -776,13 +1400,19 @@ def main() -> None:
                 logger.info(f"[RowID: {index}, Company: {company_name}] Row {current_row_number_for_log}: Scraper status: {current_row_scraper_status}, Pathful Canonical URL from Scraper: {final_canonical_entry_url}, True Base Domain: {true_base_domain_for_row}")
 
                 if current_row_scraper_status == "Success" and final_canonical_entry_url:
-                    if final_canonical_entry_url not in canonical_site_raw_llm_outputs: 
+                    # The store hands each pathful canonical URL to one row, so concurrent rows landing on the
+                    # same site do not both send it to the LLM.
+                    if pipeline_store.claim_pathful(final_canonical_entry_url, true_base_domain_for_row, str(index)):
+                        pathful_claim_held = True
                         run_metrics["scraping_stats"]["new_canonical_sites_scraped"] += 1
                         run_metrics["regex_extraction_stats"]["sites_processed_for_regex"] += 1
                         regex_extraction_task_start_time = time.time()
 
                         logger.info(f"[RowID: {index}, Company: {company_name}] Processing new pathful canonical URL for LLM data collection: {final_canonical_entry_url} (from input {given_url_original})")
                         all_candidate_items_for_llm: List[Dict[str, str]] = []
+                        regex_candidates_found: Optional[bool] = None
+                        content_hash: Optional[str] = None
+                        incremental_hit: Optional[Dict[str, Any]] = None
                         if scraped_pages_details: 
                             run_metrics["scraping_stats"]["total_pages_scraped_overall"] += len(scraped_pages_details)
                             if final_canonical_entry_url not in run_metrics["scraping_stats"].get("processed_canonical_sites_for_success_count", set()):
@@ -802,27 +1432,46 @@ def main() -> None:
                             elif isinstance(target_codes_raw, list):
                                 target_codes_list_for_regex = [str(item) for item in target_codes_raw if isinstance(item, (str, int))]
 
-                            for page_content_file, source_page_url, page_type in scraped_pages_details:
+                            content_hash = await asyncio.to_thread(
+                                IncrementalRunState.compute_content_hash,
+                                scraped_pages_details, company_name, target_codes_list_for_regex
+                            )
+                            incremental_hit = incremental_state.lookup(final_canonical_entry_url, content_hash)
+                            if incremental_hit is not None:
+                                logger.info(f"[RowID: {index}, Company: {company_name}] Content of {final_canonical_entry_url} unchanged since the stored run. Reusing stored regex/LLM results.")
+
+                            for page_content_file, source_page_url, page_type, fetch_tier in scraped_pages_details:
                                 run_metrics["scraping_stats"]["pages_scraped_by_type"][page_type] = \
                                     run_metrics["scraping_stats"]["pages_scraped_by_type"].get(page_type, 0) + 1
+                                run_metrics["scraping_stats"]["pages_scraped_by_fetch_tier"][fetch_tier] = \
+                                    run_metrics["scraping_stats"]["pages_scraped_by_fetch_tier"].get(fetch_tier, 0) + 1
                                 
                                 # --- Start: Aggregate page details for Canonical Domain Journey ---
                                 if true_base_domain_for_row and true_base_domain_for_row in canonical_domain_journey_data:
                                     canonical_domain_journey_data[true_base_domain_for_row]["Scraped_Pages_Details_Aggregated"][page_type] += 1
                                     canonical_domain_journey_data[true_base_domain_for_row]["Total_Pages_Scraped_For_Domain"] += 1
                                 # --- End: Aggregate page details ---
+                                if incremental_hit is not None:
+                                    continue
                                 
                                 if os.path.exists(page_content_file):
                                     try:
                                         with open(page_content_file, 'r', encoding='utf-8') as f_content:
                                             text_content = f_content.read()
-                                        page_candidate_items: List[Dict[str, str]] = extract_numbers_with_snippets_from_text(
-                                            text_content=text_content,
-                                            source_url=source_page_url,
-                                            original_input_company_name=company_name,
-                                            target_country_codes=target_codes_list_for_regex,
-                                            snippet_window_chars=app_config.snippet_window_chars
-                                        )
+                                        pipeline_store.save_scraped_page(final_canonical_entry_url, true_base_domain_for_row, source_page_url, page_type, fetch_tier, text_content)
+                                        async with regex_semaphore:
+                                            page_candidate_items: List[Dict[str, str]] = await asyncio.to_thread(
+                                                extract_numbers_with_snippets_from_text,
+                                                text_content=text_content,
+                                                source_url=source_page_url,
+                                                original_input_company_name=company_name,
+                                                target_country_codes=target_codes_list_for_regex,
+                                                snippet_window_chars=app_config.snippet_window_chars
+                                            )
+                                            tel_hrefs = await asyncio.to_thread(read_tel_hrefs_for_page_file, page_content_file)
+                                            if tel_hrefs:
+                                                tel_href_candidates = extract_numbers_from_tel_hrefs(tel_hrefs, source_page_url, company_name, target_codes_list_for_regex)
+                                                page_candidate_items = merge_tel_href_candidates(page_candidate_items, tel_href_candidates)
 
                                         # Filter page_candidate_items: if a number is repeated > 3 times from this page, only keep first 3
                                         filtered_page_candidates: List[Dict[str, str]] = []
@@ -842,6 +1491,7 @@ def main() -> None:
                                             logger.info(f"[RowID: {index}, Company: {company_name}] Filtered regex candidates for page '{source_page_url}'. Original: {len(page_candidate_items)}, Filtered: {len(filtered_page_candidates)}")
 
                                         all_candidate_items_for_llm.extend(filtered_page_candidates)
+                                        pipeline_store.save_regex_candidates(final_canonical_entry_url, filtered_page_candidates)
                                     except Exception as file_read_exc:
                                         logger.error(f"[RowID: {index}, Company: {company_name}] Error reading scraped page content {page_content_file} (canonical: {final_canonical_entry_url}): {file_read_exc}", exc_info=True)
                                         run_metrics["errors_encountered"].append(f"File read error for regex: {page_content_file}")
@@ -867,20 +1517,30 @@ def main() -> None:
                             
                             run_metrics["tasks"].setdefault("regex_extraction_total_duration_seconds", 0)
                             run_metrics["tasks"]["regex_extraction_total_duration_seconds"] += (time.time() - regex_extraction_task_start_time)
-                            if all_candidate_items_for_llm:
+                            if incremental_hit is not None:
+                                regex_candidates_found = incremental_hit["regex_candidates_found"]
+                                if incremental_hit["regex_candidates_found"] and true_base_domain_for_row and true_base_domain_for_row in canonical_domain_journey_data:
+                                    canonical_domain_journey_data[true_base_domain_for_row]["Regex_Candidates_Found_For_Any_Pathful"] = True
+                            elif all_candidate_items_for_llm:
                                 run_metrics["regex_extraction_stats"]["sites_with_regex_candidates"] += 1
                                 run_metrics["regex_extraction_stats"]["total_regex_candidates_found"] += len(all_candidate_items_for_llm)
-                                canonical_site_regex_candidates_found_status[final_canonical_entry_url] = True
+                                regex_candidates_found = True
                                 # --- Start: Update Regex_Candidates_Found for Canonical Domain Journey ---
                                 if true_base_domain_for_row and true_base_domain_for_row in canonical_domain_journey_data:
                                     canonical_domain_journey_data[true_base_domain_for_row]["Regex_Candidates_Found_For_Any_Pathful"] = True
                                 # --- End: Update Regex_Candidates_Found ---
                             else:
-                                canonical_site_regex_candidates_found_status[final_canonical_entry_url] = False
+                                regex_candidates_found = False
                                 # No need to set Regex_Candidates_Found_For_Any_Pathful to False here, as it should remain True if any other pathful had candidates.
-                            logger.info(f"[RowID: {index}, Company: {company_name}] Generated {len(all_candidate_items_for_llm)} candidate items for LLM for canonical URL {final_canonical_entry_url}. Regex candidates found: {canonical_site_regex_candidates_found_status[final_canonical_entry_url]}.")
+                            logger.info(f"[RowID: {index}, Company: {company_name}] Generated {len(all_candidate_items_for_llm)} candidate items for LLM for canonical URL {final_canonical_entry_url}. Regex candidates found: {regex_candidates_found}.")
      
-                        if canonical_site_regex_candidates_found_status.get(final_canonical_entry_url, False): # Check if regex found candidates
+                        if incremental_hit is not None:
+                            reused_llm_outputs: List[PhoneNumberLLMOutput] = incremental_hit["llm_outputs"]
+                            pipeline_store.complete_pathful(final_canonical_entry_url, current_row_scraper_status, regex_candidates_found, reused_llm_outputs)
+                            if true_base_domain_for_row and true_base_domain_for_row in canonical_domain_journey_data:
+                                canonical_domain_journey_data[true_base_domain_for_row]["LLM_Total_Raw_Numbers_Extracted"] += len(reused_llm_outputs)
+                            logger.info(f"[RowID: {index}, Company: {company_name}] Reused {len(reused_llm_outputs)} stored LLM outputs for unchanged pathful canonical {final_canonical_entry_url}. Regex and LLM skipped.")
+                        elif regex_candidates_found: # Check if regex found candidates
                             run_metrics["llm_processing_stats"]["sites_processed_for_llm"] += 1
                             # --- Start: Update LLM_Calls_Made for Canonical Domain Journey ---
                             if true_base_domain_for_row and true_base_domain_for_row in canonical_domain_journey_data:
@@ -895,8 +1555,7 @@ def main() -> None:
 
                                 if not os.path.exists(prompt_template_abs_path):
                                     logger.error(f"[RowID: {index}, Company: {company_name}] LLM prompt template file not found at {prompt_template_abs_path}. Cannot process pathful canonical URL {final_canonical_entry_url}.")
-                                    canonical_site_raw_llm_outputs[final_canonical_entry_url] = [] 
-                                    canonical_site_pathful_scraper_status[final_canonical_entry_url] = "Error_LLM_PromptMissing"
+                                    pipeline_store.complete_pathful(final_canonical_entry_url, "Error_LLM_PromptMissing", regex_candidates_found, [])
                                     run_metrics["llm_processing_stats"]["llm_calls_failure_prompt_missing"] += 1
                                     run_metrics["errors_encountered"].append(f"LLM prompt template missing: {prompt_template_abs_path}")
                                     log_row_failure(
@@ -929,16 +1588,19 @@ def main() -> None:
                                         logger.info(f"[RowID: {index}, Company: {company_name}] Saved LLM input data for {final_canonical_entry_url} to {llm_input_filepath}")
                                     except IOError as e: logger.error(f"[RowID: {index}, Company: {company_name}] IOError saving LLM input data for {final_canonical_entry_url}: {e}")
 
-                                    llm_classified_outputs, llm_raw_response, token_stats = llm_extractor.extract_phone_numbers(
-                                        candidate_items=all_candidate_items_for_llm,
-                                        prompt_template_path=prompt_template_abs_path,
-                                        llm_context_dir=llm_context_dir,
-                                        file_identifier_prefix=f"CANONICAL_{safe_canonical_name_for_file}",
-                                        triggering_input_row_id=index,
-                                        triggering_company_name=company_name
-                                    )
-                                    canonical_site_raw_llm_outputs[final_canonical_entry_url] = llm_classified_outputs
-                                    canonical_site_pathful_scraper_status[final_canonical_entry_url] = current_row_scraper_status
+                                    async with llm_semaphore:
+                                        llm_classified_outputs, llm_raw_response, token_stats = await llm_extractor.extract_phone_numbers_async(
+                                            candidate_items=all_candidate_items_for_llm,
+                                            prompt_template_path=prompt_template_abs_path,
+                                            llm_context_dir=llm_context_dir,
+                                            file_identifier_prefix=f"CANONICAL_{safe_canonical_name_for_file}",
+                                            triggering_input_row_id=index,
+                                            triggering_company_name=company_name,
+                                            source_page_types={source_page_url: page_type for _, source_page_url, page_type, _ in (scraped_pages_details or [])}
+                                        )
+                                    pipeline_store.complete_pathful(final_canonical_entry_url, current_row_scraper_status, regex_candidates_found, llm_classified_outputs)
+                                    if content_hash is not None:
+                                        incremental_state.record_pathful(final_canonical_entry_url, content_hash, True, llm_classified_outputs)
                                     run_metrics["llm_processing_stats"]["llm_calls_success"] += 1
                                     run_metrics["llm_processing_stats"]["total_llm_extracted_numbers_raw"] += len(llm_classified_outputs)
                                     # --- Start: Update LLM_Total_Raw_Numbers_Extracted for Canonical Domain Journey ---
@@ -967,12 +1629,13 @@ def main() -> None:
                                         run_metrics["errors_encountered"].append(f"IOError saving LLM raw output: {llm_raw_output_filepath}")
                             except Exception as llm_exc:
                                 logger.error(f"[RowID: {index}, Company: {company_name}] Error during LLM processing for pathful canonical {final_canonical_entry_url}: {llm_exc}", exc_info=True)
-                                canonical_site_raw_llm_outputs[final_canonical_entry_url] = []
-                                canonical_site_pathful_scraper_status[final_canonical_entry_url] = "Error_LLM_Processing"
                                 # Capture the exception detail for the attrition report
                                 exception_type_name = type(llm_exc).__name__
                                 exception_message_str = str(llm_exc)
-                                canonical_site_llm_exception_details[final_canonical_entry_url] = f"{exception_type_name}: {exception_message_str}"
+                                pipeline_store.complete_pathful(
+                                    final_canonical_entry_url, "Error_LLM_Processing", regex_candidates_found, [],
+                                    llm_exception=f"{exception_type_name}: {exception_message_str}"
+                                )
                                 # --- Start: Update LLM Error info for Canonical Domain Journey ---
                                 if true_base_domain_for_row and true_base_domain_for_row in canonical_domain_journey_data:
                                     canonical_domain_journey_data[true_base_domain_for_row]["LLM_Processing_Error_Encountered_For_Domain"] = True
@@ -1000,10 +1663,11 @@ def main() -> None:
 
                                 run_metrics["tasks"].setdefault("llm_extraction_total_duration_seconds", 0)
                                 run_metrics["tasks"]["llm_extraction_total_duration_seconds"] += (time.time() - llm_task_start_time)
-                        else: # Corresponds to 'if canonical_site_regex_candidates_found_status.get(final_canonical_entry_url, False):'
+                        else: # Corresponds to 'elif regex_candidates_found:'
                             logger.info(f"[RowID: {index}, Company: {company_name}] No regex candidate snippets for LLM from pathful canonical {final_canonical_entry_url}. Storing empty LLM result, LLM not called.")
-                            canonical_site_raw_llm_outputs[final_canonical_entry_url] = [] # Ensure it's an empty list
-                            canonical_site_pathful_scraper_status[final_canonical_entry_url] = current_row_scraper_status # Preserve scraper status
+                            pipeline_store.complete_pathful(final_canonical_entry_url, current_row_scraper_status, regex_candidates_found, []) # Preserve scraper status
+                            if content_hash is not None:
+                                incremental_state.record_pathful(final_canonical_entry_url, content_hash, False, [])
                             # Ensure llm_no_candidates_to_process is incremented if this canonical URL was new
                             # and would have been processed by LLM if candidates existed.
                             # This metric might need to be site-based rather than call-based if not already.
@@ -1021,8 +1685,8 @@ def main() -> None:
                     elif "InvalidURL" not in current_row_scraper_status : 
                         run_metrics["scraping_stats"]["scraping_failure_error"] += 1
 
-                    if final_canonical_entry_url and final_canonical_entry_url not in canonical_site_pathful_scraper_status: 
-                        canonical_site_pathful_scraper_status[final_canonical_entry_url] = current_row_scraper_status
+                    if final_canonical_entry_url:
+                        pipeline_store.record_scrape_status(final_canonical_entry_url, true_base_domain_for_row, current_row_scraper_status)
                     df.at[index, 'Overall_VerificationStatus'] = f'Unverified_Scrape_{current_row_scraper_status}'
                     df.at[index, 'Original_Number_Status'] = f'Scrape_{current_row_scraper_status}' if row.get('NormalizedGivenPhoneNumber') else 'Original_Not_Provided'
                     log_row_failure(
@@ -1041,7 +1705,7 @@ def main() -> None:
                     )
                     stage_key = f"Scraping_{current_row_scraper_status}"
                     row_level_failure_counts[stage_key] = row_level_failure_counts.get(stage_key, 0) + 1
-                    rows_failed_in_pass1 +=1
+                    pass1_state.rows_failed_in_pass1 +=1
     
                 if current_row_scraper_status == "Success":
                     run_metrics["scraping_stats"]["scraping_success"] += 1
@@ -1072,7 +1736,7 @@ def main() -> None:
                 )
                 stage_key = "RowProcessing_Pass1_UnhandledException"
                 row_level_failure_counts[stage_key] = row_level_failure_counts.get(stage_key, 0) + 1
-                rows_failed_in_pass1 +=1
+                pass1_state.rows_failed_in_pass1 +=1
                 logger.error(
                     f"[RowID: {index}, Company: {company_name}] Row {current_row_number_for_log} errored in Pass 1. "
                     f"ScraperStatus='{df.at[index, 'ScrapingStatus']}', "
@@ -1085,15 +1749,124 @@ def main() -> None:
                             df.at[index, col_name] = None
                 if 'Original_Number_Status' in df.columns:
                     df.at[index, 'Original_Number_Status'] = 'Error_Pass1_RowProcessing'
+            finally:
+                if pathful_claim_held:
+                    # A row that failed (or was cancelled) before completing the pathful URL gives it up, so a
+                    # later row landing on it processes it instead of skipping it as already claimed.
+                    try:
+                        if pipeline_store.release_pathful(final_canonical_entry_url, str(index)):
+                            logger.warning(f"[RowID: {index}, Company: {company_name}] Released the claim on {final_canonical_entry_url}; a later row on it will process it again.")
+                    except sqlite3.Error as e:
+                        logger.error(f"[RowID: {index}, Company: {company_name}] Could not release the claim on {final_canonical_entry_url}: {e}")
+                # Rows waiting on this leader must not hang if it failed before (or without) scraping.
+                shared_work_unit_domain = row_to_shared_work_unit.get(index)
+                if shared_work_unit_domain is not None and index in work_unit_leader_rows and not shared_work_unit_results[shared_work_unit_domain].done():
+                    shared_work_unit_results[shared_work_unit_domain].set_result(None)
+
+        async def _run_pass1_rows() -> None:
+            loop = asyncio.get_running_loop()
+            positions = {index: position for position, index in enumerate(df.index)}
+            index_by_row_key = {str(index): index for index in df.index}
+            worker_id = f"pid-{os.getpid()}"
+
+            async def _pass1_worker() -> None:
+                # A claim hands out every pending row of one work unit, in input order, so the rows of a
+                # shared domain run here one after another and reuse the first row's scrape result.
+                while True:
+                    claimed_work_unit = pipeline_store.claim_work_unit(worker_id)
+                    if claimed_work_unit is None:
+                        return
+                    work_unit, claimed_row_keys = claimed_work_unit
+                    unit_rows = [index_by_row_key[row_key] for row_key in claimed_row_keys if row_key in index_by_row_key]
+                    shared_domain = row_to_shared_work_unit.get(unit_rows[0]) if unit_rows else None
+                    if shared_domain is not None:
+                        shared_work_unit_results[shared_domain] = loop.create_future()
+                        leader_index = domain_work_units[shared_domain][0]
+                        if leader_index not in unit_rows:
+                            if pass1_row_scrape_results.get(leader_index) is not None:
+                                # Leader finished before (restored from a checkpoint): its followers reuse its scrape result.
+                                shared_work_unit_results[shared_domain].set_result(pass1_row_scrape_results[leader_index])
+                            else:
+                                work_unit_leader_rows.add(unit_rows[0])
+                    for index in unit_rows:
+                        await _process_pass1_row(positions[index], index, df.loc[index])
+                        checkpoint_pass1_row(pass1_state, checkpoint_store, index)
+                        row_failed = df.at[index, 'Overall_VerificationStatus'] == 'Error_Pass1_RowProcessing'
+                        pipeline_store.set_row_status([str(index)], QUEUE_FAILED if row_failed else QUEUE_DONE, scraping_status=str(df.at[index, 'ScrapingStatus']))
+
+            queued_row_count = pipeline_store.queue_counts().get(QUEUE_PENDING, 0)
+            num_workers = max(1, min(app_config.pipeline_max_concurrent_rows, queued_row_count))
+            if completed_pass1_rows:
+                logger.info(f"Pass 1: skipping {len(completed_pass1_rows)} rows restored from the checkpoint.")
+            logger.info(f"Pass 1: processing {queued_row_count} queued rows with {num_workers} concurrent row worker(s). Stage limits: scrape={app_config.pipeline_max_concurrent_scrapes}, regex={app_config.pipeline_max_concurrent_regex}, llm={app_config.pipeline_max_concurrent_llm_calls}")
+            await asyncio.gather(*(_pass1_worker() for _ in range(num_workers)))
+
+        if worker_processes > 1:
+            # Each worker process runs this function up to the end of Pass 1, on its own event loop and
+            # browser pool, and claims work units from the shared queue until it is empty.
+            logger.info(f"Pass 1: starting {worker_processes} worker processes.")
+            spawn_context = multiprocessing.get_context("spawn")
+            pass1_worker_processes = [
+                spawn_context.Process(target=_run_pass1_worker_process, args=(run_id, worker_number, worker_processes, incremental), name=f"pass1-worker-{worker_number}")
+                for worker_number in range(1, worker_processes + 1)
+            ]
+            for worker_process in pass1_worker_processes:
+                worker_process.start()
+            for worker_process in pass1_worker_processes:
+                worker_process.join()
+                if worker_process.exitcode != 0:
+                    logger.warning(f"Pass 1 worker process {worker_process.name} exited with code {worker_process.exitcode}. Its unfinished rows are processed here.")
+            worker_row_count = restore_worker_checkpoints(pass1_state, checkpoint_store, worker_checkpoint_pattern)
+            _merge_worker_failure_logs()
+            discard_unfinished_pathful_results(pass1_state)
+            mark_restored_rows_in_queue(pass1_state)
+            run_metrics["data_processing_stats"]["rows_processed_by_worker_processes"] = worker_row_count
+            logger.info(f"Pass 1: worker processes completed {worker_row_count} rows; {pipeline_store.queue_counts().get(QUEUE_PENDING, 0)} rows left to process here.")
+        run_metrics["data_processing_stats"]["pass1_worker_processes"] = worker_processes
+
+        rows_processed_before_pass1_loop = pass1_state.rows_processed_in_pass1
+        scrape_event_loop.run_until_complete(_run_pass1_rows())
         
         run_metrics["tasks"]["pass1_main_loop_duration_seconds"] = time.time() - pass1_loop_start_time
-        run_metrics["data_processing_stats"]["rows_successfully_processed_pass1"] = rows_processed_in_pass1 - rows_failed_in_pass1
-        run_metrics["data_processing_stats"]["rows_failed_pass1"] = rows_failed_in_pass1
+        scrape_event_loop.run_until_complete(browser_pool.close())
+        scrape_event_loop.run_until_complete(http_fetcher.close())
+        scrape_event_loop.run_until_complete(robots_cache.close())
+        if worker_processes == 1 or pass1_state.rows_processed_in_pass1 > rows_processed_before_pass1_loop:
+            pass1_component_stats: Dict[str, Any] = {
+                "browser_pool": browser_pool.get_stats(),
+                "http_fetch_tier": http_fetcher.get_stats(),
+                "stop_policies": stop_policies.get_stats(),
+                "dns_resolver": dns_resolver.get_stats(),
+            }
+            if response_cache is not None:
+                pass1_component_stats["response_cache"] = response_cache.get_stats()
+            if url_discovery is not None:
+                pass1_component_stats["url_discovery"] = url_discovery.get_stats()
+            if request_interceptor is not None:
+                pass1_component_stats["request_interception"] = request_interceptor.get_stats()
+            crawl_frontier_component_stats = crawl_frontier.get_stats()
+            crawl_frontier_component_stats["robots_cache"] = robots_cache.get_stats()
+            # Added to the stats merged from worker processes' checkpoints, if any.
+            merge_pass1_metrics(run_metrics["scraping_stats"], pass1_component_stats, "scraping_stats")
+            merge_pass1_metrics(run_metrics.setdefault("crawl_frontier_stats", {}), crawl_frontier_component_stats, "crawl_frontier_stats")
+            merge_pass1_metrics(run_metrics["llm_processing_stats"], {"gemini_client": llm_extractor.get_stats(), "classification_cache": llm_extractor.get_cache_stats(), "cross_domain_batching": llm_extractor.get_batching_stats(), "chunk_sizing": llm_extractor.get_chunk_sizing_stats()}, "llm_processing_stats")
+        if pass1_worker or shard:
+            if checkpoint_store is not None:
+                checkpoint_store.save_state(pass1_state_snapshot(pass1_state))
+            if shard:
+                logger.info(f"Shard {shard[0]}/{shard[1]} finished Pass 1 ({pass1_state.rows_processed_in_pass1} input rows). Combine all shards with: python main_pipeline.py merge <shard output directories>")
+            else:
+                logger.info(f"Pass 1 worker {pass1_worker[1]} finished: processed {pass1_state.rows_processed_in_pass1} input rows.")
+            return
+        run_metrics["data_processing_stats"]["rows_successfully_processed_pass1"] = pass1_state.rows_processed_in_pass1 - pass1_state.rows_failed_in_pass1
+        run_metrics["data_processing_stats"]["rows_failed_pass1"] = pass1_state.rows_failed_in_pass1
         run_metrics["data_processing_stats"]["row_level_failure_summary"] = row_level_failure_counts # Store the collected counts
-        logger.info(f"Pass 1 (Scraping and Raw LLM Data Collection) complete. Processed {rows_processed_in_pass1} input rows.")
-        logger.info(f"Unique pathful canonical sites for which raw LLM data was collected: {len(canonical_site_raw_llm_outputs)}")
-        logger.debug(f"Pathful canonical site raw LLM data cache keys: {list(canonical_site_raw_llm_outputs.keys())}")
-        logger.debug(f"Pathful canonical site scraper status cache: {list(canonical_site_pathful_scraper_status.keys())}")
+        logger.info(f"Pass 1 (Scraping and Raw LLM Data Collection) complete. Processed {pass1_state.rows_processed_in_pass1} input rows.")
+        completed_pathful_urls_by_true_base = pipeline_store.completed_pathful_urls_by_true_base()
+        canonical_site_pathful_scraper_status = pipeline_store.pathful_scraper_statuses()
+        logger.info(f"Unique pathful canonical sites for which raw LLM data was collected: {sum(len(urls) for urls in completed_pathful_urls_by_true_base.values())}")
+        logger.debug(f"Pathful canonical sites with raw LLM data, by true base domain: {completed_pathful_urls_by_true_base}")
+        logger.debug(f"Pathful canonical site scraper statuses: {list(canonical_site_pathful_scraper_status.keys())}")
         logger.debug(f"Input to True Base Domain map entries: {len(input_to_canonical_map)}")
         
         run_metrics["scraping_stats"]["total_urls_fetched_by_scraper"] = run_metrics["scraping_stats"]["total_pages_scraped_overall"]
@@ -1109,12 +1882,7 @@ def main() -> None:
         true_base_scraper_status: Dict[str, str] = {}
 
 
-        for pathful_url_key, raw_llm_list in canonical_site_raw_llm_outputs.items():
-            true_base = get_canonical_base_url(pathful_url_key)
-            if not true_base:
-                logger.warning(f"Could not get true_base_domain for pathful_url_key '{pathful_url_key}' during global consolidation. Skipping.")
-                continue
-            
+        for true_base, pathful_url_key in ((tb, url) for tb, urls in completed_pathful_urls_by_true_base.items() for url in urls):
             if true_base not in true_base_to_pathful_map:
                 true_base_to_pathful_map[true_base] = []
                 true_base_to_input_company_names[true_base] = set()
@@ -1153,9 +1921,7 @@ def main() -> None:
 
 
         for true_base_domain, list_of_pathful_urls in true_base_to_pathful_map.items():
-            all_llm_results_for_this_true_base: List[PhoneNumberLLMOutput] = []
-            for pathful_url_item in list_of_pathful_urls:
-                all_llm_results_for_this_true_base.extend(canonical_site_raw_llm_outputs.get(pathful_url_item, []))
+            all_llm_results_for_this_true_base: List[PhoneNumberLLMOutput] = pipeline_store.llm_outputs_for_true_base(true_base_domain)
             
             representative_company_name_for_consolidation = "Unknown"
             if true_base_to_input_company_names.get(true_base_domain):
@@ -1164,10 +1930,19 @@ def main() -> None:
                 pass
 
 
-            final_consolidated_data_by_true_base[true_base_domain] = process_and_consolidate_contact_data(
-                llm_results=all_llm_results_for_this_true_base,
-                company_name_from_input=representative_company_name_for_consolidation,
-                initial_given_url=true_base_domain
+            reused_contact_details = incremental_state.lookup_domain(true_base_domain, list_of_pathful_urls, representative_company_name_for_consolidation)
+            if reused_contact_details is not None:
+                final_consolidated_data_by_true_base[true_base_domain] = reused_contact_details
+                logger.info(f"Reusing stored consolidated contact details for unchanged domain '{true_base_domain}'.")
+            else:
+                final_consolidated_data_by_true_base[true_base_domain] = process_and_consolidate_contact_data(
+                    llm_results=all_llm_results_for_this_true_base,
+                    company_name_from_input=representative_company_name_for_consolidation,
+                    initial_given_url=true_base_domain
+                )
+            incremental_state.record_domain(
+                true_base_domain, list_of_pathful_urls, representative_company_name_for_consolidation,
+                final_consolidated_data_by_true_base[true_base_domain]
             )
             # --- Start: Populate LLM consolidated numbers info in canonical_domain_journey_data ---
             if true_base_domain in canonical_domain_journey_data and final_consolidated_data_by_true_base[true_base_domain]:
@@ -1181,6 +1956,9 @@ def main() -> None:
             # --- End: Populate LLM consolidated numbers info ---
         logger.info(f"Global Consolidation complete. {len(final_consolidated_data_by_true_base)} true base domains processed.")
         run_metrics["tasks"]["global_consolidation_duration_seconds"] = time.time() - global_consolidation_start_time
+        incremental_state.save()
+        run_metrics["incremental_stats"] = incremental_state.get_stats()
+        run_metrics["pipeline_store_stats"] = pipeline_store.get_stats()
         run_metrics["data_processing_stats"]["unique_true_base_domains_consolidated"] = len(final_consolidated_data_by_true_base)
 
         # --- Determine Final Outcome and Fault Category for each Canonical Domain ---
@@ -1231,6 +2009,11 @@ def main() -> None:
             'Low Relevance': 4, 'Non-Business': 5, None: 99
         }
 
+        # Per-pathful lookups for the row outcome and attrition details, read once from the pipeline store.
+        pathful_urls_with_llm_outputs = pipeline_store.pathful_urls_with_llm_outputs()
+        canonical_site_regex_candidates_found_status = pipeline_store.regex_candidates_found_by_pathful()
+        canonical_site_llm_exception_details = pipeline_store.llm_exceptions_by_pathful()
+
         for index, original_row_data in df.iterrows():
             company_name_pass2 = str(original_row_data.get('CompanyName', f"Row_{index}"))
             given_url_pass2 = original_row_data.get('GivenURL')
@@ -1427,7 +2210,7 @@ def main() -> None:
                 true_base_scraper_status_map=true_base_scraper_status,
                 true_base_to_pathful_map=true_base_to_pathful_map,
                 canonical_site_pathful_scraper_status=canonical_site_pathful_scraper_status,
-                canonical_site_raw_llm_outputs=canonical_site_raw_llm_outputs,
+                pathful_urls_with_llm_outputs=pathful_urls_with_llm_outputs,
                 canonical_site_regex_candidates_found_status=canonical_site_regex_candidates_found_status, # Pass new dict
                 canonical_site_llm_exception_details=canonical_site_llm_exception_details # Pass new dict
             )
@@ -1720,6 +2503,16 @@ def main() -> None:
 
 
     finally:
+        try:
+            scrape_event_loop.run_until_complete(browser_pool.close())
+            scrape_event_loop.run_until_complete(http_fetcher.close())
+            scrape_event_loop.run_until_complete(robots_cache.close())
+        except Exception as e_pool_close:
+            logger.error(f"Error closing browser pool: {e_pool_close}")
+        scrape_event_loop.close()
+        if checkpoint_store is not None:
+            checkpoint_store.close()
+        pipeline_store.close()
         if failure_log_file_handle:
             try:
                 failure_log_file_handle.close()
@@ -1893,6 +2686,15 @@ def write_run_metrics(metrics: Dict[str, Any], output_dir: str, run_id: str, pip
             f.write(f"- **Rows Successfully Processed (Pass 1):** {stats.get('rows_successfully_processed_pass1', 0)}\n")
             f.write(f"- **Rows Failed During Processing (Pass 1):** {stats.get('rows_failed_pass1', 0)} (Input rows that did not complete Pass 1 successfully due to errors such as invalid URL, scraping failure, or critical processing exceptions for that row, preventing LLM processing or final data consolidation for that specific input.)\n")
             f.write(f"- **Unique True Base Domains Consolidated:** {stats.get('unique_true_base_domains_consolidated', 0)}\n")
+            if stats.get('rows_restored_from_checkpoint'):
+                f.write(f"- **Rows Restored from Pass 1 Checkpoint (Resumed Run):** {stats.get('rows_restored_from_checkpoint', 0)}\n")
+            if stats.get('shards_merged'):
+                f.write(f"- **Shards Merged:** {stats.get('shards_merged')} ({stats.get('rows_restored_from_shards', 0)} rows restored from shard checkpoints)\n")
+            if stats.get('pass1_worker_processes', 1) > 1:
+                f.write(f"- **Pass 1 Worker Processes:** {stats.get('pass1_worker_processes')} (rows completed by workers: {stats.get('rows_processed_by_worker_processes', 0)})\n")
+            f.write(f"- **Planned Work Units (Unique Domains + Rows Without Domain):** {stats.get('planned_work_units', 0)} for {stats.get('input_rows_count', 0)} rows\n")
+            f.write(f"- **Domains Shared by Multiple Rows:** {stats.get('planned_domains_shared_by_multiple_rows', 0)}\n")
+            f.write(f"- **Rows Reusing Another Row's Domain Scrape (Planned / Actual):** {stats.get('planned_rows_reusing_domain_result', 0)} / {stats.get('rows_reused_domain_result', 0)}\n")
             # Removed extra \n\n to place new section directly after
 
             f.write("\n## Input Data Duplicate Analysis:\n")
@@ -1945,6 +2747,76 @@ def write_run_metrics(metrics: Dict[str, Any], output_dir: str, run_id: str, pip
             else:
                 f.write("- Average Pages Scraped per Successfully Scraped Canonical Site: N/A (No successful canonical scrapes)\n")
 
+            f.write("- **Pages Scraped by Fetch Tier:**\n")
+            pages_by_tier = stats.get("pages_scraped_by_fetch_tier", {})
+            if pages_by_tier:
+                for fetch_tier, count in sorted(pages_by_tier.items()):
+                    f.write(f"  - *{fetch_tier.upper()}:* {count}\n")
+            else:
+                f.write("  - No fetch tier data recorded.\n")
+            http_tier_stats = stats.get("http_fetch_tier", {})
+            if http_tier_stats:
+                f.write(f"- **HTTP Tier Requests:** {http_tier_stats.get('http_requests', 0)} (Served: {http_tier_stats.get('http_served', 0)}, Terminal 404/410: {http_tier_stats.get('http_terminal_status', 0)}, Not Modified: {http_tier_stats.get('http_not_modified', 0)})\n")
+                escalations = http_tier_stats.get("escalations_by_reason", {})
+                if escalations:
+                    f.write("- **Escalations to Browser by Reason:**\n")
+                    for reason, count in sorted(escalations.items(), key=lambda kv: kv[1], reverse=True):
+                        f.write(f"  - *{reason}:* {count}\n")
+
+            pool_stats = stats.get("browser_pool", {})
+            if pool_stats:
+                f.write("- **Browser Pool:**\n")
+                f.write(f"  - *Pool Size (Browsers):* {pool_stats.get('pool_size', 0)}\n")
+                f.write(f"  - *Browser Launches:* {pool_stats.get('browser_launches', 0)}\n")
+                f.write(f"  - *Restarts (Page Limit / Crash / Memory):* {pool_stats.get('browser_restarts_page_limit', 0)} / {pool_stats.get('browser_restarts_crash', 0)} / {pool_stats.get('browser_restarts_memory', 0)}\n")
+                f.write(f"  - *Context Leases:* {pool_stats.get('context_leases', 0)} (Created: {pool_stats.get('contexts_created', 0)}, Reused: {pool_stats.get('contexts_reused', 0)})\n")
+                f.write(f"  - *Pages Fetched Through Pool:* {pool_stats.get('pages_fetched', 0)}\n")
+                f.write(f"  - *Total Lease Wait:* {pool_stats.get('lease_wait_seconds_total', 0)} seconds\n")
+                if pool_stats.get('peak_browser_memory_mb'):
+                    f.write(f"  - *Peak Chromium Memory:* {pool_stats.get('peak_browser_memory_mb')} MB\n")
+            cache_stats = stats.get("response_cache", {})
+            if cache_stats:
+                f.write("- **Response Cache:**\n")
+                f.write(f"  - *Lookups:* {cache_stats.get('lookups', 0)}\n")
+                f.write(f"  - *Hits (No Request):* {cache_stats.get('hits', 0)} ({cache_stats.get('hits_ratio', 0.0):.1%})\n")
+                f.write(f"  - *Revalidated (304 Not Modified):* {cache_stats.get('revalidated', 0)} ({cache_stats.get('revalidated_ratio', 0.0):.1%})\n")
+                f.write(f"  - *Misses (Not Cached):* {cache_stats.get('misses', 0)} ({cache_stats.get('misses_ratio', 0.0):.1%})\n")
+                f.write(f"  - *Stale Entries Re-fetched:* {cache_stats.get('stale_refetched', 0)} ({cache_stats.get('stale_refetched_ratio', 0.0):.1%})\n")
+                f.write(f"  - *Pages Stored:* {cache_stats.get('stores', 0)}\n")
+            discovery_stats = stats.get("url_discovery", {})
+            if discovery_stats:
+                f.write("- **URL Discovery (Sitemaps / Well-Known Paths):**\n")
+                f.write(f"  - *Sites Checked / With Seeds:* {discovery_stats.get('sites_checked', 0)} / {discovery_stats.get('sites_with_seeds', 0)}\n")
+                f.write(f"  - *Sitemaps Fetched (Same-Host URLs Seen):* {discovery_stats.get('sitemaps_fetched', 0)} ({discovery_stats.get('sitemap_urls_seen', 0)})\n")
+                f.write(f"  - *Well-Known Path Probes:* {discovery_stats.get('well_known_probes', 0)}\n")
+                f.write(f"  - *Seeds from Sitemaps / Well-Known Paths:* {discovery_stats.get('seeds_from_sitemap', 0)} / {discovery_stats.get('seeds_from_well_known_paths', 0)}\n")
+            stop_policy_stats = stats.get("stop_policies", {})
+            if stop_policy_stats.get("policies"):
+                f.write(f"- **Early-Stop Policies ({', '.join(stop_policy_stats.get('policies', []))}):**\n")
+                f.write(f"  - *Entry Points Evaluated:* {stop_policy_stats.get('entry_points_evaluated', 0)}\n")
+                f.write(f"  - *Pages Regex-Scanned During Crawl:* {stop_policy_stats.get('pages_regex_scanned_during_crawl', 0)}\n")
+                for policy_name, counters in stop_policy_stats.get("by_policy", {}).items():
+                    f.write(f"  - *{policy_name}:* {counters.get('early_stops', 0)} early stops, ~{counters.get('pages_saved', 0)} page fetches saved\n")
+            interception_stats = stats.get("request_interception", {})
+            if interception_stats:
+                f.write("- **Request Interception (Browser Tier):**\n")
+                f.write(f"  - *Requests Seen / Blocked:* {interception_stats.get('requests_seen', 0)} / {interception_stats.get('requests_blocked_total', 0)} (via host blocklist: {interception_stats.get('requests_blocked_by_host_list', 0)})\n")
+                f.write(f"  - *Estimated Bytes Saved:* {interception_stats.get('estimated_bytes_saved', 0) / (1024 * 1024):.1f} MB\n")
+                for resource_type, count in sorted(interception_stats.get("requests_blocked_by_type", {}).items()):
+                    f.write(f"  - *Blocked {resource_type}:* {count}\n")
+                top_domains = interception_stats.get("top_domains_by_estimated_bytes_saved", {})
+                if top_domains:
+                    f.write("  - *Top Domains by Estimated Savings:*\n")
+                    for domain, counters in top_domains.items():
+                        f.write(f"    - {domain}: {counters.get('requests', 0)} requests, ~{counters.get('bytes', 0) / 1024:.0f} KB\n")
+
+            dns_stats = stats.get("dns_resolver", {})
+            if dns_stats:
+                dns_outcomes = dns_stats.get("outcomes", {})
+                f.write("- **DNS Resolver:**\n")
+                f.write(f"  - *Lookups / Cache Hits:* {dns_stats.get('lookups', 0)} / {dns_stats.get('cache_hits', 0)} (hit rate: {dns_stats.get('cache_hit_rate', 0.0):.1%}, deduplicated in flight: {dns_stats.get('lookups_deduplicated', 0)})\n")
+                f.write(f"  - *Resolutions (Resolved / Not Found / Timeout or Transient):* {dns_stats.get('resolutions', 0)} ({dns_outcomes.get('resolved', 0)} / {dns_outcomes.get('not_found', 0)} / {dns_outcomes.get('unknown', 0)})\n")
+                f.write(f"  - *TLD Probe Batches (Resolved):* {dns_stats.get('probe_batches', 0)} ({dns_stats.get('probe_batches_resolved', 0)})\n")
             f.write("- **Pages Scraped by Type:**\n")
             pages_by_type = stats.get("pages_scraped_by_type", {})
             if pages_by_type:
@@ -1954,6 +2826,35 @@ def write_run_metrics(metrics: Dict[str, Any], output_dir: str, run_id: str, pip
                 f.write("  - No page type data recorded.\n")
             f.write("\n")
 
+            f.write("## Crawl Frontier Statistics:\n")
+            frontier_stats = metrics.get("crawl_frontier_stats", {})
+            if frontier_stats:
+                f.write(f"- **Hosts Seen:** {frontier_stats.get('hosts_seen', 0)}\n")
+                f.write(f"- **URLs Enqueued (All Entry Points):** {frontier_stats.get('urls_enqueued', 0)}\n")
+                f.write(f"- **Peak Frontier Depth:** {frontier_stats.get('frontier_depth_peak', 0)}\n")
+                f.write(f"- **Requests Dispatched:** {frontier_stats.get('requests_dispatched', 0)}\n")
+                f.write(f"- **Peak Concurrent Fetches:** {frontier_stats.get('active_fetches_peak', 0)}\n")
+                f.write(f"- **Peak In-Flight Requests on a Single Host:** {frontier_stats.get('per_host_in_flight_peak', 0)}\n")
+                f.write(f"- **Requests Delayed by Host Politeness:** {frontier_stats.get('requests_delayed', 0)}\n")
+                f.write(f"- **Host Wait Time (Total / Avg / Max):** {frontier_stats.get('host_wait_seconds_total', 0)}s / {frontier_stats.get('host_wait_seconds_avg', 0)}s / {frontier_stats.get('host_wait_seconds_max', 0)}s\n")
+                f.write(f"- **Hosts with robots.txt Crawl-delay:** {frontier_stats.get('hosts_with_robots_crawl_delay', 0)}\n")
+                robots_stats = frontier_stats.get("robots_cache", {})
+                if robots_stats:
+                    f.write(f"- **robots.txt Cache Lookups / Memory Hits:** {robots_stats.get('lookups', 0)} / {robots_stats.get('memory_hits', 0)} (hit rate: {robots_stats.get('memory_hit_rate', 0.0):.1%})\n")
+                    f.write(f"- **robots.txt Entries Loaded from Disk:** {robots_stats.get('entries_loaded_from_disk', 0)}\n")
+                    f.write(f"- **robots.txt Fetches (Deduplicated Concurrent Lookups):** {robots_stats.get('fetches', 0)} ({robots_stats.get('fetches_deduplicated', 0)})\n")
+                    for outcome, count in sorted(robots_stats.get("fetches_by_outcome", {}).items()):
+                        f.write(f"  - *{outcome}:* {count}\n")
+                    f.write(f"- **URLs Disallowed by robots.txt:** {robots_stats.get('urls_disallowed', 0)}\n")
+                top_hosts = frontier_stats.get("top_hosts_by_wait_seconds", {})
+                if top_hosts:
+                    f.write("- **Hosts with Longest Politeness Waits (seconds):**\n")
+                    for host, wait_seconds in top_hosts.items():
+                        f.write(f"  - *{host}:* {wait_seconds}\n")
+            else:
+                f.write("- No crawl frontier data recorded.\n")
+            f.write("\n")
+
             f.write("## Regex Extraction Statistics:\n")
             stats = metrics.get("regex_extraction_stats", {})
             f.write(f"- **Canonical Sites Processed for Regex:** {stats.get('sites_processed_for_regex', 0)}\n")
@@ -1972,6 +2873,36 @@ def write_run_metrics(metrics: Dict[str, Any], output_dir: str, run_id: str, pip
             f.write(f"- **Total LLM Prompt Tokens:** {stats.get('total_llm_prompt_tokens', 0)}\n")
             f.write(f"- **Total LLM Completion Tokens:** {stats.get('total_llm_completion_tokens', 0)}\n")
             f.write(f"- **Total LLM Tokens Overall:** {stats.get('total_llm_tokens_overall', 0)}\n")
+            gemini_client_stats = stats.get('gemini_client', {})
+            f.write(f"- **Gemini API Requests Sent:** {gemini_client_stats.get('requests', 0)}\n")
+            f.write(f"- **Peak Gemini Requests In Flight:** {gemini_client_stats.get('in_flight_requests_peak', 0)} (limit {app_config.llm_max_in_flight_requests})\n")
+            f.write(f"- **Requests Delayed by Rate Limiter:** {gemini_client_stats.get('requests_delayed', 0)}\n")
+            f.write(f"- **Rate Limiter Wait Time (Total / Max):** {gemini_client_stats.get('wait_seconds_total', 0.0):.2f}s / {gemini_client_stats.get('wait_seconds_max', 0.0):.2f}s\n")
+            f.write(f"- **Gemini Throttle Events (429):** {gemini_client_stats.get('throttle_events', 0)}\n")
+            f.write(f"- **Adaptive Concurrency Decreases / Increases:** {gemini_client_stats.get('concurrency_decreases', 0)} / {gemini_client_stats.get('concurrency_increases', 0)}\n")
+            batching_stats = stats.get('cross_domain_batching', {})
+            if batching_stats:
+                batched_candidates = batching_stats.get('candidates', 0)
+                f.write(f"- **Cross-Domain Batching: Chunks Sent / Without Batching:** {batching_stats.get('chunks_sent', 0)} / {batching_stats.get('chunks_without_batching', 0)} ({batching_stats.get('multi_call_chunks', 0)} chunks shared by several URLs)\n")
+                if batched_candidates:
+                    f.write(f"- **Instruction Prompt Tokens per Classified Number (estimated):** {batching_stats.get('instruction_prompt_tokens_estimated', 0) / batched_candidates:.1f} (without batching: {batching_stats.get('instruction_prompt_tokens_without_batching_estimated', 0) / batched_candidates:.1f})\n")
+            chunk_sizing_stats = stats.get('chunk_sizing', {})
+            sized_candidates = chunk_sizing_stats.get('candidates', 0)
+            if sized_candidates:
+                chunking_mode = "adaptive" if app_config.llm_adaptive_chunking else "fixed"
+                f.write(f"- **LLM Candidates per Chunk, {chunking_mode} (Avg / Max):** {sized_candidates / max(1, chunk_sizing_stats.get('chunks', 0)):.1f} / {chunk_sizing_stats.get('chunk_candidates_max', 0)}\n")
+                f.write(f"- **LLM Tokens per Classified Number (Prompt / Completion, incl. retries):** {chunk_sizing_stats.get('prompt_tokens', 0) / sized_candidates:.1f} / {chunk_sizing_stats.get('completion_tokens', 0) / sized_candidates:.1f}\n")
+                f.write(f"- **LLM Number Mismatch Retries:** {chunk_sizing_stats.get('mismatch_retry_candidates', 0)} numbers in {chunk_sizing_stats.get('mismatch_retry_passes', 0)} retry calls (retry rate {chunk_sizing_stats.get('mismatch_retry_candidates', 0) / sized_candidates:.1%})\n")
+                f.write(f"- **LLM Truncated Responses / Item Count Mismatches:** {chunk_sizing_stats.get('truncated_responses', 0)} / {chunk_sizing_stats.get('item_count_mismatches', 0)}\n")
+                if app_config.llm_adaptive_chunking:
+                    f.write(f"- **Adaptive Chunking Calibration:** {chunk_sizing_stats.get('chars_per_prompt_token_avg', 0.0):.2f} chars per prompt token, {chunk_sizing_stats.get('completion_tokens_per_candidate_avg', 0.0):.1f} completion tokens per number, avg. chunk limit {chunk_sizing_stats.get('candidate_limit_avg', 0)} ({chunk_sizing_stats.get('candidate_cap_decreases', 0)} cap decreases)\n")
+            cache_stats = stats.get('classification_cache', {})
+            if cache_stats:
+                cache_lookups = cache_stats.get('lookups', 0)
+                cache_hit_rate = cache_stats.get('hits', 0) / cache_lookups if cache_lookups else 0.0
+                f.write(f"- **LLM Classification Cache Lookups / Hits:** {cache_lookups} / {cache_stats.get('hits', 0)} (hit rate {cache_hit_rate:.1%})\n")
+                f.write(f"- **LLM Tokens Saved by Cache (estimated):** {cache_stats.get('tokens_saved', 0)}\n")
+                f.write(f"- **LLM Classification Cache Entries Stored / Evicted:** {cache_stats.get('stores', 0)} / {cache_stats.get('evictions', 0)}\n")
 
             successful_calls_for_avg = stats.get('llm_successful_calls_with_token_data', 0)
             if successful_calls_for_avg > 0:
@@ -1985,6 +2916,31 @@ def write_run_metrics(metrics: Dict[str, Any], output_dir: str, run_id: str, pip
                 f.write("- Average token counts not available (no successful calls with token data).\n")
             f.write("\n")
 
+            incremental_stats = metrics.get("incremental_stats", {})
+            if incremental_stats:
+                f.write("## Incremental Run Statistics:\n")
+                f.write(f"- **Reuse of Stored Results Enabled (--incremental):** {incremental_stats.get('reuse_enabled', False)}\n")
+                if incremental_stats.get('state_discarded_fingerprint_changed'):
+                    f.write("- **Stored Results Discarded:** prompt, model or extraction settings changed\n")
+                f.write(f"- **Stored Pathful URL Results Loaded:** {incremental_stats.get('pathful_entries_loaded', 0)}\n")
+                f.write(f"- **Pathful URLs Unchanged (Regex/LLM Skipped):** {incremental_stats.get('pathful_unchanged', 0)} of {incremental_stats.get('pathful_lookups', 0)} ({incremental_stats.get('pathful_unchanged_ratio', 0.0):.1%})\n")
+                f.write(f"- **Pathful URLs Changed / New:** {incremental_stats.get('pathful_changed', 0)} / {incremental_stats.get('pathful_new', 0)}\n")
+                f.write(f"- **Domains Reusing Stored Contact Details:** {incremental_stats.get('domains_reused', 0)}\n")
+                f.write(f"- **Pathful URL / Domain Results Recorded:** {incremental_stats.get('pathful_recorded', 0)} / {incremental_stats.get('domains_recorded', 0)}\n\n")
+
+            store_stats = metrics.get("pipeline_store_stats", {})
+            if store_stats:
+                f.write("## Pipeline Store Statistics:\n")
+                f.write(f"- **Queue Status Counts:** {', '.join(f'{status}: {count}' for status, count in sorted(store_stats.get('queue_counts', {}).items())) or 'N/A'}\n")
+                f.write(f"- **Pathful Canonical URLs Completed:** {store_stats.get('pathful_sites_completed', 0)}\n")
+                f.write(f"- **Pathful Claims Granted / Refused (Already Claimed):** {store_stats.get('pathful_claims_granted', 0)} / {store_stats.get('pathful_claims_refused', 0)}\n")
+                if store_stats.get('pathful_claims_released'):
+                    f.write(f"- **Pathful Claims Released by Failed Rows:** {store_stats.get('pathful_claims_released')}\n")
+                f.write(f"- **Pages / Regex Candidates / LLM Outputs Stored:** {store_stats.get('pages_stored', 0)} / {store_stats.get('regex_candidates_stored', 0)} / {store_stats.get('llm_outputs_stored', 0)}\n")
+                if store_stats.get('pathful_sites_imported'):
+                    f.write(f"- **Pathful Canonical URL Results Imported from Shards:** {store_stats.get('pathful_sites_imported')}\n")
+                f.write(f"- **Store Size:** {store_stats.get('db_size_bytes', 0) / (1024 * 1024):.2f} MB\n\n")
+
             f.write("## Report Generation Statistics:\n")
             stats = metrics.get("report_generation_stats", {})
             f.write(f"- **Detailed Report Rows Created:** {stats.get('detailed_report_rows', 0)}\n")
@@ -2250,8 +3206,43 @@ def generate_augmented_input_report(
         logger.error(f"Failed to write Augmented Input Report to {output_path_augmented_excel}: {e}", exc_info=True)
 
 
+def _run_pass1_worker_process(run_id: str, worker_number: int, worker_count: int, incremental: bool) -> None:
+    """Entry point of a Pass 1 worker process started by `main` (see its `worker_processes` argument)."""
+    main(incremental=incremental, pass1_worker=(run_id, worker_number, worker_count))
+
+
 if __name__ == '__main__':
     if not logger.hasHandlers():
         logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
-    
-    main()
\ No newline at end of file
+
+    arg_parser = argparse.ArgumentParser(description="Phone number extraction and validation pipeline.")
+    arg_parser.add_argument(
+        "--incremental", action="store_true",
+        help="Skip regex and LLM processing for domains whose scraped content is unchanged since the previous run, reusing the stored results."
+    )
+    arg_parser.add_argument(
+        "--resume", metavar="RUN_ID", default=None,
+        help="Resume an interrupted run: rows in its Pass 1 checkpoint are restored, the rest are processed, then reports are written."
+    )
+    arg_parser.add_argument(
+        "--workers", metavar="N", type=int, default=None,
+        help="Run Pass 1 in N processes that share the run's work queue (default: PIPELINE_WORKER_PROCESSES)."
+    )
+    arg_parser.add_argument(
+        "--shard", metavar="i/N", type=parse_shard_spec, default=None,
+        help="Run Pass 1 only for shard i of N (rows partitioned by a hash of their domain), e.g. on one of N machines. "
+             "Combine the shard output directories with the 'merge' command."
+    )
+    cli_subparsers = arg_parser.add_subparsers(dest="command")
+    merge_parser = cli_subparsers.add_parser(
+        "merge", help="Run consolidation and report generation over the output directories of all --shard runs of the input."
+    )
+    merge_parser.add_argument("shard_dirs", nargs="+", metavar="SHARD_DIR", help="Output directory of a --shard run.")
+    cli_args = arg_parser.parse_args()
+
+    if cli_args.command == "merge":
+        if cli_args.shard or cli_args.resume:
+            arg_parser.error("--shard and --resume cannot be combined with 'merge'.")
+        main(incremental=cli_args.incremental, worker_processes=cli_args.workers, merge_shard_dirs=cli_args.shard_dirs)
+    else:
+        main(incremental=cli_args.incremental, resume_run_id=cli_args.resume, worker_processes=cli_args.workers, shard=cli_args.shard)
\ No newline at end of file
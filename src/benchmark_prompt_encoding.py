@@ -0,0 +1,261 @@
+"""
+Benchmark for the compact LLM candidate encoding.
+
+Replays the LLM inputs recorded in a run's llm_context directory
+(`CANONICAL_*_llm_input_data.json`), chunked as the pipeline chunks them, and
+compares the prompts built with the legacy template (indented JSON) and the
+compact template (see `llm_prompt_encoding`):
+
+- prompt size per encoding: characters and estimated tokens, or the model's
+  exact count with --count-tokens;
+- that the compact encoding round-trips: same candidates in the same order,
+  each snippet contained in its candidate's context;
+- with --live, classification parity: the recorded inputs are classified again
+  with the compact template and compared, per number, with the recorded
+  responses (`CANONICAL_*_llm_raw_output.json`). --noise-baseline also
+  re-classifies them with the legacy template, since at LLM_TEMPERATURE > 0
+  the same prompt does not always get the same answer.
+
+--count-tokens and --live call the Gemini API (GEMINI_API_KEY).
+
+Usage:
+    python -m src.benchmark_prompt_encoding <llm_context_dir> [--count-tokens] [--live [--noise-baseline]]
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+from .core.config import AppConfig
+from .llm_prompt_encoding import (
+    COMPACT_CANDIDATES_PLACEHOLDER,
+    LEGACY_CANDIDATES_PLACEHOLDER,
+    decode_candidates_compact,
+    encode_candidates_compact,
+    encode_candidates_legacy,
+    format_candidates_prompt,
+    normalize_snippet,
+)
+
+PROJECT_ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHARS_PER_TOKEN_ESTIMATE: int = 4
+CHUNK_SEPARATOR = "\n\n---CHUNK_SEPARATOR---\n\n"
+
+INPUT_SUFFIX = "_llm_input_data.json"
+RAW_OUTPUT_SUFFIX = "_llm_raw_output.json"
+
+# number -> (type, classification)
+Classifications = Dict[str, Tuple[str, str]]
+
+
+def _resolve(path: str) -> str:
+    return path if os.path.isabs(path) else os.path.join(PROJECT_ROOT_DIR, path)
+
+
+def _load_recordings(llm_context_dir: str) -> List[Tuple[str, List[Dict[str, Any]], Optional[str]]]:
+    recordings: List[Tuple[str, List[Dict[str, Any]], Optional[str]]] = []
+    for input_path in sorted(glob.glob(os.path.join(llm_context_dir, f"*{INPUT_SUFFIX}"))):
+        with open(input_path, 'r', encoding='utf-8') as f:
+            candidate_items = json.load(f)
+        if not candidate_items:
+            continue
+        raw_output: Optional[str] = None
+        raw_output_path = input_path[:-len(INPUT_SUFFIX)] + RAW_OUTPUT_SUFFIX
+        if os.path.exists(raw_output_path):
+            with open(raw_output_path, 'r', encoding='utf-8') as f:
+                raw_output = f.read()
+        recordings.append((os.path.basename(input_path)[:-len(INPUT_SUFFIX)], candidate_items, raw_output))
+    return recordings
+
+
+def _chunks(candidate_items: List[Dict[str, Any]], chunk_size: int) -> List[List[Dict[str, Any]]]:
+    return [candidate_items[i:i + chunk_size] for i in range(0, len(candidate_items), chunk_size)]
+
+
+def _parse_classifications(raw_output: str) -> Classifications:
+    """Classifications in a recorded raw output (all its chunks; the first answer per number wins)."""
+    classifications: Classifications = {}
+    decoder = json.JSONDecoder()
+    for chunk_text in raw_output.split(CHUNK_SEPARATOR):
+        start = chunk_text.find('{')
+        if start == -1:
+            continue
+        try:
+            parsed, _ = decoder.raw_decode(chunk_text[start:])
+        except json.JSONDecodeError:
+            continue
+        for entry in parsed.get("extracted_numbers", []) if isinstance(parsed, dict) else []:
+            if isinstance(entry, dict) and entry.get("number"):
+                classifications.setdefault(entry["number"], (str(entry.get("type")), str(entry.get("classification"))))
+    return classifications
+
+
+def _check_round_trip(candidate_items: List[Dict[str, Any]]) -> bool:
+    decoded = decode_candidates_compact(encode_candidates_compact(candidate_items))
+    if len(decoded) != len(candidate_items):
+        return False
+    for original, restored in zip(candidate_items, decoded):
+        if (original.get('number'), original.get('source_url'), original.get('original_input_company_name')) != \
+           (restored['number'], restored['source_url'], restored['original_input_company_name']):
+            return False
+        if normalize_snippet(original.get('snippet')) not in restored['snippet']:
+            return False
+    return True
+
+
+def _count_snippets_and_contexts(candidate_items: List[Dict[str, Any]]) -> Tuple[int, int]:
+    snippets = 0
+    contexts = 0
+    for line in encode_candidates_compact(candidate_items).splitlines():
+        page = json.loads(line)
+        snippets += len(page["candidates"])
+        contexts += len(page["contexts"])
+    return snippets, contexts
+
+
+def _classify(config: AppConfig, template_path: str, recordings, work_dir: str) -> Dict[str, Classifications]:
+    from .llm_extractor_component import GeminiLLMExtractor  # Needs google-generativeai and an API key
+
+    extractor = GeminiLLMExtractor(config)
+    results: Dict[str, Classifications] = {}
+    for name, candidate_items, _ in recordings:
+        outputs, _, _ = extractor.extract_phone_numbers(
+            candidate_items, template_path, os.path.join(work_dir, "llm_context"), f"BENCH_{name}", "BENCH", "benchmark"
+        )
+        results[name] = {
+            output.number: (output.type, output.classification)
+            for output in outputs if not output.type.startswith("Error_")
+        }
+    return results
+
+
+def _agreement(recorded: Dict[str, Classifications], classified: Dict[str, Classifications]) -> Tuple[int, int, int, List[str]]:
+    compared = same_classification = same_type = 0
+    differences: List[str] = []
+    for name, recorded_classifications in recorded.items():
+        for number, (recorded_type, recorded_classification) in recorded_classifications.items():
+            if number not in classified.get(name, {}):
+                continue
+            new_type, new_classification = classified[name][number]
+            compared += 1
+            same_type += new_type == recorded_type
+            if new_classification == recorded_classification:
+                same_classification += 1
+            else:
+                differences.append(f"{name} {number}: {recorded_type}/{recorded_classification} -> {new_type}/{new_classification}")
+    return compared, same_classification, same_type, differences
+
+
+def _percent(part: float, whole: float) -> str:
+    return f"{100.0 * part / whole:.1f}%" if whole else "n/a"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark legacy vs. compact LLM candidate encoding on recorded LLM inputs.")
+    parser.add_argument("llm_context_dir", help="A run's llm_context directory (CANONICAL_*_llm_input_data.json / _llm_raw_output.json).")
+    parser.add_argument("--legacy-template", default="prompts/gemini_phone_validation_v1.txt", help="Template with the indented JSON placeholder.")
+    parser.add_argument("--compact-template", default="prompts/gemini_phone_validation_v2.txt", help="Template with the compact placeholder.")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Candidates per prompt (default: LLM_CANDIDATE_CHUNK_SIZE).")
+    parser.add_argument("--count-tokens", action="store_true", help="Count prompt tokens with the Gemini API instead of estimating them.")
+    parser.add_argument("--live", action="store_true", help="Re-classify the recorded inputs with the compact template and compare with the recorded responses.")
+    parser.add_argument("--noise-baseline", action="store_true", help="With --live, also re-classify with the legacy template.")
+    parser.add_argument("--show-differences", type=int, default=20, help="Classification differences to list.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    config = AppConfig()
+    chunk_size = max(1, args.chunk_size or config.llm_candidate_chunk_size)
+    legacy_template_path = _resolve(args.legacy_template)
+    compact_template_path = _resolve(args.compact_template)
+    with open(legacy_template_path, 'r', encoding='utf-8') as f:
+        legacy_template = f.read()
+    with open(compact_template_path, 'r', encoding='utf-8') as f:
+        compact_template = f.read()
+    if LEGACY_CANDIDATES_PLACEHOLDER not in legacy_template or COMPACT_CANDIDATES_PLACEHOLDER not in compact_template:
+        print("The legacy template needs the JSON list placeholder and the compact template the compact placeholder.")
+        return
+
+    recordings = _load_recordings(args.llm_context_dir)
+    if not recordings:
+        print(f"No *{INPUT_SUFFIX} files with candidates found in {args.llm_context_dir}")
+        return
+
+    if args.count_tokens:
+        from google.generativeai.client import configure
+        from google.generativeai.generative_models import GenerativeModel
+        configure(api_key=config.gemini_api_key)
+        model = GenerativeModel(config.llm_model_name)
+
+        def count_tokens(prompt: str) -> int:
+            return model.count_tokens(prompt).total_tokens
+    else:
+        def count_tokens(prompt: str) -> int:
+            return max(1, len(prompt) // CHARS_PER_TOKEN_ESTIMATE)
+
+    totals = {"legacy_prompt": 0, "compact_prompt": 0, "legacy_candidates": 0, "compact_candidates": 0,
+              "legacy_chars": 0, "compact_chars": 0}
+    candidates = chunks = round_trip_failures = snippets = contexts = 0
+    for name, candidate_items, _ in recordings:
+        candidates += len(candidate_items)
+        for chunk in _chunks(candidate_items, chunk_size):
+            chunks += 1
+            if not _check_round_trip(chunk):
+                round_trip_failures += 1
+                print(f"ROUND TRIP MISMATCH: {name} (chunk of {len(chunk)})")
+            chunk_snippets, chunk_contexts = _count_snippets_and_contexts(chunk)
+            snippets += chunk_snippets
+            contexts += chunk_contexts
+            legacy_prompt = format_candidates_prompt(legacy_template, chunk)
+            compact_prompt = format_candidates_prompt(compact_template, chunk)
+            totals["legacy_chars"] += len(legacy_prompt)
+            totals["compact_chars"] += len(compact_prompt)
+            totals["legacy_prompt"] += count_tokens(legacy_prompt)
+            totals["compact_prompt"] += count_tokens(compact_prompt)
+            totals["legacy_candidates"] += count_tokens(encode_candidates_legacy(chunk))
+            totals["compact_candidates"] += count_tokens(encode_candidates_compact(chunk))
+
+    token_label = f"counted by {config.llm_model_name}" if args.count_tokens else f"estimated at {CHARS_PER_TOKEN_ESTIMATE} chars/token"
+    print(f"Recorded inputs: {len(recordings)} canonical URLs, {candidates} candidates, {chunks} chunks of up to {chunk_size}")
+    print(f"Legacy template:  {legacy_template_path}")
+    print(f"Compact template: {compact_template_path}")
+    print(f"Round trip: {chunks - round_trip_failures}/{chunks} chunks OK")
+    print(f"Snippet merging: {snippets} snippets -> {contexts} contexts")
+    print(f"{'':28}{'legacy':>12}{'compact':>12}{'change':>10}")
+    for label, legacy_key, compact_key in (
+        ("Prompt chars", "legacy_chars", "compact_chars"),
+        ("Prompt tokens", "legacy_prompt", "compact_prompt"),
+        ("Candidate block tokens", "legacy_candidates", "compact_candidates"),
+    ):
+        legacy_value, compact_value = totals[legacy_key], totals[compact_key]
+        change = f"-{_percent(legacy_value - compact_value, legacy_value)}" if legacy_value else "n/a"
+        print(f"{label:28}{legacy_value:>12}{compact_value:>12}{change:>10}")
+    print(f"Tokens {token_label}; prompt tokens per candidate: {totals['legacy_prompt'] / candidates:.1f} -> {totals['compact_prompt'] / candidates:.1f}")
+
+    if not args.live:
+        return
+    recorded = {name: _parse_classifications(raw_output) for name, _, raw_output in recordings if raw_output}
+    recorded = {name: classifications for name, classifications in recorded.items() if classifications}
+    if not recorded:
+        print("No recorded responses with classifications to compare against.")
+        return
+    live_recordings = [recording for recording in recordings if recording[0] in recorded]
+    config.llm_cache_enabled = False  # Every candidate must reach the model.
+    with tempfile.TemporaryDirectory() as work_dir:
+        runs = [("compact", compact_template_path)]
+        if args.noise_baseline:
+            runs.insert(0, ("legacy (noise baseline)", legacy_template_path))
+        print(f"Classification parity vs. recorded responses ({config.llm_model_name}, temperature {config.llm_temperature}):")
+        for label, template_path in runs:
+            classified = _classify(config, template_path, live_recordings, work_dir)
+            compared, same_classification, same_type, differences = _agreement(recorded, classified)
+            print(f"  {label:24} {compared} numbers compared, classification {_percent(same_classification, compared)} same, type {_percent(same_type, compared)} same")
+            for difference in differences[:args.show_differences]:
+                print(f"    {difference}")
+
+
+if __name__ == "__main__":
+    main()
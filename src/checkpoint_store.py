@@ -0,0 +1,195 @@
+"""
+SQLite checkpoint of Pass 1 progress, for resuming crashed runs.
+
+Pass 1 keeps its results in memory (raw LLM outputs per pathful canonical URL,
+the canonical domain journey data, the DataFrame's status columns) and only
+writes reports at the end. `RunCheckpointStore` persists, as each input row
+finishes Pass 1, everything that row produced:
+
+- `rows`: the row's Pass 1 DataFrame values and scrape result.
+- `pathful`: the incremental-run record of the row's pathful canonical URL
+  (its regex/LLM results are persisted in the pipeline store).
+- `domains`: the current journey data of the row's true base domain.
+- `state`: run-level counters (run_metrics sections, failure counts).
+- `errors`: global error messages, appended as they occur.
+
+All writes for one row happen in a single transaction, so a crash leaves the
+store at the last completed row. `python main_pipeline.py --resume <run_id>`
+restores this state, skips the completed rows and continues with the rest,
+then runs consolidation and reporting as usual.
+
+Run-level counters are snapshotted with each row, so on a resumed run they also
+include the work of rows that were in flight at the crash and are processed again.
+
+With `--workers N`, every Pass 1 worker process writes its own store next to
+the run's one; the main process restores each worker store and folds it into
+the run's store with `import_checkpoint`, recording the worker store's name so
+it is never folded in twice.
+
+The store lives in the run's output directory (PIPELINE_CHECKPOINT_FILE).
+"""
+import json
+import logging
+import sqlite3
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rows (
+    row_key TEXT PRIMARY KEY,
+    seq INTEGER NOT NULL,
+    record TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pathful (
+    url TEXT PRIMARY KEY,
+    record TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS domains (
+    true_base TEXT PRIMARY KEY,
+    record TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS errors (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    message TEXT NOT NULL
+);
+"""
+
+
+def _json_default(value: Any) -> Any:
+    """JSON encoder fallback for sets, Counters and numpy/pandas scalars found in Pass 1 structures."""
+    if isinstance(value, Counter):
+        return dict(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if hasattr(value, 'item'):  # numpy scalar
+        return value.item()
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def dumps(value: Any) -> str:
+    return json.dumps(value, default=_json_default)
+
+
+class RunCheckpointStore:
+    """
+    Per-run Pass 1 checkpoint. Single writer (the pipeline's event loop thread).
+
+    Usage:
+        store = RunCheckpointStore(path)
+        store.checkpoint_row(row_key, row_record, pathful=(url, record), domain=(true_base, record), state={...}, new_errors=[...])
+        ...
+        completed = store.load()  # on resume
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._conn = sqlite3.connect(db_path)
+        self._conn.executescript(_SCHEMA)
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.commit()
+        self._seq: int = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM rows").fetchone()[0]
+        self.rows_checkpointed: int = 0
+
+    def get_meta(self, key: str) -> Any:
+        row = self._conn.execute("SELECT value FROM state WHERE key = ?", (f"meta:{key}",)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set_meta(self, key: str, value: Any) -> None:
+        with self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (f"meta:{key}", dumps(value)))
+
+    def checkpoint_row(
+        self,
+        row_key: str,
+        row_record: Dict[str, Any],
+        pathful: Optional[Tuple[str, Dict[str, Any]]] = None,
+        domain: Optional[Tuple[str, Dict[str, Any]]] = None,
+        state: Optional[Dict[str, Any]] = None,
+        new_errors: Optional[List[str]] = None
+    ) -> None:
+        """Records one completed row and everything it changed, atomically."""
+        self._seq += 1
+        row_record = dict(row_record, checkpointed_at=time.time())
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO rows (row_key, seq, record) VALUES (?, ?, ?)",
+                (row_key, self._seq, dumps(row_record))
+            )
+            if pathful is not None:
+                self._conn.execute("INSERT OR REPLACE INTO pathful (url, record) VALUES (?, ?)", (pathful[0], dumps(pathful[1])))
+            if domain is not None:
+                self._conn.execute("INSERT OR REPLACE INTO domains (true_base, record) VALUES (?, ?)", (domain[0], dumps(domain[1])))
+            for key, value in (state or {}).items():
+                self._conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, dumps(value)))
+            if new_errors:
+                self._conn.executemany("INSERT INTO errors (message) VALUES (?)", [(str(message),) for message in new_errors])
+        self.rows_checkpointed += 1
+
+    def save_state(self, state: Dict[str, Any]) -> None:
+        """Overwrites run-level state keys without recording a row (a worker's final counters)."""
+        with self._conn:
+            for key, value in state.items():
+                self._conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, dumps(value)))
+
+    def imported_checkpoints(self) -> List[str]:
+        """Names of the worker stores already folded into this one."""
+        return self.get_meta("imported_checkpoints") or []
+
+    def import_checkpoint(
+        self,
+        source_name: str,
+        rows: Dict[str, Dict[str, Any]],
+        pathful: Dict[str, Dict[str, Any]],
+        domains: Dict[str, Dict[str, Any]],
+        state: Dict[str, Any],
+        new_errors: List[str]
+    ) -> None:
+        """
+        Adds the completed rows of another store (as returned by its `load()`) atomically.
+
+        `domains` and `state` must already be merged with this store's records:
+        they replace the stored ones.
+        """
+        imported = self.imported_checkpoints()
+        with self._conn:
+            for row_key, row_record in rows.items():
+                self._seq += 1
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO rows (row_key, seq, record) VALUES (?, ?, ?)",
+                    (row_key, self._seq, dumps(row_record))
+                )
+            self._conn.executemany("INSERT OR REPLACE INTO pathful (url, record) VALUES (?, ?)", [(url, dumps(record)) for url, record in pathful.items()])
+            self._conn.executemany("INSERT OR REPLACE INTO domains (true_base, record) VALUES (?, ?)", [(true_base, dumps(record)) for true_base, record in domains.items()])
+            for key, value in state.items():
+                self._conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, dumps(value)))
+            if new_errors:
+                self._conn.executemany("INSERT INTO errors (message) VALUES (?)", [(str(message),) for message in new_errors])
+            self._conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", ("meta:imported_checkpoints", dumps(imported + [source_name])))
+
+    def load(self) -> Dict[str, Any]:
+        """
+        Everything checkpointed so far:
+        {"rows": {row_key: record}, "pathful": {url: record}, "domains": {true_base: record},
+         "state": {key: value}, "errors": [message, ...]}
+        """
+        rows = {key: json.loads(record) for key, record in self._conn.execute("SELECT row_key, record FROM rows ORDER BY seq")}
+        pathful = {url: json.loads(record) for url, record in self._conn.execute("SELECT url, record FROM pathful")}
+        domains = {true_base: json.loads(record) for true_base, record in self._conn.execute("SELECT true_base, record FROM domains")}
+        state = {key: json.loads(value) for key, value in self._conn.execute("SELECT key, value FROM state") if not key.startswith("meta:")}
+        errors = [message for (message,) in self._conn.execute("SELECT message FROM errors ORDER BY seq")]
+        return {"rows": rows, "pathful": pathful, "domains": domains, "state": state, "errors": errors}
+
+    def close(self) -> None:
+        try:
+            self._conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"RunCheckpointStore: error closing {self.db_path}: {e}")
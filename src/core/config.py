@@ -52,9 +52,33 @@ class AppConfig:
         scraper_min_score_to_queue (int): Minimum score a link needs to be added to the scrape queue.
         scraper_score_threshold_for_limit_bypass (int): Score threshold for a page to bypass the max_pages_per_domain limit.
         scraper_max_high_priority_pages_after_limit (int): Max number of high-priority pages to scrape after SCRAPER_MAX_PAGES_PER_DOMAIN is hit.
+        scraper_url_discovery_enabled (bool): Whether to seed the crawl with imprint/contact URLs found via sitemaps and well-known paths.
+        scraper_discovery_well_known_paths (List[str]): Paths probed with HEAD/GET during URL discovery (e.g., /impressum).
+        scraper_discovery_max_sitemaps (int): Max sitemap files (including sitemap index children) fetched per site. 0 skips sitemaps.
+        scraper_discovery_max_seeds (int): Max discovered URLs seeded into the queue per site.
+        scraper_discovery_min_seed_score (int): Min link score a sitemap URL needs to be seeded.
+        scraper_response_cache_enabled (bool): Whether fetched pages are cached on disk and reused across runs.
+        scraper_response_cache_subdir (str): Subdirectory of output_base_dir holding the response cache.
+        scraper_response_cache_max_age_hours (float): Age below which a cached page is used without revalidation.
+        scraper_stop_policies (List[str]): Names of early-stop policies ending an entry point's crawl once enough contact data was found. Empty disables early stopping.
         
         max_depth_internal_links (int): Maximum depth to follow internal links.
         scraper_networkidle_timeout_ms (int): Timeout in ms for Playwright's networkidle wait. 0 to disable.
+        scraper_per_host_max_concurrency (int): Maximum concurrent page fetches against a single host.
+        scraper_per_host_min_delay_seconds (float): Minimum spacing in seconds between request starts on the same host.
+        scraper_max_crawl_delay_seconds (float): Upper bound applied to robots.txt `Crawl-delay` values.
+        scraper_http_first_enabled (bool): Whether pages are fetched with plain HTTP first and escalated to Playwright only when needed.
+        scraper_http_min_visible_text_chars (int): Minimum visible text length for an HTTP-fetched page to be used without a browser.
+        scraper_http_timeout_seconds (float): Timeout in seconds for HTTP-tier requests.
+        scraper_http_max_connections (int): Connection pool size of the shared HTTP-tier client.
+        scraper_request_interception_enabled (bool): Whether browser contexts abort unneeded sub-resource requests.
+        scraper_blocked_resource_types (List[str]): Playwright resource types to abort (e.g., image, font, media, stylesheet).
+        scraper_blocked_hosts (List[str]): Hosts (and their subdomains) whose requests are aborted, e.g. analytics and ad networks.
+        browser_pool_size (int): Number of persistent Chromium browsers kept by the scraper's browser pool.
+        browser_pool_contexts_per_browser (int): Maximum concurrently leased contexts per pooled browser.
+        browser_pool_max_pages_per_browser (int): Page fetches after which a pooled browser is restarted (0 to disable).
+        browser_pool_max_context_reuses (int): Leases after which a browser context is closed instead of recycled (0 for no limit).
+        browser_pool_max_memory_mb (int): Combined Chromium RSS in MB above which a pooled browser is recycled (0 to disable, requires psutil).
         snippet_window_chars (int): Number of characters before/after a regex match for snippet extraction.
         
         output_base_dir (str): Base directory for output files.
@@ -64,15 +88,35 @@ class AppConfig:
         
         respect_robots_txt (bool): Whether the scraper should respect robots.txt.
         robots_txt_user_agent (str): User-agent string for checking robots.txt.
+        robots_cache_ttl_hours (float): How long a fetched (or missing) robots.txt stays cached.
+        robots_cache_error_ttl_minutes (float): How long a failed robots.txt fetch (5xx/network error) stays cached.
+        robots_cache_path (str): JSON file persisting the robots.txt cache across runs, relative to output_base_dir. Empty disables the disk cache.
         
         gemini_api_key (Optional[str]): API key for Google Gemini.
         llm_model_name (str): Specific Google Gemini model to use.
         llm_temperature (float): Temperature for LLM response generation.
         llm_max_tokens (int): Maximum tokens for LLM response.
-        llm_prompt_template_path (str): Path to the LLM prompt template file.
+        llm_prompt_template_path (str): Path to the LLM prompt template file. Its placeholder selects the
+            candidate encoding (compact JSON Lines for v2, indented JSON for v1; see llm_prompt_encoding).
         llm_max_retries_on_number_mismatch (int): Max retries if LLM output number mismatches input.
-        llm_candidate_chunk_size (int): Number of regex candidates to send per LLM call.
+        llm_candidate_chunk_size (int): Number of regex candidates to send per LLM call (without adaptive chunking).
         llm_max_chunks_per_url (int): Maximum number of chunks (and thus LLM calls) per canonical URL.
+            Together with llm_candidate_chunk_size, limits the candidates sent per canonical URL.
+        llm_adaptive_chunking (bool): Whether chunk boundaries follow prompt/output token budgets calibrated
+            from Gemini's reported usage instead of llm_candidate_chunk_size.
+        llm_adaptive_chunk_max_candidates (int): Most candidates per chunk with adaptive chunking.
+        llm_max_in_flight_requests (int): Maximum Gemini requests in flight at once, across all chunks and canonical URLs.
+        llm_min_in_flight_requests (int): Lowest in-flight limit the adaptive concurrency control backs off to on rate-limit errors.
+        llm_concurrency_decrease_factor (float): Factor applied to the in-flight limit on a Gemini rate-limit error (429).
+        llm_requests_per_minute (int): Client-side Gemini request budget per minute (0 disables). Split across Pass 1 worker processes.
+        llm_tokens_per_minute (int): Client-side Gemini token budget per minute (0 disables). Split across Pass 1 worker processes.
+        llm_cross_domain_batching (bool): Whether candidates of concurrently processed canonical URLs are packed into shared LLM chunks.
+        llm_batch_max_prompt_tokens (int): Estimated prompt token budget (instructions plus candidates) of a packed chunk,
+            and of every chunk with adaptive chunking.
+        llm_batch_linger_seconds (float): How long a partly filled packed chunk waits for more candidates before it is sent.
+        llm_cache_enabled (bool): Whether candidate classifications are cached and reused across rows and runs.
+        llm_cache_file (str): SQLite file under output_base_dir holding the LLM classification cache.
+        llm_cache_max_entries (int): Cache size above which the least recently used entries are evicted (0 = unbounded).
         
         target_country_codes (List[str]): Target country codes for phone number parsing.
         default_region_code (Optional[str]): Default region code for phone number parsing.
@@ -80,6 +124,9 @@ class AppConfig:
         default_region_code (Optional[str]): Default region code for phone number parsing.
         url_probing_tlds (List[str]): Comma-separated list of TLDs to try appending to domain-like inputs that lack a TLD (e.g., "de,com,at,ch").
         enable_dns_error_fallbacks (bool): Whether to enable DNS error fallback strategies (hyphen simplification, .de to .com swap).
+        dns_cache_ttl_seconds (float): How long a successful DNS resolution stays cached.
+        dns_negative_cache_ttl_seconds (float): How long a failed DNS resolution (unknown host) stays cached.
+        dns_resolve_timeout_seconds (float): Timeout for a single DNS lookup; timed-out hosts are not rejected.
         
         input_excel_file_path (str): Path to the input data file.
         input_file_profile_name (str): Name of the input column mapping profile to use.
@@ -90,6 +137,17 @@ class AppConfig:
         nrows_config (Optional[int]): Number of rows to read after skipping. None means read to end.
         consecutive_empty_rows_to_stop (int): Number of consecutive empty rows to detect as end-of-data when ROW_PROCESSING_RANGE is open-ended.
         
+        pipeline_max_concurrent_rows (int): Number of input rows processed concurrently in Pass 1.
+        pipeline_max_concurrent_scrapes (int): Maximum concurrent `scrape_website` calls in Pass 1.
+        pipeline_max_concurrent_regex (int): Maximum concurrent regex extraction jobs (run in worker threads).
+        pipeline_max_concurrent_llm_calls (int): Maximum pathful canonical URLs in LLM extraction at once (their chunks are sent concurrently, see llm_max_in_flight_requests).
+        pipeline_worker_processes (int): Number of processes sharing Pass 1 (`--workers` overrides); the limits above apply per process.
+        pipeline_checkpoint_file (str): SQLite file in each run's output directory checkpointing Pass 1 for `--resume` (empty disables).
+        pipeline_store_file (str): SQLite (WAL) file in each run's output directory holding the work queue, scraped page text, regex candidates and LLM outputs.
+        pipeline_store_busy_timeout_seconds (float): How long a pipeline store write waits for another process holding the write lock.
+        pipeline_store_page_text (bool): Whether the text of scraped pages is stored in the pipeline store.
+        pipeline_incremental_state_file (str): JSON file under output_base_dir holding per-domain content hashes and results for `--incremental` runs.
+        
         log_level (str): Logging level for the file log (e.g., INFO, DEBUG).
         console_log_level (str): Logging level for console output (e.g., WARNING, INFO).
 
@@ -155,12 +213,48 @@ class AppConfig:
         self.scraper_min_score_to_queue: int = int(os.getenv('SCRAPER_MIN_SCORE_TO_QUEUE', '40'))
         self.scraper_score_threshold_for_limit_bypass: int = int(os.getenv('SCRAPER_SCORE_THRESHOLD_FOR_LIMIT_BYPASS', '80'))
         self.scraper_max_high_priority_pages_after_limit: int = int(os.getenv('SCRAPER_MAX_HIGH_PRIORITY_PAGES_AFTER_LIMIT', '5')) # Default to 5
+        self.scraper_url_discovery_enabled: bool = os.getenv('SCRAPER_URL_DISCOVERY_ENABLED', 'True').lower() == 'true'
+        well_known_paths_str: str = os.getenv('SCRAPER_DISCOVERY_WELL_KNOWN_PATHS', '/impressum,/kontakt,/imprint,/contact')
+        self.scraper_discovery_well_known_paths: List[str] = [p.strip() for p in well_known_paths_str.split(',') if p.strip()]
+        self.scraper_discovery_max_sitemaps: int = int(os.getenv('SCRAPER_DISCOVERY_MAX_SITEMAPS', '3'))
+        self.scraper_discovery_max_seeds: int = int(os.getenv('SCRAPER_DISCOVERY_MAX_SEEDS', '4'))
+        self.scraper_discovery_min_seed_score: int = int(os.getenv('SCRAPER_DISCOVERY_MIN_SEED_SCORE', '80'))
+        self.scraper_response_cache_enabled: bool = os.getenv('SCRAPER_RESPONSE_CACHE_ENABLED', 'True').lower() == 'true'
+        self.scraper_response_cache_subdir: str = os.getenv('SCRAPER_RESPONSE_CACHE_SUBDIR', 'http_cache')
+        self.scraper_response_cache_max_age_hours: float = float(os.getenv('SCRAPER_RESPONSE_CACHE_MAX_AGE_HOURS', '24'))
+        stop_policies_str: str = os.getenv('SCRAPER_STOP_POLICIES', 'imprint_and_contact')
+        self.scraper_stop_policies: List[str] = [p.strip().lower() for p in stop_policies_str.split(',') if p.strip() and p.strip().lower() != 'none']
 
         # Existing Scraper Settings
         self.max_depth_internal_links: int = int(os.getenv('MAX_DEPTH_INTERNAL_LINKS', '1'))
         self.scraper_networkidle_timeout_ms: int = int(os.getenv('SCRAPER_NETWORKIDLE_TIMEOUT_MS', '3000')) # Default 3s, 0 to disable
         self.snippet_window_chars: int = int(os.getenv('SNIPPET_WINDOW_CHARS', '300')) # Character window for snippets, default 300 chars
 
+        # Per-Host Politeness (Crawl Frontier) Settings
+        self.scraper_per_host_max_concurrency: int = int(os.getenv('SCRAPER_PER_HOST_MAX_CONCURRENCY', '2'))
+        self.scraper_per_host_min_delay_seconds: float = float(os.getenv('SCRAPER_PER_HOST_MIN_DELAY_SECONDS', '1.0'))
+        self.scraper_max_crawl_delay_seconds: float = float(os.getenv('SCRAPER_MAX_CRAWL_DELAY_SECONDS', '10'))
+
+        # Tiered Fetch (HTTP first, Playwright fallback) Settings
+        self.scraper_http_first_enabled: bool = os.getenv('SCRAPER_HTTP_FIRST_ENABLED', 'True').lower() == 'true'
+        self.scraper_http_min_visible_text_chars: int = int(os.getenv('SCRAPER_HTTP_MIN_VISIBLE_TEXT_CHARS', '250'))
+        self.scraper_http_timeout_seconds: float = float(os.getenv('SCRAPER_HTTP_TIMEOUT_SECONDS', '15'))
+        self.scraper_http_max_connections: int = int(os.getenv('SCRAPER_HTTP_MAX_CONNECTIONS', '100'))
+
+        # Request Interception Settings
+        self.scraper_request_interception_enabled: bool = os.getenv('SCRAPER_REQUEST_INTERCEPTION_ENABLED', 'True').lower() == 'true'
+        blocked_resource_types_str: str = os.getenv('SCRAPER_BLOCKED_RESOURCE_TYPES', 'image,font,media,stylesheet')
+        self.scraper_blocked_resource_types: List[str] = [t.strip().lower() for t in blocked_resource_types_str.split(',') if t.strip()]
+        blocked_hosts_str: str = os.getenv('SCRAPER_BLOCKED_HOSTS', 'google-analytics.com,googletagmanager.com,doubleclick.net,googlesyndication.com,googleadservices.com,connect.facebook.net,hotjar.com,clarity.ms,bat.bing.com,etracker.com,etracker.de,snap.licdn.com,px.ads.linkedin.com,analytics.tiktok.com,adform.net,criteo.com')
+        self.scraper_blocked_hosts: List[str] = [h.strip().lower() for h in blocked_hosts_str.split(',') if h.strip()]
+
+        # Browser Pool Settings
+        self.browser_pool_size: int = int(os.getenv('BROWSER_POOL_SIZE', '2'))
+        self.browser_pool_contexts_per_browser: int = int(os.getenv('BROWSER_POOL_CONTEXTS_PER_BROWSER', '4'))
+        self.browser_pool_max_pages_per_browser: int = int(os.getenv('BROWSER_POOL_MAX_PAGES_PER_BROWSER', '500')) # 0 to disable
+        self.browser_pool_max_context_reuses: int = int(os.getenv('BROWSER_POOL_MAX_CONTEXT_REUSES', '25')) # 0 for no limit
+        self.browser_pool_max_memory_mb: int = int(os.getenv('BROWSER_POOL_MAX_MEMORY_MB', '0')) # 0 to disable, requires psutil
+
         # --- Output Configuration ---
         self.output_base_dir: str = os.getenv('OUTPUT_BASE_DIR', 'output_data') # Relative to phone_validation_pipeline
         self.scraped_content_subdir: str = 'scraped_content'
@@ -170,6 +264,9 @@ class AppConfig:
         # --- Robots.txt Handling ---
         self.respect_robots_txt: bool = os.getenv('RESPECT_ROBOTS_TXT', 'True').lower() == 'true'
         self.robots_txt_user_agent: str = os.getenv('ROBOTS_TXT_USER_AGENT', '*')
+        self.robots_cache_ttl_hours: float = float(os.getenv('ROBOTS_CACHE_TTL_HOURS', '24'))
+        self.robots_cache_error_ttl_minutes: float = float(os.getenv('ROBOTS_CACHE_ERROR_TTL_MINUTES', '30'))
+        self.robots_cache_path: str = os.getenv('ROBOTS_CACHE_PATH', 'robots_cache.json')
 
         # --- LLM Configuration ---
         self.gemini_api_key: Optional[str] = os.getenv('GEMINI_API_KEY')
@@ -182,6 +279,19 @@ class AppConfig:
         self.llm_max_retries_on_number_mismatch: int = int(os.getenv('LLM_MAX_RETRIES_ON_NUMBER_MISMATCH', '1'))
         self.llm_candidate_chunk_size: int = int(os.getenv('LLM_CANDIDATE_CHUNK_SIZE', '10'))
         self.llm_max_chunks_per_url: int = int(os.getenv('LLM_MAX_CHUNKS_PER_URL', '10'))
+        self.llm_adaptive_chunking: bool = os.getenv('LLM_ADAPTIVE_CHUNKING', 'True').lower() == 'true'
+        self.llm_adaptive_chunk_max_candidates: int = int(os.getenv('LLM_ADAPTIVE_CHUNK_MAX_CANDIDATES', '25'))
+        self.llm_max_in_flight_requests: int = int(os.getenv('LLM_MAX_IN_FLIGHT_REQUESTS', '8'))
+        self.llm_min_in_flight_requests: int = int(os.getenv('LLM_MIN_IN_FLIGHT_REQUESTS', '1'))
+        self.llm_concurrency_decrease_factor: float = float(os.getenv('LLM_CONCURRENCY_DECREASE_FACTOR', '0.5'))
+        self.llm_requests_per_minute: int = int(os.getenv('LLM_REQUESTS_PER_MINUTE', '0'))
+        self.llm_tokens_per_minute: int = int(os.getenv('LLM_TOKENS_PER_MINUTE', '0'))
+        self.llm_cross_domain_batching: bool = os.getenv('LLM_CROSS_DOMAIN_BATCHING', 'True').lower() == 'true'
+        self.llm_batch_max_prompt_tokens: int = int(os.getenv('LLM_BATCH_MAX_PROMPT_TOKENS', '6000'))
+        self.llm_batch_linger_seconds: float = float(os.getenv('LLM_BATCH_LINGER_SECONDS', '1.0'))
+        self.llm_cache_enabled: bool = os.getenv('LLM_CACHE_ENABLED', 'True').lower() == 'true'
+        self.llm_cache_file: str = os.getenv('LLM_CACHE_FILE', 'llm_classification_cache.sqlite')
+        self.llm_cache_max_entries: int = int(os.getenv('LLM_CACHE_MAX_ENTRIES', '200000'))
 
         # --- Phone Number Normalization Configuration ---
         target_country_codes_str: str = os.getenv('TARGET_COUNTRY_CODES', 'DE,CH,AT') # Germany, Switzerland, Austria
@@ -192,6 +302,9 @@ class AppConfig:
         url_probing_tlds_str: str = os.getenv('URL_PROBING_TLDS', 'de,com,at,ch')
         self.url_probing_tlds: List[str] = [tld.strip().lower() for tld in url_probing_tlds_str.split(',') if tld.strip()]
         self.enable_dns_error_fallbacks: bool = os.getenv('ENABLE_DNS_ERROR_FALLBACKS', 'True').lower() == 'true'
+        self.dns_cache_ttl_seconds: float = float(os.getenv('DNS_CACHE_TTL_SECONDS', '1800'))
+        self.dns_negative_cache_ttl_seconds: float = float(os.getenv('DNS_NEGATIVE_CACHE_TTL_SECONDS', '300'))
+        self.dns_resolve_timeout_seconds: float = float(os.getenv('DNS_RESOLVE_TIMEOUT_SECONDS', '5'))
 
         # --- Data Handling & Input Profiling ---
         self.input_excel_file_path: str = os.getenv('INPUT_EXCEL_FILE_PATH', 'data_to_be_inputed.xlsx') # Relative to phone_validation_pipeline
@@ -247,6 +360,18 @@ class AppConfig:
         # --- Data Handling Enhancements ---
         self.consecutive_empty_rows_to_stop: int = int(os.getenv('CONSECUTIVE_EMPTY_ROWS_TO_STOP', '3'))
 
+        # --- Pipeline Concurrency Configuration ---
+        self.pipeline_max_concurrent_rows: int = int(os.getenv('PIPELINE_MAX_CONCURRENT_ROWS', '8'))
+        self.pipeline_max_concurrent_scrapes: int = int(os.getenv('PIPELINE_MAX_CONCURRENT_SCRAPES', '8'))
+        self.pipeline_max_concurrent_regex: int = int(os.getenv('PIPELINE_MAX_CONCURRENT_REGEX', '4'))
+        self.pipeline_max_concurrent_llm_calls: int = int(os.getenv('PIPELINE_MAX_CONCURRENT_LLM_CALLS', '4'))
+        self.pipeline_worker_processes: int = int(os.getenv('PIPELINE_WORKER_PROCESSES', '1'))
+        self.pipeline_checkpoint_file: str = os.getenv('PIPELINE_CHECKPOINT_FILE', 'pass1_checkpoint.sqlite')
+        self.pipeline_store_file: str = os.getenv('PIPELINE_STORE_FILE', 'pipeline_store.sqlite')
+        self.pipeline_store_busy_timeout_seconds: float = float(os.getenv('PIPELINE_STORE_BUSY_TIMEOUT_SECONDS', '30'))
+        self.pipeline_store_page_text: bool = os.getenv('PIPELINE_STORE_PAGE_TEXT', 'True').lower() == 'true'
+        self.pipeline_incremental_state_file: str = os.getenv('PIPELINE_INCREMENTAL_STATE_FILE', 'incremental_state.json')
+
         # --- Logging Configuration ---
         self.log_level: str = os.getenv('LOG_LEVEL', 'INFO').upper()
         self.console_log_level: str = os.getenv('CONSOLE_LOG_LEVEL', 'WARNING').upper()
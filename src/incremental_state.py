@@ -0,0 +1,262 @@
+"""
+Per-domain results of earlier pipeline runs, for incremental re-runs.
+
+Every run records, for each pathful canonical URL that completed regex and LLM
+processing, a hash of its scraped page texts together with the LLM outputs, and
+for each true base domain the consolidated `CompanyContactDetails`. The state is
+kept in a JSON file under OUTPUT_BASE_DIR (PIPELINE_INCREMENTAL_STATE_FILE).
+
+With `--incremental`, a pathful canonical URL whose content hash matches the
+stored one skips regex extraction and the LLM call and reuses the stored LLM
+outputs. A domain whose pathful URLs were all unchanged reuses its stored
+`CompanyContactDetails`. Changed and new domains go through the full path.
+
+The hash covers the page texts and `tel:` hrefs plus everything else that feeds
+regex and the LLM (company name, target country codes). A fingerprint of the
+prompt template, model name and extraction settings is stored with the file; if
+it changes, all stored results are treated as stale.
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .core.config import AppConfig
+from .core.schemas import CompanyContactDetails, PhoneNumberLLMOutput
+from .regex_extractor_component import tel_hrefs_path_for_page_file
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STATE_FORMAT_VERSION: int = 1
+
+# Stats counted per pathful canonical URL in Pass 1.
+PASS1_STAT_KEYS = ("pathful_lookups", "pathful_unchanged", "pathful_changed", "pathful_new", "pathful_recorded")
+
+
+class IncrementalRunState:
+    """
+    Stored per-pathful-URL and per-domain results, loaded at start-up and saved after consolidation.
+
+    Results are always recorded, so a normal run prepares the next incremental
+    run. Stored results are only reused when `reuse_enabled` is set.
+    """
+
+    def __init__(self, config: AppConfig, run_id: str, reuse_enabled: bool = False, state_path: Optional[str] = None):
+        self.config = config
+        self.run_id = run_id
+        self.reuse_enabled = reuse_enabled
+        if state_path is None:
+            output_base_dir = config.output_base_dir
+            if not os.path.isabs(output_base_dir):
+                output_base_dir = os.path.join(PROJECT_ROOT_DIR, output_base_dir)
+            state_path = os.path.join(output_base_dir, config.pipeline_incremental_state_file)
+        self.state_path: str = state_path
+        self.fingerprint: str = self._processing_fingerprint()
+
+        self._pathful: Dict[str, Dict[str, Any]] = {}
+        self._domains: Dict[str, Dict[str, Any]] = {}
+        self._reused_pathful_urls: Set[str] = set()
+
+        self.stats: Dict[str, Any] = {
+            "reuse_enabled": reuse_enabled,
+            "pathful_entries_loaded": 0,
+            "state_discarded_fingerprint_changed": False,
+            "pathful_lookups": 0,
+            "pathful_unchanged": 0,
+            "pathful_changed": 0,
+            "pathful_new": 0,
+            "domains_reused": 0,
+            "pathful_recorded": 0,
+            "domains_recorded": 0,
+        }
+        self._load()
+
+    def _processing_fingerprint(self) -> str:
+        """Hash of the settings that change regex/LLM results for identical page content."""
+        prompt_path = self.config.llm_prompt_template_path
+        if not os.path.isabs(prompt_path):
+            prompt_path = os.path.join(PROJECT_ROOT_DIR, prompt_path)
+        try:
+            with open(prompt_path, 'rb') as f:
+                prompt_digest = hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            prompt_digest = "missing"
+        parts = [
+            prompt_digest,
+            self.config.llm_model_name,
+            str(self.config.llm_temperature),
+            str(self.config.snippet_window_chars),
+            str(self.config.max_identical_numbers_per_page_to_llm),
+            ",".join(self.config.target_country_codes),
+        ]
+        return hashlib.sha256("\x1f".join(parts).encode('utf-8')).hexdigest()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"IncrementalRunState: could not read state file {self.state_path}: {e}. Starting empty.")
+            return
+        if payload.get("version") != STATE_FORMAT_VERSION or payload.get("fingerprint") != self.fingerprint:
+            self.stats["state_discarded_fingerprint_changed"] = True
+            logger.info(f"IncrementalRunState: prompt, model or extraction settings changed since the stored run. Ignoring stored results in {self.state_path}.")
+            return
+        self._pathful = payload.get("pathful", {})
+        self._domains = payload.get("domains", {})
+        self.stats["pathful_entries_loaded"] = len(self._pathful)
+        logger.info(f"IncrementalRunState: loaded {len(self._pathful)} pathful URL and {len(self._domains)} domain results from {self.state_path}.")
+
+    @staticmethod
+    def compute_content_hash(
+        scraped_pages_details: Iterable[Tuple[str, str, str, str]],
+        company_name: str,
+        target_country_codes: Sequence[str]
+    ) -> str:
+        """
+        Hash over the text and `tel:` href files of the scraped pages (order-independent) and the regex inputs.
+
+        Blocking file I/O: call through `asyncio.to_thread`.
+        """
+        page_digests: List[str] = []
+        for page_content_file, source_page_url, page_type, _ in scraped_pages_details:
+            page_hash = hashlib.sha256()
+            page_hash.update(f"{source_page_url}\x1f{page_type}\x1f".encode('utf-8'))
+            try:
+                with open(page_content_file, 'rb') as f:
+                    page_hash.update(f.read())
+            except OSError:
+                page_hash.update(b"<unreadable>")
+            try:
+                with open(tel_hrefs_path_for_page_file(page_content_file), 'rb') as f:
+                    page_hash.update(b"\x1ftel\x1f" + f.read())
+            except OSError:
+                pass
+            page_digests.append(page_hash.hexdigest())
+        content_hash = hashlib.sha256()
+        content_hash.update(f"{company_name}\x1f{','.join(sorted(target_country_codes))}\x1f".encode('utf-8'))
+        for digest in sorted(page_digests):
+            content_hash.update(digest.encode('ascii'))
+        return content_hash.hexdigest()
+
+    def lookup(self, pathful_url: str, content_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the stored result for `pathful_url` if its content is unchanged, else None.
+
+        The result has `regex_candidates_found` (bool) and `llm_outputs`
+        (List[PhoneNumberLLMOutput]).
+        """
+        if not self.reuse_enabled:
+            return None
+        self.stats["pathful_lookups"] += 1
+        entry = self._pathful.get(pathful_url)
+        if entry is None:
+            self.stats["pathful_new"] += 1
+            return None
+        if entry.get("content_hash") != content_hash:
+            self.stats["pathful_changed"] += 1
+            return None
+        try:
+            llm_outputs = [PhoneNumberLLMOutput(**item) for item in entry.get("llm_outputs", [])]
+        except (TypeError, ValueError) as e:
+            logger.warning(f"IncrementalRunState: stored LLM outputs for {pathful_url} are invalid ({e}). Reprocessing.")
+            self.stats["pathful_changed"] += 1
+            return None
+        self.stats["pathful_unchanged"] += 1
+        self._reused_pathful_urls.add(pathful_url)
+        return {
+            "regex_candidates_found": bool(entry.get("regex_candidates_found", False)),
+            "llm_outputs": llm_outputs,
+        }
+
+    def record_pathful(self, pathful_url: str, content_hash: str, regex_candidates_found: bool, llm_outputs: List[PhoneNumberLLMOutput]) -> None:
+        """Stores the result of a completed regex/LLM pass (not called for LLM errors, so those are retried)."""
+        self._pathful[pathful_url] = {
+            "content_hash": content_hash,
+            "regex_candidates_found": regex_candidates_found,
+            "llm_outputs": [item.model_dump() for item in llm_outputs],
+            "run_id": self.run_id,
+            "recorded_at": time.time(),
+        }
+        self.stats["pathful_recorded"] += 1
+
+    def export_pathful(self, pathful_url: str) -> Optional[Dict[str, Any]]:
+        """Raw stored record for `pathful_url` (for run checkpoints), or None."""
+        return self._pathful.get(pathful_url)
+
+    def import_pathful(self, pathful_url: str, record: Dict[str, Any]) -> None:
+        """Restores a record exported by `export_pathful` (when resuming a run)."""
+        self._pathful[pathful_url] = record
+
+    def pass1_stats(self) -> Dict[str, int]:
+        """Lookup and recording counters of Pass 1 (for run checkpoints and worker processes)."""
+        return {key: self.stats[key] for key in PASS1_STAT_KEYS}
+
+    def add_pass1_stats(self, counters: Dict[str, int]) -> None:
+        """Adds counters returned by another process's (or an interrupted run's) `pass1_stats`."""
+        for key in PASS1_STAT_KEYS:
+            self.stats[key] += counters.get(key, 0)
+
+    def lookup_domain(self, true_base_domain: str, pathful_urls: Sequence[str], company_name: str) -> Optional[CompanyContactDetails]:
+        """Stored `CompanyContactDetails` if every pathful URL of the domain was unchanged this run, else None."""
+        if not self.reuse_enabled or not pathful_urls:
+            return None
+        if not all(url in self._reused_pathful_urls for url in pathful_urls):
+            return None
+        entry = self._domains.get(true_base_domain)
+        if entry is None or sorted(entry.get("pathful_urls", [])) != sorted(pathful_urls) or entry.get("company_name") != company_name:
+            return None
+        details_data = entry.get("contact_details")
+        if details_data is None:
+            return None
+        try:
+            details = CompanyContactDetails.model_validate(details_data)
+        except ValueError as e:
+            logger.warning(f"IncrementalRunState: stored contact details for {true_base_domain} are invalid ({e}). Re-consolidating.")
+            return None
+        self.stats["domains_reused"] += 1
+        return details
+
+    def record_domain(self, true_base_domain: str, pathful_urls: Sequence[str], company_name: str, details: Optional[CompanyContactDetails]) -> None:
+        # Only domains whose pathful URLs all have stored results can be reused later.
+        if not all(url in self._pathful for url in pathful_urls):
+            return
+        self._domains[true_base_domain] = {
+            "pathful_urls": sorted(pathful_urls),
+            "company_name": company_name,
+            "contact_details": details.model_dump() if details is not None else None,
+            "run_id": self.run_id,
+            "recorded_at": time.time(),
+        }
+        self.stats["domains_recorded"] += 1
+
+    def save(self) -> None:
+        """Writes the state file atomically. Results of domains not seen in this run are kept."""
+        payload = {
+            "version": STATE_FORMAT_VERSION,
+            "fingerprint": self.fingerprint,
+            "saved_by_run_id": self.run_id,
+            "pathful": self._pathful,
+            "domains": self._domains,
+        }
+        tmp_path = f"{self.state_path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(payload, f)
+            os.replace(tmp_path, self.state_path)
+            logger.info(f"IncrementalRunState: saved {len(self._pathful)} pathful URL and {len(self._domains)} domain results to {self.state_path}.")
+        except OSError as e:
+            logger.warning(f"IncrementalRunState: could not write state file {self.state_path}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        lookups = stats["pathful_lookups"]
+        stats["pathful_unchanged_ratio"] = round(stats["pathful_unchanged"] / lookups, 3) if lookups else 0.0
+        return stats
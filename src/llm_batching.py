@@ -0,0 +1,177 @@
+"""
+Cross-domain packing of LLM candidates into shared Gemini requests.
+
+`GeminiLLMExtractor` used to chunk the candidates of one pathful canonical URL
+at a time, so a site with three candidates still paid for a whole request,
+including the ~1k-token instruction prompt. `CandidateBatcher` collects the
+candidates of all concurrent `extract_phone_numbers_async` calls and packs
+them, in arrival order, into chunks sized by `AdaptiveChunkSizer` (at most
+LLM_CANDIDATE_CHUNK_SIZE candidates, or the adaptive token budgets, and
+LLM_BATCH_MAX_PROMPT_TOKENS estimated prompt tokens). A chunk is sent as soon
+as it is full, or LLM_BATCH_LINGER_SECONDS after its first candidate arrived.
+
+Every candidate gets its own future, so results go back to the call (and thus
+the pathful canonical URL) that submitted it, in that call's order. A chunk's
+raw response is returned to every call with candidates in it; its token usage
+is split over its candidates.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .core.config import AppConfig
+from .core.schemas import PhoneNumberLLMOutput
+from .llm_chunk_sizing import AdaptiveChunkSizer
+
+logger = logging.getLogger(__name__)
+
+# Rough prompt size estimate (characters per token) for packing decisions.
+CHARS_PER_TOKEN_ESTIMATE: int = 4
+
+# (chunk candidates, chunk number, row ids, company names, prompt template) -> (outputs, raw response, token stats)
+ClassifyChunk = Callable[[List[Dict[str, Any]], int, str, str, str], Awaitable[Tuple[List[PhoneNumberLLMOutput], str, Dict[str, int]]]]
+
+# Per-candidate result: (output, chunk number, chunk's raw response, share of the chunk's token stats)
+CandidateResult = Tuple[PhoneNumberLLMOutput, int, str, Dict[str, float]]
+
+
+class _OpenChunk:
+    def __init__(self, prompt_template: str, template_tokens: int):
+        self.prompt_template = prompt_template
+        self.estimated_tokens: int = template_tokens
+        self.items: List[Dict[str, Any]] = []
+        self.futures: List[asyncio.Future] = []
+        self.row_ids: List[str] = []
+        self.company_names: List[str] = []
+        self.linger_handle: Optional[asyncio.TimerHandle] = None
+
+
+class CandidateBatcher:
+    """
+    Packs candidates of concurrent extraction calls into shared chunks.
+
+    Used from one event loop at a time; pending state is dropped if the running loop changes.
+    """
+
+    def __init__(self, config: AppConfig, classify_chunk: ClassifyChunk, chunk_sizer: AdaptiveChunkSizer):
+        self.config = config
+        self.classify_chunk = classify_chunk
+        self.chunk_sizer = chunk_sizer
+        self.linger_seconds: float = max(0.0, config.llm_batch_linger_seconds)
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._open_chunks: Dict[str, _OpenChunk] = {}  # prompt template -> chunk being filled
+        self._chunk_tasks: "set[asyncio.Task]" = set()
+        self._chunk_number: int = 0
+
+        self.stats: Dict[str, Any] = {
+            "calls": 0,
+            "candidates": 0,
+            "chunks_sent": 0,
+            "chunks_without_batching": 0,
+            "multi_call_chunks": 0,
+            "instruction_prompt_tokens_estimated": 0,
+            "instruction_prompt_tokens_without_batching_estimated": 0,
+        }
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        return max(1, len(text) // CHARS_PER_TOKEN_ESTIMATE)
+
+    def _bind_to_running_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._open_chunks = {}
+            self._chunk_tasks = set()
+
+    def _send(self, prompt_template: str) -> None:
+        chunk = self._open_chunks.pop(prompt_template, None)
+        if chunk is None or not chunk.items:
+            return
+        if chunk.linger_handle is not None:
+            chunk.linger_handle.cancel()
+        self._chunk_number += 1
+        task = asyncio.ensure_future(self._run_chunk(chunk, self._chunk_number))
+        self._chunk_tasks.add(task)
+        task.add_done_callback(self._chunk_tasks.discard)
+
+    async def _run_chunk(self, chunk: _OpenChunk, chunk_number: int) -> None:
+        self.stats["chunks_sent"] += 1
+        self.stats["instruction_prompt_tokens_estimated"] += self.estimate_tokens(chunk.prompt_template)
+        if len(set(chunk.row_ids)) > 1:
+            self.stats["multi_call_chunks"] += 1
+        row_ids = ",".join(dict.fromkeys(chunk.row_ids))
+        company_names = " | ".join(dict.fromkeys(chunk.company_names))
+        try:
+            outputs, raw_response, token_stats = await self.classify_chunk(
+                chunk.items, chunk_number, row_ids, company_names, chunk.prompt_template
+            )
+        except asyncio.CancelledError:
+            for future in chunk.futures:
+                future.cancel()
+            raise
+        except Exception as e:
+            for future in chunk.futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        token_share = {key: value / len(chunk.items) for key, value in token_stats.items()}
+        for future, output in zip(chunk.futures, outputs):
+            if not future.done():
+                future.set_result((output, chunk_number, raw_response, token_share))
+
+    async def classify(
+        self,
+        candidate_items: List[Dict[str, Any]],
+        prompt_template: str,
+        triggering_input_row_id: Any,
+        triggering_company_name: str
+    ) -> Tuple[List[PhoneNumberLLMOutput], List[str], Dict[str, int]]:
+        """
+        Classifies `candidate_items` in shared chunks. Returns one output per
+        candidate (in order), the raw responses of the chunks they were in, and
+        their share of those chunks' token usage.
+        """
+        self._bind_to_running_loop()
+        self.stats["calls"] += 1
+        self.stats["candidates"] += len(candidate_items)
+        unbatched_chunks = len(self.chunk_sizer.split(prompt_template, candidate_items))
+        self.stats["chunks_without_batching"] += unbatched_chunks
+        self.stats["instruction_prompt_tokens_without_batching_estimated"] += unbatched_chunks * self.estimate_tokens(prompt_template)
+        template_tokens = self.chunk_sizer.estimate_tokens(len(prompt_template))
+
+        futures: List[asyncio.Future] = []
+        for item in candidate_items:
+            chunk = self._open_chunks.get(prompt_template)
+            item_tokens = self.chunk_sizer.estimate_item_tokens(prompt_template, item, chunk.items[-1] if chunk is not None and chunk.items else None)
+            if chunk is not None and chunk.items and not self.chunk_sizer.fits(len(chunk.items) + 1, chunk.estimated_tokens + item_tokens):
+                self._send(prompt_template)
+                chunk = None
+                item_tokens = self.chunk_sizer.estimate_item_tokens(prompt_template, item, None)
+            if chunk is None:
+                chunk = _OpenChunk(prompt_template, template_tokens)
+                self._open_chunks[prompt_template] = chunk
+                chunk.linger_handle = asyncio.get_running_loop().call_later(self.linger_seconds, self._send, prompt_template)
+            future = asyncio.get_running_loop().create_future()
+            chunk.items.append(item)
+            chunk.futures.append(future)
+            chunk.row_ids.append(str(triggering_input_row_id))
+            chunk.company_names.append(str(triggering_company_name))
+            chunk.estimated_tokens += item_tokens
+            futures.append(future)
+        chunk = self._open_chunks.get(prompt_template)
+        if chunk is not None and len(chunk.items) >= self.chunk_sizer.candidate_limit():
+            self._send(prompt_template)
+
+        results: List[CandidateResult] = await asyncio.gather(*futures)
+        outputs = [output for output, _, _, _ in results]
+        raw_responses = list({chunk_number: raw_response for _, chunk_number, raw_response, _ in results}.values())
+        token_totals: Dict[str, float] = {}
+        for _, _, _, token_share in results:
+            for key, value in token_share.items():
+                token_totals[key] = token_totals.get(key, 0.0) + value
+        return outputs, raw_responses, {key: int(round(value)) for key, value in token_totals.items()}
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats)
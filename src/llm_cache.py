@@ -0,0 +1,169 @@
+"""
+Content-addressed cache of LLM phone number classifications, shared across rows and runs.
+
+The same number/snippet pairs reach Gemini again whenever a domain appears
+twice in the input or is re-run later. `LLMClassificationCache` stores each
+successful classification under a hash of everything that determines it:
+
+- the prompt template content, the model name and the temperature,
+- the candidate number, its snippet (whitespace-normalized) and the page type
+  of the page it was found on.
+
+`GeminiLLMExtractor` looks every candidate up before chunking and only sends
+the misses to the LLM. A hit is returned as a `PhoneNumberLLMOutput` with the
+current candidate's source URL and company name. Error outputs are never
+cached, so failed classifications are retried.
+
+Entries live in a SQLite (WAL) file under OUTPUT_BASE_DIR (LLM_CACHE_FILE),
+shared by Pass 1 worker processes. When it holds more than
+LLM_CACHE_MAX_ENTRIES entries, the least recently used ones are evicted.
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from .core.config import AppConfig
+from .core.schemas import PhoneNumberLLMOutput
+from .llm_prompt_encoding import normalize_snippet
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Output fields that come from the current candidate, not from the cached classification.
+CANDIDATE_FIELDS = ("source_url", "original_input_company_name")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_classifications (
+    cache_key TEXT PRIMARY KEY,
+    output TEXT NOT NULL,
+    tokens REAL NOT NULL,
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_llm_classifications_last_used ON llm_classifications (last_used_at);
+"""
+
+
+class LLMClassificationCache:
+    """
+    Persistent per-candidate classification cache. One instance per process.
+
+    Thread-safe: the synchronous `extract_phone_numbers` may call it from other threads.
+    """
+
+    def __init__(self, config: AppConfig, db_path: Optional[str] = None, busy_timeout_seconds: float = 30.0):
+        self.config = config
+        self.max_entries: int = max(0, config.llm_cache_max_entries)
+        if db_path is None:
+            output_base_dir = config.output_base_dir
+            if not os.path.isabs(output_base_dir):
+                output_base_dir = os.path.join(PROJECT_ROOT_DIR, output_base_dir)
+            db_path = os.path.join(output_base_dir, config.llm_cache_file)
+        self.db_path: str = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=busy_timeout_seconds, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._entry_count: int = self._conn.execute("SELECT COUNT(*) FROM llm_classifications").fetchone()[0]
+
+        self.stats: Dict[str, Any] = {
+            "lookups": 0,
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "tokens_saved": 0,
+        }
+
+    @staticmethod
+    def template_digest(prompt_template: str) -> str:
+        return hashlib.sha256(prompt_template.encode('utf-8')).hexdigest()
+
+    def key_for(self, template_digest: str, candidate_item: Dict[str, Any], page_type: Optional[str]) -> str:
+        parts = [
+            template_digest,
+            self.config.llm_model_name,
+            str(self.config.llm_temperature),
+            str(candidate_item.get('number') or ""),
+            normalize_snippet(str(candidate_item.get('snippet') or "")),
+            page_type or "",
+        ]
+        return hashlib.sha256("\x1f".join(parts).encode('utf-8')).hexdigest()
+
+    def lookup(self, cache_key: str, candidate_item: Dict[str, Any]) -> Optional[PhoneNumberLLMOutput]:
+        """The cached classification for `cache_key`, enriched with `candidate_item`'s source, or None."""
+        with self._lock:
+            self.stats["lookups"] += 1
+            row = self._conn.execute(
+                "SELECT output, tokens FROM llm_classifications WHERE cache_key = ?", (cache_key,)
+            ).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+            try:
+                output = PhoneNumberLLMOutput(**json.loads(row[0]))
+            except (ValueError, TypeError) as e:
+                logger.warning(f"LLMClassificationCache: discarding invalid entry {cache_key[:12]}: {e}")
+                self._conn.execute("DELETE FROM llm_classifications WHERE cache_key = ?", (cache_key,))
+                self._entry_count -= 1
+                self.stats["misses"] += 1
+                return None
+            self._conn.execute("UPDATE llm_classifications SET last_used_at = ? WHERE cache_key = ?", (time.time(), cache_key))
+            self.stats["hits"] += 1
+            self.stats["tokens_saved"] += int(round(row[1]))
+        output.source_url = candidate_item.get('source_url')
+        output.original_input_company_name = candidate_item.get('original_input_company_name')
+        return output
+
+    def store(self, cache_key: str, output: PhoneNumberLLMOutput, tokens: float) -> None:
+        """Caches a successful classification. `tokens` is its share of the LLM call's token usage."""
+        if output.type.startswith("Error_"):
+            return
+        record = output.model_dump(exclude=set(CANDIDATE_FIELDS))
+        now = time.time()
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_classifications (cache_key, output, tokens, created_at, last_used_at) VALUES (?, ?, ?, ?, ?)",
+                    (cache_key, json.dumps(record), float(tokens), now, now)
+                )
+            except sqlite3.Error as e:
+                logger.warning(f"LLMClassificationCache: could not store entry: {e}")
+                return
+            self.stats["stores"] += 1
+            # Approximate (replaced keys and other processes' entries are not tracked); _evict recounts.
+            self._entry_count += 1
+            if self.max_entries and self._entry_count > self.max_entries:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Drops the least recently used entries down to 90% of max_entries (caller holds the lock)."""
+        self._entry_count = self._conn.execute("SELECT COUNT(*) FROM llm_classifications").fetchone()[0]
+        excess = self._entry_count - int(self.max_entries * 0.9)
+        if excess <= 0:
+            return
+        self._conn.execute(
+            "DELETE FROM llm_classifications WHERE cache_key IN "
+            "(SELECT cache_key FROM llm_classifications ORDER BY last_used_at LIMIT ?)",
+            (excess,)
+        )
+        self._entry_count -= excess
+        self.stats["evictions"] += excess
+        logger.info(f"LLMClassificationCache: evicted {excess} least recently used entries ({self._entry_count} left).")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats)
+
+    def close(self) -> None:
+        try:
+            self._conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"LLMClassificationCache: error closing {self.db_path}: {e}")
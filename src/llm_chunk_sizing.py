@@ -0,0 +1,213 @@
+"""
+Token-budget-aware sizing of LLM candidate chunks.
+
+A fixed LLM_CANDIDATE_CHUNK_SIZE wastes requests on short snippets and, with
+long ones or many candidates, risks responses cut off at LLM_MAX_TOKENS,
+which surface as `Error_LLMItemCountMismatch` or unparseable JSON.
+
+With LLM_ADAPTIVE_CHUNKING, `AdaptiveChunkSizer` closes a chunk when the next
+candidate would exceed one of:
+
+- the prompt budget LLM_BATCH_MAX_PROMPT_TOKENS (instructions plus encoded
+  candidates), estimated from prompt characters;
+- the output budget LLM_MAX_TOKENS, for the expected response of
+  OUTPUT_HEADROOM times the tokens per candidate seen so far;
+- a candidate cap that starts at LLM_ADAPTIVE_CHUNK_MAX_CANDIDATES, is
+  halved (relative to the failed chunk) when a response is truncated or
+  returns the wrong number of items, and grows back by one candidate per
+  "window" of clean responses.
+
+Characters per prompt token and completion tokens per candidate are
+calibrated from each response's `usage_metadata`, starting from priors. The
+same statistics (tokens per candidate, mismatch retries, truncations) are
+collected with fixed-size chunking, so both modes can be compared.
+"""
+import logging
+from typing import Any, Dict, List, Optional
+
+from .core.config import AppConfig
+from .llm_prompt_encoding import estimate_item_chars
+
+logger = logging.getLogger(__name__)
+
+# Estimate used with fixed-size chunking, and the prior for the calibrated one.
+CHARS_PER_TOKEN_ESTIMATE: int = 4
+PRIOR_PROMPT_TOKENS: int = 2000
+
+# One {"number", "type", "classification"} object of the response, before calibration.
+PRIOR_COMPLETION_TOKENS_PER_CANDIDATE: float = 40.0
+PRIOR_CANDIDATES: int = 10
+RESPONSE_OVERHEAD_TOKENS: int = 20
+
+# Responses vary; chunks are planned for this multiple of the expected output.
+OUTPUT_HEADROOM: float = 1.5
+
+
+def _is_truncated(response: Any) -> bool:
+    candidates = getattr(response, 'candidates', None)
+    if not candidates:
+        return False
+    finish_reason = getattr(candidates[0], 'finish_reason', None)
+    return getattr(finish_reason, 'name', str(finish_reason)) == 'MAX_TOKENS'
+
+
+class AdaptiveChunkSizer:
+    """
+    Chooses chunk boundaries for `GeminiLLMExtractor` and `CandidateBatcher`.
+
+    Used from one thread (the extractor's event loop) at a time.
+    """
+
+    def __init__(self, config: AppConfig):
+        self.config = config
+        self.adaptive: bool = config.llm_adaptive_chunking
+        self.fixed_chunk_size: int = max(1, config.llm_candidate_chunk_size)
+        self.max_candidates: int = max(1, config.llm_adaptive_chunk_max_candidates)
+        self.max_prompt_tokens: int = max(1, config.llm_batch_max_prompt_tokens)
+        self.max_output_tokens: int = max(1, config.llm_max_tokens)
+        self.candidate_cap: float = float(self.max_candidates)
+
+        self._prompt_chars: float = float(PRIOR_PROMPT_TOKENS * CHARS_PER_TOKEN_ESTIMATE)
+        self._prompt_tokens: float = float(PRIOR_PROMPT_TOKENS)
+        self._completion_tokens: float = PRIOR_COMPLETION_TOKENS_PER_CANDIDATE * PRIOR_CANDIDATES
+        self._completion_candidates: float = float(PRIOR_CANDIDATES)
+
+        self.stats: Dict[str, Any] = {
+            "chunks": 0,
+            "candidates": 0,
+            "chunk_candidates_max": 0,
+            "prompt_tokens": 0,
+            "prompt_chars": 0,
+            "completion_tokens": 0,
+            # Completion tokens (less the response overhead) and candidates of the responses used for calibration.
+            "calibration_completion_tokens": 0,
+            "calibration_candidates": 0,
+            # Sum over chunks of the candidate limit in effect when their responses arrived.
+            "chunk_candidate_limit_total": 0,
+            "item_count_mismatches": 0,
+            "truncated_responses": 0,
+            "mismatch_retry_passes": 0,
+            "mismatch_retry_candidates": 0,
+            "candidate_cap_decreases": 0,
+        }
+
+    @property
+    def chars_per_prompt_token(self) -> float:
+        return self._prompt_chars / self._prompt_tokens
+
+    @property
+    def completion_tokens_per_candidate(self) -> float:
+        return self._completion_tokens / self._completion_candidates
+
+    def estimate_tokens(self, chars: int) -> int:
+        if not self.adaptive:
+            return max(1, chars // CHARS_PER_TOKEN_ESTIMATE)
+        return max(1, int(chars / self.chars_per_prompt_token))
+
+    def estimate_item_tokens(self, prompt_template: str, item: Dict[str, Any], previous_item: Optional[Dict[str, Any]]) -> int:
+        return self.estimate_tokens(estimate_item_chars(prompt_template, item, previous_item))
+
+    def candidate_limit(self) -> int:
+        """Most candidates a chunk may hold right now."""
+        if not self.adaptive:
+            return self.fixed_chunk_size
+        per_candidate = self.completion_tokens_per_candidate * OUTPUT_HEADROOM
+        output_limit = int((self.max_output_tokens - RESPONSE_OVERHEAD_TOKENS) / per_candidate) if per_candidate > 0 else self.max_candidates
+        return max(1, min(int(self.candidate_cap), output_limit))
+
+    def fits(self, candidates: int, prompt_tokens: int) -> bool:
+        """Whether a chunk of `candidates` candidates and `prompt_tokens` estimated prompt tokens is within budget."""
+        return candidates <= self.candidate_limit() and prompt_tokens <= self.max_prompt_tokens
+
+    def split(self, prompt_template: Optional[str], candidate_items: List[Dict[str, Any]]) -> List[List[int]]:
+        """Indices of `candidate_items` per chunk, in order. Fixed-size slices unless adaptive."""
+        if not self.adaptive or prompt_template is None:
+            return [list(range(i, min(i + self.fixed_chunk_size, len(candidate_items)))) for i in range(0, len(candidate_items), self.fixed_chunk_size)]
+        template_tokens = self.estimate_tokens(len(prompt_template))
+        chunks: List[List[int]] = []
+        chunk_tokens = 0
+        for index, item in enumerate(candidate_items):
+            if chunks:
+                item_tokens = self.estimate_item_tokens(prompt_template, item, candidate_items[chunks[-1][-1]])
+                if self.fits(len(chunks[-1]) + 1, chunk_tokens + item_tokens):
+                    chunks[-1].append(index)
+                    chunk_tokens += item_tokens
+                    continue
+            chunks.append([index])
+            chunk_tokens = template_tokens + self.estimate_item_tokens(prompt_template, item, None)
+        return chunks
+
+    def record_response(self, prompt_chars: int, candidates: int, response: Any, item_count_mismatch: bool, is_retry: bool = False) -> None:
+        """Calibrates the estimates from one Gemini response to a prompt of `prompt_chars` characters."""
+        if not is_retry:
+            self.stats["chunks"] += 1
+            self.stats["candidates"] += candidates
+            self.stats["chunk_candidates_max"] = max(self.stats["chunk_candidates_max"], candidates)
+            self.stats["chunk_candidate_limit_total"] += self.candidate_limit()
+        truncated = _is_truncated(response)
+        usage_metadata = getattr(response, 'usage_metadata', None)
+        prompt_tokens = getattr(usage_metadata, 'prompt_token_count', None) if usage_metadata else None
+        completion_tokens = getattr(usage_metadata, 'candidates_token_count', None) if usage_metadata else None
+        if isinstance(prompt_tokens, int) and prompt_tokens > 0:
+            self.stats["prompt_tokens"] += prompt_tokens
+            self.stats["prompt_chars"] += prompt_chars
+            self._prompt_chars += prompt_chars
+            self._prompt_tokens += prompt_tokens
+        if isinstance(completion_tokens, int):
+            self.stats["completion_tokens"] += completion_tokens
+            if not truncated and not item_count_mismatch and candidates > 0:
+                calibration_tokens = max(0, completion_tokens - RESPONSE_OVERHEAD_TOKENS)
+                self.stats["calibration_completion_tokens"] += calibration_tokens
+                self.stats["calibration_candidates"] += candidates
+                self._completion_tokens += calibration_tokens
+                self._completion_candidates += candidates
+
+        if truncated:
+            self.stats["truncated_responses"] += 1
+        if item_count_mismatch:
+            self.stats["item_count_mismatches"] += 1
+        if not self.adaptive:
+            return
+        if truncated or item_count_mismatch:
+            self._on_oversized(candidates)
+        else:
+            self._on_clean()
+
+    def record_mismatch_retry(self, candidates: int) -> None:
+        self.stats["mismatch_retry_passes"] += 1
+        self.stats["mismatch_retry_candidates"] += candidates
+
+    def _on_oversized(self, candidates: int) -> None:
+        # Relative to the failed chunk, so concurrent failures of equally sized chunks lower the cap once.
+        lowered_cap = max(1.0, candidates / 2.0)
+        if lowered_cap < self.candidate_cap:
+            self.candidate_cap = lowered_cap
+            self.stats["candidate_cap_decreases"] += 1
+            logger.warning(f"AdaptiveChunkSizer: truncated or incomplete LLM response for {candidates} candidates. Chunk cap lowered to {int(self.candidate_cap)}.")
+
+    def _on_clean(self) -> None:
+        if self.candidate_cap < self.max_candidates:
+            self.candidate_cap = min(float(self.max_candidates), self.candidate_cap + 1.0 / self.candidate_cap)
+
+    @staticmethod
+    def add_derived_stats(stats: Dict[str, Any]) -> None:
+        """
+        Sets the `*_avg` values of `stats` from its counters (also used on counters merged across processes).
+
+        The calibration averages include the priors, like the estimates the sizer uses.
+        `candidate_limit_avg` is left as it is when no chunk was sent.
+        """
+        stats["chars_per_prompt_token_avg"] = round(
+            (PRIOR_PROMPT_TOKENS * CHARS_PER_TOKEN_ESTIMATE + stats.get("prompt_chars", 0)) / (PRIOR_PROMPT_TOKENS + stats.get("prompt_tokens", 0)), 2
+        )
+        stats["completion_tokens_per_candidate_avg"] = round(
+            (PRIOR_COMPLETION_TOKENS_PER_CANDIDATE * PRIOR_CANDIDATES + stats.get("calibration_completion_tokens", 0)) / (PRIOR_CANDIDATES + stats.get("calibration_candidates", 0)), 1
+        )
+        if stats.get("chunks", 0):
+            stats["candidate_limit_avg"] = round(stats.get("chunk_candidate_limit_total", 0) / stats["chunks"], 1)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        stats["candidate_limit_avg"] = self.candidate_limit()
+        self.add_derived_stats(stats)
+        return stats
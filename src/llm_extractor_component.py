@@ -1,8 +1,10 @@
+import asyncio
+import functools
 import logging
 import json
 import re
 import os
-from typing import Dict, Any, List, Tuple, Optional
+from typing import Dict, Any, List, Tuple, Optional, Callable, Awaitable
 
 from google.generativeai.client import configure
 from google.generativeai.generative_models import GenerativeModel
@@ -17,6 +19,11 @@ from phonenumbers import PhoneNumberFormat
 # Assuming schemas are in core.schemas and config in core.config
 from .core.schemas import PhoneNumberLLMOutput, MinimalExtractionOutput
 from .core.config import AppConfig
+from .llm_batching import CandidateBatcher
+from .llm_cache import LLMClassificationCache
+from .llm_chunk_sizing import AdaptiveChunkSizer
+from .llm_prompt_encoding import format_candidates_prompt
+from .llm_rate_limiter import GeminiRateLimiter
 
 logger = logging.getLogger(__name__)
 
@@ -62,6 +69,10 @@ class GeminiLLMExtractor:
             self.config.llm_model_name,
             # generation_config is set per-request to include response_schema
         )
+        self.rate_limiter = GeminiRateLimiter(config)
+        self.classification_cache: Optional[LLMClassificationCache] = LLMClassificationCache(config) if config.llm_cache_enabled else None
+        self.chunk_sizer = AdaptiveChunkSizer(config)
+        self.batcher: Optional[CandidateBatcher] = CandidateBatcher(config, self._classify_batched_chunk, self.chunk_sizer) if config.llm_cross_domain_batching else None
         logger.info(f"GeminiLLMExtractor initialized with model: {self.config.llm_model_name}")
 
     def _load_prompt_template(self, prompt_file_path: str) -> str:
@@ -171,21 +182,38 @@ class GeminiLLMExtractor:
         logger.debug(f"No clear JSON block found in LLM text output: {text_output[:200]}...")
         return None
 
+    async def _call_model_async(self, formatted_prompt: str, generation_config: GenerationConfig):
+        return await self.model.generate_content_async(formatted_prompt, generation_config=generation_config)
+
+    async def _call_model_in_thread(self, formatted_prompt: str, generation_config: GenerationConfig):
+        """Blocking client in a worker thread, for the synchronous `extract_phone_numbers` (each call runs on a new event loop)."""
+        return await asyncio.to_thread(self.model.generate_content, formatted_prompt, generation_config=generation_config)
+
     @retry(
         stop=stop_after_attempt(3),  # Try 3 times in total (1 initial + 2 retries)
         wait=wait_exponential(multiplier=1, min=2, max=10),  # Wait 2s, then 4s (max 10s)
         retry=retry_if_exception_type(RETRYABLE_GEMINI_EXCEPTIONS),
         reraise=True  # Reraise the exception if all retries fail
     )
-    def _generate_content_with_retry(self, formatted_prompt: str, generation_config: GenerationConfig, file_identifier_prefix: str, triggering_input_row_id: Any, triggering_company_name: str):
+    async def _generate_content_with_retry(
+        self,
+        formatted_prompt: str,
+        generation_config: GenerationConfig,
+        file_identifier_prefix: str,
+        triggering_input_row_id: Any,
+        triggering_company_name: str,
+        call_model: Optional[Callable[[str, GenerationConfig], Awaitable[Any]]] = None
+    ):
         """
         Internal method to call Gemini API with retry logic.
+
+        Every attempt first waits for the rate limiter (request/token budgets and
+        adaptive concurrency); no slot is held during the backoff between attempts.
         """
         logger.info(f"[{file_identifier_prefix}, RowID: {triggering_input_row_id}, Company: {triggering_company_name}] Attempting to generate content with Gemini API...")
-        response = self.model.generate_content(
-            formatted_prompt,
-            generation_config=generation_config
-        )
+        async with self.rate_limiter.request(self.rate_limiter.estimate_tokens(formatted_prompt)) as ticket:
+            response = await (call_model or self._call_model_async)(formatted_prompt, generation_config)
+            ticket.record_usage(response)
         # Basic check for safety, though specific non-retriable content blocks
         # would ideally be handled by the caller if they are not exceptions.
         if response and response.prompt_feedback and response.prompt_feedback.block_reason:
@@ -196,6 +224,22 @@ class GeminiLLMExtractor:
         logger.info(f"[{file_identifier_prefix}, RowID: {triggering_input_row_id}, Company: {triggering_company_name}] Successfully generated content from Gemini API attempt.")
         return response
 
+    def get_stats(self) -> Dict[str, Any]:
+        """Rate limiter counters: requests sent, peak in flight, limiter waits and throttling."""
+        return self.rate_limiter.get_stats()
+
+    def get_chunk_sizing_stats(self) -> Dict[str, Any]:
+        """Chunk sizes, token usage per candidate and mismatch/truncation counters."""
+        return self.chunk_sizer.get_stats()
+
+    def get_batching_stats(self) -> Dict[str, Any]:
+        """Cross-domain batching counters (empty if batching is disabled)."""
+        return self.batcher.get_stats() if self.batcher is not None else {}
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Classification cache counters (empty if the cache is disabled)."""
+        return self.classification_cache.get_stats() if self.classification_cache is not None else {}
+
     def _process_successful_llm_item(
         self,
         llm_output: PhoneNumberLLMOutput,
@@ -241,7 +285,8 @@ class GeminiLLMExtractor:
         llm_context_dir: str,  # New parameter
         file_identifier_prefix: str,  # New parameter
         triggering_input_row_id: Any,
-        triggering_company_name: str
+        triggering_company_name: str,
+        source_page_types: Optional[Dict[str, str]] = None
     ) -> Tuple[List[PhoneNumberLLMOutput], Optional[str], Optional[Dict[str, int]]]:
         """
         Classifies candidate phone numbers based on their snippets and source URLs using the Gemini API.
@@ -251,6 +296,10 @@ class GeminiLLMExtractor:
         It expects a JSON response conforming to LLMExtractionResult, which contains a list
         of PhoneNumberLLMOutput objects (now with a 'classification' field).
 
+        Blocking version of `extract_phone_numbers_async`: the chunks are sent concurrently
+        on a private event loop, through the synchronous Gemini client in worker threads.
+        Must not be called from a running event loop.
+
         Args:
             candidate_items (List[Dict[str, str]]): A list of dictionaries, where each
                                                    dictionary contains "candidate_number",
@@ -259,6 +308,8 @@ class GeminiLLMExtractor:
                                        should expect a JSON list of these candidate items.
             llm_context_dir (str): The directory path to save LLM context files.
             file_identifier_prefix (str): A prefix for naming LLM context files (e.g., "CANONICAL_domain_com").
+            source_page_types (Optional[Dict[str, str]]): Page type of each candidate's source URL,
+                                                          part of the classification cache key.
 
         Returns:
             Tuple[List[PhoneNumberLLMOutput], Optional[str]]:
@@ -274,13 +325,57 @@ class GeminiLLMExtractor:
             the prompt, `google_exceptions.GoogleAPIError` for API issues,
             `json.JSONDecodeError`, and `PydanticValidationError`.
         """
-        overall_processed_outputs: List[PhoneNumberLLMOutput] = []
+        return asyncio.run(self._extract_phone_numbers(
+            candidate_items, prompt_template_path, llm_context_dir, file_identifier_prefix,
+            triggering_input_row_id, triggering_company_name, source_page_types,
+            generate=functools.partial(self._generate_content_with_retry, call_model=self._call_model_in_thread)
+        ))
+
+    async def extract_phone_numbers_async(
+        self,
+        candidate_items: List[Dict[str, str]],
+        prompt_template_path: str,
+        llm_context_dir: str,
+        file_identifier_prefix: str,
+        triggering_input_row_id: Any,
+        triggering_company_name: str,
+        source_page_types: Optional[Dict[str, str]] = None
+    ) -> Tuple[List[PhoneNumberLLMOutput], Optional[str], Optional[Dict[str, int]]]:
+        """
+        Async version of `extract_phone_numbers` (same arguments and result).
+
+        All chunks of `candidate_items` are dispatched at once with the async Gemini
+        client, so the call takes about as long as its slowest chunk. Requests of
+        all calls go through `rate_limiter` (at most LLM_MAX_IN_FLIGHT_REQUESTS in
+        flight, fewer while Gemini is throttling).
+        Each chunk keeps its own error items and number-mismatch retries.
+        Candidates found in `classification_cache` are not sent at all. With
+        LLM_CROSS_DOMAIN_BATCHING the rest are packed into chunks together with the
+        candidates of other concurrent calls (`batcher`).
+        """
+        return await self._extract_phone_numbers(
+            candidate_items, prompt_template_path, llm_context_dir, file_identifier_prefix,
+            triggering_input_row_id, triggering_company_name, source_page_types,
+            generate=self._generate_content_with_retry, batch_across_calls=True
+        )
+
+    async def _extract_phone_numbers(
+        self,
+        candidate_items: List[Dict[str, str]],
+        prompt_template_path: str,
+        llm_context_dir: str,
+        file_identifier_prefix: str,
+        triggering_input_row_id: Any,
+        triggering_company_name: str,
+        source_page_types: Optional[Dict[str, str]],
+        generate: Callable[..., Awaitable[Any]],
+        batch_across_calls: bool = False
+    ) -> Tuple[List[PhoneNumberLLMOutput], Optional[str], Optional[Dict[str, int]]]:
         overall_raw_responses: List[str] = []
         accumulated_token_stats: Dict[str, int] = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
 
         chunk_size = self.config.llm_candidate_chunk_size
         max_chunks = self.config.llm_max_chunks_per_url
-        chunks_processed_count = 0
 
         # --- BEGIN LOGIC FOR SAVING TEMPLATE ONCE (moved outside chunk loop) ---
         try:
@@ -306,207 +401,296 @@ class GeminiLLMExtractor:
             logger.error(f"[{file_identifier_prefix}, RowID: {triggering_input_row_id}, Company: {triggering_company_name}] Error in pre-processing for saving prompt template: {e_path_setup}")
         # --- END LOGIC FOR SAVING TEMPLATE ONCE ---
 
-        for i in range(0, len(candidate_items), chunk_size):
-            if chunks_processed_count >= max_chunks:
-                logger.warning(f"[{file_identifier_prefix}, RowID: {triggering_input_row_id}, Company: {triggering_company_name}] Reached max_chunks limit ({max_chunks}). Processing {chunks_processed_count * chunk_size} candidates out of {len(candidate_items)}.")
-                break
-            
-            current_chunk_candidate_items = candidate_items[i : i + chunk_size]
-            if not current_chunk_candidate_items:
-                break # Should not happen if loop condition is correct
+        # The template is read once per call; a failure is reported per chunk, as before.
+        prompt_template: Optional[str] = None
+        prompt_template_error: Optional[Exception] = None
+        try:
+            prompt_template = self._load_prompt_template(prompt_template_path)
+        except Exception as e:
+            prompt_template_error = e
+
+        # Cached classifications are used as they are; only the misses are chunked and sent.
+        outputs_by_position: Dict[int, PhoneNumberLLMOutput] = {}
+        cache_keys_by_position: Dict[int, str] = {}
+        if self.classification_cache is not None and prompt_template is not None:
+            template_digest = self.classification_cache.template_digest(prompt_template)
+            for position, item in enumerate(candidate_items):
+                cache_key = self.classification_cache.key_for(template_digest, item, (source_page_types or {}).get(item.get('source_url')))
+                cached_output = self.classification_cache.lookup(cache_key, item)
+                if cached_output is not None:
+                    outputs_by_position[position] = cached_output
+                else:
+                    cache_keys_by_position[position] = cache_key
+            if outputs_by_position:
+                logger.info(f"[{file_identifier_prefix}, RowID: {triggering_input_row_id}, Company: {triggering_company_name}] {len(outputs_by_position)} of {len(candidate_items)} candidates answered from the LLM classification cache.")
+        miss_positions = [position for position in range(len(candidate_items)) if position not in outputs_by_position]
+
+        if len(miss_positions) > max_chunks * chunk_size:
+            logger.warning(f"[{file_identifier_prefix}, RowID: {triggering_input_row_id}, Company: {triggering_company_name}] Reached max_chunks limit ({max_chunks}). Processing {max_chunks * chunk_size} candidates out of {len(miss_positions)} not found in the cache.")
+            miss_positions = miss_positions[:max(0, max_chunks * chunk_size)]
+
+        chunk_results: List[Tuple[List[int], List[PhoneNumberLLMOutput], Dict[str, int]]] = []
+        if self.batcher is not None and batch_across_calls and prompt_template is not None and miss_positions:
+            # Packed into chunks shared with other concurrent calls (see CandidateBatcher).
+            batched_outputs, batched_raw_responses, batched_token_stats = await self.batcher.classify(
+                [candidate_items[position] for position in miss_positions], prompt_template,
+                triggering_input_row_id, triggering_company_name
+            )
+            overall_raw_responses.extend(batched_raw_responses)
+            chunk_results.append((miss_positions, batched_outputs, batched_token_stats))
+            chunks_sent_count = len(batched_raw_responses)
+        else:
+            chunks: List[List[int]] = [
+                [miss_positions[index] for index in chunk_indices]
+                for chunk_indices in self.chunk_sizer.split(prompt_template, [candidate_items[position] for position in miss_positions])
+            ]
+            # All chunks are in flight together; results are collected in chunk order.
+            own_chunk_results = await asyncio.gather(*(
+                self._classify_chunk(
+                    [candidate_items[position] for position in chunk_positions], chunk_number, len(chunks),
+                    prompt_template, prompt_template_error, generate,
+                    f"{file_identifier_prefix}_chunk_{chunk_number}", triggering_input_row_id, triggering_company_name
+                )
+                for chunk_number, chunk_positions in enumerate(chunks, start=1)
+            ))
+            for chunk_positions, (chunk_outputs, chunk_raw_response, chunk_token_stats) in zip(chunks, own_chunk_results):
+                overall_raw_responses.append(chunk_raw_response)
+                chunk_results.append((chunk_positions, chunk_outputs, chunk_token_stats))
+            chunks_sent_count = len(chunks)
+
+        for chunk_positions, chunk_outputs, chunk_token_stats in chunk_results:
+            for key_token in accumulated_token_stats:
+                accumulated_token_stats[key_token] += chunk_token_stats.get(key_token, 0)
+            tokens_per_candidate = chunk_token_stats.get("total_tokens", 0) / len(chunk_positions)
+            for position, output in zip(chunk_positions, chunk_outputs):
+                outputs_by_position[position] = output
+                if position in cache_keys_by_position:
+                    self.classification_cache.store(cache_keys_by_position[position], output, tokens_per_candidate)
+        overall_processed_outputs: List[PhoneNumberLLMOutput] = [outputs_by_position[position] for position in sorted(outputs_by_position)]
+        if not overall_raw_responses and outputs_by_position:
+            overall_raw_responses.append(json.dumps({"cache": f"All {len(outputs_by_position)} candidates answered from the LLM classification cache."}))
 
-            chunks_processed_count += 1
-            chunk_file_identifier_prefix = f"{file_identifier_prefix}_chunk_{chunks_processed_count}"
-            
-            logger.info(f"[{chunk_file_identifier_prefix}, RowID: {triggering_input_row_id}, Company: {triggering_company_name}] Processing chunk {chunks_processed_count}/{max_chunks if max_chunks > 0 else 'unlimited'} with {len(current_chunk_candidate_items)} items.")
+        # Combine raw responses (e.g., join with a separator or return as a list of strings)
+        # For simplicity, returning the list of raw responses. The caller can decide how to use/store them.
+        # Or, if a single string is preferred:
+        final_combined_raw_response_str = "\n\n---CHUNK_SEPARATOR---\n\n".join(overall_raw_responses) if overall_raw_responses else json.dumps({"error": "No LLM responses captured."})
+        
+        successful_items_count = sum(1 for item in overall_processed_outputs if item and not item.type.startswith("Error_"))
+        error_items_count = len(overall_processed_outputs) - successful_items_count
+        logger.info(f"[{file_identifier_prefix}, RowID: {triggering_input_row_id}, Company: {triggering_company_name}] Overall LLM extraction summary: {successful_items_count} successful, {error_items_count} errors out of {len(candidate_items)} candidates processed over {chunks_sent_count} chunks.")
 
-            # --- Per-Chunk LLM Call Logic (adapted from original single call logic) ---
-            final_processed_outputs_for_chunk: List[Optional[PhoneNumberLLMOutput]] = [None] * len(current_chunk_candidate_items)
-            items_needing_retry_for_chunk: List[Tuple[int, Dict[str, Any]]] = []
-            raw_llm_response_str_initial_for_chunk: Optional[str] = None
-            
-            try:
-                prompt_template_chunk = self._load_prompt_template(prompt_template_path)
-                candidate_items_json_str_chunk = json.dumps(current_chunk_candidate_items, indent=2)
-                formatted_prompt_chunk = prompt_template_chunk.replace(
-                    "[Insert JSON list of (candidate_number, source_url, snippet) objects here]",
-                    candidate_items_json_str_chunk
-                )
-            except Exception as e:
-                logger.error(f"[{chunk_file_identifier_prefix}, RowID: {triggering_input_row_id}, Company: {triggering_company_name}] Failed to load/format prompt for chunk: {e}")
-                for k, item_detail_chunk in enumerate(current_chunk_candidate_items):
-                    final_processed_outputs_for_chunk[k] = self._create_error_llm_item(item_detail_chunk, "Error_PromptLoading", file_identifier_prefix=chunk_file_identifier_prefix, triggering_input_row_id=triggering_input_row_id, triggering_company_name=triggering_company_name)
-                overall_processed_outputs.extend([item for item in final_processed_outputs_for_chunk if item is not None])
-                overall_raw_responses.append(json.dumps({"error": f"Error loading prompt for chunk: {str(e)}"}))
-                continue # Next chunk
+        return overall_processed_outputs, final_combined_raw_response_str, accumulated_token_stats
 
-            generation_config_chunk = GenerationConfig(
-                candidate_count=1, max_output_tokens=self.config.llm_max_tokens, temperature=self.config.llm_temperature
-            )
+    async def _classify_batched_chunk(
+        self,
+        chunk_items: List[Dict[str, Any]],
+        chunk_number: int,
+        row_ids: str,
+        company_names: str,
+        prompt_template: str
+    ) -> Tuple[List[PhoneNumberLLMOutput], str, Dict[str, int]]:
+        """`CandidateBatcher` callback: one chunk packed from several calls' candidates."""
+        return await self._classify_chunk(
+            chunk_items, chunk_number, 0, prompt_template, None, self._generate_content_with_retry,
+            f"BATCH_{chunk_number}", row_ids, company_names
+        )
 
-            try:
-                response_chunk = self._generate_content_with_retry(formatted_prompt_chunk, generation_config_chunk, chunk_file_identifier_prefix, triggering_input_row_id, triggering_company_name)
-                raw_llm_response_str_initial_for_chunk = response_chunk.text
-
-                if hasattr(response_chunk, 'usage_metadata') and response_chunk.usage_metadata:
-                    token_stats_chunk = {
-                        "prompt_tokens": response_chunk.usage_metadata.prompt_token_count,
-                        "completion_tokens": response_chunk.usage_metadata.candidates_token_count,
-                        "total_tokens": response_chunk.usage_metadata.total_token_count
-                    }
-                    for key_token in accumulated_token_stats: accumulated_token_stats[key_token] += token_stats_chunk.get(key_token, 0)
-                    logger.info(f"[{chunk_file_identifier_prefix}, RowID: {triggering_input_row_id}, Company: {triggering_company_name}] LLM chunk call usage: {token_stats_chunk}")
-                else:
-                    logger.warning(f"[{chunk_file_identifier_prefix}, RowID: {triggering_input_row_id}, Company: {triggering_company_name}] LLM chunk call: Gemini API usage metadata not found.")
-
-                if not response_chunk.candidates:
-                    logger.error(f"[{chunk_file_identifier_prefix}, RowID: {triggering_input_row_id}, Company: {triggering_company_name}] No candidates in Gemini response for chunk.")
-                    for k, item_detail_chunk in enumerate(current_chunk_candidate_items):
-                        final_processed_outputs_for_chunk[k] = self._create_error_llm_item(item_detail_chunk, "Error_NoLLMCandidates", file_identifier_prefix=chunk_file_identifier_prefix, triggering_input_row_id=triggering_input_row_id, triggering_company_name=triggering_company_name)
-                elif raw_llm_response_str_initial_for_chunk:
-                    json_candidate_str_chunk = self._extract_json_from_text(raw_llm_response_str_initial_for_chunk)
-                    if json_candidate_str_chunk:
-                        try:
-                            parsed_json_object_chunk = json.loads(json_candidate_str_chunk)
-                            llm_result_chunk = MinimalExtractionOutput(**parsed_json_object_chunk)
-                            validated_numbers_chunk = llm_result_chunk.extracted_numbers
-
-                            if len(validated_numbers_chunk) != len(current_chunk_candidate_items):
-                                logger.error(f"[{chunk_file_identifier_prefix}, RowID: {triggering_input_row_id}, Company: {triggering_company_name}] LLM chunk call: Mismatch in item count. Input: {len(current_chunk_candidate_items)}, Output: {len(validated_numbers_chunk)}. Marking all in chunk as error.")
-                                for k_err, item_detail_chunk_err in enumerate(current_chunk_candidate_items):
-                                    final_processed_outputs_for_chunk[k_err] = self._create_error_llm_item(item_detail_chunk_err, "Error_LLMItemCountMismatch", file_identifier_prefix=chunk_file_identifier_prefix, triggering_input_row_id=triggering_input_row_id, triggering_company_name=triggering_company_name)
-                            else:
-                                for k, input_item_detail_chunk in enumerate(current_chunk_candidate_items):
-                                    llm_output_item_chunk = validated_numbers_chunk[k]
-                                    if llm_output_item_chunk.number == input_item_detail_chunk['number']:
-                                        final_processed_outputs_for_chunk[k] = self._process_successful_llm_item(llm_output_item_chunk, input_item_detail_chunk)
-                                    else:
-                                        items_needing_retry_for_chunk.append((k, input_item_detail_chunk)) # k is index within chunk
-                        except (json.JSONDecodeError, PydanticValidationError) as e_parse_validate:
-                            logger.error(f"[{chunk_file_identifier_prefix}, RowID: {triggering_input_row_id}, Company: {triggering_company_name}] LLM chunk call: Failed to parse/validate JSON: {e_parse_validate}. Raw: '{raw_llm_response_str_initial_for_chunk[:200]}...'")
+    async def _classify_chunk(
+        self,
+        current_chunk_candidate_items: List[Dict[str, Any]],
+        chunk_number: int,
+        max_chunks: int,
+        prompt_template: Optional[str],
+        prompt_template_error: Optional[Exception],
+        generate: Callable[..., Awaitable[Any]],
+        chunk_file_identifier_prefix: str,
+        triggering_input_row_id: Any,
+        triggering_company_name: str
+    ) -> Tuple[List[PhoneNumberLLMOutput], str, Dict[str, int]]:
+        """
+        One LLM call (plus number-mismatch retries) for one chunk of candidates.
+
+        Returns one output per candidate (error items where classification failed),
+        the raw response text (or an error JSON) and the chunk's token usage.
+        """
+        chunk_token_stats: Dict[str, int] = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        logger.info(f"[{chunk_file_identifier_prefix}, RowID: {triggering_input_row_id}, Company: {triggering_company_name}] Processing chunk {chunk_number}/{max_chunks if max_chunks > 0 else 'unlimited'} with {len(current_chunk_candidate_items)} items.")
+
+        # --- Per-Chunk LLM Call Logic (adapted from original single call logic) ---
+        final_processed_outputs_for_chunk: List[Optional[PhoneNumberLLMOutput]] = [None] * len(current_chunk_candidate_items)
+        items_needing_retry_for_chunk: List[Tuple[int, Dict[str, Any]]] = []
+        raw_llm_response_str_initial_for_chunk: Optional[str] = None
+        item_count_mismatch_for_chunk = False
+        
+        try:
+            if prompt_template is None:
+                raise prompt_template_error or ValueError("Prompt template not loaded.")
+            formatted_prompt_chunk = format_candidates_prompt(prompt_template, current_chunk_candidate_items)
+        except Exception as e:
+            logger.error(f"[{chunk_file_identifier_prefix}, RowID: {triggering_input_row_id}, Company: {triggering_company_name}] Failed to load/format prompt for chunk: {e}")
+            for k, item_detail_chunk in enumerate(current_chunk_candidate_items):
+                final_processed_outputs_for_chunk[k] = self._create_error_llm_item(item_detail_chunk, "Error_PromptLoading", file_identifier_prefix=chunk_file_identifier_prefix, triggering_input_row_id=triggering_input_row_id, triggering_company_name=triggering_company_name)
+            return [item for item in final_processed_outputs_for_chunk if item is not None], json.dumps({"error": f"Error loading prompt for chunk: {str(e)}"}), chunk_token_stats
+
+        generation_config_chunk = GenerationConfig(
+            candidate_count=1, max_output_tokens=self.config.llm_max_tokens, temperature=self.config.llm_temperature
+        )
+
+        response_chunk = None
+        try:
+            response_chunk = await generate(formatted_prompt_chunk, generation_config_chunk, chunk_file_identifier_prefix, triggering_input_row_id, triggering_company_name)
+            raw_llm_response_str_initial_for_chunk = response_chunk.text
+
+            if hasattr(response_chunk, 'usage_metadata') and response_chunk.usage_metadata:
+                token_stats_chunk = {
+                    "prompt_tokens": response_chunk.usage_metadata.prompt_token_count,
+                    "completion_tokens": response_chunk.usage_metadata.candidates_token_count,
+                    "total_tokens": response_chunk.usage_metadata.total_token_count
+                }
+                for key_token in chunk_token_stats: chunk_token_stats[key_token] += token_stats_chunk.get(key_token, 0)
+                logger.info(f"[{chunk_file_identifier_prefix}, RowID: {triggering_input_row_id}, Company: {triggering_company_name}] LLM chunk call usage: {token_stats_chunk}")
+            else:
+                logger.warning(f"[{chunk_file_identifier_prefix}, RowID: {triggering_input_row_id}, Company: {triggering_company_name}] LLM chunk call: Gemini API usage metadata not found.")
+            if not response_chunk.candidates:
+                logger.error(f"[{chunk_file_identifier_prefix}, RowID: {triggering_input_row_id}, Company: {triggering_company_name}] No candidates in Gemini response for chunk.")
+                for k, item_detail_chunk in enumerate(current_chunk_candidate_items):
+                    final_processed_outputs_for_chunk[k] = self._create_error_llm_item(item_detail_chunk, "Error_NoLLMCandidates", file_identifier_prefix=chunk_file_identifier_prefix, triggering_input_row_id=triggering_input_row_id, triggering_company_name=triggering_company_name)
+            elif raw_llm_response_str_initial_for_chunk:
+                json_candidate_str_chunk = self._extract_json_from_text(raw_llm_response_str_initial_for_chunk)
+                if json_candidate_str_chunk:
+                    try:
+                        parsed_json_object_chunk = json.loads(json_candidate_str_chunk)
+                        llm_result_chunk = MinimalExtractionOutput(**parsed_json_object_chunk)
+                        validated_numbers_chunk = llm_result_chunk.extracted_numbers
+
+                        if len(validated_numbers_chunk) != len(current_chunk_candidate_items):
+                            item_count_mismatch_for_chunk = True
+                            logger.error(f"[{chunk_file_identifier_prefix}, RowID: {triggering_input_row_id}, Company: {triggering_company_name}] LLM chunk call: Mismatch in item count. Input: {len(current_chunk_candidate_items)}, Output: {len(validated_numbers_chunk)}. Marking all in chunk as error.")
                             for k_err, item_detail_chunk_err in enumerate(current_chunk_candidate_items):
-                                final_processed_outputs_for_chunk[k_err] = self._create_error_llm_item(item_detail_chunk_err, f"Error_ChunkJsonParseValidate_{type(e_parse_validate).__name__}", file_identifier_prefix=chunk_file_identifier_prefix, triggering_input_row_id=triggering_input_row_id, triggering_company_name=triggering_company_name)
-                    else: # No JSON block in chunk
-                        logger.warning(f"[{chunk_file_identifier_prefix}, RowID: {triggering_input_row_id}, Company: {triggering_company_name}] LLM chunk call: Could not extract JSON block.")
+                                final_processed_outputs_for_chunk[k_err] = self._create_error_llm_item(item_detail_chunk_err, "Error_LLMItemCountMismatch", file_identifier_prefix=chunk_file_identifier_prefix, triggering_input_row_id=triggering_input_row_id, triggering_company_name=triggering_company_name)
+                        else:
+                            for k, input_item_detail_chunk in enumerate(current_chunk_candidate_items):
+                                llm_output_item_chunk = validated_numbers_chunk[k]
+                                if llm_output_item_chunk.number == input_item_detail_chunk['number']:
+                                    final_processed_outputs_for_chunk[k] = self._process_successful_llm_item(llm_output_item_chunk, input_item_detail_chunk)
+                                else:
+                                    items_needing_retry_for_chunk.append((k, input_item_detail_chunk)) # k is index within chunk
+                    except (json.JSONDecodeError, PydanticValidationError) as e_parse_validate:
+                        logger.error(f"[{chunk_file_identifier_prefix}, RowID: {triggering_input_row_id}, Company: {triggering_company_name}] LLM chunk call: Failed to parse/validate JSON: {e_parse_validate}. Raw: '{raw_llm_response_str_initial_for_chunk[:200]}...'")
                         for k_err, item_detail_chunk_err in enumerate(current_chunk_candidate_items):
-                             final_processed_outputs_for_chunk[k_err] = self._create_error_llm_item(item_detail_chunk_err, "Error_ChunkNoJsonBlock", file_identifier_prefix=chunk_file_identifier_prefix, triggering_input_row_id=triggering_input_row_id, triggering_company_name=triggering_company_name)
-                else: # Empty response for chunk
-                    logger.warning(f"[{chunk_file_identifier_prefix}, RowID: {triggering_input_row_id}, Company: {triggering_company_name}] LLM chunk call: Response text is empty.")
+                            final_processed_outputs_for_chunk[k_err] = self._create_error_llm_item(item_detail_chunk_err, f"Error_ChunkJsonParseValidate_{type(e_parse_validate).__name__}", file_identifier_prefix=chunk_file_identifier_prefix, triggering_input_row_id=triggering_input_row_id, triggering_company_name=triggering_company_name)
+                else: # No JSON block in chunk
+                    logger.warning(f"[{chunk_file_identifier_prefix}, RowID: {triggering_input_row_id}, Company: {triggering_company_name}] LLM chunk call: Could not extract JSON block.")
                     for k_err, item_detail_chunk_err in enumerate(current_chunk_candidate_items):
-                        final_processed_outputs_for_chunk[k_err] = self._create_error_llm_item(item_detail_chunk_err, "Error_ChunkEmptyResponse", file_identifier_prefix=chunk_file_identifier_prefix, triggering_input_row_id=triggering_input_row_id, triggering_company_name=triggering_company_name)
-
-            except google_exceptions.GoogleAPIError as e_api:
-                logger.error(f"[{chunk_file_identifier_prefix}, RowID: {triggering_input_row_id}, Company: {triggering_company_name}] LLM chunk call: Gemini API error: {e_api}")
-                for k_err, item_detail_chunk_err in enumerate(current_chunk_candidate_items):
-                    final_processed_outputs_for_chunk[k_err] = self._create_error_llm_item(item_detail_chunk_err, f"Error_ChunkApiError_{type(e_api).__name__}", file_identifier_prefix=chunk_file_identifier_prefix, triggering_input_row_id=triggering_input_row_id, triggering_company_name=triggering_company_name)
-                raw_llm_response_str_initial_for_chunk = json.dumps({"error": f"Chunk Gemini API error: {str(e_api)}", "type": type(e_api).__name__})
-            except Exception as e_gen:
-                logger.error(f"[{chunk_file_identifier_prefix}, RowID: {triggering_input_row_id}, Company: {triggering_company_name}] LLM chunk call: Unexpected error: {e_gen}", exc_info=True)
+                         final_processed_outputs_for_chunk[k_err] = self._create_error_llm_item(item_detail_chunk_err, "Error_ChunkNoJsonBlock", file_identifier_prefix=chunk_file_identifier_prefix, triggering_input_row_id=triggering_input_row_id, triggering_company_name=triggering_company_name)
+            else: # Empty response for chunk
+                logger.warning(f"[{chunk_file_identifier_prefix}, RowID: {triggering_input_row_id}, Company: {triggering_company_name}] LLM chunk call: Response text is empty.")
                 for k_err, item_detail_chunk_err in enumerate(current_chunk_candidate_items):
-                    final_processed_outputs_for_chunk[k_err] = self._create_error_llm_item(item_detail_chunk_err, f"Error_ChunkUnexpected_{type(e_gen).__name__}", file_identifier_prefix=chunk_file_identifier_prefix, triggering_input_row_id=triggering_input_row_id, triggering_company_name=triggering_company_name)
-                raw_llm_response_str_initial_for_chunk = json.dumps({"error": f"Chunk unexpected error: {str(e_gen)}", "type": type(e_gen).__name__})
+                    final_processed_outputs_for_chunk[k_err] = self._create_error_llm_item(item_detail_chunk_err, "Error_ChunkEmptyResponse", file_identifier_prefix=chunk_file_identifier_prefix, triggering_input_row_id=triggering_input_row_id, triggering_company_name=triggering_company_name)
+
+        except google_exceptions.GoogleAPIError as e_api:
+            logger.error(f"[{chunk_file_identifier_prefix}, RowID: {triggering_input_row_id}, Company: {triggering_company_name}] LLM chunk call: Gemini API error: {e_api}")
+            for k_err, item_detail_chunk_err in enumerate(current_chunk_candidate_items):
+                final_processed_outputs_for_chunk[k_err] = self._create_error_llm_item(item_detail_chunk_err, f"Error_ChunkApiError_{type(e_api).__name__}", file_identifier_prefix=chunk_file_identifier_prefix, triggering_input_row_id=triggering_input_row_id, triggering_company_name=triggering_company_name)
+            raw_llm_response_str_initial_for_chunk = json.dumps({"error": f"Chunk Gemini API error: {str(e_api)}", "type": type(e_api).__name__})
+        except Exception as e_gen:
+            logger.error(f"[{chunk_file_identifier_prefix}, RowID: {triggering_input_row_id}, Company: {triggering_company_name}] LLM chunk call: Unexpected error: {e_gen}", exc_info=True)
+            for k_err, item_detail_chunk_err in enumerate(current_chunk_candidate_items):
+                final_processed_outputs_for_chunk[k_err] = self._create_error_llm_item(item_detail_chunk_err, f"Error_ChunkUnexpected_{type(e_gen).__name__}", file_identifier_prefix=chunk_file_identifier_prefix, triggering_input_row_id=triggering_input_row_id, triggering_company_name=triggering_company_name)
+            raw_llm_response_str_initial_for_chunk = json.dumps({"error": f"Chunk unexpected error: {str(e_gen)}", "type": type(e_gen).__name__})
+        if response_chunk is not None:
+            self.chunk_sizer.record_response(len(formatted_prompt_chunk), len(current_chunk_candidate_items), response_chunk, item_count_mismatch_for_chunk)
+        
+        # --- Mismatch Retry Loop for the Current Chunk ---
+        # This internal retry logic is complex and operates on indices within the current chunk.
+        # It's adapted from the original single-batch retry.
+        current_chunk_retry_attempt = 0
+        raw_llm_response_str_retry_for_chunk: Optional[str] = None
+
+        while items_needing_retry_for_chunk and current_chunk_retry_attempt < self.config.llm_max_retries_on_number_mismatch:
+            current_chunk_retry_attempt += 1
+            logger.info(f"[{chunk_file_identifier_prefix}, RowID: {triggering_input_row_id}, Company: {triggering_company_name}] Attempting LLM chunk retry pass #{current_chunk_retry_attempt} for {len(items_needing_retry_for_chunk)} items.")
             
-            # --- Mismatch Retry Loop for the Current Chunk ---
-            # This internal retry logic is complex and operates on indices within the current chunk.
-            # It's adapted from the original single-batch retry.
-            current_chunk_retry_attempt = 0
-            raw_llm_response_str_retry_for_chunk: Optional[str] = None
-
-            while items_needing_retry_for_chunk and current_chunk_retry_attempt < self.config.llm_max_retries_on_number_mismatch:
-                current_chunk_retry_attempt += 1
-                logger.info(f"[{chunk_file_identifier_prefix}, RowID: {triggering_input_row_id}, Company: {triggering_company_name}] Attempting LLM chunk retry pass #{current_chunk_retry_attempt} for {len(items_needing_retry_for_chunk)} items.")
-                
-                inputs_for_this_chunk_retry_pass = [item_tuple[1] for item_tuple in items_needing_retry_for_chunk]
-                original_indices_within_chunk_for_this_pass = [item_tuple[0] for item_tuple in items_needing_retry_for_chunk]
-
-                # ... (Prompt formatting for retry chunk - similar to initial chunk) ...
-                try:
-                    prompt_template_chunk_retry = self._load_prompt_template(prompt_template_path)
-                    candidate_items_json_str_chunk_retry = json.dumps(inputs_for_this_chunk_retry_pass, indent=2)
-                    formatted_prompt_chunk_retry = prompt_template_chunk_retry.replace(
-                        "[Insert JSON list of (candidate_number, source_url, snippet) objects here]",
-                        candidate_items_json_str_chunk_retry
-                    )
-                except Exception as e_prompt_retry:
-                    logger.error(f"[{chunk_file_identifier_prefix}] Failed to load/format prompt for chunk retry #{current_chunk_retry_attempt}: {e_prompt_retry}")
-                    for original_idx_in_chunk, item_detail_retry_err in items_needing_retry_for_chunk:
-                        if final_processed_outputs_for_chunk[original_idx_in_chunk] is None:
-                            final_processed_outputs_for_chunk[original_idx_in_chunk] = self._create_error_llm_item(item_detail_retry_err, f"Error_ChunkRetryPromptLoading_Pass{current_chunk_retry_attempt}", file_identifier_prefix=chunk_file_identifier_prefix, triggering_input_row_id=triggering_input_row_id, triggering_company_name=triggering_company_name)
-                    items_needing_retry_for_chunk.clear()
-                    break # Break from this chunk's retry loop
-
-                generation_config_chunk_retry = GenerationConfig(
-                    candidate_count=1, max_output_tokens=self.config.llm_max_tokens, temperature=self.config.llm_temperature
-                )
+            inputs_for_this_chunk_retry_pass = [item_tuple[1] for item_tuple in items_needing_retry_for_chunk]
+            self.chunk_sizer.record_mismatch_retry(len(inputs_for_this_chunk_retry_pass))
+            original_indices_within_chunk_for_this_pass = [item_tuple[0] for item_tuple in items_needing_retry_for_chunk]
+
+            # ... (Prompt formatting for retry chunk - similar to initial chunk) ...
+            try:
+                if prompt_template is None:
+                    raise prompt_template_error or ValueError("Prompt template not loaded.")
+                formatted_prompt_chunk_retry = format_candidates_prompt(prompt_template, inputs_for_this_chunk_retry_pass)
+            except Exception as e_prompt_retry:
+                logger.error(f"[{chunk_file_identifier_prefix}] Failed to load/format prompt for chunk retry #{current_chunk_retry_attempt}: {e_prompt_retry}")
+                for original_idx_in_chunk, item_detail_retry_err in items_needing_retry_for_chunk:
+                    if final_processed_outputs_for_chunk[original_idx_in_chunk] is None:
+                        final_processed_outputs_for_chunk[original_idx_in_chunk] = self._create_error_llm_item(item_detail_retry_err, f"Error_ChunkRetryPromptLoading_Pass{current_chunk_retry_attempt}", file_identifier_prefix=chunk_file_identifier_prefix, triggering_input_row_id=triggering_input_row_id, triggering_company_name=triggering_company_name)
+                items_needing_retry_for_chunk.clear()
+                break # Break from this chunk's retry loop
+
+            generation_config_chunk_retry = GenerationConfig(
+                candidate_count=1, max_output_tokens=self.config.llm_max_tokens, temperature=self.config.llm_temperature
+            )
+            
+            try:
+                response_chunk_retry = await generate(formatted_prompt_chunk_retry, generation_config_chunk_retry, f"{chunk_file_identifier_prefix}_retry{current_chunk_retry_attempt}", triggering_input_row_id, triggering_company_name)
+                raw_llm_response_str_retry_for_chunk = response_chunk_retry.text
                 
-                try:
-                    response_chunk_retry = self._generate_content_with_retry(formatted_prompt_chunk_retry, generation_config_chunk_retry, f"{chunk_file_identifier_prefix}_retry{current_chunk_retry_attempt}", triggering_input_row_id, triggering_company_name)
-                    raw_llm_response_str_retry_for_chunk = response_chunk_retry.text
-                    
-                    if hasattr(response_chunk_retry, 'usage_metadata') and response_chunk_retry.usage_metadata: # Accumulate tokens for retry
-                        token_stats_chunk_retry = { "prompt_tokens": response_chunk_retry.usage_metadata.prompt_token_count, "completion_tokens": response_chunk_retry.usage_metadata.candidates_token_count, "total_tokens": response_chunk_retry.usage_metadata.total_token_count }
-                        for key_token_r in accumulated_token_stats: accumulated_token_stats[key_token_r] += token_stats_chunk_retry.get(key_token_r, 0)
-                        logger.info(f"[{chunk_file_identifier_prefix}] LLM chunk retry #{current_chunk_retry_attempt} usage: {token_stats_chunk_retry}")
-
-                    still_mismatched_after_this_chunk_retry: List[Tuple[int, Dict[str, Any]]] = []
-                    if not response_chunk_retry.candidates: # No candidates in retry response
-                        still_mismatched_after_this_chunk_retry.extend(items_needing_retry_for_chunk)
-                    elif raw_llm_response_str_retry_for_chunk:
-                        json_candidate_str_chunk_retry = self._extract_json_from_text(raw_llm_response_str_retry_for_chunk)
-                        if json_candidate_str_chunk_retry:
-                            try:
-                                parsed_json_object_chunk_retry = json.loads(json_candidate_str_chunk_retry)
-                                llm_result_chunk_retry = MinimalExtractionOutput(**parsed_json_object_chunk_retry)
-                                validated_numbers_chunk_retry = llm_result_chunk_retry.extracted_numbers
-
-                                if len(validated_numbers_chunk_retry) != len(inputs_for_this_chunk_retry_pass):
-                                    still_mismatched_after_this_chunk_retry.extend(items_needing_retry_for_chunk)
-                                else:
-                                    for j_retry, retried_input_item_detail_chunk in enumerate(inputs_for_this_chunk_retry_pass):
-                                        original_idx_within_chunk = original_indices_within_chunk_for_this_pass[j_retry]
-                                        retried_llm_output_item_chunk = validated_numbers_chunk_retry[j_retry]
-                                        if retried_llm_output_item_chunk.number == retried_input_item_detail_chunk['number']:
-                                            final_processed_outputs_for_chunk[original_idx_within_chunk] = self._process_successful_llm_item(retried_llm_output_item_chunk, retried_input_item_detail_chunk)
-                                        else:
-                                            still_mismatched_after_this_chunk_retry.append((original_idx_within_chunk, retried_input_item_detail_chunk))
-                            except (json.JSONDecodeError, PydanticValidationError):
+                if hasattr(response_chunk_retry, 'usage_metadata') and response_chunk_retry.usage_metadata: # Accumulate tokens for retry
+                    token_stats_chunk_retry = { "prompt_tokens": response_chunk_retry.usage_metadata.prompt_token_count, "completion_tokens": response_chunk_retry.usage_metadata.candidates_token_count, "total_tokens": response_chunk_retry.usage_metadata.total_token_count }
+                    for key_token_r in chunk_token_stats: chunk_token_stats[key_token_r] += token_stats_chunk_retry.get(key_token_r, 0)
+                    logger.info(f"[{chunk_file_identifier_prefix}] LLM chunk retry #{current_chunk_retry_attempt} usage: {token_stats_chunk_retry}")
+
+                still_mismatched_after_this_chunk_retry: List[Tuple[int, Dict[str, Any]]] = []
+                item_count_mismatch_for_retry = False
+                if not response_chunk_retry.candidates: # No candidates in retry response
+                    still_mismatched_after_this_chunk_retry.extend(items_needing_retry_for_chunk)
+                elif raw_llm_response_str_retry_for_chunk:
+                    json_candidate_str_chunk_retry = self._extract_json_from_text(raw_llm_response_str_retry_for_chunk)
+                    if json_candidate_str_chunk_retry:
+                        try:
+                            parsed_json_object_chunk_retry = json.loads(json_candidate_str_chunk_retry)
+                            llm_result_chunk_retry = MinimalExtractionOutput(**parsed_json_object_chunk_retry)
+                            validated_numbers_chunk_retry = llm_result_chunk_retry.extracted_numbers
+
+                            if len(validated_numbers_chunk_retry) != len(inputs_for_this_chunk_retry_pass):
+                                item_count_mismatch_for_retry = True
                                 still_mismatched_after_this_chunk_retry.extend(items_needing_retry_for_chunk)
-                        else: # No JSON block in chunk retry
+                            else:
+                                for j_retry, retried_input_item_detail_chunk in enumerate(inputs_for_this_chunk_retry_pass):
+                                    original_idx_within_chunk = original_indices_within_chunk_for_this_pass[j_retry]
+                                    retried_llm_output_item_chunk = validated_numbers_chunk_retry[j_retry]
+                                    if retried_llm_output_item_chunk.number == retried_input_item_detail_chunk['number']:
+                                        final_processed_outputs_for_chunk[original_idx_within_chunk] = self._process_successful_llm_item(retried_llm_output_item_chunk, retried_input_item_detail_chunk)
+                                    else:
+                                        still_mismatched_after_this_chunk_retry.append((original_idx_within_chunk, retried_input_item_detail_chunk))
+                        except (json.JSONDecodeError, PydanticValidationError):
                             still_mismatched_after_this_chunk_retry.extend(items_needing_retry_for_chunk)
-                    else: # Empty response in chunk retry
+                    else: # No JSON block in chunk retry
                         still_mismatched_after_this_chunk_retry.extend(items_needing_retry_for_chunk)
-                    items_needing_retry_for_chunk = still_mismatched_after_this_chunk_retry
-                except google_exceptions.GoogleAPIError as e_api_retry:
-                     logger.error(f"[{chunk_file_identifier_prefix}] Retry #{current_chunk_retry_attempt}: Gemini API error: {e_api_retry}")
-                except Exception as e_gen_retry:
-                     logger.error(f"[{chunk_file_identifier_prefix}] Retry #{current_chunk_retry_attempt}: Unexpected error: {e_gen_retry}", exc_info=True)
-            
-            if items_needing_retry_for_chunk: # Persistently mismatched in chunk
-                for original_idx_in_chunk_persist, item_detail_persist_error_chunk in items_needing_retry_for_chunk:
-                    if final_processed_outputs_for_chunk[original_idx_in_chunk_persist] is None:
-                        final_processed_outputs_for_chunk[original_idx_in_chunk_persist] = self._create_error_llm_item(item_detail_persist_error_chunk, "Error_PersistentMismatchAfterRetries", file_identifier_prefix=chunk_file_identifier_prefix, triggering_input_row_id=triggering_input_row_id, triggering_company_name=triggering_company_name)
-
-            # Fill any remaining None slots in this chunk's outputs with errors
-            for k_final_check, output_item_chunk_final in enumerate(final_processed_outputs_for_chunk):
-                if output_item_chunk_final is None:
-                    final_processed_outputs_for_chunk[k_final_check] = self._create_error_llm_item(current_chunk_candidate_items[k_final_check], "Error_NotProcessedInChunk", file_identifier_prefix=chunk_file_identifier_prefix, triggering_input_row_id=triggering_input_row_id, triggering_company_name=triggering_company_name)
-
-            overall_processed_outputs.extend([item for item in final_processed_outputs_for_chunk if item is not None])
-            if raw_llm_response_str_initial_for_chunk: # Store the initial response for this chunk
-                 overall_raw_responses.append(raw_llm_response_str_initial_for_chunk)
-            elif raw_llm_response_str_retry_for_chunk: # Or the last retry response if initial was problematic
-                 overall_raw_responses.append(raw_llm_response_str_retry_for_chunk)
-            else: # Fallback if no response text was captured for the chunk
-                 overall_raw_responses.append(json.dumps({"error": f"LLM response for chunk {chunks_processed_count} not captured."}))
-
-
-        # Combine raw responses (e.g., join with a separator or return as a list of strings)
-        # For simplicity, returning the list of raw responses. The caller can decide how to use/store them.
-        # Or, if a single string is preferred:
-        final_combined_raw_response_str = "\n\n---CHUNK_SEPARATOR---\n\n".join(overall_raw_responses) if overall_raw_responses else json.dumps({"error": "No LLM responses captured."})
+                else: # Empty response in chunk retry
+                    still_mismatched_after_this_chunk_retry.extend(items_needing_retry_for_chunk)
+                items_needing_retry_for_chunk = still_mismatched_after_this_chunk_retry
+                self.chunk_sizer.record_response(len(formatted_prompt_chunk_retry), len(inputs_for_this_chunk_retry_pass), response_chunk_retry, item_count_mismatch_for_retry, is_retry=True)
+            except google_exceptions.GoogleAPIError as e_api_retry:
+                 logger.error(f"[{chunk_file_identifier_prefix}] Retry #{current_chunk_retry_attempt}: Gemini API error: {e_api_retry}")
+            except Exception as e_gen_retry:
+                 logger.error(f"[{chunk_file_identifier_prefix}] Retry #{current_chunk_retry_attempt}: Unexpected error: {e_gen_retry}", exc_info=True)
         
-        successful_items_count = sum(1 for item in overall_processed_outputs if item and not item.type.startswith("Error_"))
-        error_items_count = len(overall_processed_outputs) - successful_items_count
-        logger.info(f"[{file_identifier_prefix}, RowID: {triggering_input_row_id}, Company: {triggering_company_name}] Overall LLM extraction summary: {successful_items_count} successful, {error_items_count} errors out of {len(candidate_items)} candidates processed over {chunks_processed_count} chunks.")
-
-        return overall_processed_outputs, final_combined_raw_response_str, accumulated_token_stats
\ No newline at end of file
+        if items_needing_retry_for_chunk: # Persistently mismatched in chunk
+            for original_idx_in_chunk_persist, item_detail_persist_error_chunk in items_needing_retry_for_chunk:
+                if final_processed_outputs_for_chunk[original_idx_in_chunk_persist] is None:
+                    final_processed_outputs_for_chunk[original_idx_in_chunk_persist] = self._create_error_llm_item(item_detail_persist_error_chunk, "Error_PersistentMismatchAfterRetries", file_identifier_prefix=chunk_file_identifier_prefix, triggering_input_row_id=triggering_input_row_id, triggering_company_name=triggering_company_name)
+
+        # Fill any remaining None slots in this chunk's outputs with errors
+        for k_final_check, output_item_chunk_final in enumerate(final_processed_outputs_for_chunk):
+            if output_item_chunk_final is None:
+                final_processed_outputs_for_chunk[k_final_check] = self._create_error_llm_item(current_chunk_candidate_items[k_final_check], "Error_NotProcessedInChunk", file_identifier_prefix=chunk_file_identifier_prefix, triggering_input_row_id=triggering_input_row_id, triggering_company_name=triggering_company_name)
+
+        chunk_outputs = [item for item in final_processed_outputs_for_chunk if item is not None]
+        if raw_llm_response_str_initial_for_chunk: # Store the initial response for this chunk
+            return chunk_outputs, raw_llm_response_str_initial_for_chunk, chunk_token_stats
+        if raw_llm_response_str_retry_for_chunk: # Or the last retry response if initial was problematic
+            return chunk_outputs, raw_llm_response_str_retry_for_chunk, chunk_token_stats
+        # Fallback if no response text was captured for the chunk
+        return chunk_outputs, json.dumps({"error": f"LLM response for chunk {chunk_number} not captured."}), chunk_token_stats
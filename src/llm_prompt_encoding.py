@@ -0,0 +1,154 @@
+"""
+Serialization of candidate phone numbers into the LLM prompt.
+
+The original encoding (`json.dumps(items, indent=2)`, for templates with the
+legacy placeholder) repeats `source_url` and `original_input_company_name` on
+every candidate, escapes umlauts as `\\u00fc`, and sends the full snippet of
+each candidate even though the snippets of numbers that are close together on
+a page (phone, fax, mobile of the same contact block) mostly overlap.
+
+Templates with the compact placeholder get one minified JSON line per run of
+consecutive candidates from the same page and company:
+
+    {"source_url":"...","company":"...","contexts":["..."],"candidates":[{"number":"+49...","context":0}]}
+
+Snippets are whitespace-normalized and merged when one contains the other or
+when the end of one overlaps the start of the next by at least
+MIN_SNIPPET_OVERLAP_CHARS characters, so each piece of page text is sent once.
+Only consecutive candidates are grouped, so the candidate order (which the
+response must follow) is unchanged.
+"""
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+LEGACY_CANDIDATES_PLACEHOLDER = "[Insert JSON list of (candidate_number, source_url, snippet) objects here]"
+COMPACT_CANDIDATES_PLACEHOLDER = "[Insert compact candidate pages here]"
+
+# Shorter overlaps are usually coincidental (a shared phrase), not the same stretch of page text.
+MIN_SNIPPET_OVERLAP_CHARS: int = 40
+
+_COMPACT_SEPARATORS = (',', ':')
+
+
+def uses_compact_encoding(prompt_template: str) -> bool:
+    return COMPACT_CANDIDATES_PLACEHOLDER in prompt_template
+
+
+def normalize_snippet(snippet: Optional[str]) -> str:
+    return " ".join((snippet or "").split())
+
+
+def _overlap_length(left: str, right: str, min_overlap: int) -> int:
+    """Length of the longest suffix of `left` that is a prefix of `right` (0 if shorter than `min_overlap`)."""
+    if len(left) < min_overlap or len(right) < min_overlap:
+        return 0
+    anchor = right[:min_overlap]
+    start = left.find(anchor)
+    while start != -1:
+        if right.startswith(left[start:]):
+            return len(left) - start
+        start = left.find(anchor, start + 1)
+    return 0
+
+
+def merge_overlapping_snippets(snippets: List[str], min_overlap: int = MIN_SNIPPET_OVERLAP_CHARS) -> Tuple[List[str], List[int]]:
+    """
+    Merges overlapping snippets of one page. Returns the merged contexts and,
+    per snippet, the index of the context that contains it.
+    """
+    contexts: List[str] = []
+    context_indices: List[int] = []
+    for snippet in snippets:
+        if not snippet:
+            contexts.append("")
+            context_indices.append(len(contexts) - 1)
+            continue
+        containing = next((i for i, context in enumerate(contexts) if snippet in context), None)
+        if containing is not None:
+            context_indices.append(containing)
+            continue
+        if contexts:
+            overlap = _overlap_length(contexts[-1], snippet, min_overlap)
+            if overlap:
+                contexts[-1] += snippet[overlap:]
+                context_indices.append(len(contexts) - 1)
+                continue
+            overlap = _overlap_length(snippet, contexts[-1], min_overlap)
+            if overlap:
+                contexts[-1] = snippet + contexts[-1][overlap:]
+                context_indices.append(len(contexts) - 1)
+                continue
+        contexts.append(snippet)
+        context_indices.append(len(contexts) - 1)
+    return contexts, context_indices
+
+
+def _page_key(item: Dict[str, Any]) -> Tuple[Any, Any]:
+    return item.get('source_url'), item.get('original_input_company_name')
+
+
+def _group_consecutive_pages(candidate_items: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    groups: List[List[Dict[str, Any]]] = []
+    for item in candidate_items:
+        if groups and _page_key(groups[-1][-1]) == _page_key(item):
+            groups[-1].append(item)
+        else:
+            groups.append([item])
+    return groups
+
+
+def encode_candidates_compact(candidate_items: List[Dict[str, Any]]) -> str:
+    lines: List[str] = []
+    for group in _group_consecutive_pages(candidate_items):
+        contexts, context_indices = merge_overlapping_snippets([normalize_snippet(item.get('snippet')) for item in group])
+        page = {
+            "source_url": group[0].get('source_url'),
+            "company": group[0].get('original_input_company_name'),
+            "contexts": contexts,
+            "candidates": [{"number": item.get('number'), "context": index} for item, index in zip(group, context_indices)],
+        }
+        lines.append(json.dumps(page, ensure_ascii=False, separators=_COMPACT_SEPARATORS))
+    return "\n".join(lines)
+
+
+def encode_candidates_legacy(candidate_items: List[Dict[str, Any]]) -> str:
+    return json.dumps(candidate_items, indent=2)
+
+
+def decode_candidates_compact(encoded: str) -> List[Dict[str, Any]]:
+    """Inverse of `encode_candidates_compact`, with each candidate's merged context as its snippet."""
+    candidate_items: List[Dict[str, Any]] = []
+    for line in encoded.splitlines():
+        if not line.strip():
+            continue
+        page = json.loads(line)
+        for candidate in page["candidates"]:
+            candidate_items.append({
+                "number": candidate["number"],
+                "snippet": page["contexts"][candidate["context"]],
+                "source_url": page["source_url"],
+                "original_input_company_name": page["company"],
+            })
+    return candidate_items
+
+
+def format_candidates_prompt(prompt_template: str, candidate_items: List[Dict[str, Any]]) -> str:
+    """The prompt for `candidate_items`, in the encoding the template's placeholder asks for."""
+    if uses_compact_encoding(prompt_template):
+        return prompt_template.replace(COMPACT_CANDIDATES_PLACEHOLDER, encode_candidates_compact(candidate_items))
+    return prompt_template.replace(LEGACY_CANDIDATES_PLACEHOLDER, encode_candidates_legacy(candidate_items))
+
+
+def estimate_item_chars(prompt_template: str, item: Dict[str, Any], previous_item: Optional[Dict[str, Any]]) -> int:
+    """
+    Upper bound on the prompt characters `item` adds after `previous_item`
+    (None for the first item of a chunk). Snippet merging is not anticipated.
+    """
+    if not uses_compact_encoding(prompt_template):
+        return len(json.dumps(item, indent=2)) + 2
+    chars = len(json.dumps({"number": item.get('number'), "context": 0}, separators=_COMPACT_SEPARATORS)) + 1
+    chars += len(json.dumps(normalize_snippet(item.get('snippet')), ensure_ascii=False)) + 1
+    if previous_item is None or _page_key(previous_item) != _page_key(item):
+        header = {"source_url": item.get('source_url'), "company": item.get('original_input_company_name'), "contexts": [], "candidates": []}
+        chars += len(json.dumps(header, ensure_ascii=False, separators=_COMPACT_SEPARATORS)) + 1
+    return chars
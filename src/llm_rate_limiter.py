@@ -0,0 +1,220 @@
+"""
+Client-side rate limiting for Gemini requests.
+
+With chunks sent concurrently, tenacity's exponential backoff alone turns a
+`ResourceExhausted` (HTTP 429) into a retry storm: every in-flight request
+fails, waits about as long, and retries at once. `GeminiRateLimiter` gates
+each request (including tenacity's retries) on:
+
+- a requests-per-minute and a tokens-per-minute token bucket
+  (LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE; 0 disables a bucket). The
+  token cost of a request is estimated from its prompt length before sending,
+  then corrected with the response's reported usage.
+- an adaptive concurrency limit (AIMD): it starts at LLM_MAX_IN_FLIGHT_REQUESTS,
+  is multiplied by LLM_CONCURRENCY_DECREASE_FACTOR on a 429 (once per
+  overload: 429s of requests started before the last decrease are ignored),
+  never drops below LLM_MIN_IN_FLIGHT_REQUESTS, and grows by one request per
+  "window" of successful requests back up to the maximum.
+
+Budgets apply per process; Pass 1 worker processes each get an equal share
+(`scale_budgets`).
+"""
+import asyncio
+import contextlib
+import logging
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+
+from google.api_core import exceptions as google_exceptions
+
+from .core.config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+# Rough prompt size estimate used before the API reports the real token count.
+CHARS_PER_TOKEN_ESTIMATE: int = 4
+
+
+class TokenBucket:
+    """Refills `per_minute` units per minute, continuously, up to one minute's worth."""
+
+    def __init__(self, per_minute: float):
+        self.capacity: float = float(per_minute)
+        self.refill_per_second: float = self.capacity / 60.0
+        self._level: float = self.capacity
+        self._updated_at: float = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._level = min(self.capacity, self._level + (now - self._updated_at) * self.refill_per_second)
+        self._updated_at = now
+
+    def seconds_until_available(self, amount: float) -> float:
+        """0 if `amount` units can be taken now, else how long until they can."""
+        self._refill()
+        amount = min(amount, self.capacity)  # A request larger than the whole budget waits for a full bucket.
+        if self._level >= amount:
+            return 0.0
+        return (amount - self._level) / self.refill_per_second
+
+    def take(self, amount: float) -> None:
+        self._refill()
+        self._level -= min(amount, self.capacity)
+
+    def adjust(self, amount: float) -> None:
+        """Takes (positive) or returns (negative) units after the fact; the level may go negative."""
+        self._refill()
+        self._level = min(self.capacity, self._level - amount)
+
+
+class RequestTicket:
+    """Handed to the caller for one request, to report the tokens it actually used."""
+
+    def __init__(self, estimated_tokens: int, concurrency_epoch: int):
+        self.estimated_tokens: int = estimated_tokens
+        self.concurrency_epoch: int = concurrency_epoch
+        self.used_tokens: Optional[int] = None
+
+    def record_usage(self, response: Any) -> None:
+        usage_metadata = getattr(response, 'usage_metadata', None)
+        total_tokens = getattr(usage_metadata, 'total_token_count', None) if usage_metadata else None
+        if isinstance(total_tokens, int):
+            self.used_tokens = total_tokens
+
+
+class GeminiRateLimiter:
+    """
+    Request/token budgets plus AIMD concurrency control for one process.
+
+    Usage:
+        async with limiter.request(limiter.estimate_tokens(prompt)) as ticket:
+            response = await model.generate_content_async(prompt)
+            ticket.record_usage(response)
+
+    Used from one event loop at a time. The synchronous
+    `GeminiLLMExtractor.extract_phone_numbers` runs each call on a new loop;
+    the loop-bound parts are recreated then.
+    """
+
+    def __init__(self, config: AppConfig):
+        self.config = config
+        self.max_concurrency: int = max(1, config.llm_max_in_flight_requests)
+        self.min_concurrency: int = max(1, min(config.llm_min_in_flight_requests, self.max_concurrency))
+        self.decrease_factor: float = min(max(config.llm_concurrency_decrease_factor, 0.0), 1.0)
+        self.concurrency_limit: float = float(self.max_concurrency)
+        self._concurrency_epoch: int = 0
+        self._in_flight: int = 0   # Slots taken, including requests still waiting for budget
+        self._sending: int = 0
+
+        self._request_bucket: Optional[TokenBucket] = None
+        self._token_bucket: Optional[TokenBucket] = None
+        self.scale_budgets(1.0)
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._slot_released: Optional[asyncio.Condition] = None
+
+        self.stats: Dict[str, Any] = {
+            "requests": 0,
+            "requests_delayed": 0,
+            "in_flight_requests_peak": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+            "throttle_events": 0,
+            "concurrency_decreases": 0,
+            "concurrency_increases": 0,
+        }
+
+    def scale_budgets(self, share: float) -> None:
+        """Limits this process to `share` of the configured per-minute budgets."""
+        requests_per_minute = self.config.llm_requests_per_minute * share
+        tokens_per_minute = self.config.llm_tokens_per_minute * share
+        self._request_bucket = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self._token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+
+    @staticmethod
+    def estimate_tokens(prompt: str) -> int:
+        return max(1, len(prompt) // CHARS_PER_TOKEN_ESTIMATE)
+
+    def _bind_to_running_loop(self) -> asyncio.Condition:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._slot_released is None:
+            self._loop = loop
+            self._slot_released = asyncio.Condition()
+            self._in_flight = 0
+            self._sending = 0
+        return self._slot_released
+
+    async def _wait_for_budget(self, estimated_tokens: int) -> None:
+        while True:
+            delay = 0.0
+            if self._request_bucket is not None:
+                delay = max(delay, self._request_bucket.seconds_until_available(1))
+            if self._token_bucket is not None:
+                delay = max(delay, self._token_bucket.seconds_until_available(estimated_tokens))
+            if delay <= 0:
+                break
+            await asyncio.sleep(delay)
+        # Taken in the same step as the final check, so concurrent waiters cannot overdraw.
+        if self._request_bucket is not None:
+            self._request_bucket.take(1)
+        if self._token_bucket is not None:
+            self._token_bucket.take(estimated_tokens)
+
+    def _on_success(self) -> None:
+        if self.concurrency_limit < self.max_concurrency:
+            previous_slots = int(self.concurrency_limit)
+            self.concurrency_limit = min(float(self.max_concurrency), self.concurrency_limit + 1.0 / self.concurrency_limit)
+            if int(self.concurrency_limit) > previous_slots:
+                self.stats["concurrency_increases"] += 1
+                logger.debug(f"GeminiRateLimiter: concurrency limit raised to {int(self.concurrency_limit)}.")
+
+    def _on_throttled(self, ticket: RequestTicket) -> None:
+        self.stats["throttle_events"] += 1
+        if ticket.concurrency_epoch != self._concurrency_epoch:
+            return  # This overload was already answered by a decrease.
+        self._concurrency_epoch += 1
+        self.concurrency_limit = max(float(self.min_concurrency), self.concurrency_limit * self.decrease_factor)
+        self.stats["concurrency_decreases"] += 1
+        logger.warning(f"GeminiRateLimiter: Gemini rate limit hit. Concurrency limit lowered to {int(self.concurrency_limit)}.")
+
+    @contextlib.asynccontextmanager
+    async def request(self, estimated_tokens: int) -> AsyncIterator[RequestTicket]:
+        """Waits for a concurrency slot and budget, then holds the slot for one request."""
+        slot_released = self._bind_to_running_loop()
+        wait_started_at = time.monotonic()
+        async with slot_released:
+            await slot_released.wait_for(lambda: self._in_flight < int(self.concurrency_limit))
+            self._in_flight += 1
+        try:
+            await self._wait_for_budget(estimated_tokens)
+            waited_seconds = time.monotonic() - wait_started_at
+            self.stats["requests"] += 1
+            if waited_seconds >= 0.001:
+                self.stats["requests_delayed"] += 1
+            self.stats["wait_seconds_total"] += waited_seconds
+            self.stats["wait_seconds_max"] = max(self.stats["wait_seconds_max"], waited_seconds)
+
+            ticket = RequestTicket(estimated_tokens, self._concurrency_epoch)
+            self._sending += 1
+            self.stats["in_flight_requests_peak"] = max(self.stats["in_flight_requests_peak"], self._sending)
+            try:
+                yield ticket
+            except google_exceptions.ResourceExhausted:
+                self._on_throttled(ticket)
+                raise
+            else:
+                self._on_success()
+            finally:
+                self._sending -= 1
+                if ticket.used_tokens is not None and self._token_bucket is not None:
+                    self._token_bucket.adjust(ticket.used_tokens - ticket.estimated_tokens)
+        finally:
+            async with slot_released:
+                self._in_flight -= 1
+                slot_released.notify_all()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        stats["wait_seconds_total"] = round(stats["wait_seconds_total"], 3)
+        stats["wait_seconds_max"] = round(stats["wait_seconds_max"], 3)
+        return stats
@@ -0,0 +1,512 @@
+"""
+SQLite-backed work queue and result store for Pass 1 and Pass 2.
+
+Pass 1 used to keep its per-site results in dicts inside `main_pipeline.main`
+(raw LLM outputs, scraper statuses, regex flags and LLM errors per pathful
+canonical URL), and Pass 2 consolidation and the report writers read those
+dicts. `PipelineRepository` defines the storage operations both passes use, and
+`SQLitePipelineRepository` implements them on a SQLite database in WAL mode in
+the run's output directory (PIPELINE_STORE_FILE):
+
+- `urls_to_process`: one entry per input row with its work unit (the row's
+  input canonical domain) and queue status (pending, claimed, done, failed).
+  `claim_work_unit` hands out all pending rows of one work unit atomically, so
+  several worker processes can share one queue.
+- `pathful_sites`: one entry per pathful canonical URL: the claim that makes
+  exactly one row process it, its scraper status, whether regex found
+  candidates, and the LLM error, if any.
+- `scraped_pages`: text of the pages scraped for a pathful canonical URL.
+- `regex_candidates`: regex candidates (number and snippet) sent to the LLM.
+- `llm_extractions`: LLM outputs, indexed by pathful URL and true base domain.
+
+Pass 2 reads consolidation input per true base domain with indexed queries
+instead of walking in-memory dicts.
+"""
+import logging
+import os
+import sqlite3
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .core.schemas import PhoneNumberLLMOutput
+
+logger = logging.getLogger(__name__)
+
+# urls_to_process statuses
+QUEUE_PENDING = "pending"
+QUEUE_CLAIMED = "claimed"
+QUEUE_DONE = "done"
+QUEUE_FAILED = "failed"
+
+# pathful_sites result states
+PATHFUL_CLAIMED = "claimed"          # A row is running regex/LLM for it
+PATHFUL_DONE = "done"                # Regex/LLM finished (LLM outputs may be empty)
+PATHFUL_SCRAPE_ONLY = "scrape_only"  # Only a (failed) scraper status is known
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls_to_process (
+    row_key TEXT PRIMARY KEY,
+    given_url TEXT,
+    work_unit TEXT NOT NULL,
+    status TEXT NOT NULL,
+    claimed_by TEXT,
+    claimed_at REAL,
+    scraping_status TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_urls_status_unit ON urls_to_process (status, work_unit);
+CREATE INDEX IF NOT EXISTS idx_urls_unit ON urls_to_process (work_unit);
+
+CREATE TABLE IF NOT EXISTS pathful_sites (
+    pathful_url TEXT PRIMARY KEY,
+    true_base TEXT,
+    result_state TEXT NOT NULL,
+    claimed_by_row TEXT,
+    scraper_status TEXT,
+    regex_candidates_found INTEGER,
+    llm_exception TEXT,
+    result_seq INTEGER,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_pathful_true_base ON pathful_sites (true_base, result_state);
+
+CREATE TABLE IF NOT EXISTS scraped_pages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    pathful_url TEXT NOT NULL,
+    true_base TEXT,
+    source_url TEXT NOT NULL,
+    page_type TEXT,
+    fetch_tier TEXT,
+    page_text TEXT,
+    UNIQUE (pathful_url, source_url)
+);
+CREATE INDEX IF NOT EXISTS idx_pages_true_base ON scraped_pages (true_base);
+
+CREATE TABLE IF NOT EXISTS regex_candidates (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    pathful_url TEXT NOT NULL,
+    source_url TEXT,
+    number TEXT,
+    snippet TEXT,
+    original_input_company_name TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_candidates_pathful ON regex_candidates (pathful_url);
+
+CREATE TABLE IF NOT EXISTS llm_extractions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    pathful_url TEXT NOT NULL,
+    true_base TEXT,
+    position INTEGER NOT NULL,
+    number TEXT NOT NULL,
+    type TEXT,
+    classification TEXT,
+    source_url TEXT,
+    original_input_company_name TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_llm_true_base ON llm_extractions (true_base);
+CREATE INDEX IF NOT EXISTS idx_llm_pathful ON llm_extractions (pathful_url);
+"""
+
+
+class PipelineRepository(ABC):
+    """Storage operations used by Pass 1 (queue, per-site results) and Pass 2 (consolidation, reports)."""
+
+    # --- Work queue ---
+    @abstractmethod
+    def enqueue_rows(self, rows: Iterable[Tuple[str, Optional[str], str]]) -> int:
+        """Adds (row_key, given_url, work_unit) entries as pending. Existing entries keep their status."""
+
+    @abstractmethod
+    def claim_work_unit(self, worker_id: str) -> Optional[Tuple[str, List[str]]]:
+        """Atomically claims every pending row of the next work unit. Returns (work_unit, row_keys) or None."""
+
+    @abstractmethod
+    def set_row_status(self, row_keys: Iterable[str], status: str, worker_id: Optional[str] = None, scraping_status: Optional[str] = None) -> None:
+        """Moves rows to `status` (claiming them for `worker_id` when the status is QUEUE_CLAIMED)."""
+
+    @abstractmethod
+    def requeue_unfinished(self) -> int:
+        """Returns claimed rows (e.g. of a crashed worker) to pending. Returns the number of rows requeued."""
+
+    @abstractmethod
+    def queue_counts(self) -> Dict[str, int]:
+        """Number of queue entries per status."""
+
+    # --- Pathful canonical URL results (Pass 1) ---
+    @abstractmethod
+    def claim_pathful(self, pathful_url: str, true_base: Optional[str], row_key: str) -> bool:
+        """True if the calling row should run regex/LLM for `pathful_url` (nobody has, or is doing, it yet)."""
+
+    @abstractmethod
+    def record_scrape_status(self, pathful_url: str, true_base: Optional[str], scraper_status: str) -> None:
+        """Keeps the scraper status of a pathful URL that was not processed further, unless one is already known."""
+
+    @abstractmethod
+    def save_scraped_page(self, pathful_url: str, true_base: Optional[str], source_url: str, page_type: str, fetch_tier: str, page_text: Optional[str]) -> None:
+        pass
+
+    @abstractmethod
+    def save_regex_candidates(self, pathful_url: str, candidates: List[Dict[str, str]]) -> None:
+        pass
+
+    @abstractmethod
+    def complete_pathful(
+        self, pathful_url: str, scraper_status: str, regex_candidates_found: Optional[bool],
+        llm_outputs: List[PhoneNumberLLMOutput], llm_exception: Optional[str] = None
+    ) -> None:
+        """Stores the final regex/LLM result of a claimed pathful URL."""
+
+    @abstractmethod
+    def release_pathful(self, pathful_url: str, row_key: str) -> bool:
+        """
+        Gives up `row_key`'s unfinished claim on `pathful_url` (e.g. the row failed), dropping its partial
+        results, so a later row can claim it. False if the row does not hold the claim (anymore).
+        """
+
+    @abstractmethod
+    def discard_pathful_results(self, keep_claimed_by_rows: Set[str]) -> int:
+        """Drops pathful results (and their pages, candidates, LLM outputs) claimed by rows not in `keep_claimed_by_rows`."""
+
+    @abstractmethod
+    def import_results(self, other_store_path: str) -> int:
+        """
+        Copies the pathful results (with pages, candidates and LLM outputs) of another run's store, e.g. a
+        shard's. Pathful URLs this store already has results for are skipped. Returns the number imported.
+        """
+
+    # --- Reads for consolidation and reports (Pass 2) ---
+    @abstractmethod
+    def completed_pathful_urls_by_true_base(self) -> Dict[str, List[str]]:
+        """True base domain -> its completed pathful URLs, in completion order."""
+
+    @abstractmethod
+    def pathful_scraper_statuses(self) -> Dict[str, str]:
+        pass
+
+    @abstractmethod
+    def regex_candidates_found_by_pathful(self) -> Dict[str, bool]:
+        pass
+
+    @abstractmethod
+    def llm_exceptions_by_pathful(self) -> Dict[str, str]:
+        pass
+
+    @abstractmethod
+    def pathful_urls_with_llm_outputs(self) -> Set[str]:
+        pass
+
+    @abstractmethod
+    def llm_outputs_for_true_base(self, true_base: str) -> List[PhoneNumberLLMOutput]:
+        """LLM outputs of all completed pathful URLs of `true_base`, in completion order."""
+
+    @abstractmethod
+    def add_stats(self, counters: Dict[str, int]) -> None:
+        """Adds counters collected by another process's repository (see `stats`) to this one's."""
+
+    @abstractmethod
+    def get_stats(self) -> Dict[str, Any]:
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        pass
+
+
+class SQLitePipelineRepository(PipelineRepository):
+    """
+    `PipelineRepository` on one SQLite file in WAL mode.
+
+    Each process opens its own instance; writers on other connections wait up to
+    `busy_timeout_seconds` for the write lock. Within a process, use it from one
+    thread (the pipeline's event loop thread).
+    """
+
+    def __init__(self, db_path: str, busy_timeout_seconds: float = 30.0, store_page_text: bool = True):
+        self.db_path = db_path
+        self.store_page_text = store_page_text
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        # Autocommit mode: multi-statement writes open their own transactions (BEGIN IMMEDIATE).
+        self._conn = sqlite3.connect(db_path, timeout=busy_timeout_seconds, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+        self.stats: Dict[str, int] = {
+            "rows_enqueued": 0,
+            "work_units_claimed": 0,
+            "rows_requeued": 0,
+            "pathful_claims_granted": 0,
+            "pathful_claims_refused": 0,
+            "pathful_claims_released": 0,
+            "pages_stored": 0,
+            "regex_candidates_stored": 0,
+            "llm_outputs_stored": 0,
+            "pathful_sites_imported": 0,
+        }
+
+    def _write_transaction(self, statements: List[Tuple[str, Any]]) -> None:
+        """Runs (sql, params) pairs in one IMMEDIATE transaction. `params` may be a list of tuples (executemany)."""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            for sql, params in statements:
+                if isinstance(params, list):
+                    self._conn.executemany(sql, params)
+                else:
+                    self._conn.execute(sql, params)
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    # --- Work queue ---
+    def enqueue_rows(self, rows: Iterable[Tuple[str, Optional[str], str]]) -> int:
+        now = time.time()
+        before = self._conn.total_changes
+        self._write_transaction([(
+            "INSERT OR IGNORE INTO urls_to_process (row_key, given_url, work_unit, status, updated_at) VALUES (?, ?, ?, ?, ?)",
+            [(row_key, given_url, work_unit, QUEUE_PENDING, now) for row_key, given_url, work_unit in rows]
+        )])
+        enqueued = self._conn.total_changes - before
+        self.stats["rows_enqueued"] += enqueued
+        return enqueued
+
+    def claim_work_unit(self, worker_id: str) -> Optional[Tuple[str, List[str]]]:
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._conn.execute(
+                "SELECT work_unit FROM urls_to_process WHERE status = ? ORDER BY rowid LIMIT 1", (QUEUE_PENDING,)
+            ).fetchone()
+            if row is None:
+                self._conn.execute("COMMIT")
+                return None
+            work_unit = row[0]
+            row_keys = [key for (key,) in self._conn.execute(
+                "SELECT row_key FROM urls_to_process WHERE work_unit = ? AND status = ? ORDER BY rowid", (work_unit, QUEUE_PENDING)
+            )]
+            now = time.time()
+            self._conn.execute(
+                "UPDATE urls_to_process SET status = ?, claimed_by = ?, claimed_at = ?, updated_at = ? WHERE work_unit = ? AND status = ?",
+                (QUEUE_CLAIMED, worker_id, now, now, work_unit, QUEUE_PENDING)
+            )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self.stats["work_units_claimed"] += 1
+        return work_unit, row_keys
+
+    def set_row_status(self, row_keys: Iterable[str], status: str, worker_id: Optional[str] = None, scraping_status: Optional[str] = None) -> None:
+        now = time.time()
+        if status == QUEUE_CLAIMED:
+            sql = "UPDATE urls_to_process SET status = ?, claimed_by = ?, claimed_at = ?, updated_at = ? WHERE row_key = ?"
+            params = [(status, worker_id, now, now, row_key) for row_key in row_keys]
+        else:
+            sql = "UPDATE urls_to_process SET status = ?, scraping_status = COALESCE(?, scraping_status), updated_at = ? WHERE row_key = ?"
+            params = [(status, scraping_status, now, row_key) for row_key in row_keys]
+        self._write_transaction([(sql, params)])
+
+    def requeue_unfinished(self) -> int:
+        before = self._conn.total_changes
+        self._write_transaction([(
+            "UPDATE urls_to_process SET status = ?, claimed_by = NULL, claimed_at = NULL, updated_at = ? WHERE status = ?",
+            (QUEUE_PENDING, time.time(), QUEUE_CLAIMED)
+        )])
+        requeued = self._conn.total_changes - before
+        self.stats["rows_requeued"] += requeued
+        return requeued
+
+    def queue_counts(self) -> Dict[str, int]:
+        return {status: count for status, count in self._conn.execute("SELECT status, COUNT(*) FROM urls_to_process GROUP BY status")}
+
+    # --- Pathful canonical URL results ---
+    def claim_pathful(self, pathful_url: str, true_base: Optional[str], row_key: str) -> bool:
+        before = self._conn.total_changes
+        # A pathful URL known only from a failed scrape can still be claimed by a row whose scrape succeeded.
+        self._conn.execute(
+            "INSERT INTO pathful_sites (pathful_url, true_base, result_state, claimed_by_row, updated_at) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (pathful_url) DO UPDATE SET result_state = excluded.result_state, claimed_by_row = excluded.claimed_by_row, "
+            "updated_at = excluded.updated_at WHERE pathful_sites.result_state = ?",
+            (pathful_url, true_base, PATHFUL_CLAIMED, row_key, time.time(), PATHFUL_SCRAPE_ONLY)
+        )
+        granted = self._conn.total_changes > before
+        self.stats["pathful_claims_granted" if granted else "pathful_claims_refused"] += 1
+        return granted
+
+    def record_scrape_status(self, pathful_url: str, true_base: Optional[str], scraper_status: str) -> None:
+        self._conn.execute(
+            "INSERT OR IGNORE INTO pathful_sites (pathful_url, true_base, result_state, scraper_status, updated_at) VALUES (?, ?, ?, ?, ?)",
+            (pathful_url, true_base, PATHFUL_SCRAPE_ONLY, scraper_status, time.time())
+        )
+
+    def save_scraped_page(self, pathful_url: str, true_base: Optional[str], source_url: str, page_type: str, fetch_tier: str, page_text: Optional[str]) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO scraped_pages (pathful_url, true_base, source_url, page_type, fetch_tier, page_text) VALUES (?, ?, ?, ?, ?, ?)",
+            (pathful_url, true_base, source_url, page_type, fetch_tier, page_text if self.store_page_text else None)
+        )
+        self.stats["pages_stored"] += 1
+
+    def save_regex_candidates(self, pathful_url: str, candidates: List[Dict[str, str]]) -> None:
+        if not candidates:
+            return
+        self._write_transaction([(
+            "INSERT INTO regex_candidates (pathful_url, source_url, number, snippet, original_input_company_name) VALUES (?, ?, ?, ?, ?)",
+            [(pathful_url, c.get('source_url'), c.get('number'), c.get('snippet'), c.get('original_input_company_name')) for c in candidates]
+        )])
+        self.stats["regex_candidates_stored"] += len(candidates)
+
+    def complete_pathful(
+        self, pathful_url: str, scraper_status: str, regex_candidates_found: Optional[bool],
+        llm_outputs: List[PhoneNumberLLMOutput], llm_exception: Optional[str] = None
+    ) -> None:
+        self._write_transaction([
+            ("DELETE FROM llm_extractions WHERE pathful_url = ?", (pathful_url,)),
+            (
+                "INSERT INTO llm_extractions (pathful_url, true_base, position, number, type, classification, source_url, original_input_company_name) "
+                "SELECT ?, true_base, ?, ?, ?, ?, ?, ? FROM pathful_sites WHERE pathful_url = ?",
+                [
+                    (pathful_url, position, item.number, item.type, item.classification, item.source_url, item.original_input_company_name, pathful_url)
+                    for position, item in enumerate(llm_outputs)
+                ]
+            ),
+            (
+                "UPDATE pathful_sites SET result_state = ?, scraper_status = ?, regex_candidates_found = ?, llm_exception = ?, "
+                "result_seq = (SELECT COALESCE(MAX(result_seq), 0) + 1 FROM pathful_sites), updated_at = ? WHERE pathful_url = ?",
+                (PATHFUL_DONE, scraper_status, None if regex_candidates_found is None else int(regex_candidates_found), llm_exception, time.time(), pathful_url)
+            ),
+        ])
+        self.stats["llm_outputs_stored"] += len(llm_outputs)
+
+    def discard_pathful_results(self, keep_claimed_by_rows: Set[str]) -> int:
+        discarded = [
+            url for url, claimed_by_row in self._conn.execute(
+                "SELECT pathful_url, claimed_by_row FROM pathful_sites WHERE result_state != ?", (PATHFUL_SCRAPE_ONLY,)
+            ) if claimed_by_row not in keep_claimed_by_rows
+        ]
+        if discarded:
+            self._write_transaction(self._delete_pathful_statements(discarded))
+        return len(discarded)
+
+    def release_pathful(self, pathful_url: str, row_key: str) -> bool:
+        # Only this row's connection changes a claim it holds, so the check needs no write lock.
+        claim = self._conn.execute("SELECT result_state, claimed_by_row FROM pathful_sites WHERE pathful_url = ?", (pathful_url,)).fetchone()
+        if claim != (PATHFUL_CLAIMED, row_key):
+            return False
+        self._write_transaction(self._delete_pathful_statements([pathful_url]))
+        self.stats["pathful_claims_released"] += 1
+        return True
+
+    @staticmethod
+    def _delete_pathful_statements(pathful_urls: List[str]) -> List[Tuple[str, Any]]:
+        params = [(url,) for url in pathful_urls]
+        return [
+            ("DELETE FROM llm_extractions WHERE pathful_url = ?", params),
+            ("DELETE FROM regex_candidates WHERE pathful_url = ?", params),
+            ("DELETE FROM scraped_pages WHERE pathful_url = ?", params),
+            ("DELETE FROM pathful_sites WHERE pathful_url = ?", params),
+        ]
+
+    def import_results(self, other_store_path: str) -> int:
+        self._conn.execute("ATTACH DATABASE ? AS other_store", (other_store_path,))
+        try:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Unfinished claims are not copied; a known scraper status is replaced by finished results.
+                self._conn.execute(
+                    "CREATE TEMP TABLE import_pathful_urls AS SELECT o.pathful_url FROM other_store.pathful_sites o "
+                    "LEFT JOIN main.pathful_sites m ON m.pathful_url = o.pathful_url "
+                    "WHERE o.result_state != ? AND (m.pathful_url IS NULL OR (m.result_state = ? AND o.result_state = ?))",
+                    (PATHFUL_CLAIMED, PATHFUL_SCRAPE_ONLY, PATHFUL_DONE)
+                )
+                imported = self._conn.execute("SELECT COUNT(*) FROM temp.import_pathful_urls").fetchone()[0]
+                result_seq_offset = self._conn.execute("SELECT COALESCE(MAX(result_seq), 0) FROM main.pathful_sites").fetchone()[0]
+                self._conn.execute("DELETE FROM main.pathful_sites WHERE pathful_url IN temp.import_pathful_urls")
+                self._conn.execute(
+                    "INSERT INTO main.pathful_sites (pathful_url, true_base, result_state, claimed_by_row, scraper_status, regex_candidates_found, llm_exception, result_seq, updated_at) "
+                    "SELECT pathful_url, true_base, result_state, claimed_by_row, scraper_status, regex_candidates_found, llm_exception, result_seq + ?, updated_at "
+                    "FROM other_store.pathful_sites WHERE pathful_url IN temp.import_pathful_urls",
+                    (result_seq_offset,)
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO main.scraped_pages (pathful_url, true_base, source_url, page_type, fetch_tier, page_text) "
+                    "SELECT pathful_url, true_base, source_url, page_type, fetch_tier, page_text FROM other_store.scraped_pages "
+                    "WHERE pathful_url IN temp.import_pathful_urls ORDER BY id"
+                )
+                self._conn.execute(
+                    "INSERT INTO main.regex_candidates (pathful_url, source_url, number, snippet, original_input_company_name) "
+                    "SELECT pathful_url, source_url, number, snippet, original_input_company_name FROM other_store.regex_candidates "
+                    "WHERE pathful_url IN temp.import_pathful_urls ORDER BY id"
+                )
+                self._conn.execute(
+                    "INSERT INTO main.llm_extractions (pathful_url, true_base, position, number, type, classification, source_url, original_input_company_name) "
+                    "SELECT pathful_url, true_base, position, number, type, classification, source_url, original_input_company_name FROM other_store.llm_extractions "
+                    "WHERE pathful_url IN temp.import_pathful_urls ORDER BY id"
+                )
+                self._conn.execute("DROP TABLE temp.import_pathful_urls")
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        finally:
+            self._conn.execute("DETACH DATABASE other_store")
+        self.stats["pathful_sites_imported"] += imported
+        return imported
+
+    # --- Reads ---
+    def completed_pathful_urls_by_true_base(self) -> Dict[str, List[str]]:
+        by_true_base: Dict[str, List[str]] = {}
+        for true_base, pathful_url in self._conn.execute(
+            "SELECT true_base, pathful_url FROM pathful_sites WHERE result_state = ? AND true_base IS NOT NULL ORDER BY result_seq",
+            (PATHFUL_DONE,)
+        ):
+            by_true_base.setdefault(true_base, []).append(pathful_url)
+        return by_true_base
+
+    def pathful_scraper_statuses(self) -> Dict[str, str]:
+        return dict(self._conn.execute("SELECT pathful_url, scraper_status FROM pathful_sites WHERE scraper_status IS NOT NULL"))
+
+    def regex_candidates_found_by_pathful(self) -> Dict[str, bool]:
+        return {
+            url: bool(found) for url, found in self._conn.execute(
+                "SELECT pathful_url, regex_candidates_found FROM pathful_sites WHERE regex_candidates_found IS NOT NULL"
+            )
+        }
+
+    def llm_exceptions_by_pathful(self) -> Dict[str, str]:
+        return dict(self._conn.execute("SELECT pathful_url, llm_exception FROM pathful_sites WHERE llm_exception IS NOT NULL"))
+
+    def pathful_urls_with_llm_outputs(self) -> Set[str]:
+        return {url for (url,) in self._conn.execute("SELECT DISTINCT pathful_url FROM llm_extractions")}
+
+    def llm_outputs_for_true_base(self, true_base: str) -> List[PhoneNumberLLMOutput]:
+        return [
+            PhoneNumberLLMOutput(number=number, type=type_, classification=classification, source_url=source_url, original_input_company_name=company_name)
+            for number, type_, classification, source_url, company_name in self._conn.execute(
+                "SELECT e.number, e.type, e.classification, e.source_url, e.original_input_company_name "
+                "FROM llm_extractions e JOIN pathful_sites p ON p.pathful_url = e.pathful_url "
+                "WHERE e.true_base = ? AND p.result_state = ? ORDER BY p.result_seq, e.position",
+                (true_base, PATHFUL_DONE)
+            )
+        ]
+
+    def add_stats(self, counters: Dict[str, int]) -> None:
+        for key, value in counters.items():
+            self.stats[key] = self.stats.get(key, 0) + value
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = dict(self.stats)
+        stats["queue_counts"] = self.queue_counts()
+        stats["pathful_sites_completed"] = self._conn.execute(
+            "SELECT COUNT(*) FROM pathful_sites WHERE result_state = ?", (PATHFUL_DONE,)
+        ).fetchone()[0]
+        try:
+            stats["db_size_bytes"] = os.path.getsize(self.db_path)
+        except OSError:
+            stats["db_size_bytes"] = 0
+        return stats
+
+    def close(self) -> None:
+        try:
+            self._conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"SQLitePipelineRepository: error closing {self.db_path}: {e}")
@@ -4,7 +4,9 @@ Regex-based Phone Number Extraction Component
 
 # Standard library imports
 import logging
-from typing import List, Optional, Set, Dict # Added Dict
+import os
+from typing import Iterable, List, Optional, Set, Dict # Added Dict
+from urllib.parse import unquote
 
 # Third-party imports
 import phonenumbers
@@ -17,6 +19,9 @@ logger = logging.getLogger(__name__)
 
 DEFAULT_REGION = "US" # Example, to be configured
 
+# The scraper saves the `tel:` hrefs of a page next to its cleaned text file, one href per line.
+TEL_HREFS_FILE_SUFFIX = "_tel.txt"
+
 # Placeholder for potential validation rules adapted from the old project
 MIN_NSN_LENGTH = 7
 MAX_REPEATING_DIGITS = 4
@@ -248,6 +253,93 @@ def extract_numbers_with_snippets_from_text(
     return results
 
 
+def tel_hrefs_path_for_page_file(page_content_file: str) -> str:
+    """Returns the path of the `tel:` hrefs file that belongs to the cleaned page text file `page_content_file`."""
+    root, _ = os.path.splitext(page_content_file)
+    return root + TEL_HREFS_FILE_SUFFIX
+
+
+def read_tel_hrefs_for_page_file(page_content_file: str) -> List[str]:
+    """Reads the `tel:` hrefs saved for `page_content_file`. Returns [] if the page had none."""
+    try:
+        with open(tel_hrefs_path_for_page_file(page_content_file), 'r', encoding='utf-8') as f:
+            return [line.strip() for line in f if line.strip()]
+    except FileNotFoundError:
+        return []
+
+
+def extract_numbers_from_tel_hrefs(
+    tel_hrefs: Iterable[str],
+    source_url: str,
+    original_input_company_name: str,
+    target_country_codes: Optional[List[str]] = None
+) -> List[Dict[str, str]]:
+    """
+    Parses the numbers of `tel:` hrefs into candidates shaped like those of
+    `extract_numbers_with_snippets_from_text`.
+
+    The numbers go through the same validity and custom checks as numbers found in
+    the page text. A page's text does not always show the number of a `tel:` link
+    (e.g. icon-only "call us" buttons), so these catch numbers the text regex misses.
+    The snippet is the href itself. Duplicate numbers are returned once.
+
+    Args:
+        tel_hrefs (Iterable[str]): The `tel:` hrefs of one page.
+        source_url (str): The URL of the page the hrefs were found on.
+        original_input_company_name (str): The company name from the original input row.
+        target_country_codes (Optional[List[str]]): Hints for parsing non-international numbers.
+
+    Returns:
+        List[Dict[str, str]]: A list of dictionaries, each with "number", "snippet",
+                                "source_url", and "original_input_company_name".
+    """
+    default_parse_region = DEFAULT_REGION
+    if target_country_codes and target_country_codes[0] and len(target_country_codes[0]) == 2:
+        default_parse_region = target_country_codes[0].upper()
+
+    results: List[Dict[str, str]] = []
+    seen_numbers: Set[str] = set()
+    for href in tel_hrefs:
+        # tel:+49-30-1234567;ext=12 -> +49-30-1234567
+        raw_number = unquote(href.strip()[len('tel:'):]).split(';', 1)[0].strip()
+        if not raw_number:
+            continue
+        try:
+            number_obj = phonenumbers.parse(raw_number, default_parse_region)
+        except phonenumbers.NumberParseException:
+            logger.debug(f"Could not parse tel: href '{href}' from {source_url}.")
+            continue
+        if not phonenumbers.is_valid_number(number_obj):
+            logger.debug(f"Number of tel: href '{href}' from {source_url} is invalid by basic check.")
+            continue
+        nsn = str(number_obj.national_number)
+        if not _validate_number_custom(raw_number, nsn):
+            logger.debug(f"Custom validation failed for tel: href '{href}' (nsn: {nsn}) from {source_url}.")
+            continue
+        e164_number = phonenumbers.format_number(number_obj, PhoneNumberFormat.E164)
+        if e164_number in seen_numbers:
+            continue
+        seen_numbers.add(e164_number)
+        results.append({
+            "number": e164_number,
+            "snippet": href.strip(),
+            "source_url": source_url,
+            "original_input_company_name": original_input_company_name
+        })
+    return results
+
+
+def merge_tel_href_candidates(text_candidates: List[Dict[str, str]], tel_href_candidates: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """
+    Appends the `tel:` href candidates whose number was not already found in the page text.
+
+    Numbers found in the text keep their text snippet, which gives the LLM more context
+    than the bare href.
+    """
+    numbers_in_text = {candidate.get('number') for candidate in text_candidates}
+    return text_candidates + [candidate for candidate in tel_href_candidates if candidate['number'] not in numbers_in_text]
+
+
 def extract_phone_numbers_from_file( # This function is mostly for testing/standalone use
     file_path: str,
     original_input_company_name_for_file: str = "FromFile", # Added default for standalone use
@@ -1,2 +1,11 @@
 # Makes the scraper directory a Python package
-from .scraper_logic import scrape_website
\ No newline at end of file
+from .scraper_logic import scrape_website
+from .browser_pool import BrowserPool
+from .crawl_frontier import CrawlFrontier, UrlPriorityQueue
+from .http_fetcher import HttpFetcher
+from .request_interception import RequestInterceptor
+from .robots_cache import RobotsCache
+from .stop_policy import CrawlStopPolicies, StopPolicy, STOP_POLICIES
+from .url_discovery import UrlDiscovery
+from .response_cache import ResponseCache
+from .dns_resolver import AsyncDnsResolver
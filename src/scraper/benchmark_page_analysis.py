@@ -0,0 +1,88 @@
+"""
+Micro-benchmark for single-pass page analysis.
+
+Compares the old per-page processing (`extract_text_from_html` followed by
+`find_internal_links`, each parsing the HTML separately) with `analyze_page`,
+which parses once, over a directory of saved HTML pages. Also checks that both
+paths produce the same text and links.
+
+Usage:
+    python -m src.scraper.benchmark_page_analysis <html_dir> [--repeat 5] [--base-url https://www.example.de/]
+"""
+import argparse
+import glob
+import logging
+import os
+import time
+from typing import List, Tuple
+
+from .scraper_logic import (
+    HTML_PARSER,
+    analyze_page,
+    extract_text_from_html,
+    find_internal_links,
+    _classify_page_type,
+    config_instance,
+)
+
+
+def _load_pages(html_dir: str) -> List[Tuple[str, str]]:
+    pages: List[Tuple[str, str]] = []
+    for pattern in ("*.html", "*.htm"):
+        for path in sorted(glob.glob(os.path.join(html_dir, "**", pattern), recursive=True)):
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                pages.append((path, f.read()))
+    return pages
+
+
+def _run_two_pass(pages: List[Tuple[str, str]], base_url: str) -> float:
+    start = time.perf_counter()
+    for _, html in pages:
+        extract_text_from_html(html)
+        find_internal_links(html, base_url, "BENCH", "benchmark")
+        _classify_page_type(base_url, config_instance)
+    return time.perf_counter() - start
+
+
+def _run_single_pass(pages: List[Tuple[str, str]], base_url: str) -> float:
+    start = time.perf_counter()
+    for _, html in pages:
+        analyze_page(html, base_url, "BENCH", "benchmark")
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark two-pass vs. single-pass HTML page analysis.")
+    parser.add_argument("html_dir", help="Directory containing saved .html pages (searched recursively).")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of timed repetitions (best run is reported).")
+    parser.add_argument("--base-url", default="https://www.example.de/", help="URL the pages are treated as being served from.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    pages = _load_pages(args.html_dir)
+    if not pages:
+        print(f"No .html/.htm files found under {args.html_dir}")
+        return
+
+    mismatches = 0
+    for path, html in pages:
+        analysis = analyze_page(html, args.base_url, "BENCH", "benchmark")
+        if analysis.cleaned_text != extract_text_from_html(html) or \
+           analysis.scored_links != find_internal_links(html, args.base_url, "BENCH", "benchmark"):
+            mismatches += 1
+            print(f"MISMATCH: {path}")
+
+    two_pass = min(_run_two_pass(pages, args.base_url) for _ in range(args.repeat))
+    single_pass = min(_run_single_pass(pages, args.base_url) for _ in range(args.repeat))
+    total_mb = sum(len(html) for _, html in pages) / (1024 * 1024)
+
+    print(f"Parser backend: {HTML_PARSER}")
+    print(f"Pages: {len(pages)} ({total_mb:.1f} MB), best of {args.repeat} runs")
+    print(f"Two-pass (text + links): {two_pass * 1000:.1f} ms ({two_pass * 1000 / len(pages):.2f} ms/page)")
+    print(f"Single-pass analyze_page: {single_pass * 1000:.1f} ms ({single_pass * 1000 / len(pages):.2f} ms/page)")
+    print(f"Speedup: {two_pass / single_pass:.2f}x")
+    print(f"Output mismatches: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
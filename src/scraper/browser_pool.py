@@ -0,0 +1,341 @@
+"""
+Long-lived pool of Playwright Chromium browsers shared across scrape calls.
+
+Launching Chromium for every input row dominated scrape wall-clock time on large
+input lists. `BrowserPool` keeps `BROWSER_POOL_SIZE` browsers running for the
+whole pipeline run and hands out browser contexts on lease. Contexts are
+recycled (pages closed, cookies cleared) between leases, and browsers are
+restarted after a configurable number of page fetches, after a crash, or when
+the combined Chromium memory footprint exceeds a configured limit.
+"""
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from playwright.async_api import (
+    async_playwright,
+    Browser,
+    BrowserContext,
+    Playwright,
+    Error as PlaywrightError,
+)
+
+from ..core.config import AppConfig
+from .request_interception import RequestInterceptor
+
+try:
+    import psutil  # Optional: enables memory-based browser recycling
+except ImportError:  # pragma: no cover - depends on the environment
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+CHROMIUM_LAUNCH_ARGS: List[str] = ['--no-sandbox', '--disable-setuid-sandbox', '--disable-dev-shm-usage']
+
+# Minimum number of seconds between two memory footprint checks.
+MEMORY_CHECK_INTERVAL_SECONDS: float = 10.0
+
+
+class _BrowserSlot:
+    """Book-keeping for a single pooled browser."""
+
+    def __init__(self, slot_id: int):
+        self.slot_id: int = slot_id
+        self.browser: Optional[Browser] = None
+        self.idle_contexts: List[BrowserContext] = []
+        self.active_leases: int = 0
+        self.pages_since_launch: int = 0
+        self.crashed: bool = False
+        self.retire_reason: Optional[str] = None  # Set when the browser should be restarted once idle
+
+    def is_healthy(self) -> bool:
+        return self.browser is not None and not self.crashed and self.browser.is_connected()
+
+
+class BrowserPool:
+    """
+    Manages a fixed number of persistent Chromium browsers and leases browser
+    contexts to scraper calls.
+
+    Usage:
+        async with BrowserPool(config) as pool:
+            async with pool.lease_context(row_id, company) as context:
+                page = await context.new_page()
+                ...
+                pool.record_page_fetched(context)
+
+    If a `RequestInterceptor` is given it is installed on every context the pool
+    creates. The pool must be used from a single event loop for its whole lifetime.
+    """
+
+    def __init__(self, config: AppConfig, size: Optional[int] = None, request_interceptor: Optional[RequestInterceptor] = None):
+        self.config = config
+        self.request_interceptor = request_interceptor
+        self.size: int = max(1, size if size is not None else config.browser_pool_size)
+        self.contexts_per_browser: int = max(1, config.browser_pool_contexts_per_browser)
+        self.max_pages_per_browser: int = config.browser_pool_max_pages_per_browser
+        self.max_context_reuses: int = config.browser_pool_max_context_reuses
+        self.max_memory_mb: int = config.browser_pool_max_memory_mb
+
+        self._playwright: Optional[Playwright] = None
+        self._slots: List[_BrowserSlot] = [_BrowserSlot(i) for i in range(self.size)]
+        self._capacity = asyncio.Semaphore(self.size * self.contexts_per_browser)
+        self._lock = asyncio.Lock()
+        self._context_slots: Dict[int, _BrowserSlot] = {}  # id(context) -> owning slot
+        self._context_uses: Dict[int, int] = {}  # id(context) -> completed leases
+        self._started: bool = False
+        self._closed: bool = False
+        self._last_memory_check: float = 0.0
+
+        if self.max_memory_mb > 0 and psutil is None:
+            logger.warning("BROWSER_POOL_MAX_MEMORY_MB is set but psutil is not installed. Memory-based browser recycling is disabled.")
+
+        self.stats: Dict[str, Any] = {
+            "browser_launches": 0,
+            "browser_restarts_page_limit": 0,
+            "browser_restarts_crash": 0,
+            "browser_restarts_memory": 0,
+            "contexts_created": 0,
+            "contexts_reused": 0,
+            "context_leases": 0,
+            "pages_fetched": 0,
+            "lease_wait_seconds_total": 0.0,
+            "peak_browser_memory_mb": 0.0,
+        }
+
+    async def __aenter__(self) -> "BrowserPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        """Starts Playwright and launches all pooled browsers."""
+        if self._started:
+            return
+        self._started = True
+        self._closed = False
+        self._playwright = await async_playwright().start()
+        await asyncio.gather(*(self._launch(slot) for slot in self._slots))
+        logger.info(f"BrowserPool started with {self.size} browser(s), up to {self.contexts_per_browser} concurrent context(s) each.")
+
+    async def close(self) -> None:
+        """Closes all browsers and stops Playwright."""
+        if self._closed or not self._started:
+            return
+        self._closed = True
+        for slot in self._slots:
+            await self._shutdown_slot(slot)
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception as e:
+                logger.warning(f"BrowserPool: error stopping Playwright: {e}")
+            self._playwright = None
+        self._started = False
+        logger.info(f"BrowserPool closed. Stats: {self.get_stats()}")
+
+    @asynccontextmanager
+    async def lease_context(self, input_row_id: Any = None, company_name_or_id: str = "") -> AsyncIterator[BrowserContext]:
+        """
+        Leases a browser context for the duration of the `async with` block.
+
+        The context is returned to the pool afterwards. If the block raised a
+        Playwright error the context is discarded instead of being reused.
+        """
+        if not self._started:
+            await self.start()
+
+        wait_start = time.time()
+        await self._capacity.acquire()
+        self.stats["lease_wait_seconds_total"] += time.time() - wait_start
+
+        slot: Optional[_BrowserSlot] = None
+        context: Optional[BrowserContext] = None
+        try:
+            async with self._lock:
+                slot = await self._pick_slot()
+                context = await self._checkout_context(slot)
+                slot.active_leases += 1
+                self.stats["context_leases"] += 1
+        except Exception:
+            self._capacity.release()
+            raise
+
+        logger.debug(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Leased browser context from pool slot {slot.slot_id} (active leases on slot: {slot.active_leases}).")
+        reusable = True
+        try:
+            yield context
+        except PlaywrightError:
+            reusable = False
+            raise
+        finally:
+            try:
+                async with self._lock:
+                    await self._checkin_context(slot, context, reusable)
+            finally:
+                self._capacity.release()
+
+    def record_page_fetched(self, context: BrowserContext) -> None:
+        """Counts a page fetch against the browser owning `context`."""
+        self.stats["pages_fetched"] += 1
+        slot = self._context_slots.get(id(context))
+        if slot is not None:
+            slot.pages_since_launch += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        stats["lease_wait_seconds_total"] = round(stats["lease_wait_seconds_total"], 2)
+        stats["pool_size"] = self.size
+        return stats
+
+    # --- Internal helpers ---
+
+    async def _launch(self, slot: _BrowserSlot) -> None:
+        if self._playwright is None:
+            raise RuntimeError("BrowserPool is not started.")
+        browser = await self._playwright.chromium.launch(headless=True, args=CHROMIUM_LAUNCH_ARGS)
+        browser.on("disconnected", lambda b, s=slot: self._on_disconnected(s, b))
+        slot.browser = browser
+        slot.crashed = False
+        slot.retire_reason = None
+        slot.pages_since_launch = 0
+        self.stats["browser_launches"] += 1
+        logger.debug(f"BrowserPool: launched browser for slot {slot.slot_id}.")
+
+    def _on_disconnected(self, slot: _BrowserSlot, browser: Browser) -> None:
+        if self._closed or slot.browser is not browser or slot.retire_reason is not None:
+            return
+        slot.crashed = True
+        logger.warning(f"BrowserPool: browser in slot {slot.slot_id} disconnected unexpectedly. It will be relaunched on next lease.")
+
+    def _forget_context(self, context: BrowserContext) -> None:
+        self._context_slots.pop(id(context), None)
+        self._context_uses.pop(id(context), None)
+
+    async def _close_context(self, context: BrowserContext) -> None:
+        self._forget_context(context)
+        try:
+            await context.close()
+        except Exception as e:
+            logger.debug(f"BrowserPool: error closing context: {e}")
+
+    async def _shutdown_slot(self, slot: _BrowserSlot) -> None:
+        for context in slot.idle_contexts:
+            self._forget_context(context)
+        slot.idle_contexts = []
+        browser = slot.browser
+        slot.browser = None
+        if browser is not None and browser.is_connected():
+            try:
+                await browser.close()
+            except Exception as e:
+                logger.warning(f"BrowserPool: error closing browser in slot {slot.slot_id}: {e}")
+
+    async def _restart(self, slot: _BrowserSlot, reason: str) -> None:
+        logger.info(f"BrowserPool: restarting browser in slot {slot.slot_id} (reason: {reason}, pages since launch: {slot.pages_since_launch}).")
+        slot.retire_reason = reason  # Suppresses the crash handler while we close it ourselves
+        await self._shutdown_slot(slot)
+        self.stats[f"browser_restarts_{reason}"] += 1
+        await self._launch(slot)
+
+    async def _pick_slot(self) -> _BrowserSlot:
+        # Crashed browsers are relaunched straight away; contexts still leased
+        # from them are dead anyway. Retired browsers wait until they are idle.
+        for slot in self._slots:
+            if slot.crashed or slot.browser is None or not slot.browser.is_connected():
+                await self._restart(slot, "crash")
+            elif slot.retire_reason is not None and slot.active_leases == 0:
+                await self._restart(slot, slot.retire_reason)
+
+        candidates = [s for s in self._slots if s.is_healthy() and s.retire_reason is None and s.active_leases < self.contexts_per_browser]
+        if not candidates:
+            # Every browser is draining towards a restart; oversubscribe the least busy one.
+            candidates = [s for s in self._slots if s.is_healthy()]
+        return min(candidates, key=lambda s: (s.active_leases, s.pages_since_launch))
+
+    async def _checkout_context(self, slot: _BrowserSlot) -> BrowserContext:
+        while slot.idle_contexts:
+            context = slot.idle_contexts.pop()
+            if slot.browser is not None and context in slot.browser.contexts:
+                self.stats["contexts_reused"] += 1
+                return context
+            self._forget_context(context)
+
+        assert slot.browser is not None
+        context = await slot.browser.new_context(
+            user_agent=self.config.user_agent,
+            java_script_enabled=True,
+            ignore_https_errors=True
+        )
+        if self.request_interceptor is not None:
+            await self.request_interceptor.install(context)
+        self._context_slots[id(context)] = slot
+        self._context_uses[id(context)] = 0
+        self.stats["contexts_created"] += 1
+        return context
+
+    async def _checkin_context(self, slot: _BrowserSlot, context: BrowserContext, reusable: bool) -> None:
+        slot.active_leases = max(0, slot.active_leases - 1)
+        uses = self._context_uses.get(id(context), 0) + 1
+        self._context_uses[id(context)] = uses
+
+        if self.max_pages_per_browser > 0 and slot.pages_since_launch >= self.max_pages_per_browser and slot.retire_reason is None:
+            slot.retire_reason = "page_limit"
+        self._check_memory()
+
+        context_alive = slot.is_healthy() and context in slot.browser.contexts  # type: ignore[union-attr]
+        if not reusable or not context_alive or slot.retire_reason is not None or \
+           (self.max_context_reuses > 0 and uses >= self.max_context_reuses):
+            if context_alive:
+                await self._close_context(context)
+            else:
+                self._forget_context(context)
+        else:
+            try:
+                for page in list(context.pages):
+                    await page.close()
+                await context.clear_cookies()
+                slot.idle_contexts.append(context)
+            except PlaywrightError as e:
+                logger.debug(f"BrowserPool: could not reset context for reuse, discarding it: {e}")
+                await self._close_context(context)
+
+        if slot.retire_reason is not None and slot.active_leases == 0 and not self._closed:
+            await self._restart(slot, slot.retire_reason)
+
+    def _check_memory(self) -> None:
+        if self.max_memory_mb <= 0 or psutil is None:
+            return
+        now = time.time()
+        if now - self._last_memory_check < MEMORY_CHECK_INTERVAL_SECONDS:
+            return
+        self._last_memory_check = now
+
+        total_rss_bytes = 0
+        try:
+            for child in psutil.Process().children(recursive=True):
+                try:
+                    name = child.name().lower()
+                    if 'chrom' in name or 'headless_shell' in name:
+                        total_rss_bytes += child.memory_info().rss
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+        except Exception as e:
+            logger.debug(f"BrowserPool: memory check failed: {e}")
+            return
+
+        total_mb = total_rss_bytes / (1024 * 1024)
+        self.stats["peak_browser_memory_mb"] = round(max(self.stats["peak_browser_memory_mb"], total_mb), 1)
+        if total_mb <= self.max_memory_mb:
+            return
+
+        # Recycle the browser that has done the most work since its last launch.
+        candidates = [s for s in self._slots if s.is_healthy() and s.retire_reason is None]
+        if candidates:
+            victim = max(candidates, key=lambda s: s.pages_since_launch)
+            victim.retire_reason = "memory"
+            logger.warning(f"BrowserPool: Chromium memory {total_mb:.0f}MB exceeds limit {self.max_memory_mb}MB. Scheduling restart of slot {victim.slot_id}.")
@@ -0,0 +1,265 @@
+"""
+Process-wide crawl frontier with per-host politeness scheduling.
+
+Every page fetch made by the scraper passes through `CrawlFrontier.host_slot()`.
+The frontier limits how many requests may be in flight against one host at a
+time and spaces request starts by a per-host delay (the configured minimum, or
+the robots.txt `Crawl-delay` if that is larger). Because a fetch only leases a
+browser context *after* it has obtained its host slot, rows waiting on a slow
+or rate-limited host do not hold browser contexts, and pages from other
+domains are interleaved onto the idle browsers.
+
+The frontier also keeps a global view of how many URLs are queued across all
+entry points, and exposes depth, per-host in-flight and wait-time metrics.
+When given a `RobotsCache`, `is_allowed()` checks URLs against the host's
+robots.txt and picks up its `Crawl-delay`.
+
+`UrlPriorityQueue` is the heap-backed URL queue used per entry point; it does
+not depend on the frontier and can equally hold URLs for many hosts.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+from ..core.config import AppConfig
+from .robots_cache import RobotsCache
+
+logger = logging.getLogger(__name__)
+
+
+class UrlPriorityQueue:
+    """
+    Priority queue of (url, depth, score) with O(log n) push/pop.
+
+    URLs are popped highest score first, then lowest depth, then in insertion
+    order. Each URL is queued at most once: pushing a URL that is queued again
+    with a higher score raises its priority (the old heap entry is skipped when
+    it surfaces), and pushing a URL that was already popped or marked as seen is
+    ignored.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[int, int, int, str]] = []  # (-score, depth, sequence, url)
+        self._queued: Dict[str, Tuple[int, int, int]] = {}  # url -> (score, depth, sequence) of its live heap entry
+        self._seen: Set[str] = set()  # Every URL ever pushed or marked seen
+        self._sequence = itertools.count()
+        self.priority_updates: int = 0
+
+    def __len__(self) -> int:
+        return len(self._queued)
+
+    def __bool__(self) -> bool:
+        return bool(self._queued)
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._seen
+
+    def mark_seen(self, url: str) -> None:
+        """Prevents `url` from being queued later (e.g., a redirect target that was already fetched)."""
+        self._seen.add(url)
+
+    def push(self, url: str, depth: int, score: int) -> bool:
+        """Queues `url`. Returns True only if the URL was newly queued (not for priority updates)."""
+        queued = self._queued.get(url)
+        if queued is not None:
+            if score <= queued[0]:
+                return False
+            self.priority_updates += 1
+        elif url in self._seen:
+            return False
+        sequence = next(self._sequence)
+        self._queued[url] = (score, depth, sequence)
+        self._seen.add(url)
+        heapq.heappush(self._heap, (-score, depth, sequence, url))
+        return queued is None
+
+    def pop(self) -> Tuple[str, int, int]:
+        """Removes and returns the highest-priority (url, depth, score). Raises IndexError if empty."""
+        while self._heap:
+            neg_score, depth, sequence, url = heapq.heappop(self._heap)
+            queued = self._queued.get(url)
+            if queued is not None and queued[2] == sequence:
+                del self._queued[url]
+                return url, depth, -neg_score
+        raise IndexError("pop from an empty UrlPriorityQueue")
+
+
+class _HostState:
+    """Scheduling state for a single host."""
+
+    def __init__(self):
+        self.condition = asyncio.Condition()
+        self.in_flight: int = 0
+        self.peak_in_flight: int = 0
+        self.next_start_at: float = 0.0  # Monotonic time before which no new request may start
+        self.crawl_delay_seconds: Optional[float] = None  # From robots.txt, if any
+        self.robots_checked: bool = False  # Whether the robots.txt Crawl-delay has been looked up
+        self.requests_dispatched: int = 0
+        self.wait_seconds_total: float = 0.0
+
+
+class CrawlFrontier:
+    """
+    Schedules page fetches across hosts.
+
+    Usage:
+        async with frontier.host_slot(url, row_id, company):
+            ... fetch url ...
+
+    Must be used from a single event loop.
+    """
+
+    def __init__(self, config: AppConfig, robots_cache: Optional[RobotsCache] = None):
+        self.config = config
+        self.robots_cache = robots_cache
+        self.max_in_flight_per_host: int = max(1, config.scraper_per_host_max_concurrency)
+        self.min_delay_seconds: float = max(0.0, config.scraper_per_host_min_delay_seconds)
+        self.max_crawl_delay_seconds: float = max(0.0, config.scraper_max_crawl_delay_seconds)
+        self._hosts: Dict[str, _HostState] = {}
+
+        self._queued_urls: int = 0
+        self._peak_queued_urls: int = 0
+        self._active_fetches: int = 0
+        self._peak_active_fetches: int = 0
+
+        self.stats: Dict[str, Any] = {
+            "urls_enqueued": 0,
+            "requests_dispatched": 0,
+            "requests_delayed": 0,
+            "host_wait_seconds_total": 0.0,
+            "host_wait_seconds_max": 0.0,
+            "hosts_with_robots_crawl_delay": 0,
+        }
+
+    @staticmethod
+    def host_key(url: str) -> str:
+        """Returns the politeness key for a URL: its lowercased host without a leading 'www.'."""
+        netloc = urlparse(url).netloc.lower()
+        if '@' in netloc:
+            netloc = netloc.rsplit('@', 1)[1]
+        if netloc.startswith("www."):
+            netloc = netloc[4:]
+        return netloc
+
+    def _state(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = _HostState()
+            self._hosts[host] = state
+        return state
+
+    def set_crawl_delay(self, url_or_host: str, crawl_delay_seconds: Optional[float]) -> None:
+        """Registers a robots.txt `Crawl-delay` for the host of `url_or_host` (capped by SCRAPER_MAX_CRAWL_DELAY_SECONDS)."""
+        if crawl_delay_seconds is None:
+            return
+        host = self.host_key(url_or_host) if '://' in url_or_host else url_or_host.lower()
+        state = self._state(host)
+        delay = min(float(crawl_delay_seconds), self.max_crawl_delay_seconds)
+        if state.crawl_delay_seconds is None:
+            self.stats["hosts_with_robots_crawl_delay"] += 1
+        state.crawl_delay_seconds = delay
+        logger.debug(f"CrawlFrontier: host '{host}' uses robots.txt Crawl-delay {delay}s (requested {crawl_delay_seconds}s).")
+
+    def get_host_delay(self, host: str) -> float:
+        state = self._hosts.get(host)
+        if state is None or state.crawl_delay_seconds is None:
+            return self.min_delay_seconds
+        return max(self.min_delay_seconds, state.crawl_delay_seconds)
+
+    async def is_allowed(self, url: str, input_row_id: Any = None, company_name_or_id: str = "") -> bool:
+        """Checks `url` against its host's (cached) robots.txt. Always True without a robots cache."""
+        if self.robots_cache is None:
+            return True
+        allowed = await self.robots_cache.is_allowed(url, input_row_id, company_name_or_id)
+        state = self._state(self.host_key(url))
+        if not state.robots_checked:
+            state.robots_checked = True
+            self.set_crawl_delay(url, self.robots_cache.get_crawl_delay(url))
+        return allowed
+
+    # --- Global queue depth accounting ---
+
+    def note_enqueued(self, count: int = 1) -> None:
+        self._queued_urls += count
+        self.stats["urls_enqueued"] += count
+        self._peak_queued_urls = max(self._peak_queued_urls, self._queued_urls)
+
+    def note_dequeued(self, count: int = 1) -> None:
+        self._queued_urls = max(0, self._queued_urls - count)
+
+    @property
+    def depth(self) -> int:
+        """Number of URLs currently queued across all entry points."""
+        return self._queued_urls
+
+    # --- Host scheduling ---
+
+    @asynccontextmanager
+    async def host_slot(self, url: str, input_row_id: Any = None, company_name_or_id: str = "") -> AsyncIterator[str]:
+        """Waits for a politeness slot on the URL's host and holds it while the block runs."""
+        host = self.host_key(url)
+        state = self._state(host)
+        wait_start = time.monotonic()
+
+        async with state.condition:
+            while state.in_flight >= self.max_in_flight_per_host:
+                await state.condition.wait()
+            state.in_flight += 1
+            state.peak_in_flight = max(state.peak_in_flight, state.in_flight)
+
+        try:
+            # Reserve the next start time for this host so concurrent waiters are spaced out.
+            now = time.monotonic()
+            start_at = max(now, state.next_start_at)
+            state.next_start_at = start_at + self.get_host_delay(host)
+            if start_at > now:
+                await asyncio.sleep(start_at - now)
+
+            waited = time.monotonic() - wait_start
+            state.wait_seconds_total += waited
+            state.requests_dispatched += 1
+            self.stats["requests_dispatched"] += 1
+            self.stats["host_wait_seconds_total"] += waited
+            self.stats["host_wait_seconds_max"] = max(self.stats["host_wait_seconds_max"], waited)
+            if waited > 0.01:
+                self.stats["requests_delayed"] += 1
+                logger.debug(f"[RowID: {input_row_id}, Company: {company_name_or_id}] CrawlFrontier: waited {waited:.2f}s for host '{host}' (in flight: {state.in_flight}).")
+
+            self._active_fetches += 1
+            self._peak_active_fetches = max(self._peak_active_fetches, self._active_fetches)
+            try:
+                yield host
+            finally:
+                self._active_fetches -= 1
+        finally:
+            async with state.condition:
+                state.in_flight -= 1
+                state.condition.notify()
+
+    @staticmethod
+    def add_derived_stats(stats: Dict[str, Any]) -> None:
+        """Sets `host_wait_seconds_avg` of `stats` from its counters (also used on counters merged across processes)."""
+        dispatched = stats.get("requests_dispatched", 0)
+        stats["host_wait_seconds_avg"] = round(stats.get("host_wait_seconds_total", 0.0) / dispatched, 3) if dispatched else 0.0
+
+    def get_stats(self, top_n_hosts: int = 5) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        self.add_derived_stats(stats)
+        stats["host_wait_seconds_total"] = round(stats["host_wait_seconds_total"], 2)
+        stats["host_wait_seconds_max"] = round(stats["host_wait_seconds_max"], 2)
+        stats["hosts_seen"] = len(self._hosts)
+        stats["frontier_depth_current"] = self._queued_urls
+        stats["frontier_depth_peak"] = self._peak_queued_urls
+        stats["active_fetches_peak"] = self._peak_active_fetches
+        stats["per_host_in_flight_current_max"] = max((s.in_flight for s in self._hosts.values()), default=0)
+        stats["per_host_in_flight_peak"] = max((s.peak_in_flight for s in self._hosts.values()), default=0)
+        slowest = sorted(self._hosts.items(), key=lambda kv: kv[1].wait_seconds_total, reverse=True)[:top_n_hosts]
+        stats["top_hosts_by_wait_seconds"] = {
+            host: round(state.wait_seconds_total, 2) for host, state in slowest if state.wait_seconds_total >= 0.01
+        }
+        return stats
@@ -0,0 +1,150 @@
+"""
+Shared async DNS resolver with a positive/negative cache.
+
+TLD probing in the pipeline used to try each URL_PROBING_TLDS candidate one
+after another with a blocking `socket.gethostbyname`, and the scraper only
+found out that a DNS-fallback variant (hyphen simplification, .de -> .com) did
+not exist after starting a navigation for it. `AsyncDnsResolver` resolves hosts
+with the event loop's `getaddrinfo`, caches resolved hosts for
+DNS_CACHE_TTL_SECONDS and unknown hosts for DNS_NEGATIVE_CACHE_TTL_SECONDS, and
+shares one in-flight lookup per host between concurrent callers.
+`probe_first` resolves all candidates at once and returns the first one, in
+priority order, that exists.
+
+Lookups that time out or fail temporarily (EAI_AGAIN) are reported as
+"unknown", are not cached, and never cause a host to be rejected.
+"""
+import asyncio
+import logging
+import socket
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ..core.config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+# Lookup outcomes
+DNS_RESOLVED = "resolved"
+DNS_NOT_FOUND = "not_found"   # The name does not exist (or has no addresses): cached negatively
+DNS_UNKNOWN = "unknown"       # Timeout or temporary resolver failure: not cached, host not rejected
+
+# getaddrinfo errors that say nothing about whether the name exists.
+_TRANSIENT_GAI_ERRORS = {getattr(socket, name) for name in ("EAI_AGAIN", "EAI_SYSTEM", "EAI_MEMORY") if hasattr(socket, name)}
+
+
+class AsyncDnsResolver:
+    """
+    Cached, de-duplicated async host resolution. One instance is shared by the whole run.
+
+    Must be used from a single event loop.
+    """
+
+    def __init__(self, config: AppConfig):
+        self.config = config
+        self.positive_ttl_seconds: float = max(0.0, config.dns_cache_ttl_seconds)
+        self.negative_ttl_seconds: float = max(0.0, config.dns_negative_cache_ttl_seconds)
+        self.timeout_seconds: float = max(0.1, config.dns_resolve_timeout_seconds)
+
+        self._cache: Dict[str, Tuple[str, float]] = {}  # host -> (outcome, expires_at)
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+        self.stats: Dict[str, Any] = {
+            "lookups": 0,
+            "cache_hits": 0,
+            "lookups_deduplicated": 0,
+            "resolutions": 0,
+            "outcomes": {DNS_RESOLVED: 0, DNS_NOT_FOUND: 0, DNS_UNKNOWN: 0},
+            "probe_batches": 0,
+            "probe_batches_resolved": 0,
+        }
+
+    @staticmethod
+    def normalize_host(host: str) -> str:
+        return host.strip().lower().rstrip('.').split(':', 1)[0]
+
+    async def _resolve_uncached(self, host: str) -> str:
+        self.stats["resolutions"] += 1
+        loop = asyncio.get_running_loop()
+        try:
+            addresses = await asyncio.wait_for(
+                loop.getaddrinfo(host, None, type=socket.SOCK_STREAM),
+                timeout=self.timeout_seconds
+            )
+            outcome = DNS_RESOLVED if addresses else DNS_NOT_FOUND
+        except asyncio.TimeoutError:
+            logger.debug(f"DNS lookup for '{host}' timed out after {self.timeout_seconds}s.")
+            outcome = DNS_UNKNOWN
+        except socket.gaierror as e:
+            outcome = DNS_UNKNOWN if e.errno in _TRANSIENT_GAI_ERRORS else DNS_NOT_FOUND
+            logger.debug(f"DNS lookup for '{host}' failed: {e}")
+        except (OSError, UnicodeError) as e:
+            logger.debug(f"DNS lookup for '{host}' failed with {type(e).__name__}: {e}")
+            outcome = DNS_NOT_FOUND if isinstance(e, UnicodeError) else DNS_UNKNOWN
+
+        self.stats["outcomes"][outcome] += 1
+        if outcome == DNS_RESOLVED:
+            self._cache[host] = (outcome, time.time() + self.positive_ttl_seconds)
+        elif outcome == DNS_NOT_FOUND:
+            self._cache[host] = (outcome, time.time() + self.negative_ttl_seconds)
+        return outcome
+
+    async def lookup(self, host: str) -> str:
+        """Returns DNS_RESOLVED, DNS_NOT_FOUND or DNS_UNKNOWN for `host`, resolving it at most once at a time."""
+        host = self.normalize_host(host)
+        self.stats["lookups"] += 1
+        if not host:
+            return DNS_NOT_FOUND
+        cached = self._cache.get(host)
+        if cached is not None and time.time() < cached[1]:
+            self.stats["cache_hits"] += 1
+            return cached[0]
+
+        lookup_task = self._in_flight.get(host)
+        if lookup_task is not None:
+            self.stats["lookups_deduplicated"] += 1
+        else:
+            # Own task, so a cancelled caller does not cancel the lookup for the other waiters.
+            lookup_task = asyncio.ensure_future(self._resolve_uncached(host))
+            self._in_flight[host] = lookup_task
+            lookup_task.add_done_callback(lambda _task: self._in_flight.pop(host, None))
+        return await asyncio.shield(lookup_task)
+
+    async def is_resolvable(self, host: str) -> bool:
+        """False only if the host is known not to exist; timeouts and transient errors count as resolvable."""
+        return await self.lookup(host) != DNS_NOT_FOUND
+
+    async def probe_first(self, candidate_hosts: Sequence[str]) -> Optional[str]:
+        """
+        Resolves all `candidate_hosts` concurrently and returns the first one, in
+        the given priority order, that resolved. None if none did.
+
+        Returns as soon as every higher-priority candidate has failed, without
+        waiting for lower-priority lookups (which still complete into the cache).
+        """
+        self.stats["probe_batches"] += 1
+        lookup_tasks: List[asyncio.Future] = [asyncio.ensure_future(self.lookup(host)) for host in candidate_hosts]
+        try:
+            for host, lookup_task in zip(candidate_hosts, lookup_tasks):
+                if await lookup_task == DNS_RESOLVED:
+                    self.stats["probe_batches_resolved"] += 1
+                    return host
+            return None
+        finally:
+            for lookup_task in lookup_tasks:
+                if not lookup_task.done():
+                    # Only the waiter is cancelled; the shielded lookup keeps running and fills the cache.
+                    lookup_task.cancel()
+
+    @staticmethod
+    def add_derived_stats(stats: Dict[str, Any]) -> None:
+        """Sets `cache_hit_rate` of `stats` from its counters (also used on counters merged across processes)."""
+        lookups = stats.get("lookups", 0)
+        stats["cache_hit_rate"] = round(stats.get("cache_hits", 0) / lookups, 3) if lookups else 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = dict(self.stats)
+        stats["outcomes"] = dict(self.stats["outcomes"])
+        self.add_derived_stats(stats)
+        stats["cached_hosts"] = len(self._cache)
+        return stats
@@ -0,0 +1,159 @@
+"""
+Lightweight httpx fetch tier used before falling back to a full browser.
+
+Most Impressum/Kontakt pages are static HTML, so a plain GET through a pooled
+`httpx.AsyncClient` is enough and costs a fraction of a Chromium navigation.
+`HttpFetcher.fetch()` returns the page when the response is usable as-is and
+otherwise flags it for escalation to the Playwright tier, e.g. when the page
+looks JS-rendered (little visible text, a <noscript> shell, or an empty SPA
+mount point), is not HTML, or the request failed. Given conditional request
+headers, `fetch()` reports a `304 Not Modified` so a cached page can be reused.
+"""
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+import httpx
+
+from ..core.config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+FETCH_TIER_HTTP = "http"
+FETCH_TIER_BROWSER = "browser"
+FETCH_TIER_CACHE = "cache"  # Served from the persistent response cache (fresh hit or 304 revalidation)
+
+# Statuses that are authoritative without a browser: rendering the page would not change the outcome.
+TERMINAL_HTTP_STATUSES = {404, 410}
+
+_SCRIPT_STYLE_RE = re.compile(r'<(script|style|template)\b[^>]*>.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+_COMMENT_RE = re.compile(r'<!--.*?-->', re.DOTALL)
+_TAG_RE = re.compile(r'<[^>]+>')
+_WHITESPACE_RE = re.compile(r'\s+')
+_NOSCRIPT_RE = re.compile(r'<noscript\b[^>]*>(.*?)</noscript\s*>', re.IGNORECASE | re.DOTALL)
+_NOSCRIPT_JS_HINT_RE = re.compile(r'javascript|enable js|aktivieren sie', re.IGNORECASE)
+_SPA_MOUNT_POINT_RE = re.compile(
+    r'<div\b[^>]*\bid\s*=\s*["\'](?:root|app|__next|__nuxt|q-app)["\'][^>]*>\s*</div>',
+    re.IGNORECASE
+)
+_SPA_MARKER_RE = re.compile(r'\bng-app\b|\bdata-server-rendered\s*=\s*["\']false|window\.__INITIAL_STATE__', re.IGNORECASE)
+
+
+@dataclass
+class HttpFetchResult:
+    html: Optional[str]
+    status_code: Optional[int]
+    final_url: str
+    needs_browser: bool
+    reason: str  # Why the result was accepted or escalated
+    not_modified: bool = False  # 304 answer to a conditional request
+    headers: Dict[str, str] = field(default_factory=dict)  # Response headers, if a response was received
+
+
+def _visible_text_length(html: str) -> int:
+    """Cheap approximation of the visible text length of an HTML document (no DOM parse)."""
+    text = _SCRIPT_STYLE_RE.sub(' ', html)
+    text = _COMMENT_RE.sub(' ', text)
+    text = _NOSCRIPT_RE.sub(' ', text)
+    text = _TAG_RE.sub(' ', text)
+    return len(_WHITESPACE_RE.sub(' ', text).strip())
+
+
+def detect_js_rendered(html: str, min_visible_text_chars: int) -> Optional[str]:
+    """
+    Returns a short reason string if `html` looks like it needs JavaScript to render
+    its content, or None if the static HTML is usable.
+    """
+    visible_chars = _visible_text_length(html)
+    if visible_chars < min_visible_text_chars:
+        return "low_visible_text"
+    if _SPA_MOUNT_POINT_RE.search(html):
+        return "spa_mount_point"
+    if visible_chars < min_visible_text_chars * 3:
+        for noscript_body in _NOSCRIPT_RE.findall(html):
+            if _NOSCRIPT_JS_HINT_RE.search(noscript_body):
+                return "noscript_shell"
+        if _SPA_MARKER_RE.search(html):
+            return "spa_marker"
+    return None
+
+
+class HttpFetcher:
+    """Pooled httpx client for the first fetch tier. Must be closed with `close()`."""
+
+    def __init__(self, config: AppConfig):
+        self.config = config
+        self.min_visible_text_chars: int = config.scraper_http_min_visible_text_chars
+        self.client = httpx.AsyncClient(
+            follow_redirects=True,
+            verify=False,
+            timeout=httpx.Timeout(config.scraper_http_timeout_seconds),
+            limits=httpx.Limits(
+                max_connections=config.scraper_http_max_connections,
+                max_keepalive_connections=config.scraper_http_max_connections
+            ),
+            headers={
+                'User-Agent': config.user_agent,
+                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+                'Accept-Language': 'de-DE,de;q=0.9,en;q=0.8',
+            }
+        )
+        self.stats: Dict[str, Any] = {
+            "http_requests": 0,
+            "http_served": 0,
+            "http_terminal_status": 0,
+            "http_not_modified": 0,
+            "escalations_by_reason": {},
+        }
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+    def _escalate(self, url: str, status_code: Optional[int], reason: str, headers: Optional[Dict[str, str]] = None) -> HttpFetchResult:
+        self.stats["escalations_by_reason"][reason] = self.stats["escalations_by_reason"].get(reason, 0) + 1
+        return HttpFetchResult(html=None, status_code=status_code, final_url=url, needs_browser=True, reason=reason, headers=headers or {})
+
+    async def fetch(
+        self, url: str, input_row_id: Any = None, company_name_or_id: str = "",
+        conditional_headers: Optional[Dict[str, str]] = None
+    ) -> HttpFetchResult:
+        """GETs `url`. `conditional_headers` (If-None-Match / If-Modified-Since) turn it into a revalidation request."""
+        self.stats["http_requests"] += 1
+        try:
+            response = await self.client.get(url, headers=conditional_headers or None)
+        except httpx.HTTPError as e:
+            logger.debug(f"[RowID: {input_row_id}, Company: {company_name_or_id}] HTTP tier request for {url} failed ({type(e).__name__}: {e}). Escalating to browser.")
+            return self._escalate(url, None, f"request_error_{type(e).__name__}")
+
+        final_url = str(response.url)
+        response_headers = dict(response.headers)
+        if response.status_code == 304 and conditional_headers:
+            self.stats["http_not_modified"] += 1
+            logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] HTTP tier: {url} not modified since cached copy.")
+            return HttpFetchResult(html=None, status_code=304, final_url=final_url, needs_browser=False, reason="not_modified", not_modified=True, headers=response_headers)
+        if response.status_code in TERMINAL_HTTP_STATUSES:
+            self.stats["http_terminal_status"] += 1
+            logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] HTTP tier: {url} returned {response.status_code}. Not escalating.")
+            return HttpFetchResult(html=None, status_code=response.status_code, final_url=final_url, needs_browser=False, reason=f"status_{response.status_code}")
+        if not response.is_success:
+            return self._escalate(url, response.status_code, f"status_{response.status_code}", response_headers)
+
+        content_type = response.headers.get('content-type', '').lower()
+        if content_type and 'html' not in content_type:
+            return self._escalate(url, response.status_code, "non_html_content", response_headers)
+
+        html = response.text
+        js_reason = detect_js_rendered(html, self.min_visible_text_chars)
+        if js_reason:
+            logger.debug(f"[RowID: {input_row_id}, Company: {company_name_or_id}] HTTP tier: {url} looks JS-rendered ({js_reason}). Escalating to browser.")
+            return self._escalate(url, response.status_code, js_reason, response_headers)
+
+        self.stats["http_served"] += 1
+        logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] HTTP tier served {url} (Status: {response.status_code}, Landed: {final_url}).")
+        return HttpFetchResult(html=html, status_code=response.status_code, final_url=final_url, needs_browser=False, reason="static_html", headers=response_headers)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        stats["escalations_by_reason"] = dict(self.stats["escalations_by_reason"])
+        return stats
@@ -0,0 +1,99 @@
+"""
+Precompiled, table-driven link scoring for `find_internal_links`.
+
+Link scoring used to rescan every anchor's text and URL against each configured
+keyword list in nested `any(...)` loops, and rebuilt the combined priority
+keyword list for every link. `LinkScorer` compiles the keyword lists from
+`AppConfig` once: substring keywords (target keywords, exclude patterns) into a
+single alternation regex each, and exact path-segment keywords into sets. The
+score tiers are kept in tables below and produce the same scores as the
+original loops.
+"""
+import re
+from typing import Dict, List, Optional, Pattern, Sequence, Tuple
+
+from ..core.config import AppConfig
+
+# Exact path-segment keyword tiers, applied in order: (keyword list name, score, applies if score below, max length penalty).
+SEGMENT_KEYWORD_TIERS: Tuple[Tuple[str, int, int, int], ...] = (
+    ("critical", 100, 101, 20),
+    ("high", 90, 90, 20),
+)
+# Positional tier for any priority keyword segment: score - index * step, applied if score is below `score`.
+POSITIONAL_TIER_SCORE: int = 80
+POSITIONAL_TIER_STEP_PER_SEGMENT: int = 5
+POSITIONAL_TIER_MAX_LENGTH_PENALTY: int = 15
+# Substring tiers for target keywords.
+TARGET_KEYWORD_IN_PATH_SCORE: int = 50
+TARGET_KEYWORD_IN_TEXT_SCORE: int = 40
+# Points deducted per path segment beyond `scraper_max_keyword_path_segments`.
+LENGTH_PENALTY_PER_EXTRA_SEGMENT: int = 5
+
+
+def _compile_substring_matcher(keywords: Sequence[str]) -> Optional[Pattern[str]]:
+    """Single regex matching any of `keywords` as a plain substring, or None if there are none."""
+    if not keywords:
+        return None
+    # Longest first so the alternation prefers the most specific keyword; matching semantics are unaffected.
+    alternatives = sorted(set(keywords), key=len, reverse=True)
+    return re.compile('|'.join(re.escape(kw) for kw in alternatives))
+
+
+class LinkScorer:
+    """Scores candidate internal links from their anchor text and normalized URL path."""
+
+    def __init__(self, config: AppConfig):
+        self.config = config
+        self.max_keyword_path_segments: int = config.scraper_max_keyword_path_segments
+        self._target_matcher = _compile_substring_matcher(config.target_link_keywords)
+        self._exclude_matcher = _compile_substring_matcher(config.scraper_exclude_link_path_patterns)
+        self._segment_keywords: Dict[str, frozenset] = {
+            "critical": frozenset(config.scraper_critical_priority_keywords),
+            "high": frozenset(config.scraper_high_priority_keywords),
+        }
+        self._priority_keywords = self._segment_keywords["critical"] | self._segment_keywords["high"]
+
+    def matches_target(self, text: str) -> bool:
+        """True if `text` contains any target link keyword."""
+        return self._target_matcher is not None and self._target_matcher.search(text) is not None
+
+    def is_excluded(self, path_lower: str) -> bool:
+        """True if the lowercased URL path contains a hard-exclude pattern."""
+        return self._exclude_matcher is not None and self._exclude_matcher.search(path_lower) is not None
+
+    def _length_penalty(self, num_segments: int, cap: int) -> int:
+        if num_segments > self.max_keyword_path_segments:
+            return min(cap, (num_segments - self.max_keyword_path_segments) * LENGTH_PENALTY_PER_EXTRA_SEGMENT)
+        return 0
+
+    def score_path(self, path_segments: List[str], link_text_matched: bool) -> int:
+        """
+        Scores a link that already matched a target keyword in its text or URL.
+
+        `path_segments` are the lowercased, non-empty segments of the normalized
+        URL path; `link_text_matched` tells whether the anchor text contained a
+        target keyword.
+        """
+        score = 0
+        num_segments = len(path_segments)
+
+        for tier_name, tier_score, applies_below, penalty_cap in SEGMENT_KEYWORD_TIERS:
+            if score < applies_below:
+                keywords = self._segment_keywords[tier_name]
+                if keywords and any(seg in keywords for seg in path_segments):
+                    score = max(score, tier_score - self._length_penalty(num_segments, penalty_cap))
+
+        if score < POSITIONAL_TIER_SCORE and self._priority_keywords:
+            for i, seg in enumerate(path_segments):
+                if seg in self._priority_keywords:
+                    positional_score = POSITIONAL_TIER_SCORE - i * POSITIONAL_TIER_STEP_PER_SEGMENT
+                    score = max(score, positional_score - self._length_penalty(num_segments, POSITIONAL_TIER_MAX_LENGTH_PENALTY))
+                    break
+
+        if score < TARGET_KEYWORD_IN_PATH_SCORE and any(self.matches_target(seg) for seg in path_segments):
+            score = TARGET_KEYWORD_IN_PATH_SCORE
+
+        if score < TARGET_KEYWORD_IN_TEXT_SCORE and link_text_matched:
+            score = TARGET_KEYWORD_IN_TEXT_SCORE
+
+        return score
@@ -0,0 +1,116 @@
+"""
+Playwright route interception that drops sub-resources the scraper never uses.
+
+The scraper only reads `page.content()`, so images, fonts, media, stylesheets
+and third-party analytics/ad requests are pure overhead: they slow navigation
+down and keep `networkidle` from settling. `RequestInterceptor` is installed on
+every browser context created by the `BrowserPool` and aborts such requests by
+resource type and by a host blocklist. Playwright does not report the size of
+a request that was never made, so saved bytes are estimated from a per-type
+average size table.
+"""
+import logging
+from typing import Any, Dict, List, Tuple
+from urllib.parse import urlparse
+
+from ..core.config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+# Rough average transfer sizes (bytes) per resource type, used to estimate bytes saved.
+ESTIMATED_BYTES_BY_RESOURCE_TYPE: Dict[str, int] = {
+    "image": 60_000,
+    "media": 500_000,
+    "font": 40_000,
+    "stylesheet": 30_000,
+    "script": 25_000,
+    "xhr": 5_000,
+    "fetch": 5_000,
+    "other": 10_000,
+}
+DEFAULT_ESTIMATED_BYTES: int = 10_000
+
+# Resource types that are never blocked, whatever the configuration says.
+NEVER_BLOCKED_RESOURCE_TYPES = {"document"}
+
+
+def _host_of(url: str) -> str:
+    netloc = urlparse(url).netloc.lower()
+    if netloc.startswith("www."):
+        netloc = netloc[4:]
+    return netloc.split(':', 1)[0]
+
+
+class RequestInterceptor:
+    """Route handler plus per-domain counters of blocked requests and estimated bytes saved."""
+
+    def __init__(self, config: AppConfig):
+        self.config = config
+        self.blocked_resource_types = {t for t in config.scraper_blocked_resource_types if t not in NEVER_BLOCKED_RESOURCE_TYPES}
+        self.blocked_hosts: Tuple[str, ...] = tuple(h.lstrip('.') for h in config.scraper_blocked_hosts)
+        self.requests_seen: int = 0
+        self.requests_blocked_by_type: Dict[str, int] = {}
+        self.requests_blocked_by_host_list: int = 0
+        self.estimated_bytes_saved: int = 0
+        self.per_domain: Dict[str, Dict[str, int]] = {}  # page domain -> {"requests": n, "bytes": n}
+
+    def _is_blocked_host(self, host: str) -> bool:
+        return any(host == blocked or host.endswith('.' + blocked) for blocked in self.blocked_hosts)
+
+    def _page_domain(self, request) -> str:
+        """Domain of the page that issued the request; falls back to the request's own host."""
+        try:
+            page_url = request.frame.page.url
+            if page_url and page_url.startswith(('http://', 'https://')):
+                return _host_of(page_url)
+        except Exception:
+            pass
+        return _host_of(request.url)
+
+    def _record_block(self, request, resource_type: str, by_host_list: bool) -> None:
+        estimated_bytes = ESTIMATED_BYTES_BY_RESOURCE_TYPE.get(resource_type, DEFAULT_ESTIMATED_BYTES)
+        self.requests_blocked_by_type[resource_type] = self.requests_blocked_by_type.get(resource_type, 0) + 1
+        if by_host_list:
+            self.requests_blocked_by_host_list += 1
+        self.estimated_bytes_saved += estimated_bytes
+        domain_counters = self.per_domain.setdefault(self._page_domain(request), {"requests": 0, "bytes": 0})
+        domain_counters["requests"] += 1
+        domain_counters["bytes"] += estimated_bytes
+
+    async def handle_route(self, route) -> None:
+        """Playwright route handler: `await context.route("**/*", interceptor.handle_route)`."""
+        request = route.request
+        self.requests_seen += 1
+        resource_type = request.resource_type
+        try:
+            if resource_type not in NEVER_BLOCKED_RESOURCE_TYPES:
+                if resource_type in self.blocked_resource_types:
+                    self._record_block(request, resource_type, by_host_list=False)
+                    await route.abort()
+                    return
+                if self.blocked_hosts and self._is_blocked_host(_host_of(request.url)):
+                    self._record_block(request, resource_type, by_host_list=True)
+                    await route.abort()
+                    return
+            await route.continue_()
+        except Exception as e:
+            # The page may have navigated away or been closed while the request was pending.
+            logger.debug(f"RequestInterceptor: could not handle route for {request.url}: {e}")
+
+    async def install(self, context) -> None:
+        """Installs the interceptor on a Playwright browser context."""
+        await context.route("**/*", self.handle_route)
+
+    def get_stats(self, top_n_domains: int = 10) -> Dict[str, Any]:
+        top_domains: List[Tuple[str, Dict[str, int]]] = sorted(
+            self.per_domain.items(), key=lambda kv: kv[1]["bytes"], reverse=True
+        )[:top_n_domains]
+        return {
+            "requests_seen": self.requests_seen,
+            "requests_blocked_total": sum(self.requests_blocked_by_type.values()),
+            "requests_blocked_by_type": dict(self.requests_blocked_by_type),
+            "requests_blocked_by_host_list": self.requests_blocked_by_host_list,
+            "estimated_bytes_saved": self.estimated_bytes_saved,
+            "domains_with_blocked_requests": len(self.per_domain),
+            "top_domains_by_estimated_bytes_saved": {domain: dict(counters) for domain, counters in top_domains},
+        }
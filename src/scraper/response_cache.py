@@ -0,0 +1,162 @@
+"""
+Disk-backed page cache shared across pipeline runs.
+
+Most target sites barely change between runs, yet every run downloaded every
+page again. `ResponseCache` stores each successfully fetched HTML page under
+`<OUTPUT_BASE_DIR>/<SCRAPER_RESPONSE_CACHE_SUBDIR>/`, keyed by its normalized
+URL: body, status, final URL, response headers, fetch tier and fetch time.
+
+- Entries younger than SCRAPER_RESPONSE_CACHE_MAX_AGE_HOURS are served without
+  any network request ("hit").
+- Older entries with an `ETag` or `Last-Modified` validator are revalidated
+  with a conditional GET on the HTTP tier; a `304 Not Modified` reuses the
+  cached body, including pages originally rendered by the browser tier
+  ("revalidated").
+- Anything else is fetched normally and stored ("miss").
+"""
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Optional
+
+from ..core.config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Response headers kept with a cached page.
+STORED_HEADERS = ('etag', 'last-modified', 'content-type', 'cache-control')
+
+
+@dataclass
+class CachedResponse:
+    url: str
+    final_url: str
+    status_code: int
+    html: str
+    fetch_tier: str
+    fetched_at: float
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """`If-None-Match` / `If-Modified-Since` request headers for revalidation (empty if no validators)."""
+        validators: Dict[str, str] = {}
+        if self.headers.get('etag'):
+            validators['If-None-Match'] = self.headers['etag']
+        if self.headers.get('last-modified'):
+            validators['If-Modified-Since'] = self.headers['last-modified']
+        return validators
+
+
+class ResponseCache:
+    """One gzipped JSON file per normalized URL. Safe to share across concurrent scrape calls."""
+
+    def __init__(self, config: AppConfig, cache_dir: Optional[str] = None):
+        self.config = config
+        self.max_age_seconds: float = max(0.0, config.scraper_response_cache_max_age_hours * 3600)
+        if cache_dir is None:
+            output_base_dir = config.output_base_dir
+            if not os.path.isabs(output_base_dir):
+                output_base_dir = os.path.join(PROJECT_ROOT_DIR, output_base_dir)
+            cache_dir = os.path.join(output_base_dir, config.scraper_response_cache_subdir)
+        self.cache_dir: str = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        self.stats: Dict[str, int] = {
+            "lookups": 0,
+            "hits": 0,
+            "revalidated": 0,
+            "misses": 0,
+            "stale_refetched": 0,
+            "stores": 0,
+        }
+
+    def _path_for(self, url: str) -> str:
+        digest = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.json.gz")
+
+    def _read(self, url: str) -> Optional[CachedResponse]:
+        path = self._path_for(url)
+        if not os.path.exists(path):
+            return None
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                entry = CachedResponse(**json.load(f))
+        except (OSError, EOFError, ValueError, TypeError) as e:
+            logger.warning(f"ResponseCache: discarding unreadable cache entry {path}: {e}")
+            return None
+        return entry if entry.url == url else None  # Guard against hash collisions
+
+    def _write(self, entry: CachedResponse) -> None:
+        path = self._path_for(entry.url)
+        tmp_path: Optional[str] = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # A temporary file per writer: other workers may be storing the same URL concurrently.
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+            with os.fdopen(fd, 'wb') as raw_file, gzip.open(raw_file, 'wt', encoding='utf-8') as f:
+                json.dump(asdict(entry), f)
+            os.replace(tmp_path, path)
+            tmp_path = None
+        except OSError as e:
+            logger.warning(f"ResponseCache: could not write cache entry for {entry.url}: {e}")
+        finally:
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    async def lookup(self, url: str) -> Optional[CachedResponse]:
+        """Returns the cached entry for `url` (fresh or stale), or None. Counts a miss if there is none."""
+        self.stats["lookups"] += 1
+        entry = await asyncio.to_thread(self._read, url)
+        if entry is None:
+            self.stats["misses"] += 1
+        return entry
+
+    def is_fresh(self, entry: CachedResponse) -> bool:
+        return time.time() - entry.fetched_at < self.max_age_seconds
+
+    def record_hit(self) -> None:
+        self.stats["hits"] += 1
+
+    async def record_revalidated(self, entry: CachedResponse) -> None:
+        """The server answered 304: the cached body is current again."""
+        self.stats["revalidated"] += 1
+        entry.fetched_at = time.time()
+        await asyncio.to_thread(self._write, entry)
+
+    def record_stale_refetch(self) -> None:
+        """A stale entry had to be fetched again (no validators, or the page changed)."""
+        self.stats["stale_refetched"] += 1
+
+    async def store(
+        self, url: str, html: str, status_code: int, final_url: str, fetch_tier: str,
+        headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        headers = {k.lower(): v for k, v in (headers or {}).items() if k.lower() in STORED_HEADERS}
+        if 'no-store' in headers.get('cache-control', '').lower():
+            return
+        entry = CachedResponse(
+            url=url, final_url=final_url, status_code=status_code, html=html,
+            fetch_tier=fetch_tier, fetched_at=time.time(), headers=headers
+        )
+        await asyncio.to_thread(self._write, entry)
+        self.stats["stores"] += 1
+
+    @staticmethod
+    def add_derived_stats(stats: Dict[str, Any]) -> None:
+        """Sets the `*_ratio` values of `stats` from its counters (also used on counters merged across processes)."""
+        lookups = stats.get("lookups", 0)
+        for key in ("hits", "revalidated", "misses", "stale_refetched"):
+            stats[f"{key}_ratio"] = round(stats.get(key, 0) / lookups, 3) if lookups else 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = dict(self.stats)
+        self.add_derived_stats(stats)
+        return stats
@@ -0,0 +1,349 @@
+"""
+Process-wide robots.txt cache shared by all scrape calls.
+
+robots.txt used to be fetched with a fresh client for every input row, and only
+the entry URL was checked. `RobotsCache` keeps one parsed entry per scheme+host
+in memory and persists the raw robots.txt bodies to a JSON file under
+OUTPUT_BASE_DIR (ROBOTS_CACHE_PATH) so later runs can reuse them until they
+expire. Missing (4xx) robots.txt files and fetch errors are cached too
+("negative caching"): a missing file for the full TTL, errors for a shorter
+error TTL so a temporarily broken host is retried. Worker processes sharing the
+file merge their entries into it on save.
+Concurrent lookups for the same host share a single in-flight fetch.
+
+Once an entry is cached, checking a URL is a dict lookup plus
+`RobotFileParser.can_fetch`, cheap enough to run for every URL in the frontier.
+"""
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+import httpx
+
+from ..core.config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+# Entry outcomes
+ROBOTS_PARSED = "parsed"    # robots.txt fetched (2xx) and parsed
+ROBOTS_MISSING = "missing"  # 4xx: no robots.txt, everything allowed
+ROBOTS_ERROR = "error"      # 5xx or request error: assumed allowed, retried after the error TTL
+
+# Bodies larger than this are truncated before parsing/persisting (Google applies a 500 KiB limit).
+MAX_ROBOTS_TXT_BYTES: int = 500 * 1024
+
+# Saving waits this long for another process's lock on the cache file, then saves without it.
+SAVE_LOCK_TIMEOUT_SECONDS: float = 10.0
+# A lock file older than this was left behind by a crashed process.
+STALE_LOCK_SECONDS: float = 60.0
+
+PROJECT_ROOT_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@contextlib.contextmanager
+def _exclusive_lock(lock_path: str) -> Iterator[bool]:
+    """
+    Cross-process lock held by creating `lock_path` exclusively (works on
+    Windows too). Yields whether the lock was acquired before the timeout.
+    """
+    deadline = time.monotonic() + SAVE_LOCK_TIMEOUT_SECONDS
+    acquired = False
+    while True:
+        try:
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            acquired = True
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > STALE_LOCK_SECONDS:
+                    os.remove(lock_path)
+                    continue
+            except OSError:
+                pass  # Released in the meantime
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(0.05)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            with contextlib.suppress(OSError):
+                os.remove(lock_path)
+
+
+class _RobotsEntry:
+    """A cached robots.txt outcome for one scheme+host."""
+
+    def __init__(self, outcome: str, http_status: Optional[int], text: Optional[str], fetched_at: float, expires_at: float):
+        self.outcome = outcome
+        self.http_status = http_status
+        self.text = text
+        self.fetched_at = fetched_at
+        self.expires_at = expires_at
+        self._parser: Optional[RobotFileParser] = None
+
+    @property
+    def parser(self) -> Optional[RobotFileParser]:
+        """Parsed robots.txt, built lazily (entries loaded from disk may never be used)."""
+        if self.outcome != ROBOTS_PARSED or self.text is None:
+            return None
+        if self._parser is None:
+            parser = RobotFileParser()
+            parser.parse(self.text.splitlines())
+            self._parser = parser
+        return self._parser
+
+    def is_expired(self, now: float) -> bool:
+        return now >= self.expires_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "outcome": self.outcome,
+            "http_status": self.http_status,
+            "text": self.text,
+            "fetched_at": self.fetched_at,
+            "expires_at": self.expires_at,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "_RobotsEntry":
+        return cls(
+            outcome=data["outcome"],
+            http_status=data.get("http_status"),
+            text=data.get("text"),
+            fetched_at=float(data.get("fetched_at", 0.0)),
+            expires_at=float(data.get("expires_at", 0.0)),
+        )
+
+
+class RobotsCache:
+    """
+    In-memory plus on-disk robots.txt cache keyed by scheme+host.
+
+    Usage:
+        allowed = await robots_cache.is_allowed(url, row_id, company)
+        crawl_delay = robots_cache.get_crawl_delay(url)
+        ...
+        await robots_cache.close()  # persists the cache and closes the HTTP client
+
+    Must be used from a single event loop.
+    """
+
+    def __init__(self, config: AppConfig, cache_path: Optional[str] = None):
+        self.config = config
+        self.user_agent: str = config.robots_txt_user_agent
+        self.ttl_seconds: float = max(0.0, config.robots_cache_ttl_hours * 3600)
+        self.error_ttl_seconds: float = max(0.0, config.robots_cache_error_ttl_minutes * 60)
+
+        path = cache_path if cache_path is not None else config.robots_cache_path
+        if path and not os.path.isabs(path):
+            output_base_dir = config.output_base_dir
+            if not os.path.isabs(output_base_dir):
+                output_base_dir = os.path.join(PROJECT_ROOT_DIR, output_base_dir)
+            path = os.path.join(output_base_dir, path)
+        self.cache_path: Optional[str] = path or None
+
+        self._entries: Dict[str, _RobotsEntry] = {}
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+        self._dirty: bool = False
+
+        self.stats: Dict[str, Any] = {
+            "lookups": 0,
+            "memory_hits": 0,
+            "entries_loaded_from_disk": 0,
+            "fetches": 0,
+            "fetches_deduplicated": 0,
+            "fetches_by_outcome": {},
+            "urls_disallowed": 0,
+        }
+        self._load()
+
+    @staticmethod
+    def cache_key(url: str) -> str:
+        """Returns the cache key for a URL: lowercased scheme://host[:port]."""
+        parsed = urlparse(url)
+        return f"{parsed.scheme.lower()}://{parsed.netloc.lower()}"
+
+    # --- Disk persistence ---
+
+    def _read_file(self) -> Dict[str, _RobotsEntry]:
+        """Unexpired entries currently in the cache file (empty if it is missing or unreadable)."""
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                raw_entries = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"RobotsCache: could not read cache file {self.cache_path}: {e}.")
+            return {}
+        now = time.time()
+        entries: Dict[str, _RobotsEntry] = {}
+        for key, data in raw_entries.items():
+            try:
+                entry = _RobotsEntry.from_dict(data)
+            except (KeyError, TypeError, ValueError):
+                continue
+            if not entry.is_expired(now):
+                entries[key] = entry
+        return entries
+
+    def _load(self) -> None:
+        self._entries.update(self._read_file())
+        self.stats["entries_loaded_from_disk"] = len(self._entries)
+        if self._entries:
+            logger.info(f"RobotsCache: loaded {len(self._entries)} unexpired robots.txt entries from {self.cache_path}.")
+
+    def save(self) -> None:
+        """
+        Writes unexpired entries to the cache file (atomically), if anything changed.
+
+        Several worker processes may save the same file. Saves are serialized
+        with a lock file, entries saved by others since this cache was loaded
+        are kept (the more recently fetched entry wins per host), and each
+        process writes through its own temporary file.
+        """
+        if not self.cache_path or not self._dirty:
+            return
+        cache_dir = os.path.dirname(self.cache_path)
+        tmp_path: Optional[str] = None
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            with _exclusive_lock(f"{self.cache_path}.lock") as locked:
+                if not locked:
+                    logger.warning(f"RobotsCache: cache file {self.cache_path} is still locked after {SAVE_LOCK_TIMEOUT_SECONDS}s. Saving without the lock.")
+                now = time.time()
+                merged = self._read_file()
+                for key, entry in self._entries.items():
+                    on_disk = merged.get(key)
+                    if not entry.is_expired(now) and (on_disk is None or entry.fetched_at >= on_disk.fetched_at):
+                        merged[key] = entry
+                payload = {key: entry.to_dict() for key, entry in merged.items()}
+                fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix=f".{os.path.basename(self.cache_path)}.", suffix=".tmp")
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(payload, f)
+                os.replace(tmp_path, self.cache_path)
+                tmp_path = None
+            self._dirty = False
+            logger.info(f"RobotsCache: saved {len(payload)} robots.txt entries to {self.cache_path}.")
+        except OSError as e:
+            logger.warning(f"RobotsCache: could not write cache file {self.cache_path}: {e}")
+        finally:
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    async def close(self) -> None:
+        # `save` may poll another process's lock file for up to SAVE_LOCK_TIMEOUT_SECONDS.
+        await asyncio.to_thread(self.save)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    # --- Fetching ---
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                follow_redirects=True,
+                verify=False,
+                timeout=httpx.Timeout(10.0),
+                headers={'User-Agent': self.user_agent if self.user_agent != '*' else self.config.user_agent},
+            )
+        return self._client
+
+    async def _fetch(self, key: str, input_row_id: Any, company_name_or_id: str) -> _RobotsEntry:
+        robots_url = f"{key}/robots.txt"
+        now = time.time()
+        self.stats["fetches"] += 1
+        try:
+            logger.debug(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Fetching robots.txt from: {robots_url}")
+            response = await self._get_client().get(robots_url)
+            if response.is_success:
+                entry = _RobotsEntry(ROBOTS_PARSED, response.status_code, response.text[:MAX_ROBOTS_TXT_BYTES], now, now + self.ttl_seconds)
+            elif 400 <= response.status_code < 500:
+                logger.debug(f"[RowID: {input_row_id}, Company: {company_name_or_id}] robots.txt not available at {robots_url} (status {response.status_code}), assuming allowed.")
+                entry = _RobotsEntry(ROBOTS_MISSING, response.status_code, None, now, now + self.ttl_seconds)
+            else:
+                logger.warning(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Failed to fetch robots.txt from {robots_url}, status: {response.status_code}. Assuming allowed.")
+                entry = _RobotsEntry(ROBOTS_ERROR, response.status_code, None, now, now + self.error_ttl_seconds)
+        except httpx.HTTPError as e:
+            logger.warning(f"[RowID: {input_row_id}, Company: {company_name_or_id}] {type(e).__name__} fetching robots.txt from {robots_url}: {e}. Assuming allowed.")
+            entry = _RobotsEntry(ROBOTS_ERROR, None, None, now, now + self.error_ttl_seconds)
+        except Exception as e:
+            logger.error(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Unexpected error processing robots.txt for {robots_url}: {e}. Assuming allowed.", exc_info=True)
+            entry = _RobotsEntry(ROBOTS_ERROR, None, None, now, now + self.error_ttl_seconds)
+
+        outcomes = self.stats["fetches_by_outcome"]
+        outcomes[entry.outcome] = outcomes.get(entry.outcome, 0) + 1
+        self._entries[key] = entry
+        self._dirty = True
+        return entry
+
+    async def get_entry(self, url: str, input_row_id: Any = None, company_name_or_id: str = "") -> _RobotsEntry:
+        """Returns the cached entry for the URL's host, fetching robots.txt at most once per host at a time."""
+        key = self.cache_key(url)
+        self.stats["lookups"] += 1
+        entry = self._entries.get(key)
+        if entry is not None and not entry.is_expired(time.time()):
+            self.stats["memory_hits"] += 1
+            return entry
+
+        fetch_task = self._in_flight.get(key)
+        if fetch_task is not None:
+            self.stats["fetches_deduplicated"] += 1
+        else:
+            # The fetch runs as its own task so a cancelled caller does not cancel it for the other waiters.
+            fetch_task = asyncio.ensure_future(self._fetch(key, input_row_id, company_name_or_id))
+            self._in_flight[key] = fetch_task
+            fetch_task.add_done_callback(lambda _task: self._in_flight.pop(key, None))
+        return await asyncio.shield(fetch_task)
+
+    # --- Queries ---
+
+    async def is_allowed(self, url: str, input_row_id: Any = None, company_name_or_id: str = "") -> bool:
+        if not self.config.respect_robots_txt:
+            return True
+        entry = await self.get_entry(url, input_row_id, company_name_or_id)
+        parser = entry.parser
+        if parser is None:
+            return True
+        allowed = parser.can_fetch(self.user_agent, url)
+        if not allowed:
+            self.stats["urls_disallowed"] += 1
+            logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Scraping disallowed by robots.txt for URL: {url} (User-agent: {self.user_agent})")
+        return allowed
+
+    def get_crawl_delay(self, url: str) -> Optional[float]:
+        """`Crawl-delay` for the URL's host from an already cached robots.txt, if any."""
+        entry = self._entries.get(self.cache_key(url))
+        if entry is None or entry.parser is None:
+            return None
+        delay = entry.parser.crawl_delay(self.user_agent)
+        return float(delay) if delay is not None else None
+
+    def get_sitemaps(self, url: str) -> List[str]:
+        """`Sitemap:` URLs listed in the URL's host's already cached robots.txt."""
+        entry = self._entries.get(self.cache_key(url))
+        if entry is None or entry.parser is None:
+            return []
+        return list(entry.parser.site_maps() or [])
+
+    @staticmethod
+    def add_derived_stats(stats: Dict[str, Any]) -> None:
+        """Sets `memory_hit_rate` of `stats` from its counters (also used on counters merged across processes)."""
+        lookups = stats.get("lookups", 0)
+        stats["memory_hit_rate"] = round(stats.get("memory_hits", 0) / lookups, 3) if lookups else 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = dict(self.stats)
+        stats["fetches_by_outcome"] = dict(self.stats["fetches_by_outcome"])
+        stats["hosts_cached"] = len(self._entries)
+        self.add_derived_stats(stats)
+        return stats
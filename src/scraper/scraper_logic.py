@@ -5,17 +5,27 @@ import logging
 import time
 import hashlib # Added for hashing long filenames
 from urllib.parse import urljoin, urlparse, urldefrag, urlunparse
-from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError, Error as PlaywrightError
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError, Error as PlaywrightError
 from bs4 import BeautifulSoup
 from bs4.element import Tag # Added for type checking
-import httpx # For asynchronous robots.txt checking
-from urllib.robotparser import RobotFileParser
 from typing import Set, Tuple, Optional, List, Dict, Any
 import tldextract # Added for DNS fallback logic
+from dataclasses import dataclass
 
 # Assuming config.py is in src.core
 from ..core.config import AppConfig
 from ..core.logging_config import setup_logging # For main app setup, or test setup
+from .browser_pool import BrowserPool
+from .crawl_frontier import CrawlFrontier, UrlPriorityQueue
+from .http_fetcher import HttpFetcher, FETCH_TIER_HTTP, FETCH_TIER_BROWSER, FETCH_TIER_CACHE
+from .request_interception import RequestInterceptor
+from .robots_cache import RobotsCache
+from .link_scorer import LinkScorer
+from .stop_policy import CrawlProgress, CrawlStopPolicies
+from .url_discovery import UrlDiscovery
+from .response_cache import ResponseCache
+from .dns_resolver import AsyncDnsResolver
+from ..regex_extractor_component import extract_numbers_with_snippets_from_text, extract_numbers_from_tel_hrefs, merge_tel_href_candidates, tel_hrefs_path_for_page_file
 
 # Instantiate AppConfig for scraper_logic
 config_instance = AppConfig()
@@ -23,6 +33,16 @@ config_instance = AppConfig()
 # Setup logger for this module
 logger = logging.getLogger(__name__)
 
+# Compiled keyword matchers for link scoring, built on first use (see `_get_link_scorer`).
+_link_scorer: Optional[LinkScorer] = None
+
+# lxml is several times faster than the pure-Python 'html.parser'; use it when installed.
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
 def normalize_url(url: str) -> str:
     """
     Normalizes a URL to a canonical form.
@@ -114,22 +134,29 @@ async def fetch_page_content(page, url: str, input_row_id: Any, company_name_or_
         logger.error(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Unexpected error fetching page {url}: {type(e).__name__} - {e}", exc_info=True)
         return None, -5 # Generic exception
 
-def extract_text_from_html(html_content: str) -> str:
-    if not html_content: return ""
-    soup = BeautifulSoup(html_content, 'html.parser')
+@dataclass
+class PageAnalysis:
+    """Everything the scraper needs from one page, produced by a single HTML parse."""
+    cleaned_text: str
+    scored_links: List[Tuple[str, int]]
+    tel_hrefs: List[str]
+    page_type: str
+
+
+def _parse_html(html_content: str) -> BeautifulSoup:
+    return BeautifulSoup(html_content, HTML_PARSER)
+
+def _extract_text_from_soup(soup: BeautifulSoup) -> str:
+    """Returns the visible text of `soup`. Removes <script>/<style> from the tree in place."""
     for script_or_style in soup(["script", "style"]):
         script_or_style.decompose()
     text = soup.get_text(separator=' ', strip=True)
     text = re.sub(r'\s+', ' ', text).strip()
     return text
 
-def find_internal_links(html_content: str, base_url: str, input_row_id: Any, company_name_or_id: str) -> List[Tuple[str, int]]:
-    if not html_content: return []
-    scored_links: List[Tuple[str, int]] = []
-    soup = BeautifulSoup(html_content, 'html.parser')
-    normalized_base_url_str = normalize_url(base_url)
-    parsed_base_url = urlparse(normalized_base_url_str)
-
+def _iter_anchor_hrefs(soup: BeautifulSoup) -> List[Tuple[Tag, str]]:
+    """Returns (anchor tag, stripped href) for every <a> with a non-empty href."""
+    anchors: List[Tuple[Tag, str]] = []
     for link_tag in soup.find_all('a', href=True):
         if not isinstance(link_tag, Tag): continue
         href_attr = link_tag.get('href')
@@ -137,6 +164,23 @@ def find_internal_links(html_content: str, base_url: str, input_row_id: Any, com
         if isinstance(href_attr, str): current_href = href_attr.strip()
         elif isinstance(href_attr, list) and href_attr and isinstance(href_attr[0], str): current_href = href_attr[0].strip()
         if not current_href: continue
+        anchors.append((link_tag, current_href))
+    return anchors
+
+def _get_link_scorer() -> LinkScorer:
+    """Returns the compiled link scorer for the current `config_instance`, rebuilding it if the config was replaced."""
+    global _link_scorer
+    if _link_scorer is None or _link_scorer.config is not config_instance:
+        _link_scorer = LinkScorer(config_instance)
+    return _link_scorer
+
+def _score_internal_links(anchors: List[Tuple[Tag, str]], base_url: str, input_row_id: Any, company_name_or_id: str) -> List[Tuple[str, int]]:
+    scored_links: List[Tuple[str, int]] = []
+    link_scorer = _get_link_scorer()
+    normalized_base_url_str = normalize_url(base_url)
+    parsed_base_url = urlparse(normalized_base_url_str)
+
+    for link_tag, current_href in anchors:
 
         absolute_url_raw = urljoin(base_url, current_href)
         normalized_link_url = normalize_url(absolute_url_raw)
@@ -146,64 +190,16 @@ def find_internal_links(html_content: str, base_url: str, input_row_id: Any, com
         if parsed_normalized_link.netloc != parsed_base_url.netloc: continue
 
         link_text = link_tag.get_text().lower().strip()
-        link_href_lower = normalized_link_url.lower()
-        initial_keyword_match = False
-        if config_instance.target_link_keywords:
-            if any(kw in link_text for kw in config_instance.target_link_keywords) or \
-               any(kw in link_href_lower for kw in config_instance.target_link_keywords):
-                initial_keyword_match = True
-        if not initial_keyword_match: continue
-
-        if config_instance.scraper_exclude_link_path_patterns:
-            path_lower = parsed_normalized_link.path.lower()
-            if any(p and p in path_lower for p in config_instance.scraper_exclude_link_path_patterns):
-                logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Link '{normalized_link_url}' hard excluded by pattern in path: '{path_lower}'.")
-                continue
-        
-        score = 0
-        path_segments = [seg for seg in parsed_normalized_link.path.lower().strip('/').split('/') if seg]
-        num_segments = len(path_segments)
-
-        if config_instance.scraper_critical_priority_keywords:
-            for crit_kw in config_instance.scraper_critical_priority_keywords:
-                if any(seg == crit_kw for seg in path_segments):
-                    current_score_val = 100
-                    if num_segments > config_instance.scraper_max_keyword_path_segments:
-                        current_score_val -= min(20, (num_segments - config_instance.scraper_max_keyword_path_segments) * 5)
-                    score = max(score, current_score_val)
-                    if score >= 100: break
-            if score >= 100: pass
-
-        if score < 90 and config_instance.scraper_high_priority_keywords:
-            for high_kw in config_instance.scraper_high_priority_keywords:
-                if any(seg == high_kw for seg in path_segments):
-                    current_score_val = 90
-                    if num_segments > config_instance.scraper_max_keyword_path_segments:
-                        current_score_val -= min(20, (num_segments - config_instance.scraper_max_keyword_path_segments) * 5)
-                    score = max(score, current_score_val)
-                    if score >= 90: break
-            if score >= 90: pass
-        
-        if score < 80:
-            combined_keywords = list(set(config_instance.scraper_critical_priority_keywords + config_instance.scraper_high_priority_keywords))
-            if combined_keywords:
-                for p_kw in combined_keywords:
-                    for i, seg in enumerate(path_segments):
-                        if seg == p_kw:
-                            current_score_val = 80 - (i * 5)
-                            if num_segments > config_instance.scraper_max_keyword_path_segments:
-                                current_score_val -= min(15, (num_segments - config_instance.scraper_max_keyword_path_segments) * 5)
-                            score = max(score, current_score_val)
-                            break 
-                    if score >= 80: break
-        
-        if score < 50 and config_instance.target_link_keywords:
-            if any(tk in seg for tk in config_instance.target_link_keywords for seg in path_segments):
-                score = max(score, 50)
-        
-        if score < 40 and config_instance.target_link_keywords:
-            if any(tk in link_text for tk in config_instance.target_link_keywords):
-                score = max(score, 40)
+        link_text_matched = link_scorer.matches_target(link_text)
+        if not link_text_matched and not link_scorer.matches_target(normalized_link_url.lower()): continue
+
+        path_lower = parsed_normalized_link.path.lower()
+        if link_scorer.is_excluded(path_lower):
+            logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Link '{normalized_link_url}' hard excluded by pattern in path: '{path_lower}'.")
+            continue
+
+        path_segments = [seg for seg in path_lower.strip('/').split('/') if seg]
+        score = link_scorer.score_path(path_segments, link_text_matched)
 
         if score >= config_instance.scraper_min_score_to_queue:
             log_text_snippet = link_text[:50].replace('\n', ' ')
@@ -216,35 +212,40 @@ def find_internal_links(html_content: str, base_url: str, input_row_id: Any, com
     logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] From page {base_url}, found {len(scored_links)} internal links meeting score criteria.")
     return scored_links
 
-async def is_allowed_by_robots(url: str, client: httpx.AsyncClient, input_row_id: Any, company_name_or_id: str) -> bool:
+def extract_text_from_html(html_content: str) -> str:
+    if not html_content: return ""
+    return _extract_text_from_soup(_parse_html(html_content))
+
+def find_internal_links(html_content: str, base_url: str, input_row_id: Any, company_name_or_id: str) -> List[Tuple[str, int]]:
+    if not html_content: return []
+    return _score_internal_links(_iter_anchor_hrefs(_parse_html(html_content)), base_url, input_row_id, company_name_or_id)
+
+def analyze_page(html_content: str, landed_url: str, input_row_id: Any, company_name_or_id: str, discover_links: bool = True) -> PageAnalysis:
+    """
+    Parses `html_content` once and returns its cleaned text, scored internal links
+    (only if `discover_links`), `tel:` hrefs and page type.
+
+    Equivalent to calling `extract_text_from_html`, `find_internal_links` and
+    `_classify_page_type` separately, which would parse the page twice.
+    """
+    page_type = _classify_page_type(landed_url, config_instance)
+    if not html_content:
+        return PageAnalysis(cleaned_text="", scored_links=[], tel_hrefs=[], page_type=page_type)
+    soup = _parse_html(html_content)
+    anchors = _iter_anchor_hrefs(soup)
+    tel_hrefs = [href for _, href in anchors if href.lower().startswith('tel:')]
+    scored_links = _score_internal_links(anchors, landed_url, input_row_id, company_name_or_id) if discover_links else []
+    # Text extraction mutates the tree (drops <script>/<style>), so it runs after the link pass.
+    cleaned_text = _extract_text_from_soup(soup)
+    return PageAnalysis(cleaned_text=cleaned_text, scored_links=scored_links, tel_hrefs=tel_hrefs, page_type=page_type)
+
+async def is_allowed_by_robots(url: str, crawl_frontier: CrawlFrontier, input_row_id: Any, company_name_or_id: str) -> bool:
+    """Checks `url` against its host's robots.txt through the frontier's shared `RobotsCache`."""
     if not config_instance.respect_robots_txt:
         logger.debug(f"[RowID: {input_row_id}, Company: {company_name_or_id}] robots.txt check is disabled.")
         return True
-    parsed_url = urlparse(url)
-    robots_url = f"{parsed_url.scheme}://{parsed_url.netloc}/robots.txt"
-    rp = RobotFileParser()
-    try:
-        logger.debug(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Fetching robots.txt from: {robots_url}")
-        response = await client.get(robots_url, timeout=10, headers={'User-Agent': config_instance.robots_txt_user_agent})
-        if response.status_code == 200:
-            logger.debug(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Successfully fetched robots.txt for {url}, status: {response.status_code}")
-            rp.parse(response.text.splitlines())
-        elif response.status_code == 404:
-            logger.debug(f"[RowID: {input_row_id}, Company: {company_name_or_id}] robots.txt not found at {robots_url} (status 404), assuming allowed.")
-            return True
-        else:
-            logger.warning(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Failed to fetch robots.txt from {robots_url}, status: {response.status_code}. Assuming allowed.")
-            return True
-    except httpx.RequestError as e:
-        logger.warning(f"[RowID: {input_row_id}, Company: {company_name_or_id}] httpx.RequestError fetching robots.txt from {robots_url}: {e}. Assuming allowed.")
-        return True
-    except Exception as e:
-        logger.error(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Unexpected error processing robots.txt for {robots_url}: {e}. Assuming allowed.", exc_info=True)
-        return True
-    allowed = rp.can_fetch(config_instance.robots_txt_user_agent, url)
-    if not allowed:
-        logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Scraping disallowed by robots.txt for URL: {url} (User-agent: {config_instance.robots_txt_user_agent})")
-    else:
+    allowed = await crawl_frontier.is_allowed(url, input_row_id, company_name_or_id)
+    if allowed:
         logger.debug(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Scraping allowed by robots.txt for URL: {url}")
     return allowed
 
@@ -285,17 +286,87 @@ def _classify_page_type(url_str: str, config: AppConfig) -> str:
     return "general_content"
 
 
+async def _fetch_page_tiered(
+    url: str,
+    browser_pool: BrowserPool,
+    crawl_frontier: CrawlFrontier,
+    http_fetcher: Optional[HttpFetcher],
+    input_row_id: Any,
+    company_name_or_id: str,
+    response_cache: Optional[ResponseCache] = None
+) -> Tuple[Optional[str], Optional[int], str, str]:
+    """
+    Fetches a single page, first waiting for a politeness slot on its host.
+
+    A fresh `response_cache` entry is returned without any request. A stale entry
+    is revalidated with a conditional GET on the HTTP tier and reused on `304`.
+    Otherwise the page is tried with a plain HTTP GET first (if `http_fetcher` is
+    given) and only escalated to a leased browser context when the response looks
+    JS-rendered, is not HTML, or failed. Browser contexts are leased only after the
+    host slot is granted, so waiting rows never hold an idle browser.
+
+    Returns (html_content, status_code, landed_url, fetch_tier).
+    """
+    cached = await response_cache.lookup(url) if response_cache is not None else None
+    if cached is not None and response_cache.is_fresh(cached):
+        response_cache.record_hit()
+        logger.debug(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Response cache hit for {url} (cached from {cached.fetch_tier} tier).")
+        return cached.html, cached.status_code, cached.final_url, FETCH_TIER_CACHE
+
+    response_headers: Dict[str, str] = {}
+    async with crawl_frontier.host_slot(url, input_row_id, company_name_or_id):
+        if http_fetcher is not None:
+            http_result = await http_fetcher.fetch(
+                url, input_row_id, company_name_or_id,
+                conditional_headers=cached.conditional_headers() if cached is not None else None
+            )
+            if http_result.not_modified and cached is not None:
+                await response_cache.record_revalidated(cached)
+                return cached.html, cached.status_code, cached.final_url, FETCH_TIER_CACHE
+            response_headers = http_result.headers
+            if not http_result.needs_browser:
+                if cached is not None:
+                    response_cache.record_stale_refetch()
+                if response_cache is not None and http_result.html:
+                    await response_cache.store(url, http_result.html, http_result.status_code, http_result.final_url, FETCH_TIER_HTTP, response_headers)
+                return http_result.html, http_result.status_code, http_result.final_url, FETCH_TIER_HTTP
+        async with browser_pool.lease_context(input_row_id, company_name_or_id) as playwright_context:
+            page = await playwright_context.new_page()
+            try:
+                page.set_default_timeout(config_instance.default_page_timeout)
+                html_content, status_code = await fetch_page_content(page, url, input_row_id, company_name_or_id)
+                landed_url = page.url
+            finally:
+                if not page.is_closed():
+                    await page.close()
+            browser_pool.record_page_fetched(playwright_context)
+    if cached is not None:
+        response_cache.record_stale_refetch()
+    if response_cache is not None and html_content:
+        # Validators from the HTTP-tier response (if any) let the rendered page be revalidated next time.
+        await response_cache.store(url, html_content, status_code, landed_url, FETCH_TIER_BROWSER, response_headers)
+    return html_content, status_code, landed_url, FETCH_TIER_BROWSER
+
+
 async def _perform_scrape_for_entry_point(
     entry_url_to_process: str,
-    playwright_context, # Existing Playwright browser context
+    browser_pool: BrowserPool,
+    crawl_frontier: CrawlFrontier,
     output_dir_for_run: str,
     company_name_or_id: str,
     globally_processed_urls: Set[str], # Shared across all entry point attempts for the original given_url
-    input_row_id: Any
-) -> Tuple[List[Tuple[str, str, str]], str, Optional[str]]:
+    input_row_id: Any,
+    http_fetcher: Optional[HttpFetcher] = None,
+    stop_policies: Optional[CrawlStopPolicies] = None,
+    url_discovery: Optional[UrlDiscovery] = None,
+    response_cache: Optional[ResponseCache] = None
+) -> Tuple[List[Tuple[str, str, str, str]], str, Optional[str]]:
     """
     Core scraping logic for a single entry point URL and its children.
-    This function contains the main `while urls_to_scrape` loop.
+    This function contains the main `while urls_to_scrape` loop. If any of the
+    enabled `stop_policies` fires after a page is saved, the loop ends early.
+    Once the entry page is fetched, `url_discovery` seeds the queue with likely
+    imprint/contact URLs from the sitemap and well-known paths.
     """
     start_time_entry = time.time()
     # final_canonical_entry_url_for_this_attempt will be the canonical URL derived *from this specific entry_url_to_process*
@@ -313,24 +384,26 @@ async def _perform_scrape_for_entry_point(
         for_url=False,
         max_len=config_instance.filename_company_name_max_len
     )
-    scraped_page_details_for_this_entry: List[Tuple[str, str, str]] = []
+    scraped_page_details_for_this_entry: List[Tuple[str, str, str, str]] = []
     
     # Queue for this specific entry point attempt
-    urls_to_scrape_q: List[Tuple[str, int, int]] = [(entry_url_to_process, 0, 100)]
-    # processed_urls_this_entry_call tracks URLs processed starting from *this* entry_url_to_process
+    # The queue also remembers every URL queued or landed on starting from *this* entry_url_to_process,
     # to avoid loops within its own scraping process.
-    processed_urls_this_entry_call: Set[str] = {entry_url_to_process}
-
-    # Use the passed Playwright context to create a new page for this entry attempt
-    page = await playwright_context.new_page()
-    page.set_default_timeout(config_instance.default_page_timeout)
+    urls_to_scrape_q = UrlPriorityQueue()
+    urls_to_scrape_q.push(entry_url_to_process, 0, 100)
+    crawl_frontier.note_enqueued(1)
     
     entry_point_status_code: Optional[int] = None # To store status of the entry point itself
 
+    crawl_progress: Optional[CrawlProgress] = None
+    if stop_policies is not None and stop_policies.enabled:
+        crawl_progress = CrawlProgress()
+        stop_policies.entry_points_evaluated += 1
+
     try:
         while urls_to_scrape_q:
-            urls_to_scrape_q.sort(key=lambda x: (-x[2], x[1]))
-            current_url_from_queue, current_depth, current_score = urls_to_scrape_q.pop(0)
+            current_url_from_queue, current_depth, current_score = urls_to_scrape_q.pop()
+            crawl_frontier.note_dequeued(1)
             
             logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}, Entry: {entry_url_to_process}] Dequeuing URL: '{current_url_from_queue}' (Depth: {current_depth}, Score: {current_score}, Queue: {len(urls_to_scrape_q)})")
 
@@ -344,8 +417,16 @@ async def _perform_scrape_for_entry_point(
                 else: # Bypass for high priority
                     logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}, Entry: {entry_url_to_process}] Page limit reached, but processing high-priority '{current_url_from_queue}'.")
 
+            # Every frontier URL is checked against the host's cached robots.txt, not only the entry URL.
+            if not await is_allowed_by_robots(current_url_from_queue, crawl_frontier, input_row_id, company_name_or_id):
+                if current_url_from_queue == entry_url_to_process and current_depth == 0:
+                    return [], "RobotsDisallowed", None
+                continue
 
-            html_content, status_code_fetch = await fetch_page_content(page, current_url_from_queue, input_row_id, company_name_or_id)
+            html_content, status_code_fetch, final_landed_url_raw, fetch_tier = await _fetch_page_tiered(
+                current_url_from_queue, browser_pool, crawl_frontier, http_fetcher, input_row_id, company_name_or_id,
+                response_cache=response_cache
+            )
             
             if current_url_from_queue == entry_url_to_process and current_depth == 0: # This is the fetch for the entry point itself
                 entry_point_status_code = status_code_fetch
@@ -357,10 +438,9 @@ async def _perform_scrape_for_entry_point(
                    current_score >= config_instance.scraper_score_threshold_for_limit_bypass:
                     high_priority_pages_scraped_after_limit_entry +=1
 
-                final_landed_url_raw = page.url
                 final_landed_url_normalized = normalize_url(final_landed_url_raw)
                 
-                logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}, Entry: {entry_url_to_process}] Page fetch: Req='{current_url_from_queue}', LandedNorm='{final_landed_url_normalized}', Status: {status_code_fetch}")
+                logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}, Entry: {entry_url_to_process}] Page fetch: Req='{current_url_from_queue}', LandedNorm='{final_landed_url_normalized}', Status: {status_code_fetch}, Tier: {fetch_tier}")
 
                 if not final_canonical_entry_url_for_this_attempt and current_depth == 0:
                     final_canonical_entry_url_for_this_attempt = final_landed_url_normalized
@@ -371,10 +451,22 @@ async def _perform_scrape_for_entry_point(
                     continue
                 
                 globally_processed_urls.add(final_landed_url_normalized)
-                processed_urls_this_entry_call.add(final_landed_url_normalized)
+                urls_to_scrape_q.mark_seen(final_landed_url_normalized)
+
+                if url_discovery is not None and current_depth == 0:
+                    seeded_count = 0
+                    for seed_url, seed_score in await url_discovery.discover(final_landed_url_normalized, input_row_id, company_name_or_id):
+                        seed_url_normalized = normalize_url(seed_url)
+                        if seed_url_normalized not in globally_processed_urls and urls_to_scrape_q.push(seed_url_normalized, 1, seed_score):
+                            seeded_count += 1
+                    crawl_frontier.note_enqueued(seeded_count)
 
                 # ... (rest of content saving and link extraction logic from original function, lines 394-433)
-                cleaned_text = extract_text_from_html(html_content)
+                # One parse per page: cleaned text, scored links, tel: hrefs and page type.
+                page_analysis = analyze_page(
+                    html_content, final_landed_url_normalized, input_row_id, company_name_or_id,
+                    discover_links=current_depth < config_instance.max_depth_internal_links
+                )
                 parsed_landed_url = urlparse(final_landed_url_normalized)
                 source_domain = parsed_landed_url.netloc
                 safe_source_name = re.sub(r'^www\.', '', source_domain)
@@ -388,21 +480,54 @@ async def _perform_scrape_for_entry_point(
                 
                 try:
                     with open(cleaned_page_filepath, 'w', encoding='utf-8') as f_cleaned_page:
-                        f_cleaned_page.write(cleaned_text)
-                    page_type = _classify_page_type(final_landed_url_normalized, config_instance)
-                    scraped_page_details_for_this_entry.append((cleaned_page_filepath, final_landed_url_normalized, page_type))
+                        f_cleaned_page.write(page_analysis.cleaned_text)
+                    # Read back by the regex stage (`read_tel_hrefs_for_page_file`); numbers behind tel: links are candidates too.
+                    tel_hrefs_filepath = tel_hrefs_path_for_page_file(cleaned_page_filepath)
+                    if page_analysis.tel_hrefs:
+                        with open(tel_hrefs_filepath, 'w', encoding='utf-8') as f_tel_hrefs:
+                            f_tel_hrefs.write('\n'.join(page_analysis.tel_hrefs) + '\n')
+                    elif os.path.exists(tel_hrefs_filepath):
+                        os.remove(tel_hrefs_filepath) # Left over from an earlier run of this page
+                    scraped_page_details_for_this_entry.append((cleaned_page_filepath, final_landed_url_normalized, page_analysis.page_type, fetch_tier))
                 except IOError as e:
                     logger.error(f"[RowID: {input_row_id}, Company: {company_name_or_id}] IOError saving cleaned text for '{final_landed_url_normalized}': {e}")
 
+                if crawl_progress is not None:
+                    target_country_numbers: List[str] = []
+                    if stop_policies.needs_numbers_for(page_analysis.page_type):
+                        stop_policies.pages_regex_scanned += 1
+                        page_numbers = await asyncio.to_thread(
+                            extract_numbers_with_snippets_from_text,
+                            text_content=page_analysis.cleaned_text,
+                            source_url=final_landed_url_normalized,
+                            original_input_company_name=company_name_or_id,
+                            target_country_codes=config_instance.target_country_codes,
+                            snippet_window_chars=config_instance.snippet_window_chars
+                        )
+                        page_numbers = merge_tel_href_candidates(page_numbers, extract_numbers_from_tel_hrefs(
+                            page_analysis.tel_hrefs, final_landed_url_normalized, company_name_or_id, config_instance.target_country_codes
+                        ))
+                        target_country_numbers = stop_policies.filter_target_country_numbers(item["number"] for item in page_numbers)
+                    crawl_progress.record_page(page_analysis.page_type, target_country_numbers)
+                    fired_policy = stop_policies.check(crawl_progress)
+                    if fired_policy:
+                        # Estimate of the fetches avoided: what is still queued, bounded by the remaining page budget.
+                        pages_saved = len(urls_to_scrape_q)
+                        if config_instance.scraper_max_pages_per_domain > 0:
+                            remaining_budget = max(0, config_instance.scraper_max_pages_per_domain - pages_scraped_this_entry_count) + \
+                                max(0, config_instance.scraper_max_high_priority_pages_after_limit - high_priority_pages_scraped_after_limit_entry)
+                            pages_saved = min(pages_saved, remaining_budget)
+                        stop_policies.record_stop(fired_policy, pages_saved)
+                        logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}, Entry: {entry_url_to_process}] Stop policy '{fired_policy}' fired after {pages_scraped_this_entry_count} page(s). Skipping {len(urls_to_scrape_q)} queued URL(s) (est. {pages_saved} fetches saved).")
+                        break
+
                 if current_depth < config_instance.max_depth_internal_links:
-                    newly_found_links_with_scores = find_internal_links(html_content, final_landed_url_normalized, input_row_id, company_name_or_id)
                     added_to_queue_count = 0
-                    for link_url, link_score in newly_found_links_with_scores:
-                        if link_url not in globally_processed_urls and link_url not in processed_urls_this_entry_call:
-                            urls_to_scrape_q.append((link_url, current_depth + 1, link_score))
-                            processed_urls_this_entry_call.add(link_url)
+                    for link_url, link_score in page_analysis.scored_links:
+                        # Already-queued links rediscovered with a higher score are re-prioritized, not re-added.
+                        if link_url not in globally_processed_urls and urls_to_scrape_q.push(link_url, current_depth + 1, link_score):
                             added_to_queue_count +=1
-                    if added_to_queue_count > 0: urls_to_scrape_q.sort(key=lambda x: (-x[2], x[1]))
+                    crawl_frontier.note_enqueued(added_to_queue_count)
             else: # html_content is None
                 logger.warning(f"[RowID: {input_row_id}, Company: {company_name_or_id}, Entry: {entry_url_to_process}] Failed to fetch content from '{current_url_from_queue}'. Status code: {status_code_fetch}.")
                 if current_url_from_queue == entry_url_to_process and current_depth == 0: # Critical failure on the entry point itself
@@ -415,11 +540,9 @@ async def _perform_scrape_for_entry_point(
                     else: http_status_report = "NoStatusFromServer"
                     
                     logger.error(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Critical failure on entry point '{entry_url_to_process}'. Scraper status: {http_status_report}.")
-                    await page.close()
                     return [], http_status_report, None # No canonical URL if entry point fails critically
         
         # After loop for this entry point
-        await page.close()
         if scraped_page_details_for_this_entry:
             logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}, Entry: {entry_url_to_process}] Successfully scraped {len(scraped_page_details_for_this_entry)} pages.")
             return scraped_page_details_for_this_entry, "Success", final_canonical_entry_url_for_this_attempt
@@ -435,8 +558,10 @@ async def _perform_scrape_for_entry_point(
             return [], final_status_for_this_entry, final_canonical_entry_url_for_this_attempt # Return canonical if it was set by a successful landing, even if no sub-pages
     except Exception as e_entry_scrape:
         logger.error(f"[RowID: {input_row_id}, Company: {company_name_or_id}, Entry: {entry_url_to_process}] General error during scraping process: {type(e_entry_scrape).__name__} - {e_entry_scrape}", exc_info=True)
-        if page.is_closed() == False : await page.close()
         return [], f"GeneralScrapingError_{type(e_entry_scrape).__name__}", final_canonical_entry_url_for_this_attempt
+    finally:
+        # Anything still queued for this entry point is abandoned; keep the global frontier depth accurate.
+        crawl_frontier.note_dequeued(len(urls_to_scrape_q))
 
 
 async def scrape_website(
@@ -444,8 +569,35 @@ async def scrape_website(
     output_dir_for_run: str,
     company_name_or_id: str,
     globally_processed_urls: Set[str],
-    input_row_id: Any
-) -> Tuple[List[Tuple[str, str, str]], str, Optional[str]]:
+    input_row_id: Any,
+    browser_pool: Optional[BrowserPool] = None,
+    crawl_frontier: Optional[CrawlFrontier] = None,
+    http_fetcher: Optional[HttpFetcher] = None,
+    stop_policies: Optional[CrawlStopPolicies] = None,
+    url_discovery: Optional[UrlDiscovery] = None,
+    response_cache: Optional[ResponseCache] = None,
+    dns_resolver: Optional[AsyncDnsResolver] = None
+) -> Tuple[List[Tuple[str, str, str, str]], str, Optional[str]]:
+    """
+    Scrapes a website starting from `given_url`, following prioritized internal links.
+
+    Each page is fetched with `http_fetcher` first (when SCRAPER_HTTP_FIRST_ENABLED)
+    and escalated to a browser context leased from `browser_pool` only when needed,
+    after the page's host has been granted a politeness slot by `crawl_frontier`.
+    Every URL is checked against robots.txt through the frontier's `RobotsCache`.
+    The crawl of an entry point stops early when one of `stop_policies` fires
+    (built from SCRAPER_STOP_POLICIES if not passed). If SCRAPER_URL_DISCOVERY_ENABLED,
+    sitemap/well-known path seeds from `url_discovery` are crawled first. Pages
+    are served from / stored in `response_cache` when one is passed. Entry points
+    (including DNS-fallback variants) whose host does not resolve according to
+    `dns_resolver` are rejected without starting a fetch.
+    If no pool/frontier/fetcher is passed, call-local ones are created and closed
+    before returning, which is only appropriate for standalone use (e.g.,
+    `_test_scraper`).
+
+    Returns a list of (cleaned_text_path, landed_url, page_type, fetch_tier) tuples,
+    the scraper status, and the canonical entry URL.
+    """
     start_time = time.time()
     logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Starting scrape_website for original URL: {given_url}")
 
@@ -456,10 +608,28 @@ async def scrape_website(
         logger.warning(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Invalid URL after normalization: {normalized_given_url}")
         return [], "InvalidURL", None
 
+    if stop_policies is None:
+        stop_policies = CrawlStopPolicies(config_instance)
+    owns_robots_cache = crawl_frontier is None
+    if crawl_frontier is None:
+        crawl_frontier = CrawlFrontier(config_instance, robots_cache=RobotsCache(config_instance))
+    owns_http_fetcher = http_fetcher is None
+    if http_fetcher is None:
+        http_fetcher = HttpFetcher(config_instance)
+
+    if dns_resolver is None:
+        dns_resolver = AsyncDnsResolver(config_instance)
+
+    if url_discovery is None and config_instance.scraper_url_discovery_enabled:
+        url_discovery = UrlDiscovery(config_instance, http_fetcher.client, crawl_frontier, link_scorer=_get_link_scorer())
+
     # Initial robots.txt check for the very first normalized URL
-    async with httpx.AsyncClient(follow_redirects=True, verify=False) as http_client:
-        if not await is_allowed_by_robots(normalized_given_url, http_client, input_row_id, company_name_or_id):
-            return [], "RobotsDisallowed", None
+    if not await is_allowed_by_robots(normalized_given_url, crawl_frontier, input_row_id, company_name_or_id):
+        if owns_http_fetcher:
+            await http_fetcher.close()
+        if owns_robots_cache and crawl_frontier.robots_cache is not None:
+            await crawl_frontier.robots_cache.close()
+        return [], "RobotsDisallowed", None
     
     # Prepare directories once
     base_scraped_content_dir = os.path.join(output_dir_for_run, config_instance.scraped_content_subdir)
@@ -474,103 +644,109 @@ async def scrape_website(
     
     last_dns_error_status = "DNSError_AllFallbacksExhausted" # Default if all fallbacks lead to DNS errors
 
-    async with async_playwright() as p:
-        browser = None
-        try:
-            browser = await p.chromium.launch(
-                headless=True,
-                args=['--no-sandbox', '--disable-setuid-sandbox', '--disable-dev-shm-usage']
-            )
-            # Create one context to be reused by _perform_scrape_for_entry_point attempts
-            # This means cookies/state might persist across fallback attempts for the same original given_url.
-            # If strict isolation is needed, context creation would move inside the loop.
-            playwright_context = await browser.new_context(
-                user_agent=config_instance.user_agent,
-                java_script_enabled=True,
-                ignore_https_errors=True
-            )
+    owns_browser_pool = browser_pool is None
+    if browser_pool is None:
+        browser_pool = BrowserPool(
+            config_instance, size=1,
+            request_interceptor=RequestInterceptor(config_instance) if config_instance.scraper_request_interception_enabled else None
+        )
 
-            while not entry_candidates_queue.empty():
-                current_entry_url_to_attempt = await entry_candidates_queue.get()
-                
+    try:
+        while not entry_candidates_queue.empty():
+            current_entry_url_to_attempt = await entry_candidates_queue.get()
+            
+            if not await dns_resolver.is_resolvable(urlparse(current_entry_url_to_attempt).hostname or ""):
+                logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Host of entry point {current_entry_url_to_attempt} does not resolve. Skipping navigation.")
+                details, status, canonical_landed = [], "DNSError", None
+            else:
                 logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Trying entry point: {current_entry_url_to_attempt}")
 
                 details, status, canonical_landed = await _perform_scrape_for_entry_point(
-                    current_entry_url_to_attempt, playwright_context, output_dir_for_run,
-                    company_name_or_id, globally_processed_urls, input_row_id
+                    current_entry_url_to_attempt, browser_pool, crawl_frontier, output_dir_for_run,
+                    company_name_or_id, globally_processed_urls, input_row_id,
+                    http_fetcher=http_fetcher if config_instance.scraper_http_first_enabled else None,
+                    stop_policies=stop_policies,
+                    url_discovery=url_discovery,
+                    response_cache=response_cache
                 )
 
-                if status != "DNSError": # Any success or non-DNS error is final for this given_url
-                    logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Entry point {current_entry_url_to_attempt} resulted in non-DNS status: {status}. Finalizing.")
-                    if browser.is_connected(): await browser.close()
-                    return details, status, canonical_landed
-                
-                # It was a DNSError for current_entry_url_to_attempt
-                last_dns_error_status = status # Store the most recent DNS error type
-                logger.warning(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Entry point {current_entry_url_to_attempt} failed with DNSError. Status: {status}.")
+            if status != "DNSError": # Any success or non-DNS error is final for this given_url
+                logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Entry point {current_entry_url_to_attempt} resulted in non-DNS status: {status}. Finalizing.")
+                return details, status, canonical_landed
 
-                if config_instance.enable_dns_error_fallbacks:
-                    generated_fallbacks_for_current_failed_entry: List[str] = []
+            # It was a DNSError for current_entry_url_to_attempt
+            last_dns_error_status = status # Store the most recent DNS error type
+            logger.warning(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Entry point {current_entry_url_to_attempt} failed with DNSError. Status: {status}.")
+
+            if config_instance.enable_dns_error_fallbacks:
+                generated_fallbacks_for_current_failed_entry: List[str] = []
+                
+                # Strategy 1: Hyphen Simplification
+                try:
+                    parsed_failed_entry = tldextract.extract(current_entry_url_to_attempt)
+                    domain_part = parsed_failed_entry.domain
+                    suffix_part = parsed_failed_entry.suffix
                     
-                    # Strategy 1: Hyphen Simplification
-                    try:
-                        parsed_failed_entry = tldextract.extract(current_entry_url_to_attempt)
-                        domain_part = parsed_failed_entry.domain
-                        suffix_part = parsed_failed_entry.suffix
-                        
-                        if '-' in domain_part:
-                            simplified_domain_part = domain_part.split('-', 1)[0]
-                            if simplified_domain_part:
-                                variant1_domain = f"{simplified_domain_part}.{suffix_part}"
-                                parsed_original_for_reconstruct = urlparse(current_entry_url_to_attempt)
-                                variant1_url = urlunparse((parsed_original_for_reconstruct.scheme, variant1_domain, parsed_original_for_reconstruct.path, parsed_original_for_reconstruct.params, parsed_original_for_reconstruct.query, parsed_original_for_reconstruct.fragment))
-                                variant1_url_normalized = normalize_url(variant1_url)
-                                if variant1_url_normalized not in attempted_entry_candidates_this_call:
-                                    logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] DNS Fallback (Hyphen): Adding '{variant1_url_normalized}' to try.")
-                                    generated_fallbacks_for_current_failed_entry.append(variant1_url_normalized)
-                    except Exception as e_tld_hyphen:
-                        logger.error(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Error during hyphen simplification for {current_entry_url_to_attempt}: {e_tld_hyphen}")
-
-                    # Strategy 2: TLD Swap (.de to .com) on current_entry_url_to_attempt (that just DNS-failed)
-                    try:
-                        parsed_failed_entry_for_tld_swap = tldextract.extract(current_entry_url_to_attempt)
-                        if parsed_failed_entry_for_tld_swap.suffix.lower() == 'de':
-                            variant2_domain = f"{parsed_failed_entry_for_tld_swap.domain}.com"
-                            parsed_original_for_reconstruct_tld = urlparse(current_entry_url_to_attempt)
-                            variant2_url = urlunparse((parsed_original_for_reconstruct_tld.scheme, variant2_domain, parsed_original_for_reconstruct_tld.path, parsed_original_for_reconstruct_tld.params, parsed_original_for_reconstruct_tld.query, parsed_original_for_reconstruct_tld.fragment))
-                            variant2_url_normalized = normalize_url(variant2_url)
-                            if variant2_url_normalized not in attempted_entry_candidates_this_call:
-                                logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] DNS Fallback (TLD Swap): Adding '{variant2_url_normalized}' to try.")
-                                generated_fallbacks_for_current_failed_entry.append(variant2_url_normalized)
-                    except Exception as e_tld_swap_main:
-                        logger.error(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Error during .de to .com TLD swap for {current_entry_url_to_attempt}: {e_tld_swap_main}")
-
-                    for fb_url in generated_fallbacks_for_current_failed_entry:
-                        if fb_url not in attempted_entry_candidates_this_call: # Double check before adding
-                           await entry_candidates_queue.put(fb_url)
-                           attempted_entry_candidates_this_call.add(fb_url)
-                else: # DNS fallbacks disabled
-                    logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] DNS fallbacks disabled. No further attempts for {current_entry_url_to_attempt}.")
-                    # If this was the last item in queue (i.e. normalized_given_url and no fallbacks added)
-                    # the loop will terminate and the last_dns_error_status will be returned.
-            
-            # If queue is exhausted
-            if browser and browser.is_connected(): await browser.close()
-            logger.error(f"[RowID: {input_row_id}, Company: {company_name_or_id}] All entry point attempts, including DNS fallbacks, exhausted for original URL: {given_url}. Last DNS status: {last_dns_error_status}")
-            return [], last_dns_error_status, None
-
-        except Exception as e_outer:
-            logger.error(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Outer error in scrape_website for '{given_url}': {type(e_outer).__name__} - {e_outer}", exc_info=True)
-            if browser and browser.is_connected(): await browser.close()
-            return [], f"OuterScrapingError_{type(e_outer).__name__}", None
-        finally:
-            if browser and browser.is_connected():
-                logger.debug(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Ensuring browser is closed in scrape_website's final 'finally' block.")
-                await browser.close()
-
-    # Fallback if Playwright setup itself failed before entering the async with block
-    logger.error(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Scrape_website ended, possibly due to Playwright launch failure for '{given_url}'.")
-    return [], "ScraperSetupFailure_Outer", None
+                    if '-' in domain_part:
+                        simplified_domain_part = domain_part.split('-', 1)[0]
+                        if simplified_domain_part:
+                            variant1_domain = f"{simplified_domain_part}.{suffix_part}"
+                            parsed_original_for_reconstruct = urlparse(current_entry_url_to_attempt)
+                            variant1_url = urlunparse((parsed_original_for_reconstruct.scheme, variant1_domain, parsed_original_for_reconstruct.path, parsed_original_for_reconstruct.params, parsed_original_for_reconstruct.query, parsed_original_for_reconstruct.fragment))
+                            variant1_url_normalized = normalize_url(variant1_url)
+                            if variant1_url_normalized not in attempted_entry_candidates_this_call:
+                                logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] DNS Fallback (Hyphen): Adding '{variant1_url_normalized}' to try.")
+                                generated_fallbacks_for_current_failed_entry.append(variant1_url_normalized)
+                except Exception as e_tld_hyphen:
+                    logger.error(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Error during hyphen simplification for {current_entry_url_to_attempt}: {e_tld_hyphen}")
+
+                # Strategy 2: TLD Swap (.de to .com) on current_entry_url_to_attempt (that just DNS-failed)
+                try:
+                    parsed_failed_entry_for_tld_swap = tldextract.extract(current_entry_url_to_attempt)
+                    if parsed_failed_entry_for_tld_swap.suffix.lower() == 'de':
+                        variant2_domain = f"{parsed_failed_entry_for_tld_swap.domain}.com"
+                        parsed_original_for_reconstruct_tld = urlparse(current_entry_url_to_attempt)
+                        variant2_url = urlunparse((parsed_original_for_reconstruct_tld.scheme, variant2_domain, parsed_original_for_reconstruct_tld.path, parsed_original_for_reconstruct_tld.params, parsed_original_for_reconstruct_tld.query, parsed_original_for_reconstruct_tld.fragment))
+                        variant2_url_normalized = normalize_url(variant2_url)
+                        if variant2_url_normalized not in attempted_entry_candidates_this_call:
+                            logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] DNS Fallback (TLD Swap): Adding '{variant2_url_normalized}' to try.")
+                            generated_fallbacks_for_current_failed_entry.append(variant2_url_normalized)
+                except Exception as e_tld_swap_main:
+                    logger.error(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Error during .de to .com TLD swap for {current_entry_url_to_attempt}: {e_tld_swap_main}")
+
+                # Resolve all fallback hosts at once; variants that do not exist are dropped before any fetch.
+                fallback_resolvable = await asyncio.gather(*(
+                    dns_resolver.is_resolvable(urlparse(fb_url).hostname or "") for fb_url in generated_fallbacks_for_current_failed_entry
+                ))
+                for fb_url, resolvable in zip(generated_fallbacks_for_current_failed_entry, fallback_resolvable):
+                    if not resolvable:
+                        logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] DNS Fallback: '{fb_url}' does not resolve. Not trying it.")
+                        attempted_entry_candidates_this_call.add(fb_url)
+                        continue
+                    if fb_url not in attempted_entry_candidates_this_call: # Double check before adding
+                       await entry_candidates_queue.put(fb_url)
+                       attempted_entry_candidates_this_call.add(fb_url)
+            else: # DNS fallbacks disabled
+                logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] DNS fallbacks disabled. No further attempts for {current_entry_url_to_attempt}.")
+                # If this was the last item in queue (i.e. normalized_given_url and no fallbacks added)
+                # the loop will terminate and the last_dns_error_status will be returned.
+        
+        # If queue is exhausted
+        logger.error(f"[RowID: {input_row_id}, Company: {company_name_or_id}] All entry point attempts, including DNS fallbacks, exhausted for original URL: {given_url}. Last DNS status: {last_dns_error_status}")
+        return [], last_dns_error_status, None
+
+    except Exception as e_outer:
+        logger.error(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Outer error in scrape_website for '{given_url}': {type(e_outer).__name__} - {e_outer}", exc_info=True)
+        return [], f"OuterScrapingError_{type(e_outer).__name__}", None
+    finally:
+        if owns_browser_pool:
+            logger.debug(f"[RowID: {input_row_id}, Company: {company_name_or_id}] Closing call-local browser pool in scrape_website's final 'finally' block.")
+            await browser_pool.close()
+        if owns_http_fetcher:
+            await http_fetcher.close()
+        if owns_robots_cache and crawl_frontier.robots_cache is not None:
+            await crawl_frontier.robots_cache.close()
+
 
 # TODO: [FutureEnhancement] The _test_scraper function below was for demonstrating and testing
 # the scrape_website functionality directly. It includes setup for logging and test output.
@@ -625,9 +801,9 @@ async def _test_scraper():
 
     if scraped_items_with_type:
         logger.info(f"Test successful: {len(scraped_items_with_type)} page(s) scraped. Status: {status}. Canonical URL: {canonical_url}")
-        # Adjust loop to handle the new tuple structure (path, url, type)
-        for item_path, source_url, page_type in scraped_items_with_type:
-            logger.info(f"  - Saved: {item_path} (from: {source_url}, type: {page_type})")
+        # Adjust loop to handle the new tuple structure (path, url, type, fetch tier)
+        for item_path, source_url, page_type, fetch_tier in scraped_items_with_type:
+            logger.info(f"  - Saved: {item_path} (from: {source_url}, type: {page_type}, tier: {fetch_tier})")
     else:
         logger.error(f"Test failed: Status: {status}. Canonical URL: {canonical_url}")
 
@@ -0,0 +1,136 @@
+"""
+Pluggable early-stop policies for the per-entry-point crawl.
+
+Without a stop policy the scraper keeps crawling up to
+SCRAPER_MAX_PAGES_PER_DOMAIN (plus limit-bypass pages) even when the imprint and
+contact pages have already been found. A `StopPolicy` inspects a
+`CrawlProgress` after every saved page and tells the crawl to stop early.
+Policies may ask for in-crawl regex extraction on certain page types; only
+those pages are scanned during the crawl.
+
+Policies are selected by name with SCRAPER_STOP_POLICIES (comma-separated; the
+crawl stops as soon as any of them fires). New policies are added by
+subclassing `StopPolicy` and registering them in `STOP_POLICIES`.
+"""
+import logging
+from abc import ABC, abstractmethod
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Type
+
+import phonenumbers
+
+from ..core.config import AppConfig
+
+logger = logging.getLogger(__name__)
+
+
+class CrawlProgress:
+    """What the crawl of one entry point has produced so far."""
+
+    def __init__(self):
+        self.pages_scraped: int = 0
+        self.page_types_visited: Set[str] = set()
+        self.target_country_numbers_by_page_type: Dict[str, Set[str]] = {}  # page type -> E.164 numbers
+
+    def record_page(self, page_type: str, target_country_numbers: Iterable[str] = ()) -> None:
+        self.pages_scraped += 1
+        self.page_types_visited.add(page_type)
+        numbers = set(target_country_numbers)
+        if numbers:
+            self.target_country_numbers_by_page_type.setdefault(page_type, set()).update(numbers)
+
+
+class StopPolicy(ABC):
+    """Base class for early-stop rules."""
+
+    name: str = "base"
+    # Page types whose text should be regex-scanned during the crawl for this policy.
+    page_types_needing_numbers: FrozenSet[str] = frozenset()
+
+    def __init__(self, config: AppConfig):
+        self.config = config
+
+    @abstractmethod
+    def should_stop(self, progress: CrawlProgress) -> bool:
+        """Whether the crawl that produced `progress` should stop now."""
+
+
+class ImprintAndContactStopPolicy(StopPolicy):
+    """Stops once an imprint page yielded a target-country number and a contact page was visited."""
+
+    name = "imprint_and_contact"
+    page_types_needing_numbers = frozenset({"imprint"})
+
+    def should_stop(self, progress: CrawlProgress) -> bool:
+        return bool(progress.target_country_numbers_by_page_type.get("imprint")) and "contact" in progress.page_types_visited
+
+
+STOP_POLICIES: Dict[str, Type[StopPolicy]] = {
+    ImprintAndContactStopPolicy.name: ImprintAndContactStopPolicy,
+}
+
+
+class CrawlStopPolicies:
+    """
+    The stop policies configured for a run, plus per-policy counters.
+
+    One instance is shared by all scrape calls; each entry-point crawl keeps its
+    own `CrawlProgress`.
+    """
+
+    def __init__(self, config: AppConfig, policy_names: Optional[List[str]] = None):
+        self.config = config
+        self.target_country_codes: Set[str] = {code.upper() for code in config.target_country_codes}
+        names = policy_names if policy_names is not None else config.scraper_stop_policies
+        self.policies: List[StopPolicy] = []
+        for name in names:
+            policy_class = STOP_POLICIES.get(name)
+            if policy_class is None:
+                logger.warning(f"Unknown stop policy '{name}' in SCRAPER_STOP_POLICIES. Known policies: {sorted(STOP_POLICIES)}. Ignoring it.")
+                continue
+            self.policies.append(policy_class(config))
+        self._page_types_needing_numbers: FrozenSet[str] = frozenset().union(*(p.page_types_needing_numbers for p in self.policies))
+
+        self.entry_points_evaluated: int = 0
+        self.pages_regex_scanned: int = 0
+        self.stats_by_policy: Dict[str, Dict[str, int]] = {
+            p.name: {"early_stops": 0, "pages_saved": 0} for p in self.policies
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.policies)
+
+    def needs_numbers_for(self, page_type: str) -> bool:
+        return page_type in self._page_types_needing_numbers
+
+    def filter_target_country_numbers(self, e164_numbers: Iterable[str]) -> List[str]:
+        """Keeps the E.164 numbers whose region is one of TARGET_COUNTRY_CODES."""
+        kept: List[str] = []
+        for number in e164_numbers:
+            try:
+                region = phonenumbers.region_code_for_number(phonenumbers.parse(number, None))
+            except phonenumbers.NumberParseException:
+                continue
+            if region in self.target_country_codes:
+                kept.append(number)
+        return kept
+
+    def check(self, progress: CrawlProgress) -> Optional[str]:
+        """Returns the name of the first policy that wants the crawl stopped, or None."""
+        for policy in self.policies:
+            if policy.should_stop(progress):
+                return policy.name
+        return None
+
+    def record_stop(self, policy_name: str, pages_saved: int) -> None:
+        counters = self.stats_by_policy[policy_name]
+        counters["early_stops"] += 1
+        counters["pages_saved"] += pages_saved
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "policies": [p.name for p in self.policies],
+            "entry_points_evaluated": self.entry_points_evaluated,
+            "pages_regex_scanned_during_crawl": self.pages_regex_scanned,
+            "by_policy": {name: dict(counters) for name, counters in self.stats_by_policy.items()},
+        }
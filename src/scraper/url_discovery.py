@@ -0,0 +1,202 @@
+"""
+Cheap HTTP discovery of likely Impressum/Kontakt URLs before link crawling.
+
+Finding the imprint normally means fetching the homepage and scoring its
+anchors. `UrlDiscovery` runs once the entry page of a site has been fetched and
+looks for contact-type URLs without rendering anything:
+
+1. Sitemaps: the `Sitemap:` lines of the (cached) robots.txt, or `/sitemap.xml`
+   and `/sitemap_index.xml`. Sitemap index files are followed up to
+   SCRAPER_DISCOVERY_MAX_SITEMAPS files. Each listed URL on the same host is
+   scored with the crawl's `LinkScorer`.
+2. Well-known paths (SCRAPER_DISCOVERY_WELL_KNOWN_PATHS, e.g. /impressum,
+   /kontakt) are probed with HEAD (GET if HEAD is not supported), unless the
+   sitemap already produced a URL of the same page kind.
+
+The returned (url, score) seeds are pushed into the entry point's URL queue, so
+the imprint and contact pages are fetched right after the homepage. All requests
+go through the crawl frontier's per-host politeness slots.
+"""
+import gzip
+import logging
+import xml.etree.ElementTree as ET
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import urljoin, urlparse
+
+import httpx
+
+from ..core.config import AppConfig
+from .crawl_frontier import CrawlFrontier
+from .link_scorer import LinkScorer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SITEMAP_PATHS: Tuple[str, ...] = ("/sitemap.xml", "/sitemap_index.xml")
+# Sitemap bodies larger than this are ignored (the sitemap protocol caps files at 50 MB uncompressed).
+MAX_SITEMAP_BYTES: int = 10 * 1024 * 1024
+# Score given to a well-known path that answered with a 2xx status.
+WELL_KNOWN_PATH_SCORE: int = 100
+
+
+def _xml_local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def parse_sitemap(content: bytes) -> Tuple[List[str], List[str]]:
+    """
+    Parses a sitemap or sitemap index (optionally gzipped).
+
+    Returns (page_urls, child_sitemap_urls).
+    """
+    if content[:2] == b'\x1f\x8b':
+        content = gzip.decompress(content)
+    root = ET.fromstring(content)
+    page_urls: List[str] = []
+    child_sitemaps: List[str] = []
+    root_name = _xml_local_name(root.tag)
+    for element in root:
+        element_name = _xml_local_name(element.tag)
+        for child in element:
+            if _xml_local_name(child.tag) == 'loc' and child.text and child.text.strip():
+                loc = child.text.strip()
+                if root_name == 'sitemapindex' or element_name == 'sitemap':
+                    child_sitemaps.append(loc)
+                else:
+                    page_urls.append(loc)
+                break
+    return page_urls, child_sitemaps
+
+
+class UrlDiscovery:
+    """Sitemap and well-known path discovery. One instance is shared by all scrape calls."""
+
+    def __init__(self, config: AppConfig, client: httpx.AsyncClient, crawl_frontier: CrawlFrontier, link_scorer: Optional[LinkScorer] = None):
+        self.config = config
+        self.client = client
+        self.crawl_frontier = crawl_frontier
+        self.link_scorer = link_scorer or LinkScorer(config)
+        self.well_known_paths: List[str] = config.scraper_discovery_well_known_paths
+        self.max_sitemaps: int = max(0, config.scraper_discovery_max_sitemaps)
+        self.max_seeds: int = max(1, config.scraper_discovery_max_seeds)
+        self.min_seed_score: int = config.scraper_discovery_min_seed_score
+
+        self.stats: Dict[str, Any] = {
+            "sites_checked": 0,
+            "sites_with_seeds": 0,
+            "sitemaps_fetched": 0,
+            "sitemap_urls_seen": 0,
+            "seeds_from_sitemap": 0,
+            "well_known_probes": 0,
+            "seeds_from_well_known_paths": 0,
+        }
+
+    def _page_kind(self, url: str) -> Optional[str]:
+        """'imprint' or 'contact' if the URL path contains one of the configured page-type keywords."""
+        path_lower = urlparse(url).path.lower()
+        if any(kw in path_lower for kw in self.config.page_type_keywords_imprint):
+            return "imprint"
+        if any(kw in path_lower for kw in self.config.page_type_keywords_contact):
+            return "contact"
+        return None
+
+    async def _request(self, method: str, url: str, input_row_id: Any, company_name_or_id: str) -> Optional[httpx.Response]:
+        try:
+            async with self.crawl_frontier.host_slot(url, input_row_id, company_name_or_id):
+                return await self.client.request(method, url)
+        except httpx.HTTPError as e:
+            logger.debug(f"[RowID: {input_row_id}, Company: {company_name_or_id}] URL discovery: {method} {url} failed ({type(e).__name__}: {e}).")
+            return None
+
+    async def _sitemap_candidates(self, site_root: str, input_row_id: Any, company_name_or_id: str) -> List[str]:
+        sitemap_urls: List[str] = []
+        if self.crawl_frontier.robots_cache is not None:
+            sitemap_urls = self.crawl_frontier.robots_cache.get_sitemaps(site_root)
+        # Without robots.txt `Sitemap:` lines, the default locations are tried until one of them works.
+        default_locations: Set[str] = set()
+        if not sitemap_urls:
+            sitemap_urls = [urljoin(site_root, path) for path in DEFAULT_SITEMAP_PATHS]
+            default_locations = set(sitemap_urls)
+
+        host = self.crawl_frontier.host_key(site_root)
+        page_urls: List[str] = []
+        queue: List[str] = list(sitemap_urls)
+        fetched: Set[str] = set()
+        while queue and len(fetched) < self.max_sitemaps:
+            sitemap_url = queue.pop(0)
+            if sitemap_url in fetched:
+                continue
+            fetched.add(sitemap_url)
+            response = await self._request("GET", sitemap_url, input_row_id, company_name_or_id)
+            if response is None or not response.is_success or len(response.content) > MAX_SITEMAP_BYTES:
+                continue
+            try:
+                urls, child_sitemaps = parse_sitemap(response.content)
+            except (ET.ParseError, OSError, EOFError) as e:
+                logger.debug(f"[RowID: {input_row_id}, Company: {company_name_or_id}] URL discovery: could not parse sitemap {sitemap_url}: {e}")
+                continue
+            self.stats["sitemaps_fetched"] += 1
+            page_urls.extend(u for u in urls if self.crawl_frontier.host_key(u) == host)
+            if sitemap_url in default_locations:
+                queue = [u for u in queue if u not in default_locations]
+            queue.extend(child_sitemaps)
+        self.stats["sitemap_urls_seen"] += len(page_urls)
+        return page_urls
+
+    def _score_url(self, url: str) -> int:
+        url_lower = url.lower()
+        if not self.link_scorer.matches_target(url_lower):
+            return 0
+        path_lower = urlparse(url_lower).path
+        if self.link_scorer.is_excluded(path_lower):
+            return 0
+        path_segments = [seg for seg in path_lower.strip('/').split('/') if seg]
+        return self.link_scorer.score_path(path_segments, link_text_matched=False)
+
+    async def discover(self, site_url: str, input_row_id: Any = None, company_name_or_id: str = "") -> List[Tuple[str, int]]:
+        """Returns up to SCRAPER_DISCOVERY_MAX_SEEDS (url, score) seeds for the site of `site_url`, best first."""
+        parsed = urlparse(site_url)
+        site_root = f"{parsed.scheme}://{parsed.netloc}/"
+        self.stats["sites_checked"] += 1
+
+        seeds: Dict[str, int] = {}
+        from_well_known_paths: Set[str] = set()
+        if self.max_sitemaps > 0:
+            for url in await self._sitemap_candidates(site_root, input_row_id, company_name_or_id):
+                score = self._score_url(url)
+                if score >= self.min_seed_score and score > seeds.get(url, -1):
+                    seeds[url] = score
+        kinds_found = {self._page_kind(url) for url in seeds}
+
+        for path in self.well_known_paths:
+            probe_url = urljoin(site_root, path)
+            kind = self._page_kind(probe_url)
+            if kind is not None and kind in kinds_found:
+                continue
+            if not await self.crawl_frontier.is_allowed(probe_url, input_row_id, company_name_or_id):
+                continue
+            self.stats["well_known_probes"] += 1
+            response = await self._request("HEAD", probe_url, input_row_id, company_name_or_id)
+            if response is not None and response.status_code in (405, 501):
+                response = await self._request("GET", probe_url, input_row_id, company_name_or_id)
+            if response is None or not response.is_success:
+                continue
+            landed_url = str(response.url)
+            # A redirect to the homepage or another host means the path does not exist as such.
+            if self.crawl_frontier.host_key(landed_url) != self.crawl_frontier.host_key(site_root) or self._page_kind(landed_url) != kind:
+                continue
+            if landed_url not in seeds:
+                from_well_known_paths.add(landed_url)
+            seeds[landed_url] = max(seeds.get(landed_url, 0), WELL_KNOWN_PATH_SCORE)
+            kinds_found.add(kind)
+
+        ranked = sorted(seeds.items(), key=lambda kv: -kv[1])[:self.max_seeds]
+        well_known_seed_count = sum(1 for url, _ in ranked if url in from_well_known_paths)
+        self.stats["seeds_from_well_known_paths"] += well_known_seed_count
+        self.stats["seeds_from_sitemap"] += len(ranked) - well_known_seed_count
+        if ranked:
+            self.stats["sites_with_seeds"] += 1
+            logger.info(f"[RowID: {input_row_id}, Company: {company_name_or_id}] URL discovery for {site_root} found {len(ranked)} seed(s): {ranked}")
+        return ranked
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats)
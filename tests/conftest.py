@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Lets the tests import `src` when pytest is started from any directory.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
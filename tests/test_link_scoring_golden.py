@@ -0,0 +1,71 @@
+"""
+Golden test for link scoring.
+
+`expected_links.json` holds the (url, score) lists that `find_internal_links`
+returned for the pages in `fixtures/link_scoring/` at the baseline commit
+(06e1dfc), before the single-pass page analysis and the table-driven
+`LinkScorer`. That code always parsed with 'html.parser'. The fixture was
+generated with the default configuration, so keyword or score overrides in
+`.env` make this test fail.
+
+The pages:
+- Six small hand-written company pages (German and English): short menus,
+  one-pagers, deep paths, odd hrefs.
+- Real published documentation pages, kept as published. Their navigation
+  menus list every module, so each page has hundreds to thousands of anchors:
+  - `nodejs_v20_api_fs.html` (about 3,000 anchors), `nodejs_v20_api_net.html`
+    and `nodejs_v20_api_documentation.html`, from
+    https://nodejs.org/docs/v20.19.5/api/
+  - `rust_1_90_std_index.html`, from
+    https://doc.rust-lang.org/1.90.0/std/index.html
+  They were copied from the Node.js and Rust documentation packages, which
+  ship the same pages.
+
+The scraper now parses with lxml when it is installed, so every case runs with
+the parser pinned to each of 'html.parser' and 'lxml'. The lxml cases are
+skipped when lxml is not installed.
+"""
+import importlib.util
+import json
+import os
+
+import pytest
+
+from src.scraper import scraper_logic
+from src.scraper.scraper_logic import analyze_page, find_internal_links
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'link_scoring')
+
+with open(os.path.join(FIXTURES_DIR, 'expected_links.json'), encoding='utf-8') as _expected_file:
+    EXPECTED_LINKS = json.load(_expected_file)
+
+CASES = [(page, base_url) for page, by_base_url in EXPECTED_LINKS.items() for base_url in by_base_url]
+
+HTML_PARSERS = [
+    'html.parser',
+    pytest.param('lxml', marks=pytest.mark.skipif(importlib.util.find_spec('lxml') is None, reason="lxml is not installed")),
+]
+
+
+@pytest.fixture(params=HTML_PARSERS)
+def html_parser(request, monkeypatch):
+    """Pins the parser `analyze_page` and `find_internal_links` use, whatever is installed."""
+    monkeypatch.setattr(scraper_logic, 'HTML_PARSER', request.param)
+    return request.param
+
+
+def _read_page(page: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, page), encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("page,base_url", CASES)
+def test_find_internal_links_matches_golden(page, base_url, html_parser):
+    expected = [tuple(link) for link in EXPECTED_LINKS[page][base_url]]
+    assert find_internal_links(_read_page(page), base_url, "GOLDEN", "golden") == expected
+
+
+@pytest.mark.parametrize("page,base_url", CASES)
+def test_analyze_page_scored_links_match_golden(page, base_url, html_parser):
+    expected = [tuple(link) for link in EXPECTED_LINKS[page][base_url]]
+    assert analyze_page(_read_page(page), base_url, "GOLDEN", "golden").scored_links == expected
@@ -0,0 +1,55 @@
+"""
+Tests for `merge_pass1_metrics`, which combines the Pass 1 stats of worker and shard checkpoints.
+"""
+from main_pipeline import merge_pass1_metrics
+
+
+def _merge(path, *sources):
+    target = {}
+    for source in sources:
+        merge_pass1_metrics(target, source, path)
+    return target
+
+
+def test_derived_ratios_are_weighted_by_volume():
+    small_worker = {
+        "requests_dispatched": 1, "host_wait_seconds_total": 10.0, "host_wait_seconds_avg": 10.0, "host_wait_seconds_max": 10.0,
+        "robots_cache": {"lookups": 1, "memory_hits": 0, "memory_hit_rate": 0.0},
+    }
+    large_worker = {
+        "requests_dispatched": 10000, "host_wait_seconds_total": 1000.0, "host_wait_seconds_avg": 0.1, "host_wait_seconds_max": 2.0,
+        "robots_cache": {"lookups": 10000, "memory_hits": 9000, "memory_hit_rate": 0.9},
+    }
+    merged = _merge("crawl_frontier_stats", small_worker, large_worker)
+    assert merged["requests_dispatched"] == 10001
+    assert merged["host_wait_seconds_max"] == 10.0
+    assert merged["host_wait_seconds_avg"] == round(1010.0 / 10001, 3)
+    assert merged["robots_cache"]["memory_hit_rate"] == round(9000 / 10001, 3)
+
+
+def test_response_cache_and_dns_ratios_are_recomputed():
+    worker_a = {
+        "response_cache": {"lookups": 10, "hits": 10, "revalidated": 0, "misses": 0, "stale_refetched": 0, "hits_ratio": 1.0, "misses_ratio": 0.0},
+        "dns_resolver": {"lookups": 4, "cache_hits": 0, "cache_hit_rate": 0.0},
+    }
+    worker_b = {
+        "response_cache": {"lookups": 30, "hits": 0, "revalidated": 0, "misses": 30, "stale_refetched": 0, "hits_ratio": 0.0, "misses_ratio": 1.0},
+        "dns_resolver": {"lookups": 12, "cache_hits": 12, "cache_hit_rate": 1.0},
+    }
+    merged = _merge("scraping_stats", worker_a, worker_b)
+    assert merged["response_cache"]["hits_ratio"] == 0.25
+    assert merged["response_cache"]["misses_ratio"] == 0.75
+    assert merged["dns_resolver"]["cache_hit_rate"] == 0.75
+
+
+def test_chunk_sizing_averages_use_calibration_counters():
+    idle_worker = {"chunks": 0, "chunk_candidate_limit_total": 0, "candidate_limit_avg": 60, "prompt_chars": 0, "prompt_tokens": 0}
+    busy_worker = {
+        "chunks": 4, "chunk_candidate_limit_total": 100, "candidate_limit_avg": 20,
+        "prompt_chars": 24000, "prompt_tokens": 8000, "calibration_completion_tokens": 600, "calibration_candidates": 20,
+    }
+    merged = _merge("llm_processing_stats", {"chunk_sizing": idle_worker}, {"chunk_sizing": busy_worker})["chunk_sizing"]
+    assert merged["candidate_limit_avg"] == 25.0
+    assert merged["chars_per_prompt_token_avg"] == round((2000 * 4 + 24000) / (2000 + 8000), 2)
+    assert merged["completion_tokens_per_candidate_avg"] == round((40.0 * 10 + 600) / (10 + 20), 1)
+
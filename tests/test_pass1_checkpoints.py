@@ -0,0 +1,310 @@
+"""
+Tests for the Pass 1 checkpoint restore and merge functions of `main_pipeline`.
+
+`_process_row` stands in for Pass 1's row processing: it records a scrape
+result, a pathful URL result in the pipeline store, journey data and counters
+the way `main` does, without scraping or calling the LLM.
+"""
+import os
+from collections import Counter
+
+import pandas as pd
+import pytest
+
+import main_pipeline
+from main_pipeline import (
+    PASS1_ROW_COLUMNS,
+    Pass1State,
+    checkpoint_pass1_row,
+    compute_input_fingerprint,
+    discard_unfinished_pathful_results,
+    load_shard_outputs,
+    mark_restored_rows_in_queue,
+    plan_domain_work_units,
+    plan_queue_entries,
+    restore_pass1_checkpoint,
+    restore_shard_outputs,
+    restore_worker_checkpoints,
+    shard_for_work_unit,
+)
+from src.checkpoint_store import RunCheckpointStore
+from src.core.schemas import PhoneNumberLLMOutput
+from src.incremental_state import IncrementalRunState
+from src.pipeline_store import QUEUE_DONE, SQLitePipelineRepository
+
+CHECKPOINT_FILE = "pass1_checkpoint.sqlite"
+PIPELINE_STORE_FILE = "pipeline_store.sqlite"
+
+INPUT_ROWS = [
+    ("Alpha GmbH", "https://www.alpha.de"),
+    ("Alpha Vertrieb GmbH", "alpha.de/vertrieb"),
+    ("Beta AG", "https://beta.ch/kontakt"),
+    ("Gamma KG", "gamma.at"),
+    ("Delta GmbH", "not a url"),
+    ("Epsilon SE", "https://www.epsilon.de/impressum"),
+]
+
+
+def _input_df():
+    df = pd.DataFrame(INPUT_ROWS, columns=["CompanyName", "GivenURL"])
+    for col in PASS1_ROW_COLUMNS:
+        df[col] = None
+    return df
+
+
+def _run_metrics():
+    return {
+        "tasks": {},
+        "data_processing_stats": {"rows_reused_domain_result": 0},
+        "scraping_stats": {"scraping_success": 0, "scraping_failure_invalid_url": 0, "new_canonical_sites_scraped": 0, "total_pages_scraped_overall": 0, "pages_scraped_by_type": {}},
+        "regex_extraction_stats": {"sites_processed_for_regex": 0, "total_regex_candidates_found": 0},
+        "llm_processing_stats": {"sites_processed_for_llm": 0, "total_llm_extracted_numbers_raw": 0},
+        "errors_encountered": [],
+    }
+
+
+class _Run:
+    """One process's Pass 1 state, checkpoint and pipeline store in a run output directory."""
+
+    def __init__(self, run_dir, checkpoint_name=CHECKPOINT_FILE):
+        os.makedirs(run_dir, exist_ok=True)
+        self.run_dir = str(run_dir)
+        self.pipeline_store = SQLitePipelineRepository(os.path.join(self.run_dir, PIPELINE_STORE_FILE))
+        self.checkpoint_store = RunCheckpointStore(os.path.join(self.run_dir, checkpoint_name))
+        incremental_state = IncrementalRunState(main_pipeline.app_config, "test", state_path=os.path.join(self.run_dir, "incremental_state.json"))
+        self.state = Pass1State(df=_input_df(), run_metrics=_run_metrics(), incremental_state=incremental_state, pipeline_store=self.pipeline_store)
+
+    def close(self):
+        self.checkpoint_store.close()
+        self.pipeline_store.close()
+
+
+def _process_row(state, index):
+    df = state.df
+    state.rows_processed_in_pass1 += 1
+    company_name, given_url = df.at[index, "CompanyName"], df.at[index, "GivenURL"]
+    true_base = main_pipeline.get_input_canonical_url(given_url)
+    true_base = f"https://{true_base.removeprefix('www.')}" if true_base and "." in true_base else None
+    state.input_to_canonical_map[given_url] = true_base
+    if true_base is None:
+        df.at[index, "ScrapingStatus"] = "InvalidURL"
+        df.at[index, "Overall_VerificationStatus"] = "Unverified_Scrape_InvalidURL"
+        state.run_metrics["scraping_stats"]["scraping_failure_invalid_url"] += 1
+        state.run_metrics["errors_encountered"].append(f"Invalid URL for {company_name}")
+        state.row_level_failure_counts["Scraping_InvalidURL"] = state.row_level_failure_counts.get("Scraping_InvalidURL", 0) + 1
+        state.rows_failed_in_pass1 += 1
+        return
+    pathful_url = f"{true_base}/kontakt"
+    pages = [(f"/tmp/{index}_kontakt_cleaned.txt", pathful_url, "contact", "http")]
+    state.pass1_row_scrape_results[index] = (pages, "Success", pathful_url)
+    df.at[index, "ScrapingStatus"] = "Success"
+    df.at[index, "CanonicalEntryURL"] = true_base
+    df.at[index, "Overall_VerificationStatus"] = "Pending_Pass2"
+    journey = state.canonical_domain_journey_data.setdefault(true_base, {
+        "Input_Row_IDs": set(), "Input_CompanyNames": set(), "Input_GivenURLs": set(), "Pathful_URLs_Attempted_List": set(),
+        "Scraped_Pages_Details_Aggregated": Counter(), "Total_Pages_Scraped_For_Domain": 0, "LLM_Calls_Made_For_Domain": False,
+        "LLM_Consolidated_Number_Types_Summary": Counter(), "LLM_Error_Messages_Aggregated": [],
+    })
+    journey["Input_Row_IDs"].add(index)
+    journey["Input_CompanyNames"].add(company_name)
+    journey["Input_GivenURLs"].add(given_url)
+    journey["Pathful_URLs_Attempted_List"].add(pathful_url)
+    state.true_base_to_input_row_ids.setdefault(true_base, set()).add(index)
+    state.true_base_to_input_company_names.setdefault(true_base, set()).add(company_name)
+    state.true_base_to_input_given_urls.setdefault(true_base, set()).add(given_url)
+    state.true_base_to_pathful_urls_attempted.setdefault(true_base, set()).add(pathful_url)
+    state.run_metrics["scraping_stats"]["scraping_success"] += 1
+    if not state.pipeline_store.claim_pathful(pathful_url, true_base, str(index)):
+        state.run_metrics["data_processing_stats"]["rows_reused_domain_result"] += 1
+        return
+    number = f"+4989{2180000 + index * 111}"
+    journey["Scraped_Pages_Details_Aggregated"]["contact"] += 1
+    journey["Total_Pages_Scraped_For_Domain"] += 1
+    journey["LLM_Calls_Made_For_Domain"] = True
+    state.run_metrics["scraping_stats"]["new_canonical_sites_scraped"] += 1
+    state.run_metrics["scraping_stats"]["total_pages_scraped_overall"] += 1
+    state.run_metrics["scraping_stats"]["pages_scraped_by_type"]["contact"] = state.run_metrics["scraping_stats"]["pages_scraped_by_type"].get("contact", 0) + 1
+    state.run_metrics["regex_extraction_stats"]["sites_processed_for_regex"] += 1
+    state.run_metrics["regex_extraction_stats"]["total_regex_candidates_found"] += 1
+    state.run_metrics["llm_processing_stats"]["sites_processed_for_llm"] += 1
+    state.run_metrics["llm_processing_stats"]["total_llm_extracted_numbers_raw"] += 1
+    state.pipeline_store.save_regex_candidates(pathful_url, [{"number": number, "snippet": f"Tel. {number}", "source_url": pathful_url}])
+    state.pipeline_store.complete_pathful(pathful_url, "Success", True, [
+        PhoneNumberLLMOutput(number=number, type="Main Line", classification="Primary", source_url=pathful_url, original_input_company_name=company_name)
+    ])
+
+
+def _process_rows(run, row_indices):
+    for index in row_indices:
+        _process_row(run.state, index)
+        checkpoint_pass1_row(run.state, run.checkpoint_store, index)
+        run.pipeline_store.set_row_status([str(index)], QUEUE_DONE)
+
+
+def _queue_entries(df):
+    """Queue entries as `main` plans them."""
+    return plan_queue_entries(df, plan_domain_work_units({index: main_pipeline.get_input_canonical_url(url) for index, url in df["GivenURL"].items()}))
+
+
+def _run_shard(run_dir, shard_index, shard_count):
+    """A `--shard i/N` run: queues and processes only the shard's work units."""
+    run = _Run(run_dir)
+    df = run.state.df
+    shard_entries = [entry for entry in _queue_entries(df) if shard_for_work_unit(entry[2], shard_count) == shard_index]
+    run.checkpoint_store.set_meta("shard", {"index": shard_index, "count": shard_count, "input_rows": len(df), "input_fingerprint": compute_input_fingerprint(df)})
+    run.pipeline_store.enqueue_rows(shard_entries)
+    _process_rows(run, [int(row_key) for row_key, _, _ in shard_entries])
+    run.close()
+    return [int(row_key) for row_key, _, _ in shard_entries]
+
+
+def _pass1_results(state):
+    """Everything Pass 2 and the reports read from the Pass 1 state and pipeline store, in comparable form."""
+    return {
+        "df": state.df[PASS1_ROW_COLUMNS].astype(object).where(state.df[PASS1_ROW_COLUMNS].notna(), None).to_dict("index"),
+        "scrape_results": {index: (list(map(tuple, pages)), status, url) for index, (pages, status, url) in state.pass1_row_scrape_results.items()},
+        "input_to_canonical_map": state.input_to_canonical_map,
+        "journey": state.canonical_domain_journey_data,
+        "row_ids": state.true_base_to_input_row_ids,
+        "company_names": state.true_base_to_input_company_names,
+        "given_urls": state.true_base_to_input_given_urls,
+        "pathful_urls": state.true_base_to_pathful_urls_attempted,
+        "row_level_failure_counts": state.row_level_failure_counts,
+        "rows_processed": state.rows_processed_in_pass1,
+        "rows_failed": state.rows_failed_in_pass1,
+        "rows_reused_domain_result": state.run_metrics["data_processing_stats"]["rows_reused_domain_result"],
+        "scraping_stats": state.run_metrics["scraping_stats"],
+        "regex_extraction_stats": state.run_metrics["regex_extraction_stats"],
+        "llm_processing_stats": state.run_metrics["llm_processing_stats"],
+        "errors": sorted(state.run_metrics["errors_encountered"]),
+        "completed_pathful_urls": {true_base: sorted(urls) for true_base, urls in state.pipeline_store.completed_pathful_urls_by_true_base().items()},
+        "llm_outputs": {
+            true_base: sorted(item.number for item in state.pipeline_store.llm_outputs_for_true_base(true_base))
+            for true_base in state.pipeline_store.completed_pathful_urls_by_true_base()
+        },
+    }
+
+
+class _SimulatedCrash(BaseException):
+    pass
+
+
+def test_worker_checkpoint_imported_before_crash_is_not_restored_twice(tmp_path, monkeypatch):
+    run_dir = tmp_path / "run"
+    worker = _Run(run_dir, checkpoint_name="pass1_checkpoint.worker-1-4242.sqlite")
+    _process_rows(worker, range(len(INPUT_ROWS)))
+    worker_results = _pass1_results(worker.state)
+    worker.close()
+    worker_checkpoint_pattern = os.path.join(str(run_dir), "pass1_checkpoint.worker-*.sqlite")
+
+    # The main process folds the worker checkpoint into its own, then dies before deleting the worker file.
+    main_run = _Run(run_dir)
+
+    def _crash(path):
+        raise _SimulatedCrash(path)
+
+    monkeypatch.setattr(main_pipeline.os, "remove", _crash)
+    with pytest.raises(_SimulatedCrash):
+        restore_worker_checkpoints(main_run.state, main_run.checkpoint_store, worker_checkpoint_pattern)
+    monkeypatch.undo()
+    main_run.close()
+    assert os.path.exists(os.path.join(str(run_dir), "pass1_checkpoint.worker-1-4242.sqlite"))
+
+    # --resume: the run's checkpoint already holds the worker's rows; the leftover worker file is only deleted.
+    resumed = _Run(run_dir)
+    restored_rows = restore_pass1_checkpoint(resumed.state, resumed.checkpoint_store.load())
+    assert restored_rows == len(INPUT_ROWS)
+    assert restore_worker_checkpoints(resumed.state, resumed.checkpoint_store, worker_checkpoint_pattern) == 0
+    assert not os.path.exists(os.path.join(str(run_dir), "pass1_checkpoint.worker-1-4242.sqlite"))
+    assert resumed.checkpoint_store.imported_checkpoints() == ["pass1_checkpoint.worker-1-4242.sqlite"]
+    assert resumed.state.completed_pass1_rows == set(range(len(INPUT_ROWS)))
+    assert _pass1_results(resumed.state) == worker_results
+    resumed.close()
+
+
+def test_worker_checkpoints_are_restored_and_folded_in(tmp_path):
+    run_dir = tmp_path / "run"
+    for worker_number, row_indices in ((1, [0, 1, 4]), (2, [2, 3, 5])):
+        worker = _Run(run_dir, checkpoint_name=f"pass1_checkpoint.worker-{worker_number}-100.sqlite")
+        _process_rows(worker, row_indices)
+        worker.close()
+    single = _Run(tmp_path / "single")
+    _process_rows(single, range(len(INPUT_ROWS)))
+
+    main_run = _Run(run_dir)
+    worker_checkpoint_pattern = os.path.join(str(run_dir), "pass1_checkpoint.worker-*.sqlite")
+    assert restore_worker_checkpoints(main_run.state, main_run.checkpoint_store, worker_checkpoint_pattern) == len(INPUT_ROWS)
+    assert _pass1_results(main_run.state) == _pass1_results(single.state)
+    main_run.close()
+
+    # The folded-in run checkpoint restores the same state.
+    resumed = _Run(run_dir)
+    restore_pass1_checkpoint(resumed.state, resumed.checkpoint_store.load())
+    assert _pass1_results(resumed.state) == _pass1_results(single.state)
+    resumed.close()
+    single.close()
+
+
+@pytest.mark.parametrize("shard_count", [1, 2, 3, 7])
+def test_every_work_unit_lands_in_exactly_one_shard(shard_count):
+    df = _input_df()
+    entries = _queue_entries(df)
+    shards = {shard_index: [entry for entry in entries if shard_for_work_unit(entry[2], shard_count) == shard_index] for shard_index in range(1, shard_count + 1)}
+    sharded_row_keys = [row_key for shard_entries in shards.values() for row_key, _, _ in shard_entries]
+    assert sorted(sharded_row_keys) == sorted(row_key for row_key, _, _ in entries)
+    # Rows sharing a domain are one work unit, so they never end up in different shards.
+    for work_unit in {work_unit for _, _, work_unit in entries}:
+        assert sum(1 for shard_entries in shards.values() if any(entry[2] == work_unit for entry in shard_entries)) == 1
+    assert {entry[2] for entry in entries if entry[0] in ("0", "1")} == {"http://alpha.de"}
+
+
+def test_shard_assignment_does_not_depend_on_the_process():
+    # SHA-256 based, unlike hash(): these values must hold on every machine, or merged shards miss rows.
+    assert shard_for_work_unit("example.de", 4) == 4
+    assert shard_for_work_unit("row:17", 4) == 2
+
+
+def test_merged_shards_equal_an_unsharded_run(tmp_path):
+    shard_dirs = [str(tmp_path / f"shard{shard_index}") for shard_index in (1, 2, 3)]
+    shard_rows = [_run_shard(shard_dir, shard_index, 3) for shard_index, shard_dir in enumerate(shard_dirs, start=1)]
+    assert all(shard_rows) and sorted(sum(shard_rows, [])) == list(range(len(INPUT_ROWS)))
+    single = _Run(tmp_path / "single")
+    _process_rows(single, range(len(INPUT_ROWS)))
+
+    merged = _Run(tmp_path / "merged")
+    df = merged.state.df
+    merged.pipeline_store.enqueue_rows(_queue_entries(df))
+    shard_outputs = load_shard_outputs(list(reversed(shard_dirs)), CHECKPOINT_FILE, PIPELINE_STORE_FILE, compute_input_fingerprint(df), len(df))
+    restore_shard_outputs(merged.state, merged.checkpoint_store, shard_outputs, PIPELINE_STORE_FILE)
+    assert _pass1_results(merged.state) == _pass1_results(single.state)
+    assert merged.state.run_metrics["data_processing_stats"]["shards_merged"] == 3
+    assert discard_unfinished_pathful_results(merged.state) == 0
+    mark_restored_rows_in_queue(merged.state)
+    assert merged.pipeline_store.queue_counts() == {QUEUE_DONE: len(INPUT_ROWS)}
+    merged.close()
+    single.close()
+
+
+def test_merge_rejects_missing_duplicate_and_foreign_shards(tmp_path):
+    shard_dirs = [str(tmp_path / f"shard{shard_index}") for shard_index in (1, 2, 3)]
+    for shard_index, shard_dir in enumerate(shard_dirs, start=1):
+        _run_shard(shard_dir, shard_index, 3)
+    df = _input_df()
+    fingerprint = compute_input_fingerprint(df)
+
+    def _load(dirs, input_fingerprint=fingerprint):
+        return load_shard_outputs(dirs, CHECKPOINT_FILE, PIPELINE_STORE_FILE, input_fingerprint, len(df))
+
+    assert [shard_meta["index"] for _, shard_meta, _ in _load(shard_dirs)] == [1, 2, 3]
+    assert _load(shard_dirs[:2]) is None
+    assert _load(shard_dirs[:2] + [shard_dirs[0]]) is None
+    assert _load(shard_dirs + [str(tmp_path / "not_a_shard")]) is None
+
+    changed_df = df.copy()
+    changed_df.at[3, "GivenURL"] = "gamma-neu.at"
+    assert _load(shard_dirs, compute_input_fingerprint(changed_df)) is None
+
+    # A shard of another layout (2 shards) cannot stand in for shard 3 of 3.
+    other_layout_dir = str(tmp_path / "other_layout")
+    _run_shard(other_layout_dir, 2, 2)
+    assert _load(shard_dirs[:2] + [other_layout_dir]) is None
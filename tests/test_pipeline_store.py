@@ -0,0 +1,100 @@
+"""
+Tests for the work queue and pathful canonical URL claims of `SQLitePipelineRepository`.
+"""
+import threading
+import time
+
+import pytest
+
+from src.core.schemas import PhoneNumberLLMOutput
+from src.pipeline_store import QUEUE_DONE, SQLitePipelineRepository
+
+PATHFUL_URL = "https://www.example.de/kontakt"
+TRUE_BASE = "https://www.example.de"
+
+
+@pytest.fixture
+def store(tmp_path):
+    repository = SQLitePipelineRepository(str(tmp_path / "pipeline_store.sqlite"))
+    yield repository
+    repository.close()
+
+
+def _llm_output(number):
+    return PhoneNumberLLMOutput(number=number, type="Main Line", classification="Primary", source_url=PATHFUL_URL, original_input_company_name="Example GmbH")
+
+
+def test_failed_row_releases_claim_for_later_row(store):
+    assert store.claim_pathful(PATHFUL_URL, TRUE_BASE, "0")
+    store.save_scraped_page(PATHFUL_URL, TRUE_BASE, PATHFUL_URL, "contact", "http", "Telefon: 089 21800")
+    store.save_regex_candidates(PATHFUL_URL, [{"number": "+498921800", "snippet": "Telefon: 089 21800", "source_url": PATHFUL_URL}])
+    # Row 1 lands on the same URL while row 0 is still processing it.
+    assert not store.claim_pathful(PATHFUL_URL, TRUE_BASE, "1")
+
+    # Row 0 fails before completing; only the claim holder can release it.
+    assert not store.release_pathful(PATHFUL_URL, "1")
+    assert store.release_pathful(PATHFUL_URL, "0")
+    assert not store.release_pathful(PATHFUL_URL, "0")
+    assert store.stats["pathful_claims_released"] == 1
+
+    assert store.claim_pathful(PATHFUL_URL, TRUE_BASE, "2")
+    store.complete_pathful(PATHFUL_URL, "Success", True, [_llm_output("+498921800")])
+    assert store.completed_pathful_urls_by_true_base() == {TRUE_BASE: [PATHFUL_URL]}
+    assert [item.number for item in store.llm_outputs_for_true_base(TRUE_BASE)] == ["+498921800"]
+
+
+def test_release_after_completion_keeps_results(store):
+    assert store.claim_pathful(PATHFUL_URL, TRUE_BASE, "0")
+    store.complete_pathful(PATHFUL_URL, "Success", True, [_llm_output("+498921800")])
+    assert not store.release_pathful(PATHFUL_URL, "0")
+    assert store.completed_pathful_urls_by_true_base() == {TRUE_BASE: [PATHFUL_URL]}
+    assert not store.claim_pathful(PATHFUL_URL, TRUE_BASE, "1")
+
+
+def test_unreleased_claim_blocks_url_and_is_dropped_on_resume(store):
+    assert store.claim_pathful(PATHFUL_URL, TRUE_BASE, "0")
+    assert not store.claim_pathful(PATHFUL_URL, TRUE_BASE, "1")
+    # On resume, claims of rows that did not complete are discarded.
+    assert store.discard_pathful_results(keep_claimed_by_rows=set()) == 1
+    assert store.claim_pathful(PATHFUL_URL, TRUE_BASE, "1")
+
+
+def test_concurrent_workers_never_claim_the_same_work_unit(tmp_path):
+    store_path = str(tmp_path / "pipeline_store.sqlite")
+    setup_store = SQLitePipelineRepository(store_path)
+    setup_store.enqueue_rows([(str(i), f"https://www.domain-{i % 40}.de", f"domain-{i % 40}.de") for i in range(200)])
+    setup_store.close()
+    start = threading.Barrier(2)
+    claims = {"worker-1": [], "worker-2": []}
+
+    def _claim_until_empty(worker_id):
+        # One connection per claimer, as each --workers process opens its own.
+        worker_store = SQLitePipelineRepository(store_path, busy_timeout_seconds=10)
+        try:
+            start.wait()
+            while True:
+                claimed_work_unit = worker_store.claim_work_unit(worker_id)
+                if claimed_work_unit is None:
+                    return
+                claims[worker_id].append(claimed_work_unit)
+                time.sleep(0.001)
+                worker_store.set_row_status(claimed_work_unit[1], QUEUE_DONE)
+        finally:
+            worker_store.close()
+
+    claimers = [threading.Thread(target=_claim_until_empty, args=(worker_id,)) for worker_id in claims]
+    for claimer in claimers:
+        claimer.start()
+    for claimer in claimers:
+        claimer.join()
+
+    assert claims["worker-1"] and claims["worker-2"]
+    work_units = [work_unit for worker_claims in claims.values() for work_unit, _ in worker_claims]
+    row_keys = [row_key for worker_claims in claims.values() for _, unit_row_keys in worker_claims for row_key in unit_row_keys]
+    assert sorted(work_units) == sorted(f"domain-{i}.de" for i in range(40))
+    assert sorted(row_keys, key=int) == [str(i) for i in range(200)]
+    for work_unit, unit_row_keys in (claim for worker_claims in claims.values() for claim in worker_claims):
+        assert all(f"domain-{int(row_key) % 40}.de" == work_unit for row_key in unit_row_keys)
+    check_store = SQLitePipelineRepository(store_path)
+    assert check_store.queue_counts() == {QUEUE_DONE: 200}
+    check_store.close()
@@ -0,0 +1,34 @@
+"""
+Tests for `RobotsCache` persistence.
+"""
+import asyncio
+import json
+import os
+import time
+
+from src.core.config import AppConfig
+from src.scraper.robots_cache import ROBOTS_MISSING, SAVE_LOCK_TIMEOUT_SECONDS, RobotsCache, _RobotsEntry
+
+
+def test_close_waits_for_the_cache_file_lock_without_blocking_the_event_loop(tmp_path):
+    cache_path = str(tmp_path / "robots_cache.json")
+    cache = RobotsCache(AppConfig(), cache_path=cache_path)
+    now = time.time()
+    cache._entries["https://example.de"] = _RobotsEntry(ROBOTS_MISSING, 404, None, now, now + 3600)
+    cache._dirty = True
+    lock_path = f"{cache_path}.lock"
+    open(lock_path, 'w').close()  # Held by another worker process
+
+    async def release_lock_soon() -> None:
+        await asyncio.sleep(0.2)
+        os.remove(lock_path)
+
+    async def run() -> None:
+        await asyncio.gather(cache.close(), release_lock_soon())
+
+    started = time.monotonic()
+    asyncio.run(run())
+    # A close() that blocked the loop would keep the lock held until SAVE_LOCK_TIMEOUT_SECONDS ran out.
+    assert time.monotonic() - started < SAVE_LOCK_TIMEOUT_SECONDS / 2
+    with open(cache_path, encoding='utf-8') as f:
+        assert "https://example.de" in json.load(f)
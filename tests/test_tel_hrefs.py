@@ -0,0 +1,62 @@
+"""
+Tests for the `tel:` hrefs collected by `analyze_page` and their merge into the regex candidates.
+"""
+from src.regex_extractor_component import (
+    extract_numbers_from_tel_hrefs,
+    merge_tel_href_candidates,
+    read_tel_hrefs_for_page_file,
+    tel_hrefs_path_for_page_file,
+)
+from src.scraper.scraper_logic import analyze_page
+
+PAGE_WITH_TEL_LINKS = """<html><body>
+<nav><a href="/kontakt">Kontakt</a> <a href="/impressum">Impressum</a></nav>
+<p>Rufen Sie uns an: <a href="tel:+4989 21800">089 21800</a></p>
+<a href=" TEL:+49302062730 " aria-label="Anrufen"><img src="phone.svg"></a>
+<a href="mailto:info@example.de">E-Mail</a>
+</body></html>"""
+
+
+def test_analyze_page_collects_tel_hrefs():
+    analysis = analyze_page(PAGE_WITH_TEL_LINKS, "https://www.example.de/", "TEST", "test")
+    assert analysis.tel_hrefs == ["tel:+4989 21800", "TEL:+49302062730"]
+
+
+def test_analyze_page_collects_tel_hrefs_without_link_discovery():
+    analysis = analyze_page(PAGE_WITH_TEL_LINKS, "https://www.example.de/", "TEST", "test", discover_links=False)
+    assert analysis.scored_links == []
+    assert analysis.tel_hrefs == ["tel:+4989 21800", "TEL:+49302062730"]
+
+
+def test_extract_numbers_from_tel_hrefs_parses_with_region_hint():
+    candidates = extract_numbers_from_tel_hrefs(
+        ["tel:08921800", "tel:%2B49%2030%202062730;ext=1", "tel:+49 30 2062730", "tel:+49 30 9876543", "tel:12", "tel:"],
+        "https://example.de/impressum", "Example GmbH", ["DE"]
+    )
+    # +49 30 9876543 is dropped like a text match would be (sequential digits).
+    assert [c["number"] for c in candidates] == ["+498921800", "+49302062730"]
+    assert candidates[0] == {
+        "number": "+498921800",
+        "snippet": "tel:08921800",
+        "source_url": "https://example.de/impressum",
+        "original_input_company_name": "Example GmbH",
+    }
+
+
+def test_merge_tel_href_candidates_keeps_text_snippets():
+    text_candidates = [{"number": "+498921800", "snippet": "Telefon: 089 / 21 800", "source_url": "u", "original_input_company_name": "c"}]
+    tel_candidates = [
+        {"number": "+498921800", "snippet": "tel:08921800", "source_url": "u", "original_input_company_name": "c"},
+        {"number": "+49302062730", "snippet": "tel:+49302062730", "source_url": "u", "original_input_company_name": "c"},
+    ]
+    merged = merge_tel_href_candidates(text_candidates, tel_candidates)
+    assert [c["snippet"] for c in merged] == ["Telefon: 089 / 21 800", "tel:+49302062730"]
+
+
+def test_read_tel_hrefs_for_page_file(tmp_path):
+    page_file = str(tmp_path / "acme__www_acme_de_kontakt_cleaned.txt")
+    assert tel_hrefs_path_for_page_file(page_file) == str(tmp_path / "acme__www_acme_de_kontakt_cleaned_tel.txt")
+    assert read_tel_hrefs_for_page_file(page_file) == []
+    with open(tel_hrefs_path_for_page_file(page_file), 'w', encoding='utf-8') as f:
+        f.write("tel:08921800\n\ntel:+49302062730\n")
+    assert read_tel_hrefs_for_page_file(page_file) == ["tel:08921800", "tel:+49302062730"]